@@ -15,6 +15,8 @@ from app.bot.keyboards import get_categories_keyboard, get_reopen_or_new_keyboar
 from app.bot.keyboards.ticket import get_active_ticket_menu
 from app.config.texts import Texts
 from app.database import operations as ops
+from app.logging_setup import bind_log_context
+from app.services.awaiting import awaiting_queue
 from app.services.notification import NotificationService
 
 if TYPE_CHECKING:
@@ -43,25 +45,25 @@ async def handle_client_message(
     """
     user_id = message.from_user.id
     
-    logger.info(f"handle_client_message: got message from user {user_id}")
+    logger.debug("handle_client_message: got message from user %s", user_id)
     
     # Check if user is in any FSM state (creating ticket, etc.)
     current_state = await state.get_state()
     if current_state is not None:
-        logger.info(f"Skipping client_message handler - user {user_id} has state: {current_state}")
+        logger.debug("Skipping client_message handler - user %s has state: %s", user_id, current_state)
         return
     
     # Also check state data - if category is set, user is creating a ticket
     state_data = await state.get_data()
     if state_data.get("category"):
-        logger.debug(f"Skipping client_message handler - user {user_id} has category in state data")
+        logger.debug("Skipping client_message handler - user %s has category in state data", user_id)
         return
     
-    logger.debug(f"handle_client_message triggered for user {user_id}")
+    logger.debug("handle_client_message triggered for user %s", user_id)
     
     # Check user binding first
     binding = await ops.get_user_binding(session, user_id)
-    logger.info(f"User {user_id} binding: {binding}")
+    logger.debug("User %s binding: project_id=%s", user_id, binding.project_id if binding else None)
     
     if not binding:
         await message.answer(Texts.ERROR_NOT_BOUND)
@@ -69,11 +71,11 @@ async def handle_client_message(
     
     # Check for active ticket
     active_ticket = await ops.get_active_ticket(session, user_id)
-    logger.info(f"User {user_id} active_ticket: {active_ticket}")
     
     if active_ticket:
         # User has active ticket - add message to it
-        logger.info(f"Forwarding message from user {user_id} to ticket #{active_ticket.number}")
+        bind_log_context(ticket=active_ticket.number)
+        logger.debug("Forwarding message from user %s to ticket #%s", user_id, active_ticket.number)
         await add_message_to_ticket(message, session, active_ticket, bot)
         return
     
@@ -138,7 +140,7 @@ async def add_message_to_ticket(
         return
     
     # Save message to database
-    await ops.create_message(
+    saved = await ops.create_message(
         session,
         ticket_id=ticket.id,
         direction="client",
@@ -148,8 +150,9 @@ async def add_message_to_ticket(
         content=content,
         file_id=file_id
     )
+    awaiting_queue.on_message(ticket, saved)
     
-    logger.info(f"Added message to ticket #{ticket.number} from user {user_id}")
+    logger.info("Added message to ticket #%s from user %s", ticket.number, user_id)
     
     # Forward message to support group topic
     notification = NotificationService(bot, session)
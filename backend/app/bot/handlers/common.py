@@ -16,6 +16,7 @@ from app.config.settings import settings
 from app.config.texts import Texts
 from app.database import operations as ops
 from app.database.models import UserBinding
+from app.services.lifecycle import on_ticket_reopened
 from app.services.notification import NotificationService
 
 logger = logging.getLogger(__name__)
@@ -58,35 +59,31 @@ async def handle_project(
     """
     user_id = message.from_user.id
     
-    # Get all user bindings
-    bindings = await ops.get_user_bindings(session, user_id)
+    # Projects of all user bindings, active (most recently used) first
+    projects = await ops.get_user_projects(session, user_id)
     
-    if not bindings:
+    if not projects:
         await message.answer(Texts.ERROR_NOT_BOUND)
         return
     
-    if len(bindings) == 1:
+    if len(projects) == 1:
         # Single project
-        project = bindings[0].project
-        project_name = project.name if project else "Unknown"
-        await message.answer(Texts.project_single(project_name))
+        await message.answer(Texts.project_single(projects[0].project_name))
         return
     
     # Multiple projects - show selection
     # Get current active (most recent)
-    active_binding = bindings[0]  # Already sorted by updated_at desc
+    active = projects[0]  # Already sorted by updated_at desc
     
     builder = InlineKeyboardBuilder()
     
-    for binding in bindings:
-        project = binding.project
-        if project:
-            # Mark active project with checkmark
-            prefix = "✓ " if binding.id == active_binding.id else ""
-            builder.button(
-                text=f"{prefix}{project.name}",
-                callback_data=f"project:switch:{project.id}"
-            )
+    for choice in projects:
+        # Mark active project with checkmark
+        prefix = "✓ " if choice.binding_id == active.binding_id else ""
+        builder.button(
+            text=f"{prefix}{choice.project_name}",
+            callback_data=f"project:switch:{choice.project_id}"
+        )
     
     builder.adjust(1)
     
@@ -115,7 +112,7 @@ async def callback_switch_project(
         project = await ops.get_project_by_id(session, project_id)
         project_name = project.name if project else "Unknown"
         
-        logger.info(f"User {user_id} switched to project {project_id}")
+        logger.info("User %s switched to project %s", user_id, project_id)
         
         await callback.message.answer(Texts.project_switched(project_name))
     else:
@@ -147,10 +144,11 @@ async def callback_reopen_ticket(
         return
     
     # Reopen ticket
-    reopened = await ops.reopen_ticket(session, ticket.id)
+    reopened = await ops.reopen_ticket(session, ticket.id, actor=user_id)
     
     if reopened:
-        logger.info(f"User {user_id} reopened ticket #{ticket_number}")
+        await on_ticket_reopened(session, reopened)
+        logger.info("User %s reopened ticket #%s", user_id, ticket_number)
         
         # Notify support group
         notification = NotificationService(bot, session)
@@ -162,7 +160,7 @@ async def callback_reopen_ticket(
                     text="🔄 Клиент переоткрыл обращение"
                 )
             except Exception as e:
-                logger.error(f"Failed to notify reopen: {e}")
+                logger.error("Failed to notify reopen: %s", e)
         
         await callback.message.answer(Texts.ticket_reopened(ticket_number))
     else:
@@ -64,7 +64,7 @@ async def callback_csat_positive(
         reply_markup=get_skip_detailed_csat_keyboard(ticket_id)
     )
     
-    logger.info(f"Positive feedback for ticket {ticket_id}, asking detailed")
+    logger.info("Positive feedback for ticket %s, asking detailed", ticket_id)
 
 
 @router.callback_query(F.data.startswith("csat:skip_detailed:"))
@@ -148,13 +148,8 @@ async def callback_csat_detail_politeness(
     speed_rating = data.get("feedback_speed", 0)
     quality_rating = data.get("feedback_quality", 0)
     
-    # Save detailed ratings to database
-    feedback = await ops.get_feedback_by_ticket(session, ticket_id)
-    if feedback:
-        feedback.speed_rating = speed_rating
-        feedback.quality_rating = quality_rating
-        feedback.politeness_rating = rating
-        await session.commit()
+    # Save detailed ratings to database (CSAT rollups are updated in the same transaction)
+    await ops.update_feedback_ratings(session, ticket_id, speed_rating, quality_rating, rating)
     
     await state.clear()
     
@@ -172,7 +167,10 @@ async def callback_csat_detail_politeness(
         reply_markup=get_after_ticket_menu()
     )
     
-    logger.info(f"Detailed feedback for ticket {ticket_id}: speed={speed_rating}, quality={quality_rating}, politeness={rating}")
+    logger.info(
+        "Detailed feedback for ticket %s: speed=%s, quality=%s, politeness=%s",
+        ticket_id, speed_rating, quality_rating, rating
+    )
 
 
 @router.callback_query(F.data.startswith("csat:negative:"))
@@ -221,6 +219,6 @@ async def handle_feedback_comment(
             Texts.AFTER_TICKET_MENU,
             reply_markup=get_after_ticket_menu()
         )
-        logger.info(f"Negative feedback with comment for ticket {ticket_id}")
+        logger.info("Negative feedback with comment for ticket %s", ticket_id)
     else:
         await message.answer(Texts.ERROR_GENERIC)
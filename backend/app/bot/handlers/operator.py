@@ -102,7 +102,7 @@ async def callback_take_ticket(
                 logger.exception("Failed to send take confirmation to group: %s", e)
                 await _answer("Тикет взят, но не удалось отправить сообщение в группу", alert=True)
                 return
-            logger.info(f"Operator {operator_id} took ticket #{ticket.number}")
+            logger.info("Operator %s took ticket #%s", operator_id, ticket.number)
         else:
             existing_ticket = await ops.get_ticket_by_id(session, ticket_id)
             if existing_ticket and existing_ticket.assigned_to_tg_user_id:
@@ -170,7 +170,7 @@ async def callback_resume_ticket(
     if ticket:
         await callback.answer("Тикет возобновлён!")
         await callback.message.reply("▶️ Работа над тикетом возобновлена.")
-        logger.info(f"Operator {operator_id} resumed ticket #{ticket.number}")
+        logger.info("Operator %s resumed ticket #%s", operator_id, ticket.number)
     else:
         await callback.answer("Ошибка", show_alert=True)
 
@@ -191,7 +191,7 @@ async def callback_close_ticket(
     if ticket:
         await callback.answer("Тикет закрыт!")
         await callback.message.reply("✅ Тикет успешно закрыт. CSAT отправлен клиенту.")
-        logger.info(f"Operator {operator_id} closed ticket #{ticket.number}")
+        logger.info("Operator %s closed ticket #%s", operator_id, ticket.number)
     else:
         await callback.answer("Ошибка", show_alert=True)
 
@@ -273,7 +273,7 @@ async def callback_request_details(
         f"(Следующее сообщение в этом топике будет отправлено как запрос деталей)"
     )
     
-    logger.info(f"Operator started details request for ticket #{ticket.number}")
+    logger.info("Operator started details request for ticket #%s", ticket.number)
 
 
 # =============================================================================
@@ -326,10 +326,10 @@ async def handle_details_question(
         )
         
         await message.reply("✅ Вопрос отправлен клиенту!")
-        logger.info(f"Sent custom details request for ticket #{ticket_number}")
+        logger.info("Sent custom details request for ticket #%s", ticket_number)
         
     except Exception as e:
-        logger.error(f"Failed to send details request: {e}")
+        logger.error("Failed to send details request: %s", e)
         await message.reply("❌ Ошибка отправки клиенту")
 
 
@@ -374,7 +374,7 @@ async def handle_pause_reason(
             f"Причина отправлена клиенту.",
             reply_markup=get_ticket_paused_keyboard(ticket_id)
         )
-        logger.info(f"Paused ticket #{ticket_number} with reason: {message.text[:50]}...")
+        logger.info("Paused ticket #%s with reason: %s...", ticket_number, message.text[:50])
     else:
         await message.reply("❌ Ошибка при постановке на паузу")
 
@@ -415,7 +415,7 @@ async def handle_cancel_reason(
     
     if ticket:
         await message.reply("❌ Тикет отменён. Уведомление отправлено клиенту.")
-        logger.info(f"Cancelled ticket #{ticket_number} with reason: {message.text[:50]}...")
+        logger.info("Cancelled ticket #%s with reason: %s...", ticket_number, message.text[:50])
     else:
         await message.reply("❌ Ошибка при отмене тикета")
 
@@ -447,7 +447,7 @@ async def handle_operator_reply(
     ticket = await ops.get_ticket_by_topic_id(session, topic_id, chat_id)
     
     if not ticket:
-        logger.debug(f"No ticket found for topic {topic_id}")
+        logger.debug("No ticket found for topic %s", topic_id)
         return
     
     # Check if ticket is still open
@@ -466,7 +466,7 @@ async def handle_operator_reply(
         except Exception:
             pass  # Reactions might not be available
         
-        logger.info(f"Forwarded operator reply to client for ticket #{ticket.number}")
+        logger.info("Forwarded operator reply to client for ticket #%s", ticket.number)
 
 
 @router.message(
@@ -492,7 +492,7 @@ async def handle_operator_message_in_topic(
     ticket = await ops.get_ticket_by_topic_id(session, topic_id, chat_id)
     
     if not ticket:
-        logger.debug(f"No ticket found for topic {topic_id}")
+        logger.debug("No ticket found for topic %s", topic_id)
         return
     
     # Check if ticket is still open (not completed/cancelled)
@@ -510,7 +510,7 @@ async def handle_operator_message_in_topic(
         except Exception:
             pass
         
-        logger.info(f"Forwarded operator message to client for ticket #{ticket.number}")
+        logger.info("Forwarded operator message to client for ticket #%s", ticket.number)
 
 
 # =============================================================================
@@ -2,52 +2,90 @@
 Operator commands in private chat.
 
 Handles:
-- /mytickets - show operator's assigned tickets
-- /unassigned - show unassigned tickets
+- /mytickets - show operator's assigned tickets (pages with Prev/Next)
+- /unassigned - show unassigned tickets (pages with Prev/Next)
+- /breaching [hours] - open tickets whose SLA deadline is overdue or due soon
+- /awaiting [my] - open tickets whose client waits for a reply, longest first
+- /online - opt in or out of automatic assignment of new tickets
+- /search <query> - full-text search over tickets and messages
+- /history <number> [txt] - the ticket's whole conversation as an HTML or text file
+- /stats [months] - response/resolution time percentiles with a CSV export
+- /csat [days] - CSAT by operator and category (reads only the rollup table)
+- /profile [seconds] [mem] - sample the event loop and send the profile
 """
 
+import asyncio
+import html
 import logging
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
 
 from aiogram import Bot, F, Router
-from aiogram.filters import Command
-from aiogram.types import CallbackQuery, Message
+from aiogram.filters import Command, CommandObject
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.types import BufferedInputFile, CallbackQuery, FSInputFile, InlineKeyboardMarkup, Message
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.bot.filters.operator import IsOperator
+from app.bot.keyboards import get_page_buttons
 from app.config.categories import get_category_label
+from app.config.settings import settings
 from app.config.texts import Texts
 from app.database import operations as ops
+from app.database.search import search_tickets
+from app.services import profiler
+
+if TYPE_CHECKING:
+    from app.database.rollups import CsatSummary
+    from app.services.analytics import GroupStats, StatsReport
+    from app.services.status_time import StatusTime
 
 logger = logging.getLogger(__name__)
 
 router = Router(name="operator_commands")
 
+BREACHING_DEFAULT_HOURS = 4
+BREACHING_MAX_HOURS = 24 * 30
+STATS_DEFAULT_MONTHS = 3
+STATS_MAX_MONTHS = 24
+# Groups per dimension in the /stats message (the CSV has all of them)
+STATS_TOP_GROUPS = 8
+CSAT_DEFAULT_DAYS = 30
+CSAT_MAX_DAYS = 366
+CSAT_TOP_GROUPS = 8
+# /mytickets and /unassigned: tickets per page and callback data of Prev/Next (op:list:<my|new>:<cursor>)
+LIST_PAGE_SIZE = 20
+LIST_PAGE_PREFIX = "op:list:"
 
-@router.message(Command("mytickets"), F.chat.type == "private", IsOperator())
-async def cmd_my_tickets(
-    message: Message,
-    session: AsyncSession
-) -> None:
-    """Show operator's assigned tickets."""
-    operator_id = message.from_user.id
-    
-    # Get active tickets assigned to this operator
-    tickets = await ops.get_operator_tickets(session, operator_id, status_filter="active")
+
+async def _ticket_list(
+    session: AsyncSession,
+    list_name: str,
+    operator_id: int,
+    cursor: Optional[str] = None
+) -> Tuple[str, Optional[InlineKeyboardMarkup]]:
+    """
+    Render one page of /mytickets ("my") or /unassigned ("new").
     
-    if not tickets:
-        await message.answer(
-            Texts.OPERATOR_MY_TICKETS_HEADER + "\n" + Texts.OPERATOR_NO_TICKETS,
-            parse_mode="HTML"
+    Returns:
+        Message text and keyboard (topic links plus Prev/Next)
+    """
+    if list_name == "my":
+        page = await ops.get_operator_tickets(
+            session, operator_id, status_filter="active", cursor=cursor, limit=LIST_PAGE_SIZE
         )
-        return
+        header, empty = Texts.OPERATOR_MY_TICKETS_HEADER, Texts.OPERATOR_NO_TICKETS
+    else:
+        page = await ops.get_unassigned_tickets(session, limit=LIST_PAGE_SIZE, cursor=cursor)
+        header, empty = Texts.OPERATOR_UNASSIGNED_HEADER, Texts.OPERATOR_NO_UNASSIGNED
     
-    # Build message
-    text = Texts.OPERATOR_MY_TICKETS_HEADER + "\n"
+    text = header + "\n"
+    if not page.items:
+        return text + empty, None
     
     builder = InlineKeyboardBuilder()
-    
-    for ticket in tickets:
+    for ticket in page.items:
         category_label = get_category_label(ticket.category)
         text += Texts.operator_ticket_item(
             number=ticket.number,
@@ -61,14 +99,22 @@ async def cmd_my_tickets(
             text=f"🔗 #{ticket.number}",
             url=f"https://t.me/c/{str(ticket.support_chat_id)[4:]}/{ticket.topic_id}"
         )
-    
     builder.adjust(3)
     
-    await message.answer(
-        text,
-        reply_markup=builder.as_markup() if tickets else None,
-        parse_mode="HTML"
-    )
+    navigation = get_page_buttons(page, f"{LIST_PAGE_PREFIX}{list_name}:")
+    if navigation:
+        builder.row(*navigation)
+    return text, builder.as_markup()
+
+
+@router.message(Command("mytickets"), F.chat.type == "private", IsOperator())
+async def cmd_my_tickets(
+    message: Message,
+    session: AsyncSession
+) -> None:
+    """Show operator's assigned tickets."""
+    text, markup = await _ticket_list(session, "my", message.from_user.id)
+    await message.answer(text, reply_markup=markup, parse_mode="HTML")
 
 
 @router.message(Command("unassigned"), F.chat.type == "private", IsOperator())
@@ -77,84 +123,382 @@ async def cmd_unassigned_tickets(
     session: AsyncSession
 ) -> None:
     """Show unassigned (new) tickets."""
-    tickets = await ops.get_unassigned_tickets(session)
+    text, markup = await _ticket_list(session, "new", message.from_user.id)
+    await message.answer(text, reply_markup=markup, parse_mode="HTML")
+
+
+@router.callback_query(F.data == "op:my_tickets", IsOperator())
+async def callback_my_tickets(
+    callback: CallbackQuery,
+    session: AsyncSession
+) -> None:
+    """Show operator's tickets via callback."""
+    await callback.answer()
+    text, markup = await _ticket_list(session, "my", callback.from_user.id)
+    await callback.message.answer(text, reply_markup=markup, parse_mode="HTML")
+
+
+@router.callback_query(F.data.startswith(LIST_PAGE_PREFIX), IsOperator())
+async def callback_ticket_list_page(
+    callback: CallbackQuery,
+    session: AsyncSession
+) -> None:
+    """Show another page of /mytickets or /unassigned in the same message."""
+    await callback.answer()
+    list_name, _, cursor = callback.data[len(LIST_PAGE_PREFIX):].partition(":")
+    text, markup = await _ticket_list(session, list_name, callback.from_user.id, cursor or None)
+    try:
+        await callback.message.edit_text(text, reply_markup=markup, parse_mode="HTML")
+    except TelegramBadRequest as e:
+        # Double click: the page did not change
+        logger.debug("Ticket list page not edited: %s", e)
+
+
+@router.message(Command("breaching"), F.chat.type == "private", IsOperator())
+async def cmd_breaching(
+    message: Message,
+    command: CommandObject,
+    session: AsyncSession
+) -> None:
+    """
+    Show open tickets whose SLA deadline is overdue or due soon.
+    
+    Usage: /breaching [hours] (default 4, at most 720)
+    """
+    args = (command.args or "").strip()
+    hours = int(args) if args.isdigit() else BREACHING_DEFAULT_HOURS
+    hours = min(hours, BREACHING_MAX_HOURS)
+    now = datetime.utcnow()
     
+    tickets = await ops.get_tickets_breaching_before(session, now + timedelta(hours=hours))
+    header = Texts.OPERATOR_BREACHING_HEADER.format(hours=hours) + "\n"
     if not tickets:
-        await message.answer(
-            Texts.OPERATOR_UNASSIGNED_HEADER + "\n" + Texts.OPERATOR_NO_UNASSIGNED,
-            parse_mode="HTML"
-        )
+        await message.answer(header + Texts.OPERATOR_NO_BREACHING, parse_mode="HTML")
         return
     
-    # Build message
-    text = Texts.OPERATOR_UNASSIGNED_HEADER + "\n"
-    
+    text = header
     builder = InlineKeyboardBuilder()
     
     for ticket in tickets:
-        category_label = get_category_label(ticket.category)
+        minutes_left = int((ticket.sla_due_at - now).total_seconds() // 60)
         text += Texts.operator_ticket_item(
             number=ticket.number,
             status=ticket.status,
-            category=category_label,
+            category=get_category_label(ticket.category),
             description=ticket.description or ""
-        ) + "\n"
+        ) + Texts.sla_due_label(minutes_left) + "\n\n"
         
-        # Add button to go to ticket
-        builder.button(
-            text=f"🔗 #{ticket.number}",
-            url=f"https://t.me/c/{str(ticket.support_chat_id)[4:]}/{ticket.topic_id}"
-        )
+        if ticket.topic_id:
+            builder.button(
+                text=f"🔗 #{ticket.number}",
+                url=f"https://t.me/c/{str(ticket.support_chat_id)[4:]}/{ticket.topic_id}"
+            )
     
     builder.adjust(3)
     
     await message.answer(
         text,
-        reply_markup=builder.as_markup() if tickets else None,
+        reply_markup=builder.as_markup(),
         parse_mode="HTML"
     )
 
 
-@router.callback_query(F.data == "op:my_tickets", IsOperator())
-async def callback_my_tickets(
-    callback: CallbackQuery,
+@router.message(Command("awaiting"), F.chat.type == "private", IsOperator())
+async def cmd_awaiting(
+    message: Message,
+    command: CommandObject
+) -> None:
+    """
+    Show open tickets where the client spoke last, longest waiting first.
+    
+    Served from the in-memory queue, without database queries.
+    
+    Usage: /awaiting [my]
+    """
+    from app.services.awaiting import DIGEST_LIMIT, awaiting_queue, format_awaiting
+    
+    if (command.args or "").strip().lower() == "my":
+        entries = awaiting_queue.oldest(len(awaiting_queue), assigned_to=message.from_user.id)
+        total = len(entries)
+    else:
+        entries = awaiting_queue.oldest(DIGEST_LIMIT)
+        total = len(awaiting_queue)
+    entries = entries[:DIGEST_LIMIT]
+    header = Texts.AWAITING_HEADER.format(count=total) + "\n"
+    if not entries:
+        await message.answer(header + Texts.AWAITING_EMPTY, parse_mode="HTML")
+        return
+    
+    builder = InlineKeyboardBuilder()
+    for entry in entries:
+        if entry.topic_id:
+            builder.button(
+                text=f"🔗 #{entry.number}",
+                url=f"https://t.me/c/{str(entry.support_chat_id)[4:]}/{entry.topic_id}"
+            )
+    builder.adjust(3)
+    
+    await message.answer(
+        header + format_awaiting(entries, datetime.utcnow()),
+        reply_markup=builder.as_markup(),
+        parse_mode="HTML"
+    )
+
+
+@router.message(Command("online"), F.chat.type == "private", IsOperator())
+async def cmd_online(message: Message) -> None:
+    """
+    Toggle whether new tickets are assigned to the operator automatically.
+    
+    The state lives in the dispatcher (memory) and resets on restart.
+    """
+    from app.services.dispatcher import dispatcher
+    
+    operator_id = message.from_user.id
+    state = dispatcher.set_online(
+        operator_id, not dispatcher.operator(operator_id).online, message.from_user.username
+    )
+    if state.online:
+        text = Texts.ONLINE_ON.format(load=state.load, max_load=dispatcher.max_load)
+    else:
+        text = Texts.ONLINE_OFF
+    if not settings.auto_assign_enabled:
+        text += "\n\n" + Texts.ONLINE_AUTO_ASSIGN_DISABLED
+    await message.answer(text)
+
+
+@router.message(Command("history"), F.chat.type == "private", IsOperator())
+async def cmd_history(
+    message: Message,
+    command: CommandObject,
     session: AsyncSession
 ) -> None:
-    """Show operator's tickets via callback."""
-    await callback.answer()
+    """
+    Send a ticket's whole conversation as one file.
     
-    operator_id = callback.from_user.id
-    tickets = await ops.get_operator_tickets(session, operator_id, status_filter="active")
+    Messages are streamed from the database in chunks into a temporary file,
+    so long tickets do not grow memory.
     
-    if not tickets:
-        await callback.message.answer(
-            Texts.OPERATOR_MY_TICKETS_HEADER + "\n" + Texts.OPERATOR_NO_TICKETS,
-            parse_mode="HTML"
+    Usage: /history <number> [txt]
+    """
+    from app.services.transcript import build_transcript_file
+    
+    args = (command.args or "").split()
+    number = args[0].lstrip("#") if args else ""
+    if not number.isdigit():
+        await message.answer(Texts.HISTORY_USAGE, parse_mode="HTML")
+        return
+    fmt = "txt" if len(args) > 1 and args[1].lower() == "txt" else "html"
+    
+    ticket = await ops.get_ticket_by_number(session, int(number))
+    if not ticket:
+        await message.answer(Texts.HISTORY_NOT_FOUND.format(number=number))
+        return
+    
+    path, count = await build_transcript_file(session, ticket, fmt)
+    try:
+        await message.answer_document(
+            FSInputFile(path, filename=f"ticket-{ticket.number}.{fmt}"),
+            caption=Texts.HISTORY_CAPTION.format(number=ticket.number, count=count)
         )
+    finally:
+        await asyncio.to_thread(path.unlink, missing_ok=True)
+
+
+@router.message(Command("search"), F.chat.type == "private", IsOperator())
+async def cmd_search(
+    message: Message,
+    command: CommandObject,
+    session: AsyncSession
+) -> None:
+    """
+    Full-text search over ticket descriptions and messages.
+    
+    Usage: /search <query>
+    """
+    query = (command.args or "").strip()
+    if not query:
+        await message.answer(Texts.SEARCH_USAGE, parse_mode="HTML")
         return
     
-    text = Texts.OPERATOR_MY_TICKETS_HEADER + "\n"
+    hits = await search_tickets(session, query)
+    text = Texts.SEARCH_HEADER.format(query=html.escape(query[:100])) + "\n"
+    if not hits:
+        await message.answer(text + Texts.SEARCH_NOTHING_FOUND, parse_mode="HTML")
+        return
     
     builder = InlineKeyboardBuilder()
     
-    for ticket in tickets:
-        category_label = get_category_label(ticket.category)
-        text += Texts.operator_ticket_item(
-            number=ticket.number,
-            status=ticket.status,
-            category=category_label,
-            description=ticket.description or ""
-        ) + "\n"
-        
-        builder.button(
-            text=f"🔗 #{ticket.number}",
-            url=f"https://t.me/c/{str(ticket.support_chat_id)[4:]}/{ticket.topic_id}"
-        )
+    for hit in hits:
+        text += Texts.search_result_item(hit.number, hit.status, hit.snippet) + "\n"
+        if hit.topic_id:
+            builder.button(
+                text=f"🔗 #{hit.number}",
+                url=f"https://t.me/c/{str(hit.support_chat_id)[4:]}/{hit.topic_id}"
+            )
     
     builder.adjust(3)
     
-    await callback.message.answer(
+    await message.answer(
         text,
-        reply_markup=builder.as_markup() if tickets else None,
+        reply_markup=builder.as_markup(),
         parse_mode="HTML"
     )
+
+
+def _format_stats(report: "StatsReport", months: int, status_times: Dict[str, "StatusTime"]) -> str:
+    """Render a StatsReport (app.services.analytics) and time in status as the /stats message."""
+    p50, p90 = report.percentiles.index(50), report.percentiles.index(90)
+
+    def line(group: "GroupStats", label: str) -> str:
+        first_response = group.metrics["first_response_business"].percentiles
+        resolution = group.metrics["resolution_business"].percentiles
+        return Texts.stats_group_line(
+            label=label,
+            tickets=group.tickets,
+            first_response=f"{Texts.stats_duration(first_response[p50])} / {Texts.stats_duration(first_response[p90])}",
+            resolution=f"{Texts.stats_duration(resolution[p50])} / {Texts.stats_duration(resolution[p90])}",
+        )
+
+    parts = [Texts.STATS_HEADER.format(months=months, tickets=report.tickets), line(report.total, "Всего")]
+    for dimension, title in Texts.STATS_SECTIONS.items():
+        parts.append("\n" + title)
+        parts.extend(line(group, html.escape(group.label)) for group in report.groups[dimension][:STATS_TOP_GROUPS])
+    if status_times:
+        parts.append("\n" + Texts.STATS_STATUS_TIME_TITLE)
+        parts.extend(
+            Texts.stats_status_time_line(
+                status, Texts.stats_duration(status_times[status].mean_seconds), status_times[status].intervals
+            )
+            for status in Texts.OPERATOR_STATUS_LABELS
+            if status in status_times
+        )
+    parts.append("\n" + Texts.STATS_LEGEND)
+    return "\n".join(parts)
+
+
+@router.message(Command("stats"), F.chat.type == "private", IsOperator())
+async def cmd_stats(
+    message: Message,
+    command: CommandObject,
+    session: AsyncSession
+) -> None:
+    """
+    Show first-response and resolution time percentiles and send the full CSV.
+    
+    Usage: /stats [months] (default 3, at most 24)
+    """
+    from app.services.analytics import build_stats_report, report_to_csv
+    from app.services.business_calendar import get_calendar
+    from app.services.status_time import status_time
+    
+    args = (command.args or "").strip()
+    months = int(args) if args.isdigit() else STATS_DEFAULT_MONTHS
+    months = max(1, min(months, STATS_MAX_MONTHS))
+    
+    report = await build_stats_report(session, months, get_calendar())
+    if not report.tickets:
+        await message.answer(
+            Texts.STATS_HEADER.format(months=months, tickets=0) + Texts.STATS_NO_DATA,
+            parse_mode="HTML"
+        )
+        return
+    
+    # Incremental: reads only events logged since the previous /stats
+    await status_time.update(session)
+    await message.answer(_format_stats(report, months, status_time.snapshot()), parse_mode="HTML")
+    stamp = message.date.strftime("%Y%m%d-%H%M%S")
+    await message.answer_document(
+        BufferedInputFile(report_to_csv(report).encode("utf-8"), filename=f"stats-{months}m-{stamp}.csv")
+    )
+
+
+def _csat_line(summary: "CsatSummary", label: str) -> str:
+    return Texts.csat_summary_line(
+        label=label,
+        total=summary.total,
+        positive_share=summary.positive_share or 0.0,
+        speed=summary.average("speed"),
+        quality=summary.average("quality"),
+        politeness=summary.average("politeness"),
+    )
+
+
+@router.message(Command("csat"), F.chat.type == "private", IsOperator())
+async def cmd_csat(
+    message: Message,
+    command: CommandObject,
+    session: AsyncSession
+) -> None:
+    """
+    Show CSAT for the last N days by operator and category.
+    
+    Usage: /csat [days] (default 30)
+    """
+    from app.database.rollups import get_csat_summary, rollup_day
+    
+    args = (command.args or "").strip()
+    days = int(args) if args.isdigit() else CSAT_DEFAULT_DAYS
+    days = max(1, min(days, CSAT_MAX_DAYS))
+    since = rollup_day(datetime.utcnow()) - timedelta(days=days - 1)
+    
+    total = (await get_csat_summary(session, since))[0]
+    header = Texts.CSAT_REPORT_HEADER.format(days=days, total=total.total)
+    if not total.total:
+        await message.answer(header + Texts.CSAT_REPORT_EMPTY, parse_mode="HTML")
+        return
+    
+    parts = [header, _csat_line(total, "Всего")]
+    for group_by, title in Texts.CSAT_REPORT_SECTIONS.items():
+        parts.append("\n" + title)
+        for summary in (await get_csat_summary(session, since, group_by))[:CSAT_TOP_GROUPS]:
+            if group_by == "category":
+                label = get_category_label(summary.key)
+            else:
+                label = str(summary.key) if summary.key else "—"
+            parts.append(_csat_line(summary, html.escape(label)))
+    parts.append("\n" + Texts.CSAT_REPORT_LEGEND)
+    
+    await message.answer("\n".join(parts), parse_mode="HTML")
+
+
+@router.message(Command("profile"), F.chat.type == "private", IsOperator())
+async def cmd_profile(
+    message: Message,
+    command: CommandObject
+) -> None:
+    """
+    Profile the event loop for N seconds and send results as documents.
+    
+    Usage: /profile [seconds] [mem]
+    """
+    args = (command.args or "").split()
+    seconds = settings.profile_default_seconds
+    if args and args[0].isdigit():
+        seconds = int(args[0])
+    seconds = max(1, min(seconds, settings.profile_max_seconds))
+    with_memory = "mem" in args
+    
+    if profiler.is_running():
+        await message.answer(Texts.PROFILE_BUSY)
+        return
+    
+    await message.answer(Texts.profile_started(seconds, with_memory))
+    logger.info("Operator %s started profiling for %ss (memory=%s)", message.from_user.id, seconds, with_memory)
+    
+    report = await profiler.profile_event_loop(
+        seconds, settings.profile_interval_ms / 1000, with_memory=with_memory
+    )
+    
+    stamp = message.date.strftime("%Y%m%d-%H%M%S")
+    await message.answer_document(
+        BufferedInputFile(report.summary.encode("utf-8"), filename=f"profile-{stamp}.txt"),
+        caption=Texts.profile_done(report.samples, report.seconds)
+    )
+    await message.answer_document(
+        BufferedInputFile(report.collapsed.encode("utf-8"), filename=f"profile-{stamp}.collapsed")
+    )
+    if report.memory:
+        await message.answer_document(
+            BufferedInputFile(report.memory.encode("utf-8"), filename=f"tracemalloc-{stamp}.txt")
+        )
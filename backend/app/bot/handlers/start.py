@@ -55,7 +55,7 @@ async def handle_start_with_code(
         await handle_start_no_code(message, session, state)
         return
     
-    logger.info(f"User {message.from_user.id} started with code: {code}")
+    logger.info("User %s started with code: %s", message.from_user.id, code)
     
     # Validate invite code
     project = await ops.get_project_by_invite_code(session, code)
@@ -74,7 +74,7 @@ async def handle_start_with_code(
         project_with_client = await ops.get_project_with_client(session, project.id)
         project_name = project_with_client.name if project_with_client else project.name
         
-        logger.info(f"User {message.from_user.id} bound to project {project.id}")
+        logger.info("User %s bound to project %s", message.from_user.id, project.id)
         
         # Welcome via link — no mention of "code", just project
         name = _display_name(message.from_user)
@@ -84,7 +84,7 @@ async def handle_start_with_code(
         )
     else:
         # Invalid code
-        logger.warning(f"Invalid invite code: {code}")
+        logger.warning("Invalid invite code: %s", code)
         await message.answer(
             Texts.INVALID_CODE,
             reply_markup=get_triage_keyboard()
@@ -119,13 +119,13 @@ async def handle_start_no_code(
         project = await ops.get_project_with_client(session, binding.project_id)
         project_name = project.name if project else "Unknown"
         
-        logger.info(f"Known user {user_id} started, project: {project_name}")
+        logger.info("Known user %s started, project: %s", user_id, project_name)
         
         # Check if user has any tickets (to distinguish first visit from return)
         user_tickets = await ops.get_user_tickets(session, user_id, limit=1)
         user_name = message.from_user.full_name or message.from_user.first_name
         
-        if user_tickets:
+        if user_tickets.items:
             # Returning user
             welcome_text = Texts.welcome_back_personal(user_name)
         else:
@@ -192,7 +192,7 @@ async def handle_start_no_code(
                 tg_username=username,
                 tg_name=message.from_user.full_name
             )
-            logger.info(f"Operator {user_id} auto-bound to project {project.name}")
+            logger.info("Operator %s auto-bound to project %s", user_id, project.name)
             name = _display_name(message.from_user)
             project_with_client = await ops.get_project_with_client(session, project.id)
             project_name = project_with_client.name if project_with_client else project.name
@@ -203,7 +203,7 @@ async def handle_start_no_code(
             return
     
     # Unknown user - show triage
-    logger.info(f"Unknown user {user_id} started without code")
+    logger.info("Unknown user %s started without code", user_id)
     
     await message.answer(
         Texts.NO_CODE_PROMPT,
@@ -335,7 +335,7 @@ async def finish_triage(
     data = await state.get_data()
     company = data.get("company", "Unknown")
     
-    logger.info(f"Triage completed: company={company}, contact={contact}")
+    logger.info("Triage completed: company=%s, contact=%s", company, contact)
     
     # TODO: Create triage ticket when ticket handlers are ready
     # For now, just acknowledge
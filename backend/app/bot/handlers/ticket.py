@@ -2,16 +2,20 @@
 Ticket creation handlers with summary flow.
 """
 
+import html
 import logging
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 from aiogram import Bot, F, Router
+from aiogram.exceptions import TelegramBadRequest
 from aiogram.fsm.context import FSMContext
-from aiogram.types import CallbackQuery, Message
+from aiogram.types import CallbackQuery, InlineKeyboardMarkup, Message
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.bot.keyboards import (
     get_categories_keyboard,
+    get_kb_suggestions_keyboard,
+    get_page_buttons,
     get_preview_keyboard,
     get_reopen_or_new_keyboard,
     get_skip_attachments_keyboard,
@@ -23,11 +27,20 @@ from app.config.categories import get_category_by_id, get_category_label
 from app.config.settings import settings
 from app.config.texts import Texts
 from app.database import operations as ops
+from app.database.pagination import Page
+from app.services.lifecycle import on_ticket_closed, on_ticket_reopened
 
 logger = logging.getLogger(__name__)
 
 router = Router(name="ticket")
 
+# Telegram messages are limited to 4096 characters; leave room for the title and markup
+KB_ARTICLE_MAX_LENGTH = 3500
+
+# "My requests": tickets per page; Prev/Next append ":<cursor>" to the callback data
+MY_TICKETS_CALLBACK = "menu:my_tickets"
+MY_TICKETS_PAGE_SIZE = 10
+
 
 # =============================================================================
 # CATEGORY SELECTION
@@ -85,7 +98,7 @@ async def callback_category(
             )
         else:
             await state.set_state(TicketCreation.waiting_description)
-            logger.info(f"Set state to waiting_description for user {user_id}")
+            logger.info("Set state to waiting_description for user %s", user_id)
             
             # Custom message per category
             category_prompts = {
@@ -149,16 +162,22 @@ async def handle_urgency_details(
 # =============================================================================
 
 @router.message(TicketCreation.waiting_description, F.text)
+@router.message(TicketCreation.reviewing_suggestions, F.text)
 async def handle_description(
     message: Message,
     state: FSMContext
 ) -> None:
-    """Handle problem description input."""
-    logger.info(f"handle_description triggered for user {message.from_user.id}")
+    """Handle problem description input; offer knowledge-base articles first if any match."""
+    logger.info("handle_description triggered for user %s", message.from_user.id)
     
     description = message.text.strip()
     
     await state.update_data(description=description)
+    
+    data = await state.get_data()
+    if await offer_kb_suggestions(message, state, description, data.get("category")):
+        return
+    
     await state.set_state(TicketCreation.waiting_attachments)
     
     await message.answer(
@@ -167,6 +186,132 @@ async def handle_description(
     )
 
 
+# =============================================================================
+# KNOWLEDGE BASE SUGGESTIONS
+# =============================================================================
+
+async def offer_kb_suggestions(
+    message: Message,
+    state: FSMContext,
+    description: str,
+    category: Optional[str]
+) -> bool:
+    """
+    Show knowledge-base articles matching the description.
+    
+    Returns:
+        True if suggestions were shown (state is reviewing_suggestions)
+    """
+    from app.metrics import KB_SUGGESTIONS
+    from app.services.knowledge_base import knowledge_base
+    
+    if not len(knowledge_base):
+        return False
+    
+    suggestions = knowledge_base.search(
+        description,
+        category=category,
+        limit=settings.kb_max_suggestions,
+        min_score=settings.kb_min_score,
+    )
+    if not suggestions:
+        return False
+    
+    articles = [suggestion.article for suggestion in suggestions]
+    lines = [Texts.KB_SUGGESTIONS_HEADER]
+    for index, article in enumerate(articles, start=1):
+        lines.append(Texts.kb_suggestion_item(index, html.escape(article.title), html.escape(article.excerpt)))
+    lines.append(Texts.KB_SUGGESTIONS_FOOTER)
+    
+    await state.update_data(kb_suggestions=[article.slug for article in articles])
+    await state.set_state(TicketCreation.reviewing_suggestions)
+    await message.answer(
+        "\n".join(lines),
+        reply_markup=get_kb_suggestions_keyboard([article.title for article in articles])
+    )
+    KB_SUGGESTIONS.inc(outcome="shown")
+    logger.info(
+        "Suggested %s for user %s (scores %s)",
+        [article.slug for article in articles],
+        message.chat.id,
+        [round(suggestion.score, 1) for suggestion in suggestions],
+    )
+    return True
+
+
+@router.callback_query(TicketCreation.reviewing_suggestions, F.data.startswith("kb:open:"))
+async def callback_kb_open(
+    callback: CallbackQuery,
+    state: FSMContext
+) -> None:
+    """Send the full text of a suggested article."""
+    from app.metrics import KB_SUGGESTIONS
+    from app.services.knowledge_base import knowledge_base
+    
+    await callback.answer()
+    
+    data = await state.get_data()
+    slugs: List[str] = data.get("kb_suggestions", [])
+    index = int(callback.data.split(":")[2])
+    article = knowledge_base.get(slugs[index]) if index < len(slugs) else None
+    if article is None:
+        await callback.message.answer(
+            Texts.KB_ARTICLE_MISSING,
+            reply_markup=get_kb_suggestions_keyboard([])
+        )
+        return
+    
+    body = article.body
+    if len(body) > KB_ARTICLE_MAX_LENGTH:
+        body = body[:KB_ARTICLE_MAX_LENGTH].rsplit("\n", 1)[0] + "\n…"
+    await callback.message.answer(
+        Texts.kb_article(html.escape(article.title), html.escape(body)),
+        reply_markup=get_kb_suggestions_keyboard([])
+    )
+    KB_SUGGESTIONS.inc(outcome="opened")
+
+
+@router.callback_query(TicketCreation.reviewing_suggestions, F.data == "kb:solved")
+async def callback_kb_solved(
+    callback: CallbackQuery,
+    state: FSMContext
+) -> None:
+    """Suggested article answered the question - drop the draft ticket."""
+    from app.bot.keyboards import get_after_ticket_menu
+    from app.metrics import KB_SUGGESTIONS
+    
+    await callback.answer()
+    
+    data = await state.get_data()
+    logger.info("User %s solved by knowledge base: %s", callback.from_user.id, data.get("kb_suggestions"))
+    await state.clear()
+    KB_SUGGESTIONS.inc(outcome="solved")
+    
+    await callback.message.answer(
+        Texts.KB_SOLVED,
+        reply_markup=get_after_ticket_menu()
+    )
+
+
+@router.callback_query(TicketCreation.reviewing_suggestions, F.data == "kb:continue")
+async def callback_kb_continue(
+    callback: CallbackQuery,
+    state: FSMContext
+) -> None:
+    """Suggestions did not help - continue to the attachments step."""
+    from app.metrics import KB_SUGGESTIONS
+    
+    await callback.answer()
+    
+    await state.set_state(TicketCreation.waiting_attachments)
+    KB_SUGGESTIONS.inc(outcome="continued")
+    
+    await callback.message.answer(
+        Texts.ASK_ATTACHMENTS,
+        reply_markup=get_skip_attachments_keyboard()
+    )
+
+
 @router.message(F.chat.type == "private", F.text)
 async def handle_description_fallback(
     message: Message,
@@ -198,7 +343,7 @@ async def handle_description_fallback(
             from app.bot.keyboards.ticket import get_active_ticket_menu
             
             # Save message to database
-            await ops.create_message(
+            saved = await ops.create_message(
                 session,
                 ticket_id=active_ticket.id,
                 direction="client",
@@ -209,11 +354,14 @@ async def handle_description_fallback(
                 file_id=None
             )
             
+            from app.services.awaiting import awaiting_queue
+            awaiting_queue.on_message(active_ticket, saved)
+            
             # Forward to operators
             notification = NotificationService(bot, session)
             await notification.forward_client_message(active_ticket, message)
             
-            logger.info(f"Forwarded message from user {user_id} to ticket #{active_ticket.number}")
+            logger.info("Forwarded message from user %s to ticket #%s", user_id, active_ticket.number)
             
             await message.answer(
                 Texts.active_ticket_exists(active_ticket.number),
@@ -233,7 +381,7 @@ async def handle_description_fallback(
         # Already has description - this is additional message, skip
         return
     
-    logger.info(f"handle_description_fallback recovered ticket flow for user {message.from_user.id}")
+    logger.info("handle_description_fallback recovered ticket flow for user %s", message.from_user.id)
     
     description = message.text.strip()
     
@@ -556,11 +704,13 @@ async def create_ticket_from_state(
     Create ticket from collected state data.
     
     This function:
-    1. Creates ticket in database
-    2. Creates/uses topic in support group (per client)
-    3. Sends ticket card to topic
-    4. Sends confirmation to user
+    1. Looks up likely duplicates among the client's open tickets
+    2. Creates ticket in database
+    3. Creates/uses topic in support group (per client)
+    4. Sends ticket card to topic
+    5. Sends confirmation to user
     """
+    from app.services.duplicates import duplicate_index
     from app.services.ticket import TicketService
     from app.services.timezone import is_working_hours
     
@@ -584,6 +734,10 @@ async def create_ticket_from_state(
     # Determine priority
     priority = "urgent" if category == "urgent" else "normal"
     
+    # Same incident reported by colleagues minutes ago?
+    project = await ops.get_project_by_id(session, project_id)
+    duplicates = duplicate_index.find(project.client_id, description) if project and description else []
+    
     # Create ticket using service
     service = TicketService(bot, session)
     ticket, success = await service.create_ticket(
@@ -594,7 +748,8 @@ async def create_ticket_from_state(
         tg_username=tg_username,
         tg_name=tg_name,
         attachments=attachments,
-        priority=priority
+        priority=priority,
+        duplicates=duplicates
     )
     
     if not ticket:
@@ -602,7 +757,10 @@ async def create_ticket_from_state(
         await state.clear()
         return
     
-    logger.info(f"Created ticket #{ticket.number} for user {user_id}, topic created: {success}")
+    if description:
+        duplicate_index.add(ticket.id, ticket.number, project.client_id, description)
+    
+    logger.info("Created ticket #%s for user %s, topic created: %s", ticket.number, user_id, success)
     
     # Clear state
     await state.clear()
@@ -637,8 +795,9 @@ async def callback_reopen_ticket(
     ticket = await ops.get_ticket_by_number(session, ticket_number)
     
     if ticket:
-        await ops.reopen_ticket(session, ticket.id)
-        logger.info(f"Reopened ticket #{ticket_number}")
+        await ops.reopen_ticket(session, ticket.id, actor=callback.from_user.id)
+        await on_ticket_reopened(session, ticket)
+        logger.info("Reopened ticket #%s", ticket_number)
         await callback.message.answer(Texts.ticket_reopened(ticket_number))
     else:
         await callback.message.answer(Texts.ERROR_GENERIC)
@@ -660,24 +819,23 @@ async def callback_new_ticket(
 # MENU: MY TICKETS & NEW REQUEST
 # =============================================================================
 
-@router.callback_query(F.data == "menu:my_tickets")
-async def callback_my_tickets(
-    callback: CallbackQuery,
-    session: AsyncSession
-) -> None:
-    """Show user's ticket history with detailed info."""
-    await callback.answer()
+async def _my_tickets_page(
+    session: AsyncSession,
+    user_id: int,
+    cursor: Optional[str] = None
+) -> Tuple[str, InlineKeyboardMarkup]:
+    """
+    Render one page of the client's "My requests".
     
-    user_id = callback.from_user.id
-    tickets = await ops.get_user_tickets(session, user_id, limit=10)
+    Returns:
+        Message text and keyboard (ticket actions plus Prev/Next)
+    """
+    page = await ops.get_user_tickets(session, user_id, limit=MY_TICKETS_PAGE_SIZE, cursor=cursor)
+    tickets = page.items
     
     if not tickets:
         from app.bot.keyboards import get_after_ticket_menu
-        await callback.message.answer(
-            Texts.MY_TICKETS_EMPTY,
-            reply_markup=get_after_ticket_menu()
-        )
-        return
+        return Texts.MY_TICKETS_EMPTY, get_after_ticket_menu()
     
     # Status mappings
     status_emojis = {
@@ -698,19 +856,9 @@ async def callback_my_tickets(
         "closed": "Выполнен"  # legacy support
     }
     
-    # Active statuses that allow adding details
-    active_statuses = ("new", "in_progress", "on_hold")
-    
-    # Category labels
-    from app.config.categories import get_category_label
-    from aiogram.utils.keyboard import InlineKeyboardBuilder
-    
     # Build ticket list
     lines = [Texts.MY_TICKETS_HEADER]
     
-    # Collect active tickets for buttons
-    active_tickets = []
-    
     # Progress bar mapping
     progress_bars = {
         "new": Texts.PROGRESS_NEW,
@@ -745,15 +893,23 @@ async def callback_my_tickets(
             status=status_label
         )
         lines.append(line)
-        
-        # Track active tickets
-        if ticket.status in active_statuses:
-            active_tickets.append(ticket)
+    
+    return "\n".join(lines), _my_tickets_keyboard(page)
+
+
+def _my_tickets_keyboard(page: Page) -> InlineKeyboardMarkup:
+    """Buttons of one "My requests" page: add details / cancel / reopen, new request, Prev/Next."""
+    from aiogram.utils.keyboard import InlineKeyboardBuilder
+    
+    # Active statuses that allow adding details
+    active_statuses = ("new", "in_progress", "on_hold")
     
     # Build keyboard with "Add details" buttons for active tickets
     builder = InlineKeyboardBuilder()
     
-    for ticket in active_tickets:
+    for ticket in page.items:
+        if ticket.status not in active_statuses:
+            continue
         # Short description for button (max 20 chars)
         short_desc = (ticket.description or "")[:20]
         if len(ticket.description or "") > 20:
@@ -774,7 +930,7 @@ async def callback_my_tickets(
     from datetime import datetime, timedelta
     cutoff = datetime.utcnow() - timedelta(hours=48)
     
-    for ticket in tickets:
+    for ticket in page.items:
         if ticket.status == "completed" and ticket.closed_at and ticket.closed_at >= cutoff:
             # Short description for button
             short_desc = (ticket.description or "")[:15]
@@ -791,11 +947,36 @@ async def callback_my_tickets(
     
     # Adjust: one button per row
     builder.adjust(1)
+    navigation = get_page_buttons(page, f"{MY_TICKETS_CALLBACK}:")
+    if navigation:
+        builder.row(*navigation)
+    return builder.as_markup()
+
+
+@router.callback_query(F.data.startswith(MY_TICKETS_CALLBACK))
+async def callback_my_tickets(
+    callback: CallbackQuery,
+    session: AsyncSession
+) -> None:
+    """
+    Show user's ticket history with detailed info.
     
-    await callback.message.answer(
-        "\n".join(lines),
-        reply_markup=builder.as_markup()
-    )
+    "menu:my_tickets" sends the first page; Prev/Next ("menu:my_tickets:<cursor>")
+    replace the message with another page.
+    """
+    await callback.answer()
+    
+    cursor = callback.data[len(MY_TICKETS_CALLBACK) + 1:] or None
+    text, markup = await _my_tickets_page(session, callback.from_user.id, cursor)
+    
+    if cursor is None:
+        await callback.message.answer(text, reply_markup=markup)
+        return
+    try:
+        await callback.message.edit_text(text, reply_markup=markup)
+    except TelegramBadRequest as e:
+        # Double click: the page did not change
+        logger.debug("My tickets page not edited: %s", e)
 
 
 @router.callback_query(F.data == "menu:new_request")
@@ -899,7 +1080,11 @@ async def callback_client_cancel_confirm(
         return
     
     # Update ticket status to cancelled
-    await ops.update_ticket_status(session, ticket.id, "cancelled")
+    await ops.update_ticket_status(
+        session, ticket.id, "cancelled", actor=callback.from_user.id, event="client_cancelled"
+    )
+    
+    on_ticket_closed(ticket.id)
     
     # Notify operators in support chat
     from app.services.notification import NotificationService
@@ -912,7 +1097,7 @@ async def callback_client_cancel_confirm(
             text=f"❌ Клиент сам отменил обращение #{ticket_number}\n\nПричина: Уже неактуально"
         )
     except Exception as e:
-        logger.error(f"Failed to notify operators about cancellation: {e}")
+        logger.error("Failed to notify operators about cancellation: %s", e)
     
     # Confirm to client
     from app.bot.keyboards.ticket import get_after_ticket_menu
@@ -978,12 +1163,10 @@ async def callback_client_reopen_confirm(
         await callback.message.answer(Texts.ERROR_GENERIC)
         return
     
-    # Reopen ticket - set status back to new
-    await ops.update_ticket_status(session, ticket.id, "new")
+    # Reopen ticket - set status back to new (also clears closed_at)
+    await ops.update_ticket_status(session, ticket.id, "new", actor=callback.from_user.id)
     
-    # Clear closed_at
-    ticket.closed_at = None
-    await session.commit()
+    await on_ticket_reopened(session, ticket)
     
     # Notify operators in support chat
     from app.services.notification import NotificationService
@@ -1001,7 +1184,7 @@ async def callback_client_reopen_confirm(
             parse_mode="HTML"
         )
     except Exception as e:
-        logger.error(f"Failed to notify operators about reopen: {e}")
+        logger.error("Failed to notify operators about reopen: %s", e)
     
     # Confirm to client
     from app.bot.keyboards.ticket import get_after_ticket_menu
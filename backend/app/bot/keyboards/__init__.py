@@ -6,10 +6,12 @@ from app.bot.keyboards.operator import (
     get_ticket_actions_keyboard,
     get_ticket_inprogress_keyboard,
 )
+from app.bot.keyboards.pagination import get_page_buttons
 from app.bot.keyboards.ticket import (
     get_active_ticket_menu,
     get_after_ticket_menu,
     get_done_attachments_keyboard,
+    get_kb_suggestions_keyboard,
     get_preview_keyboard,
     get_reopen_or_new_keyboard,
     get_skip_attachments_keyboard,
@@ -25,7 +27,9 @@ __all__ = [
     "get_csat_keyboard",
     "get_ticket_actions_keyboard",
     "get_ticket_inprogress_keyboard",
+    "get_page_buttons",
     "get_done_attachments_keyboard",
+    "get_kb_suggestions_keyboard",
     "get_preview_keyboard",
     "get_reopen_or_new_keyboard",
     "get_skip_attachments_keyboard",
@@ -0,0 +1,30 @@
+"""
+Prev/Next buttons for keyset-paginated lists.
+"""
+
+from typing import List
+
+from aiogram.types import InlineKeyboardButton
+
+from app.config.texts import Texts
+from app.database.pagination import Page
+
+
+def get_page_buttons(page: Page, callback_prefix: str) -> List[InlineKeyboardButton]:
+    """
+    Build navigation buttons of a list page (empty if it is the only page).
+    
+    Args:
+        page: Current page
+        callback_prefix: Callback data before the cursor, e.g. "op:list:my:"
+    """
+    buttons = []
+    if page.prev_cursor:
+        buttons.append(InlineKeyboardButton(
+            text=Texts.BTN_PAGE_PREV, callback_data=f"{callback_prefix}{page.prev_cursor}"
+        ))
+    if page.next_cursor:
+        buttons.append(InlineKeyboardButton(
+            text=Texts.BTN_PAGE_NEXT, callback_data=f"{callback_prefix}{page.next_cursor}"
+        ))
+    return buttons
@@ -2,6 +2,8 @@
 Ticket-related keyboards.
 """
 
+from typing import List
+
 from aiogram.types import InlineKeyboardMarkup
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 
@@ -85,6 +87,27 @@ def get_done_attachments_keyboard() -> InlineKeyboardMarkup:
     return get_preview_keyboard()
 
 
+def get_kb_suggestions_keyboard(titles: List[str]) -> InlineKeyboardMarkup:
+    """
+    Build knowledge-base suggestions keyboard.
+    
+    Buttons:
+    - One per suggested article (opens it)
+    - This solved it
+    - Create the ticket anyway
+    """
+    builder = InlineKeyboardBuilder()
+    
+    for index, title in enumerate(titles):
+        label = title if len(title) <= 40 else title[:39] + "…"
+        builder.button(text=f"📖 {label}", callback_data=f"kb:open:{index}")
+    builder.button(text=Texts.BTN_KB_SOLVED, callback_data="kb:solved")
+    builder.button(text=Texts.BTN_KB_CONTINUE, callback_data="kb:continue")
+    
+    builder.adjust(1)
+    return builder.as_markup()
+
+
 def get_after_ticket_menu() -> InlineKeyboardMarkup:
     """
     Build menu shown after ticket creation.
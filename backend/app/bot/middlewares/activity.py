@@ -0,0 +1,33 @@
+"""
+Update activity middleware.
+
+Feeds the readiness probe with the time of the last processed update.
+"""
+
+from typing import Any, Awaitable, Callable, Dict
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject
+
+from app.health import readiness
+
+
+class UpdateActivityMiddleware(BaseMiddleware):
+    """
+    Outer update middleware that marks every processed update.
+
+    Usage:
+        dp.update.outer_middleware(UpdateActivityMiddleware())
+    """
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        """Process update, then record it as the latest activity."""
+        try:
+            return await handler(event, data)
+        finally:
+            readiness.mark_update()
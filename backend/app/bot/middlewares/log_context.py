@@ -0,0 +1,40 @@
+"""
+Log context middleware.
+
+Binds update_id and user_id to all log records emitted while handling an update.
+"""
+
+from typing import Any, Awaitable, Callable, Dict
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject, Update, User
+
+from app.logging_setup import bind_log_context, reset_log_context
+
+
+class LogContextMiddleware(BaseMiddleware):
+    """
+    Outer update middleware that sets per-update log correlation fields.
+
+    Handlers may add the ticket number with bind_log_context(ticket=...).
+
+    Usage:
+        dp.update.outer_middleware(LogContextMiddleware())
+    """
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        """Bind context for the duration of the update."""
+        user: User = data.get("event_from_user")
+        token = bind_log_context(
+            update_id=event.update_id if isinstance(event, Update) else "-",
+            user_id=user.id if user else "-",
+        )
+        try:
+            return await handler(event, data)
+        finally:
+            reset_log_context(token)
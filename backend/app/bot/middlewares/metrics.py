@@ -0,0 +1,48 @@
+"""
+Handler metrics middleware.
+
+Measures per-router/per-handler latency of update handlers.
+"""
+
+import time
+from typing import Any, Awaitable, Callable, Dict
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject
+
+from app.metrics import HANDLER_DURATION, HANDLER_ERRORS
+
+
+class MetricsMiddleware(BaseMiddleware):
+    """
+    Inner middleware that records handler latency histograms.
+
+    Register on dispatcher observers (before DatabaseMiddleware so session
+    setup is included):
+        dp.message.middleware(MetricsMiddleware())
+    """
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        """Time the matched handler and record it under router/handler labels."""
+        handler_object = data.get("handler")
+        callback = getattr(handler_object, "callback", None)
+        router = data.get("event_router")
+        labels = {
+            "router": getattr(router, "name", None) or "unknown",
+            "handler": getattr(callback, "__name__", None) or "unknown",
+            "event": type(event).__name__,
+        }
+
+        started = time.perf_counter()
+        try:
+            return await handler(event, data)
+        except Exception:
+            HANDLER_ERRORS.inc(**labels)
+            raise
+        finally:
+            HANDLER_DURATION.observe(time.perf_counter() - started, **labels)
@@ -0,0 +1,63 @@
+"""
+Per-update SQL budget middleware.
+
+Counts statements executed by a handler and warns when it exceeds the budget.
+"""
+
+import logging
+from typing import Any, Awaitable, Callable, Dict
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject
+
+from app.config.settings import settings
+from app.database.instrumentation import start_query_tracking, stop_query_tracking
+from app.metrics import HANDLER_DB_STATEMENTS
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetMiddleware(BaseMiddleware):
+    """
+    Inner middleware that tallies SQL statements per handled update.
+
+    The running QueryStats is available to handlers as data["query_stats"].
+    Register before DatabaseMiddleware so the session commit is counted:
+        dp.message.middleware(QueryBudgetMiddleware())
+    """
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        """Track statements for the handler and report budget overruns."""
+        stats, token = start_query_tracking()
+        data["query_stats"] = stats
+        try:
+            return await handler(event, data)
+        finally:
+            stop_query_tracking(token)
+
+            callback = getattr(data.get("handler"), "callback", None)
+            handler_name = getattr(callback, "__name__", None) or "unknown"
+            router_name = getattr(data.get("event_router"), "name", None) or "unknown"
+            HANDLER_DB_STATEMENTS.observe(stats.count, router=router_name, handler=handler_name)
+
+            if stats.count > settings.query_budget:
+                logger.warning(
+                    "Handler %s executed %d SQL statements (budget %d, %.1f ms in DB, %d slow)",
+                    handler_name,
+                    stats.count,
+                    settings.query_budget,
+                    stats.total_time * 1000,
+                    stats.slow_count,
+                )
+            else:
+                logger.debug(
+                    "Handler %s executed %d SQL statements (%.1f ms in DB)",
+                    handler_name,
+                    stats.count,
+                    stats.total_time * 1000,
+                )
@@ -0,0 +1,252 @@
+"""
+Update recorder middleware.
+
+Appends every incoming update, anonymized, to a JSONL file together with
+its arrival offset and processing time. The file is replayed against a
+scratch database by benchmarks.replay to reproduce production traffic
+shapes. Writes go through a queue to a helper thread, so disk I/O never
+blocks the event loop.
+
+File format (one JSON object per line):
+    {"header": {"version": 1, "recorded_at": ..., "support_chat_id": ..., "operators": [...]}}
+    {"t": 0.0, "handle_ms": 12.3, "update": {...}}
+
+Every bot start appends a new segment (header plus updates). The
+anonymization key lives next to the file ("<recording>.key") and is reused
+by later segments, so ids stay continuous across restarts. Share the
+recording without the key file.
+"""
+
+import hashlib
+import hmac
+import json
+import logging
+import os
+import queue
+import re
+import secrets
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject, Update
+
+logger = logging.getLogger(__name__)
+
+RECORDING_VERSION = 1
+
+# Objects whose "id" identifies a person or chat
+_IDENTITY_KEYS = frozenset({
+    "from", "chat", "user", "sender_chat", "forward_from", "forward_from_chat",
+    "left_chat_member", "new_chat_members", "contact",
+})
+# Free text: masked with the same length and word boundaries
+_TEXT_KEYS = frozenset({"text", "caption", "question", "address"})
+# Names: replaced with a stable pseudonym
+_NAME_KEYS = frozenset({"first_name", "last_name", "username", "title", "phone_number", "file_name"})
+# Opaque tokens: replaced with a keyed hash
+_TOKEN_KEYS = frozenset({"file_id", "file_unique_id", "chat_instance", "inline_message_id"})
+
+_COMMAND_RE = re.compile(r"^(/[A-Za-z0-9_]+(?:@\w+)?)(?:\s+(.*))?$", re.DOTALL)
+_STOP = object()
+
+
+class Anonymizer:
+    """
+    Replaces personal data in update dicts while keeping the traffic shape.
+
+    Ids are mapped through a keyed hash, so the same user keeps the same
+    pseudonymous id for as long as the key is kept and the mapping cannot
+    be reversed without the key. Text keeps its length and word boundaries;
+    command names and callback data are kept verbatim, command arguments
+    (invite codes) are hashed.
+
+    Args:
+        key: HMAC key (random when omitted)
+    """
+
+    def __init__(self, key: Optional[bytes] = None) -> None:
+        self.key = key or secrets.token_bytes(32)
+
+    def _digest(self, value: Any) -> int:
+        mac = hmac.new(self.key, str(value).encode(), hashlib.sha256).digest()
+        return int.from_bytes(mac[:8], "big")
+
+    def user_id(self, value: int) -> int:
+        """Pseudonymous id; negative (group) ids stay negative."""
+        if value < 0:
+            return -(1_000_000_000_000 + self._digest(value) % 10**12)
+        return 1 + self._digest(value) % 10**10
+
+    def token(self, value: str) -> str:
+        """Stable opaque replacement for codes and file ids."""
+        return f"a{self._digest(value):016x}"
+
+    def text(self, value: str) -> str:
+        """Mask text; keep /command and hash its argument."""
+        match = _COMMAND_RE.match(value)
+        if match:
+            command, args = match.groups()
+            return f"{command} {self.token(args.strip())}" if args and args.strip() else command
+        return re.sub(r"\S", "x", value)
+
+    def anonymize(self, payload: Any, key: Optional[str] = None) -> Any:
+        """Return anonymized copy of a JSON-like update payload."""
+        if isinstance(payload, list):
+            return [self.anonymize(item, key) for item in payload]
+        if not isinstance(payload, dict):
+            return payload
+
+        result: Dict[str, Any] = {}
+        for name, value in payload.items():
+            if name == "id" and key in _IDENTITY_KEYS and isinstance(value, int):
+                result[name] = self.user_id(value)
+            elif name in ("user_id", "chat_id") and isinstance(value, int):
+                result[name] = self.user_id(value)
+            elif name in _TEXT_KEYS and isinstance(value, str):
+                result[name] = self.text(value)
+            elif name in _NAME_KEYS and isinstance(value, str):
+                result[name] = f"{name}_{self.token(value)[1:9]}"
+            elif name in _TOKEN_KEYS and isinstance(value, str):
+                result[name] = self.token(value)
+            else:
+                result[name] = self.anonymize(value, name)
+        return result
+
+
+def load_or_create_key(path: Path) -> bytes:
+    """
+    HMAC key of a recording, kept in "<recording>.key" next to it.
+
+    Created (readable by the owner only) on the first start and reused after
+    restarts, so every segment of an appended recording maps a user, chat or
+    invite code to the same pseudonym.
+
+    Args:
+        path: Recording file
+    """
+    key_path = path.with_name(path.name + ".key")
+    if key_path.exists():
+        return bytes.fromhex(key_path.read_text(encoding="ascii").strip())
+    key_path.parent.mkdir(parents=True, exist_ok=True)
+    key = secrets.token_bytes(32)
+    with os.fdopen(os.open(key_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600), "w", encoding="ascii") as file:
+        file.write(key.hex())
+    logger.info("Created recording key %s", key_path)
+    return key
+
+
+class UpdateRecorder:
+    """
+    Background JSONL writer for recorded updates.
+
+    Args:
+        path: File to append to (created with parent directories)
+        support_chat_id: Support group id (stored pseudonymized in the header)
+        operators: Operator Telegram ids (stored pseudonymized in the header)
+        anonymizer: Anonymizer to use (key from load_or_create_key(path) when omitted)
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        support_chat_id: int,
+        operators: Iterable[int],
+        anonymizer: Optional[Anonymizer] = None,
+    ) -> None:
+        self.path = path
+        self.anonymizer = anonymizer or Anonymizer(load_or_create_key(path))
+        self.started = time.monotonic()
+        self._queue: "queue.SimpleQueue[Any]" = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self._queue.put({
+            "header": {
+                "version": RECORDING_VERSION,
+                "recorded_at": datetime.now(timezone.utc).isoformat(),
+                "support_chat_id": self.anonymizer.user_id(support_chat_id),
+                "operators": [self.anonymizer.user_id(operator_id) for operator_id in operators],
+            }
+        })
+
+    def start(self) -> None:
+        """Start writer thread."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name="update-recorder", daemon=True)
+        self._thread.start()
+        logger.info("Recording updates to %s", self.path)
+
+    def stop(self) -> None:
+        """Flush pending records and stop writer thread."""
+        if self._thread is None:
+            return
+        self._queue.put(_STOP)
+        self._thread.join()
+        self._thread = None
+
+    def record(self, update: Update, arrived: float, handle_seconds: float) -> None:
+        """
+        Queue one update for writing (never blocks).
+
+        Args:
+            update: Incoming update
+            arrived: time.monotonic() when the update arrived
+            handle_seconds: Time spent in middlewares and handlers
+        """
+        self._queue.put((update, arrived, handle_seconds))
+
+    def _serialize(self, item: Any) -> str:
+        if isinstance(item, dict):
+            return json.dumps(item, ensure_ascii=False)
+        update, arrived, handle_seconds = item
+        payload = update.model_dump(mode="json", exclude_none=True, by_alias=True)
+        return json.dumps(
+            {
+                "t": round(arrived - self.started, 6),
+                "handle_ms": round(handle_seconds * 1000, 3),
+                "update": self.anonymizer.anonymize(payload),
+            },
+            ensure_ascii=False,
+        )
+
+    def _run(self) -> None:
+        """Writer loop (runs in the helper thread)."""
+        with self.path.open("a", encoding="utf-8") as file:
+            while True:
+                item = self._queue.get()
+                if item is _STOP:
+                    return
+                try:
+                    file.write(self._serialize(item) + "\n")
+                    if self._queue.empty():
+                        file.flush()
+                except Exception:
+                    logger.exception("Failed to record update")
+
+
+class UpdateRecorderMiddleware(BaseMiddleware):
+    """
+    Outer update middleware that passes every update to an UpdateRecorder.
+
+    Usage:
+        dp.update.outer_middleware(UpdateRecorderMiddleware(recorder))
+    """
+
+    def __init__(self, recorder: UpdateRecorder) -> None:
+        self.recorder = recorder
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        """Time the update and queue it for recording."""
+        arrived = time.monotonic()
+        try:
+            return await handler(event, data)
+        finally:
+            if isinstance(event, Update):
+                self.recorder.record(event, arrived, time.monotonic() - arrived)
@@ -0,0 +1,59 @@
+"""
+Bot API session middleware.
+
+Counts outbound Telegram method calls, their latency and errors.
+Completed getUpdates calls also feed the readiness probe.
+"""
+
+import time
+from typing import TYPE_CHECKING, Any
+
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.exceptions import TelegramAPIError, TelegramRetryAfter
+
+from app.health import readiness
+from app.metrics import TELEGRAM_REQUEST_DURATION, TELEGRAM_REQUESTS, TELEGRAM_RETRY_AFTER
+
+if TYPE_CHECKING:
+    from aiogram import Bot
+    from aiogram.methods import TelegramMethod
+
+
+class TelegramApiMetricsMiddleware(BaseRequestMiddleware):
+    """
+    Request middleware that records Bot API call metrics.
+
+    Usage:
+        bot.session.middleware(TelegramApiMetricsMiddleware())
+    """
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType,
+        bot: "Bot",
+        method: "TelegramMethod",
+    ) -> Any:
+        """Time the request and count it by method and outcome."""
+        method_name = getattr(method, "__api_method__", None) or type(method).__name__
+        outcome = "ok"
+
+        started = time.perf_counter()
+        try:
+            response = await make_request(bot, method)
+            if method_name == "getUpdates":
+                # A completed long-poll cycle (even empty) means we are caught up
+                readiness.mark_update()
+            return response
+        except TelegramRetryAfter:
+            outcome = "retry_after"
+            TELEGRAM_RETRY_AFTER.inc(method=method_name)
+            raise
+        except TelegramAPIError:
+            outcome = "api_error"
+            raise
+        except Exception:
+            outcome = "network_error"
+            raise
+        finally:
+            TELEGRAM_REQUEST_DURATION.observe(time.perf_counter() - started, method=method_name)
+            TELEGRAM_REQUESTS.inc(method=method_name, outcome=outcome)
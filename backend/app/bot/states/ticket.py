@@ -10,6 +10,7 @@ class TicketCreation(StatesGroup):
     
     waiting_category = State()       # User selecting category
     waiting_description = State()    # User typing description
+    reviewing_suggestions = State()  # User reading knowledge-base suggestions
     waiting_attachments = State()    # User attaching files (optional)
     
     # Summary / preview step
@@ -38,11 +38,29 @@ CATEGORY_SLA: dict = {
 }
 
 
+# Resolution deadline in business hours (upper bound of CATEGORY_SLA; a working day is 9 h, 10:00–19:00)
+CATEGORY_RESOLUTION_HOURS: dict = {
+    "report": 12,
+    "rating": 8,
+    "widget": 18,   # 2 working days
+    "access": 3,
+    "howto": 27,    # 3 working days
+    "billing": 18,  # 2 working days
+    "feature": None,  # No SLA
+    "other": None,    # No SLA
+}
+
+
 def get_sla_time(category_id: str) -> Optional[str]:
     """Get SLA time for category."""
     return CATEGORY_SLA.get(category_id)
 
 
+def get_resolution_hours(category_id: str) -> Optional[float]:
+    """Get resolution deadline (business hours) for category, None if no SLA."""
+    return CATEGORY_RESOLUTION_HOURS.get(category_id)
+
+
 def get_category_by_id(category_id: str) -> Optional[Category]:
     """Get category by ID."""
     for cat in CATEGORIES:
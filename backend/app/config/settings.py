@@ -1,6 +1,7 @@
 """Application settings using Pydantic."""
 
 import os
+from datetime import date
 from typing import List, Optional, Union
 
 from pydantic import Field, field_validator
@@ -46,12 +47,135 @@ class Settings(BaseSettings):
         default="info",
         description="Logging level (debug, info, warning, error)"
     )
+    log_json: bool = Field(
+        default=False,
+        description="Write logs as JSON lines instead of text"
+    )
     healthcheck_port: Optional[int] = Field(
         default=None,
         description="Port for HTTP healthcheck (e.g. PORT on Railway). If set, GET / returns 200.",
         validation_alias="PORT",
     )
     
+    # === Readiness (GET /ready) ===
+    ready_db_max_ms: int = Field(
+        default=1000,
+        description="Max DB round-trip (ms) before /ready returns 503"
+    )
+    ready_update_max_age: int = Field(
+        default=300,
+        description="Max seconds since last processed update or long-poll cycle before /ready returns 503"
+    )
+    ready_loop_lag_max_ms: int = Field(
+        default=500,
+        description="Max event-loop lag (ms) measured by background probe before /ready returns 503"
+    )
+    loop_probe_interval: float = Field(
+        default=1.0,
+        description="Event-loop lag probe interval (seconds)"
+    )
+    
+    # === SQL diagnostics ===
+    slow_query_ms: int = Field(
+        default=100,
+        description="Log SQL statements slower than this (ms) with their parameter types"
+    )
+    query_budget: int = Field(
+        default=20,
+        description="Warn when one handler executes more SQL statements than this"
+    )
+    
+    # === Traffic recording (benchmarks.replay) ===
+    record_updates_path: Optional[str] = Field(
+        default=None,
+        description="Append anonymized incoming updates to this JSONL file (disabled if empty)"
+    )
+    
+    # === Duplicate detection ===
+    duplicate_window_hours: float = Field(
+        default=24,
+        description="Compare new tickets with open tickets of the same client created within this many hours"
+    )
+    duplicate_threshold: float = Field(
+        default=0.5,
+        description="Minimum estimated Jaccard similarity of descriptions to flag a likely duplicate"
+    )
+    duplicate_link: bool = Field(
+        default=True,
+        description="Record a system message linking a flagged ticket to its likely duplicate"
+    )
+    
+    # === Knowledge base (self-service suggestions) ===
+    kb_path: Optional[str] = Field(
+        default=None,
+        description="Directory with Markdown articles suggested before ticket creation (disabled if empty)"
+    )
+    kb_min_score: float = Field(
+        default=3.0,
+        description="Minimum BM25 score for an article to be suggested"
+    )
+    kb_max_suggestions: int = Field(
+        default=3,
+        description="Maximum articles suggested for one description"
+    )
+    
+    # === SLA timers ===
+    sla_timers_enabled: bool = Field(
+        default=True,
+        description="Post SLA reminders and breach alerts into ticket topics"
+    )
+    sla_first_response_minutes: int = Field(
+        default=60,
+        description="Alert if a ticket gets no first response within this many minutes (0 = off)"
+    )
+    sla_unassigned_reminder_minutes: int = Field(
+        default=30,
+        description="Remind every N minutes while a ticket stays new and unassigned (0 = off)"
+    )
+    
+    # === Auto-assignment ===
+    auto_assign_enabled: bool = Field(
+        default=False,
+        description="Assign new tickets to operators who are /online during working hours"
+    )
+    auto_assign_max_load: int = Field(
+        default=5,
+        description="Do not auto-assign to an operator with this many open tickets"
+    )
+    operator_skills: str = Field(
+        default="",
+        description="Categories per operator for auto-assignment: 111:report,billing;222:access "
+                    "(operators not listed handle every category)"
+    )
+    
+    # === Awaiting reply digest ===
+    awaiting_digest_minutes: int = Field(
+        default=60,
+        description="Post tickets whose client waits for a reply into the support group every N minutes (0 = off)"
+    )
+    awaiting_digest_min_wait_minutes: int = Field(
+        default=30,
+        description="Only list tickets whose client has been waiting at least this many minutes"
+    )
+    awaiting_digest_topic_id: Optional[int] = Field(
+        default=None,
+        description="Support group topic for the digest (General topic if empty)"
+    )
+    
+    # === Profiler (/profile) ===
+    profile_default_seconds: int = Field(
+        default=10,
+        description="Default /profile duration (seconds)"
+    )
+    profile_max_seconds: int = Field(
+        default=60,
+        description="Max /profile duration (seconds)"
+    )
+    profile_interval_ms: int = Field(
+        default=5,
+        description="Stack sampling interval while profiling (ms)"
+    )
+    
     # === Working Hours ===
     work_hours_start: int = Field(
         default=10,
@@ -65,6 +189,10 @@ class Settings(BaseSettings):
         default=[1, 2, 3, 4, 5],
         description="Working days (1=Monday, 7=Sunday)"
     )
+    work_holidays: list[date] = Field(
+        default=[],
+        description="Non-working dates excluded from business hours (env: JSON list of ISO dates)"
+    )
     
     @field_validator("operators", mode="before")
     @classmethod
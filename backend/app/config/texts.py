@@ -331,6 +331,10 @@ class Texts:
     BTN_NEW_REQUEST = "➕ Новый запрос"
     BTN_ADD_DETAILS = "📝 Добавить детали к обращению"
     
+    # List pages
+    BTN_PAGE_PREV = "◀️ Назад"
+    BTN_PAGE_NEXT = "Далее ▶️"
+    
     # === My Tickets (Library) ===
     MY_TICKETS_HEADER = "📋 Ваши обращения:\n"
     MY_TICKETS_EMPTY = "У вас пока нет обращений."
@@ -582,17 +586,18 @@ class Texts:
     
     OPERATOR_NO_UNASSIGNED = "Нет новых тикетов! 🎉"
     
+    OPERATOR_STATUS_LABELS = {
+        "new": ("🆕", "Новый"),
+        "in_progress": ("🔧", "В работе"),
+        "on_hold": ("⏸️", "На паузе"),
+        "completed": ("✅", "Выполнен"),
+        "cancelled": ("❌", "Отменён"),
+    }
+    
     @staticmethod
     def operator_ticket_item(number: int, status: str, category: str, description: str) -> str:
         """Format single ticket item for operator list."""
-        status_map = {
-            "new": ("🆕", "Новый"),
-            "in_progress": ("🔧", "В работе"),
-            "on_hold": ("⏸️", "На паузе"),
-            "completed": ("✅", "Выполнен"),
-            "cancelled": ("❌", "Отменён"),
-        }
-        status_emoji, status_text = status_map.get(status, ("❓", status))
+        status_emoji, status_text = Texts.OPERATOR_STATUS_LABELS.get(status, ("❓", status))
         
         # Truncate description
         desc = (description or "")[:40]
@@ -606,3 +611,235 @@ class Texts:
             category=category,
             description=desc
         )
+    
+    # === Duplicate detection ===
+    @staticmethod
+    def duplicate_warning(matches: list) -> str:
+        """Format likely-duplicate line for the ticket card (matches: DuplicateMatch list)."""
+        items = ", ".join(f"#{m.number} ({m.similarity:.0%})" for m in matches)
+        return f"⚠️ <b>Возможный дубликат:</b> {items}"
+    
+    @staticmethod
+    def duplicate_link_message(number: int, similarity: float) -> str:
+        """Format system message linking a ticket to its likely duplicate."""
+        return f"Возможный дубликат тикета #{number} (сходство описаний {similarity:.0%})"
+    
+    # === SLA timers ===
+    @staticmethod
+    def sla_alert(kind: str, number: int, waited_minutes: int) -> str:
+        """Format SLA reminder/breach for the ticket topic (kind: see app.services.sla)."""
+        hours, minutes = divmod(max(waited_minutes, 0), 60)
+        waited = f"{hours} ч {minutes} мин" if hours else f"{minutes} мин"
+        if kind == "unassigned":
+            return f"⏰ Тикет #{number} ждёт оператора уже {waited}. Возьмите его в работу."
+        if kind == "first_response":
+            return f"🚨 <b>SLA:</b> нет первого ответа по тикету #{number} ({waited} с создания)."
+        return f"🚨 <b>SLA:</b> истёк срок решения тикета #{number} ({waited} с создания)."
+    
+    OPERATOR_BREACHING_HEADER = (
+        "━━━━━━━━━━━━━━━━━━━━\n"
+        "🔥 <b>СРОК SLA</b> (истекает в ближайшие {hours} ч)\n"
+        "━━━━━━━━━━━━━━━━━━━━\n"
+    )
+    
+    OPERATOR_NO_BREACHING = "Нет тикетов с истекающим сроком SLA 👌"
+    
+    @staticmethod
+    def sla_due_label(minutes_left: int) -> str:
+        """Format time left until the SLA deadline (negative = overdue)."""
+        hours, minutes = divmod(abs(minutes_left), 60)
+        left = f"{hours} ч {minutes} мин" if hours else f"{minutes} мин"
+        return f"⏳ осталось {left}" if minutes_left >= 0 else f"🔥 просрочен на {left}"
+    
+    # === Awaiting reply (/awaiting and the digest) ===
+    AWAITING_HEADER = (
+        "━━━━━━━━━━━━━━━━━━━━\n"
+        "💬 <b>ЖДУТ ОТВЕТА</b> ({count})\n"
+        "━━━━━━━━━━━━━━━━━━━━\n"
+    )
+    
+    AWAITING_EMPTY = "Все клиенты получили ответ 👌"
+    
+    AWAITING_DIGEST_HEADER = "💬 <b>Ждут ответа оператора</b> дольше {minutes} мин: {count}"
+    
+    AWAITING_MORE = "…и ещё {count}"
+    
+    @staticmethod
+    def awaiting_item(number: int, waited_minutes: int, assigned: bool) -> str:
+        """Format one ticket whose client waits for a reply."""
+        hours, minutes = divmod(max(waited_minutes, 0), 60)
+        waited = f"{hours} ч {minutes} мин" if hours else f"{minutes} мин"
+        owner = "" if assigned else " · 🆕 не назначен"
+        return f"• #{number} — ждёт {waited}{owner}"
+
+    # === Auto-assignment (/online) ===
+    ONLINE_ON = (
+        "🟢 Вы на линии: новые тикеты будут назначаться вам автоматически "
+        "в рабочее время (сейчас в работе: {load} из {max_load})."
+    )
+    ONLINE_OFF = "⚪️ Вы не на линии: новые тикеты не назначаются вам автоматически."
+    ONLINE_AUTO_ASSIGN_DISABLED = "ℹ️ Автоназначение выключено (AUTO_ASSIGN_ENABLED), статус сохранён."
+
+    @staticmethod
+    def auto_assigned(number: int, username: str | None, operator_id: int) -> str:
+        """Topic note after the dispatcher assigned a ticket."""
+        return f"🤖 Тикет #{number} автоматически назначен: @{username or operator_id}"
+
+    # === Search (/search) ===
+    SEARCH_USAGE = (
+        "🔍 Поиск по тикетам и перепискам.\n"
+        "Использование: <code>/search текст</code>\n"
+        "Слова ищутся по началу: «оплат» найдёт «оплата», «оплаты»."
+    )
+    
+    SEARCH_HEADER = (
+        "━━━━━━━━━━━━━━━━━━━━\n"
+        "🔍 <b>ПОИСК:</b> {query}\n"
+        "━━━━━━━━━━━━━━━━━━━━\n"
+    )
+    
+    SEARCH_NOTHING_FOUND = "Ничего не найдено."
+    
+    @staticmethod
+    def search_result_item(number: int, status: str, snippet: str) -> str:
+        """Format one search hit (snippet is already HTML-escaped)."""
+        status_emoji, status_text = Texts.OPERATOR_STATUS_LABELS.get(status, ("❓", status))
+        return f"🎫 <b>#{number}</b> | {status_emoji} {status_text}\n💬 {snippet}\n"
+
+    # === Transcript (/history) ===
+    HISTORY_USAGE = (
+        "📜 Переписка по тикету одним файлом.\n"
+        "Использование: <code>/history номер</code> (HTML) или <code>/history номер txt</code>"
+    )
+    HISTORY_NOT_FOUND = "Тикет #{number} не найден."
+    HISTORY_CAPTION = "📜 Тикет #{number}: сообщений — {count}"
+
+    TRANSCRIPT_TITLE = "Тикет #{number}"
+    TRANSCRIPT_FIELDS = (
+        ("Категория", "category"),
+        ("Статус", "status"),
+        ("Клиент", "client"),
+        ("Оператор", "operator"),
+        ("Создан", "created"),
+    )
+    TRANSCRIPT_AUTHORS = {
+        "client": "Клиент",
+        "operator": "Оператор",
+        "system": "Система",
+    }
+    TRANSCRIPT_FILE = "📎 {type}, file_id: {file_id}"
+    TRANSCRIPT_FOOTER = "Сообщений: {count}"
+
+    # === Analytics (/stats) ===
+    STATS_HEADER = (
+        "━━━━━━━━━━━━━━━━━━━━\n"
+        "📊 <b>СТАТИСТИКА</b> за {months} мес. (тикетов: {tickets})\n"
+        "━━━━━━━━━━━━━━━━━━━━\n"
+    )
+
+    STATS_NO_DATA = "За выбранный период тикетов нет."
+
+    STATS_LEGEND = (
+        "<i>Медиана / p90 в рабочих часах: ⏱ первый ответ, ✅ решение.\n"
+        "Все метрики (и по календарному времени) — в CSV.</i>"
+    )
+
+    STATS_SECTIONS = {
+        "category": "📂 <b>По категориям</b>",
+        "operator": "👤 <b>По операторам</b>",
+        "client": "🏢 <b>По клиентам</b>",
+    }
+
+    @staticmethod
+    def stats_duration(seconds: float) -> str:
+        """Format a duration for /stats ("—" for NaN = no data)."""
+        if seconds != seconds:
+            return "—"
+        minutes = int(seconds // 60)
+        if minutes < 60:
+            return f"{minutes} мин"
+        hours, minutes = divmod(minutes, 60)
+        if hours < 24:
+            return f"{hours} ч {minutes} мин" if minutes else f"{hours} ч"
+        days, hours = divmod(hours, 24)
+        return f"{days} д {hours} ч" if hours else f"{days} д"
+
+    STATS_STATUS_TIME_TITLE = "⏳ <b>Время в статусах</b> (за всё время, в среднем за раз)"
+
+    @staticmethod
+    def stats_status_time_line(status: str, mean: str, intervals: int) -> str:
+        """Format average time in one status (mean is already formatted)."""
+        status_emoji, status_text = Texts.OPERATOR_STATUS_LABELS.get(status, ("❓", status))
+        return f"{status_emoji} {status_text}: {mean} (раз: {intervals})"
+
+    @staticmethod
+    def stats_group_line(label: str, tickets: int, first_response: str, resolution: str) -> str:
+        """Format one /stats group (label is already HTML-escaped, durations formatted)."""
+        return f"{label} — {tickets}: ⏱ {first_response} · ✅ {resolution}"
+
+    # === CSAT rollups (/csat) ===
+    CSAT_REPORT_HEADER = (
+        "━━━━━━━━━━━━━━━━━━━━\n"
+        "⭐ <b>CSAT</b> за {days} дн. (оценок: {total})\n"
+        "━━━━━━━━━━━━━━━━━━━━\n"
+    )
+
+    CSAT_REPORT_EMPTY = "За выбранный период оценок нет."
+
+    CSAT_REPORT_SECTIONS = {
+        "operator": "👤 <b>По операторам</b>",
+        "category": "📂 <b>По категориям</b>",
+    }
+
+    CSAT_REPORT_LEGEND = "<i>👍 доля положительных · средние оценки: ⚡ скорость, ✨ качество, 💬 вежливость</i>"
+
+    @staticmethod
+    def csat_summary_line(
+        label: str,
+        total: int,
+        positive_share: float,
+        speed: float | None,
+        quality: float | None,
+        politeness: float | None,
+    ) -> str:
+        """Format one /csat group (label is already HTML-escaped; None = no detailed ratings)."""
+        ratings = " · ".join(
+            f"{emoji} {value:.1f}" if value is not None else f"{emoji} —"
+            for emoji, value in (("⚡", speed), ("✨", quality), ("💬", politeness))
+        )
+        return f"{label} — {total}: 👍 {positive_share:.0%} · {ratings}"
+
+    # === Knowledge base (suggestions before ticket creation) ===
+    KB_SUGGESTIONS_HEADER = "💡 Возможно, ответ уже есть — посмотрите, пока мы не создали обращение:\n"
+    KB_SUGGESTIONS_FOOTER = "\nЕсли не помогло — продолжим оформление обращения."
+    KB_SOLVED = "🎉 Отлично, рады, что получилось! Если что-то ещё — просто напишите."
+    KB_ARTICLE_MISSING = "Статья больше недоступна. Продолжим оформление обращения?"
+    BTN_KB_SOLVED = "✅ Это решило вопрос"
+    BTN_KB_CONTINUE = "➡️ Всё равно создать обращение"
+    
+    @staticmethod
+    def kb_suggestion_item(index: int, title: str, excerpt: str) -> str:
+        """Format one suggested article (title and excerpt are already HTML-escaped)."""
+        return f"{index}. <b>{title}</b>\n{excerpt}\n"
+    
+    @staticmethod
+    def kb_article(title: str, body: str) -> str:
+        """Format full article text (title and body are already HTML-escaped)."""
+        return f"📖 <b>{title}</b>\n\n{body}"
+    
+    # === Profiler (/profile) ===
+    PROFILE_BUSY = "⏳ Профилирование уже идёт, дождитесь результата."
+    
+    @staticmethod
+    def profile_started(seconds: int, with_memory: bool) -> str:
+        """Format profiler start message."""
+        memory = " + снимок памяти (tracemalloc)" if with_memory else ""
+        return f"🔬 Профилирую event loop {seconds} с{memory}…"
+    
+    @staticmethod
+    def profile_done(samples: int, seconds: float) -> str:
+        """Format caption for profiler result."""
+        return (
+            f"🔬 Профиль: {samples} сэмплов за {seconds:.1f} с.\n"
+            "Файл .collapsed — для flamegraph.pl / speedscope."
+        )
@@ -15,7 +15,10 @@ from sqlalchemy.ext.asyncio import (
 )
 
 from app.config.settings import settings
+from app.database.instrumentation import instrument_engine
 from app.database.models import Base
+from app.database.schema import upgrade_schema
+from app.database.search import ensure_search_index
 
 logger = logging.getLogger(__name__)
 
@@ -40,6 +43,7 @@ def get_engine() -> AsyncEngine:
             get_database_url(),
             echo=settings.log_level.lower() == "debug",
         )
+        instrument_engine(_engine)
     
     return _engine
 
@@ -72,8 +76,12 @@ async def init_db() -> None:
     
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        # Columns/indexes added to models after the table was created
+        await conn.run_sync(upgrade_schema)
+        # FTS5 tables + sync triggers; first run backfills existing rows
+        await ensure_search_index(conn)
     
-    logger.info(f"Database initialized: {settings.db_path}")
+    logger.info("Database initialized: %s", settings.db_path)
 
 
 async def close_db() -> None:
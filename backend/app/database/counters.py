@@ -0,0 +1,164 @@
+"""
+Denormalized conversation counters on tickets.
+
+Ticket.message_count, last_message_at, last_client_message_at,
+last_operator_message_at and awaiting_reply_since answer "how many messages",
+"who spoke last" and "how long has the client been waiting" without scanning
+messages. count_message() updates them with one UPDATE in the transaction
+that saves the message (ops.create_message).
+
+awaiting_reply_since is the first client message after the last operator
+reply, so a client's follow-up ("any news?") does not reset the waiting time.
+System messages are counted but do not change who is waiting.
+
+backfill_message_counters() recomputes the counters from messages in ticket
+id windows (after upgrading an existing database, bulk imports or manual
+fixes): scripts/backfill_message_counters.py.
+"""
+
+import logging
+from datetime import datetime
+from typing import Any, Dict, List
+
+from sqlalchemy import and_, case, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.sql import Update
+
+from app.database.models import Message, Ticket
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 10_000
+
+COUNTER_COLUMNS = (
+    "message_count", "last_message_at", "last_client_message_at", "last_operator_message_at", "awaiting_reply_since",
+)
+
+
+def message_counter_values(direction: str, at: datetime) -> Dict[str, Any]:
+    """SET clause of count_message() for one new message."""
+    values: Dict[str, Any] = {
+        "message_count": Ticket.message_count + 1,
+        "last_message_at": at,
+        # updated_at tracks changes of the ticket itself, not conversation activity
+        "updated_at": Ticket.updated_at,
+    }
+    if direction == "client":
+        values["last_client_message_at"] = at
+        values["awaiting_reply_since"] = func.coalesce(Ticket.awaiting_reply_since, at)
+    elif direction == "operator":
+        values["last_operator_message_at"] = at
+        values["awaiting_reply_since"] = None
+    return values
+
+
+async def count_message(session: AsyncSession, ticket_id: int, direction: str, at: datetime) -> None:
+    """
+    Add one message to the ticket's counters. Does not commit.
+
+    Args:
+        session: Session of the transaction that saves the message
+        ticket_id: Ticket ID
+        direction: client, operator, or system
+        at: Message created_at (naive UTC)
+    """
+    result = await session.execute(
+        update(Ticket)
+        .where(Ticket.id == ticket_id)
+        .values(**message_counter_values(direction, at))
+        .returning(*(getattr(Ticket, name) for name in COUNTER_COLUMNS))
+        .execution_options(synchronize_session=False)
+    )
+    row = result.one_or_none()
+    # A loaded Ticket gets the new values; expiring them would need a lazy load (not possible with asyncio)
+    ticket = session.identity_map.get(session.identity_key(Ticket, ticket_id))
+    if row is not None and ticket is not None:
+        for name, value in zip(COUNTER_COLUMNS, row):
+            set_committed_value(ticket, name, value)
+
+
+def backfill_statements(after_id: int, upto_id: int) -> List[Update]:
+    """
+    UPDATE statements that recompute counters of tickets with after_id < id <= upto_id.
+
+    Plain Core statements, so benchmarks.seed can run them on a sync engine.
+    Tickets without messages in the window are reset first.
+    """
+    window = and_(Ticket.id > after_id, Ticket.id <= upto_id)
+    totals = (
+        select(
+            Message.ticket_id,
+            func.count().label("count"),
+            func.max(Message.created_at).label("last"),
+            func.max(case((Message.direction == "client", Message.created_at))).label("last_client"),
+            func.max(case((Message.direction == "operator", Message.created_at))).label("last_operator"),
+        )
+        .where(Message.ticket_id > after_id, Message.ticket_id <= upto_id)
+        .group_by(Message.ticket_id)
+        .subquery()
+    )
+    first_unanswered = (
+        select(func.min(Message.created_at))
+        .where(
+            Message.ticket_id == Ticket.id,
+            Message.direction == "client",
+            or_(Ticket.last_operator_message_at.is_(None), Message.created_at > Ticket.last_operator_message_at),
+        )
+        .scalar_subquery()
+    )
+    return [
+        update(Ticket).where(window).values(
+            message_count=0,
+            last_message_at=None,
+            last_client_message_at=None,
+            last_operator_message_at=None,
+            awaiting_reply_since=None,
+            updated_at=Ticket.updated_at,
+        ),
+        update(Ticket).where(Ticket.id == totals.c.ticket_id).values(
+            message_count=totals.c.count,
+            last_message_at=totals.c.last,
+            last_client_message_at=totals.c.last_client,
+            last_operator_message_at=totals.c.last_operator,
+            updated_at=Ticket.updated_at,
+        ),
+        # Runs after the previous statement: compares with the recomputed last operator reply
+        update(Ticket)
+        .where(
+            window,
+            Ticket.last_client_message_at.isnot(None),
+            or_(
+                Ticket.last_operator_message_at.is_(None),
+                Ticket.last_client_message_at > Ticket.last_operator_message_at,
+            ),
+        )
+        .values(awaiting_reply_since=first_unanswered, updated_at=Ticket.updated_at),
+    ]
+
+
+async def backfill_message_counters(session: AsyncSession, batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+    """
+    Recompute counters of all tickets from messages, committing per window of ticket ids.
+
+    The write lock is released between windows, so the bot keeps working;
+    a message saved while a window is being recomputed is counted either way.
+
+    Args:
+        session: Database session
+        batch_size: Ticket ids per transaction
+
+    Returns:
+        Number of tickets with messages
+    """
+    max_id = (await session.execute(select(func.max(Ticket.id)))).scalar() or 0
+    with_messages = 0
+    for after_id in range(0, max_id, batch_size):
+        reset, totals, awaiting = backfill_statements(after_id, min(after_id + batch_size, max_id))
+        await session.execute(reset.execution_options(synchronize_session=False))
+        result = await session.execute(totals.execution_options(synchronize_session=False))
+        with_messages += result.rowcount
+        await session.execute(awaiting.execution_options(synchronize_session=False))
+        await session.commit()
+    logger.info("Message counters backfilled: %s tickets with messages, ids up to %s", with_messages, max_id)
+    return with_messages
@@ -0,0 +1,154 @@
+"""
+SQLAlchemy engine instrumentation.
+
+Counts executed statements and their duration via cursor execute events,
+logs slow statements and tallies statements per update (see QueryStats).
+"""
+
+import contextvars
+import logging
+import re
+import time
+from typing import Any, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.config.settings import settings
+from app.metrics import DB_STATEMENT_DURATION, DB_STATEMENTS
+
+logger = logging.getLogger(__name__)
+
+_KNOWN_OPERATIONS = ("select", "insert", "update", "delete", "pragma")
+_WHITESPACE = re.compile(r"\s+")
+_MAX_LOGGED_STATEMENT = 500
+
+
+class QueryStats:
+    """Statements executed while handling one update."""
+
+    __slots__ = ("count", "total_time", "slow_count")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total_time = 0.0
+        self.slow_count = 0
+
+
+# Set by QueryBudgetMiddleware; SQLAlchemy's greenlet shares the caller's context
+_query_stats: contextvars.ContextVar[Optional[QueryStats]] = contextvars.ContextVar(
+    "query_stats", default=None
+)
+
+
+def start_query_tracking() -> Tuple[QueryStats, contextvars.Token]:
+    """
+    Start counting statements in the current context.
+
+    Returns:
+        Tuple of (stats, token for stop_query_tracking)
+    """
+    stats = QueryStats()
+    return stats, _query_stats.set(stats)
+
+
+def stop_query_tracking(token: contextvars.Token) -> None:
+    """Stop counting statements started with start_query_tracking()."""
+    _query_stats.reset(token)
+
+
+def parameters_shape(parameters: Any, executemany: bool = False) -> str:
+    """
+    Describe statement parameters by type only (values may hold personal data).
+
+    Examples:
+        (1, "x", None) -> "(int, str, NoneType)"
+        executemany of 3 rows -> "3 x (int, str)"
+    """
+    if executemany and isinstance(parameters, (list, tuple)):
+        first = parameters[0] if parameters else ()
+        return f"{len(parameters)} x {parameters_shape(first)}"
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{key}: {type(value).__name__}" for key, value in parameters.items()) + "}"
+    if isinstance(parameters, (list, tuple)):
+        return "(" + ", ".join(type(value).__name__ for value in parameters) + ")"
+    return type(parameters).__name__
+
+
+def statement_operation(statement: str) -> str:
+    """
+    Get low-cardinality operation label for SQL statement.
+
+    Returns:
+        select/insert/update/delete/pragma or "other"
+    """
+    head = statement.lstrip().split(None, 1)[0].lower() if statement.strip() else ""
+    return head if head in _KNOWN_OPERATIONS else "other"
+
+
+def _before_cursor_execute(
+    conn: Connection,
+    cursor: Any,
+    statement: str,
+    parameters: Any,
+    context: Any,
+    executemany: bool,
+) -> None:
+    """Remember statement start time on the connection."""
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(
+    conn: Connection,
+    cursor: Any,
+    statement: str,
+    parameters: Any,
+    context: Any,
+    executemany: bool,
+) -> None:
+    """Record statement count and duration."""
+    starts = conn.info.get("query_start_time")
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    operation = statement_operation(statement)
+    DB_STATEMENTS.inc(operation=operation)
+    DB_STATEMENT_DURATION.observe(elapsed, operation=operation)
+
+    stats = _query_stats.get()
+    if stats is not None:
+        stats.count += 1
+        stats.total_time += elapsed
+
+    if elapsed * 1000 >= settings.slow_query_ms:
+        if stats is not None:
+            stats.slow_count += 1
+        logger.warning(
+            "Slow query (%.1f ms): %s params=%s",
+            elapsed * 1000,
+            _WHITESPACE.sub(" ", statement).strip()[:_MAX_LOGGED_STATEMENT],
+            parameters_shape(parameters, executemany),
+        )
+
+
+def _handle_error(exception_context: Any) -> None:
+    """Drop start time of a failed statement so timings stay paired."""
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_start_time"):
+        conn.info["query_start_time"].pop()
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """
+    Attach metrics and slow-query listeners to engine (idempotent).
+
+    Args:
+        engine: Async engine (listeners go on its sync_engine)
+    """
+    sync_engine = engine.sync_engine
+    if event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(sync_engine, "handle_error", _handle_error)
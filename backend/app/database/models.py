@@ -8,14 +8,17 @@ Models:
     - Ticket: Support ticket
     - Message: Messages within ticket
     - Feedback: CSAT feedback after ticket close
+    - TicketEvent: Append-only log of ticket status transitions
+    - CsatRollup: CSAT totals per day x operator x category x client
 """
 
-from datetime import datetime
+from datetime import date, datetime
 from typing import Optional
 
 from sqlalchemy import (
     BigInteger,
     Boolean,
+    Date,
     DateTime,
     ForeignKey,
     Index,
@@ -43,6 +46,8 @@ class Client(Base):
     # Topic for this client in support group (one topic per client)
     topic_id: Mapped[Optional[int]] = mapped_column(BigInteger, nullable=True)
     support_chat_id: Mapped[Optional[int]] = mapped_column(BigInteger, nullable=True)
+    # SLA business hours are counted in this timezone (None = settings.timezone)
+    timezone: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
     created_at: Mapped[datetime] = mapped_column(
         DateTime, 
         default=func.now(),
@@ -198,6 +203,15 @@ class Ticket(Base):
         nullable=True
     )
     closed_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    # Resolution deadline in business hours of the client's timezone (None = no SLA)
+    sla_due_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    # Conversation counters, maintained by ops.create_message (see app/database/counters.py)
+    message_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    last_message_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    last_client_message_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    last_operator_message_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    # First client message after the last operator reply (None = nobody is waiting)
+    awaiting_reply_since: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
     
     # Relationships
     project: Mapped["Project"] = relationship("Project", back_populates="tickets")
@@ -219,6 +233,14 @@ class Ticket(Base):
         Index("idx_tickets_status", "status"),
         Index("idx_tickets_project_id", "project_id"),
         Index("idx_tickets_topic_id", "topic_id"),
+        # "Breaching soon": status IN (...) AND sla_due_at <= ? is a range scan per status
+        Index("idx_tickets_status_sla_due_at", "status", "sla_due_at"),
+        # "Awaiting operator reply longer than X": range scan per status, like the SLA index
+        Index("idx_tickets_status_awaiting_reply_since", "status", "awaiting_reply_since"),
+        # Keyset pages of ticket lists (app/database/pagination.py): seek to (key, id) and read n rows
+        Index("idx_tickets_tg_user_id_created_at", "tg_user_id", "created_at"),
+        Index("idx_tickets_assigned_status_updated_at", "assigned_to_tg_user_id", "status", "updated_at"),
+        Index("idx_tickets_status_created_at", "status", "created_at"),
     )
     
     def __repr__(self) -> str:
@@ -266,6 +288,41 @@ class Message(Base):
         return f"<Message(id={self.id}, ticket_id={self.ticket_id}, direction='{self.direction}')>"
 
 
+class TicketEvent(Base):
+    """
+    One ticket status transition (append-only).
+    
+    Written in the same transaction as the status change
+    (ops.create_ticket / ops.update_ticket_status); rows are never updated.
+    """
+    
+    __tablename__ = "ticket_events"
+    
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    ticket_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("tickets.id", ondelete="CASCADE"),
+        nullable=False
+    )
+    ts: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    event: Mapped[str] = mapped_column(
+        String(20),
+        nullable=False
+    )  # created, taken, paused, resumed, closed, cancelled, client_cancelled, reopened
+    from_status: Mapped[Optional[str]] = mapped_column(String(20), nullable=True)  # None for "created"
+    to_status: Mapped[str] = mapped_column(String(20), nullable=False)
+    actor_tg_user_id: Mapped[Optional[int]] = mapped_column(BigInteger, nullable=True)  # Operator or client
+    reason: Mapped[Optional[str]] = mapped_column(Text, nullable=True)  # Pause/cancel reason
+    
+    # Indexes
+    __table_args__ = (
+        Index("idx_ticket_events_ticket_id_ts", "ticket_id", "ts"),
+    )
+    
+    def __repr__(self) -> str:
+        return f"<TicketEvent(id={self.id}, ticket_id={self.ticket_id}, event='{self.event}')>"
+
+
 class Feedback(Base):
     """CSAT feedback after ticket close."""
     
@@ -305,6 +362,41 @@ class Feedback(Base):
         return f"<Feedback(id={self.id}, ticket_id={self.ticket_id}, csat='{self.csat}')>"
 
 
+class CsatRollup(Base):
+    """
+    CSAT totals per day x operator x category x client.
+    
+    Maintained incrementally in the same transaction as feedback writes
+    (app.database.rollups), so reports read these rows instead of scanning
+    feedback joined with tickets. Averages are sum / count per rating.
+    """
+    
+    __tablename__ = "csat_rollups"
+    
+    day: Mapped[date] = mapped_column(Date, primary_key=True)  # Support team local date
+    operator_tg_user_id: Mapped[int] = mapped_column(BigInteger, primary_key=True)  # 0 = unassigned
+    category: Mapped[str] = mapped_column(String(50), primary_key=True)
+    client_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("clients.id", ondelete="CASCADE"),
+        primary_key=True
+    )
+    positive: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    negative: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    speed_sum: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    speed_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    quality_sum: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    quality_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    politeness_sum: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    politeness_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    
+    def __repr__(self) -> str:
+        return (
+            f"<CsatRollup(day={self.day}, operator={self.operator_tg_user_id}, "
+            f"category='{self.category}', client_id={self.client_id})>"
+        )
+
+
 class PredefinedUser(Base):
     """
     Predefined mapping of Telegram usernames to clients.
@@ -8,10 +8,11 @@ import logging
 from datetime import datetime, timedelta
 from typing import List, Optional
 
-from sqlalchemy import func, select, update
+from sqlalchemy import Row, func, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
+from app.database.counters import count_message
 from app.database.models import (
     Client,
     Feedback,
@@ -19,8 +20,12 @@ from app.database.models import (
     PredefinedUser,
     Project,
     Ticket,
+    TicketEvent,
     UserBinding,
 )
+from app.database.pagination import Page, fetch_page
+from app.database.read_models import PROJECT_CHOICE_COLUMNS, TICKET_LIST_COLUMNS, ProjectChoice, TicketListItem
+from app.database.rollups import add_to_rollups, counts_of
 
 
 # =============================================================================
@@ -312,6 +317,32 @@ async def get_user_bindings(
     return list(result.scalars().all())
 
 
+async def get_user_projects(
+    session: AsyncSession,
+    tg_user_id: int
+) -> List[ProjectChoice]:
+    """
+    Get projects the user is bound to, active (most recently used) first.
+    
+    Read-only variant of get_user_bindings for /project: one join over
+    three columns, no ORM objects and no second query for projects.
+    
+    Args:
+        session: Database session
+        tg_user_id: Telegram user ID
+        
+    Returns:
+        List of ProjectChoice rows
+    """
+    result = await session.execute(
+        select(*PROJECT_CHOICE_COLUMNS)
+        .join(Project, Project.id == UserBinding.project_id)
+        .where(UserBinding.tg_user_id == tg_user_id)
+        .order_by(UserBinding.updated_at.desc())
+    )
+    return [ProjectChoice(*row) for row in result]
+
+
 async def create_or_update_user_binding(
     session: AsyncSession,
     tg_user_id: int,
@@ -449,26 +480,30 @@ async def get_active_ticket(
 async def get_user_tickets(
     session: AsyncSession,
     tg_user_id: int,
-    limit: int = 10
-) -> List[Ticket]:
+    limit: int = 10,
+    cursor: Optional[str] = None
+) -> Page[TicketListItem]:
     """
-    Get all user's tickets ordered by creation date (newest first).
+    Get a page of user's tickets ordered by creation date (newest first).
+    
+    Keyset pagination on idx_tickets_tg_user_id_created_at: any page costs
+    the same as the first. Only the list columns are selected; items are
+    read-only rows, not session-tracked Tickets.
     
     Args:
         session: Database session
         tg_user_id: Telegram user ID
         limit: Maximum number of tickets to return
+        cursor: Page cursor from a previous call (first page if None)
         
     Returns:
-        List of Ticket objects
+        Page of TicketListItem rows
     """
-    result = await session.execute(
-        select(Ticket)
-        .where(Ticket.tg_user_id == tg_user_id)
-        .order_by(Ticket.created_at.desc())
-        .limit(limit)
+    return await fetch_page(
+        session,
+        select(*TICKET_LIST_COLUMNS).where(Ticket.tg_user_id == tg_user_id),
+        Ticket.created_at, Ticket.id, descending=True, cursor=cursor, limit=limit, row_type=TicketListItem
     )
-    return list(result.scalars().all())
 
 
 async def get_recent_closed_ticket(
@@ -514,20 +549,28 @@ async def get_ticket_with_project(
 async def get_operator_tickets(
     session: AsyncSession,
     operator_tg_user_id: int,
-    status_filter: Optional[str] = None
-) -> List[Ticket]:
+    status_filter: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = 20
+) -> Page[TicketListItem]:
     """
-    Get tickets assigned to operator.
+    Get a page of tickets assigned to operator, recently updated first.
+    
+    Keyset pagination on idx_tickets_assigned_status_updated_at. With
+    'active' SQLite sorts only the operator's open tickets after the cursor,
+    never their closed history.
     
     Args:
         session: Database session
         operator_tg_user_id: Operator's Telegram user ID
         status_filter: Optional status filter ('active', 'all', or specific status)
+        cursor: Page cursor from a previous call (first page if None)
+        limit: Maximum number of tickets to return
     
     Returns:
-        List of Ticket objects
+        Page of TicketListItem rows
     """
-    query = select(Ticket).where(Ticket.assigned_to_tg_user_id == operator_tg_user_id)
+    query = select(*TICKET_LIST_COLUMNS).where(Ticket.assigned_to_tg_user_id == operator_tg_user_id)
     
     if status_filter == "active":
         active_statuses = ("in_progress", "on_hold")
@@ -535,32 +578,119 @@ async def get_operator_tickets(
     elif status_filter and status_filter != "all":
         query = query.where(Ticket.status == status_filter)
     
-    query = query.order_by(Ticket.updated_at.desc()).limit(20)
+    return await fetch_page(
+        session, query, Ticket.updated_at, Ticket.id, descending=True, cursor=cursor, limit=limit,
+        row_type=TicketListItem
+    )
+
+
+async def get_unassigned_tickets(
+    session: AsyncSession,
+    limit: int = 20,
+    cursor: Optional[str] = None
+) -> Page[TicketListItem]:
+    """
+    Get a page of unassigned tickets (new tickets without operator), oldest first.
+    
+    Keyset pagination on idx_tickets_status_created_at.
     
-    result = await session.execute(query)
+    Args:
+        session: Database session
+        limit: Maximum number of tickets to return
+        cursor: Page cursor from a previous call (first page if None)
+    
+    Returns:
+        Page of TicketListItem rows
+    """
+    return await fetch_page(
+        session,
+        select(*TICKET_LIST_COLUMNS).where(Ticket.assigned_to_tg_user_id.is_(None)).where(Ticket.status == "new"),
+        Ticket.created_at, Ticket.id, descending=False, cursor=cursor, limit=limit, row_type=TicketListItem
+    )
+
+
+async def get_open_tickets_since(
+    session: AsyncSession,
+    since: datetime
+) -> List[Ticket]:
+    """
+    Get open tickets created after a moment, oldest first, with project loaded.
+    
+    Args:
+        session: Database session
+        since: Lower bound for created_at (UTC)
+    
+    Returns:
+        List of Ticket objects
+    """
+    result = await session.execute(
+        select(Ticket)
+        .options(selectinload(Ticket.project))
+        .where(Ticket.created_at >= since)
+        .where(Ticket.status.in_(("new", "in_progress", "on_hold")))
+        .order_by(Ticket.created_at.asc())
+    )
     return list(result.scalars().all())
 
 
-async def get_unassigned_tickets(
+async def get_tickets_breaching_before(
     session: AsyncSession,
+    until: datetime,
     limit: int = 20
 ) -> List[Ticket]:
     """
-    Get unassigned tickets (new tickets without operator).
+    Get new/in-progress tickets whose SLA deadline is before a moment, most overdue first.
+    
+    Range scan on idx_tickets_status_sla_due_at.
+    
+    Args:
+        session: Database session
+        until: Upper bound for sla_due_at (UTC)
+        limit: Maximum tickets
     
     Returns:
         List of Ticket objects
     """
     result = await session.execute(
         select(Ticket)
-        .where(Ticket.assigned_to_tg_user_id.is_(None))
-        .where(Ticket.status == "new")
-        .order_by(Ticket.created_at.asc())
+        .where(Ticket.status.in_(("new", "in_progress")))
+        .where(Ticket.sla_due_at <= until)
+        .order_by(Ticket.sla_due_at.asc())
         .limit(limit)
     )
     return list(result.scalars().all())
 
 
+async def get_tickets_awaiting_reply(
+    session: AsyncSession,
+    since: datetime,
+    limit: Optional[int] = 20
+) -> List[Ticket]:
+    """
+    Get new/in-progress tickets whose client has been waiting for a reply since before a moment.
+    
+    Longest waiting first. Range scan on idx_tickets_status_awaiting_reply_since.
+    
+    Args:
+        session: Database session
+        since: Upper bound for awaiting_reply_since (UTC)
+        limit: Maximum tickets (None = all)
+    
+    Returns:
+        List of Ticket objects
+    """
+    query = (
+        select(Ticket)
+        .where(Ticket.status.in_(("new", "in_progress")))
+        .where(Ticket.awaiting_reply_since <= since)
+        .order_by(Ticket.awaiting_reply_since.asc())
+    )
+    if limit is not None:
+        query = query.limit(limit)
+    result = await session.execute(query)
+    return list(result.scalars().all())
+
+
 async def create_ticket(
     session: AsyncSession,
     project_id: int,
@@ -569,7 +699,8 @@ async def create_ticket(
     support_chat_id: int,
     description: Optional[str] = None,
     priority: str = "normal",
-    topic_id: Optional[int] = None
+    topic_id: Optional[int] = None,
+    sla_due_at: Optional[datetime] = None
 ) -> Ticket:
     """
     Create a new support ticket.
@@ -583,6 +714,7 @@ async def create_ticket(
         description: Ticket description text
         priority: normal or urgent
         topic_id: Topic ID in support group (if already created)
+        sla_due_at: Resolution deadline (UTC), see app.services.sla.resolution_deadline
         
     Returns:
         Created Ticket
@@ -598,9 +730,18 @@ async def create_ticket(
         priority=priority,
         status="new",
         support_chat_id=support_chat_id,
-        topic_id=topic_id
+        topic_id=topic_id,
+        sla_due_at=sla_due_at
     )
     session.add(ticket)
+    await session.flush()
+    session.add(TicketEvent(
+        ticket_id=ticket.id,
+        ts=datetime.utcnow(),
+        event="created",
+        to_status="new",
+        actor_tg_user_id=tg_user_id
+    ))
     await session.commit()
     await session.refresh(ticket)
     return ticket
@@ -620,49 +761,244 @@ async def update_ticket_topic(
     await session.commit()
 
 
+async def update_ticket_sla_due_at(
+    session: AsyncSession,
+    ticket_id: int,
+    sla_due_at: Optional[datetime]
+) -> None:
+    """Set ticket's resolution deadline (a new SLA period after reopen)."""
+    await session.execute(
+        update(Ticket)
+        .where(Ticket.id == ticket_id)
+        .values(sla_due_at=sla_due_at)
+    )
+    await session.commit()
+
+
+# Terminal statuses; a transition out of them is a reopen
+CLOSED_STATUSES = ("completed", "cancelled", "closed")
+# Statuses that set closed_at (a resolution); cancellations are not resolved
+RESOLVED_STATUSES = ("completed", "closed")
+
+
+def transition_event(from_status: Optional[str], to_status: str) -> str:
+    """Default ticket_events.event name for a status transition."""
+    if from_status in CLOSED_STATUSES and to_status not in CLOSED_STATUSES:
+        return "reopened"
+    if to_status == "in_progress":
+        return "resumed" if from_status == "on_hold" else "taken"
+    return {
+        "on_hold": "paused",
+        "completed": "closed",
+        "closed": "closed",
+        "cancelled": "cancelled",
+    }.get(to_status, to_status)
+
+
 async def update_ticket_status(
     session: AsyncSession,
     ticket_id: int,
     status: str,
-    assigned_to: Optional[int] = None
+    assigned_to: Optional[int] = None,
+    actor: Optional[int] = None,
+    reason: Optional[str] = None,
+    event: Optional[str] = None
 ) -> Optional[Ticket]:
     """
-    Update ticket status.
+    Update ticket status and append the transition to ticket_events (same transaction).
     
     Handles:
         - Setting assigned_to when status = in_progress
         - Setting first_response_at on first in_progress
-        - Setting closed_at when status = closed
+        - Setting closed_at when status = completed (or legacy closed)
+        - Clearing closed_at on reopen
+    
+    Args:
+        session: Database session
+        ticket_id: Ticket ID
+        status: New status
+        assigned_to: Operator to assign (in_progress only)
+        actor: Telegram user ID of who made the change (operator or client)
+        reason: Pause/cancel reason
+        event: Event name (derived from the transition if None, see transition_event)
     """
     ticket = await get_ticket_by_id(session, ticket_id)
     if not ticket:
         return None
     
+    now = datetime.utcnow()
+    from_status = ticket.status
     ticket.status = status
-    ticket.updated_at = datetime.utcnow()
+    ticket.updated_at = now
     
     if status == "in_progress":
         if assigned_to:
             ticket.assigned_to_tg_user_id = assigned_to
         if ticket.first_response_at is None:
-            ticket.first_response_at = datetime.utcnow()
-    elif status == "closed":
-        ticket.closed_at = datetime.utcnow()
-    elif status == "new":
+            ticket.first_response_at = now
+    if status in RESOLVED_STATUSES:
+        ticket.closed_at = now
+    elif from_status in CLOSED_STATUSES:
         # Reopening: clear closed_at
         ticket.closed_at = None
     
+    session.add(TicketEvent(
+        ticket_id=ticket.id,
+        ts=now,
+        event=event or transition_event(from_status, status),
+        from_status=from_status,
+        to_status=status,
+        actor_tg_user_id=actor,
+        reason=reason
+    ))
     await session.commit()
     await session.refresh(ticket)
     return ticket
 
 
+async def assign_ticket(
+    session: AsyncSession,
+    ticket_id: int,
+    operator_id: int,
+    seen_status: str,
+    seen_operator: Optional[int],
+    actor: Optional[int] = None,
+    event: Optional[str] = None
+) -> Optional[Ticket]:
+    """
+    Move a ticket to in_progress for an operator if nobody changed it meanwhile.
+    
+    Compare-and-set: the UPDATE only matches while status and assignee are
+    still what the caller saw, so a manual take and the auto-assigner can
+    never both win. The transition is logged like update_ticket_status().
+    
+    Args:
+        session: Database session
+        ticket_id: Ticket ID
+        operator_id: Operator to assign
+        seen_status: Status the decision was based on
+        seen_operator: Assignee the decision was based on (None = unassigned)
+        actor: Telegram user ID of who assigned (None = automatic)
+        event: Event name (derived from the transition if None)
+    
+    Returns:
+        Updated Ticket, or None if it changed (or does not exist)
+    """
+    now = datetime.utcnow()
+    values = {
+        "status": "in_progress",
+        "assigned_to_tg_user_id": operator_id,
+        "first_response_at": func.coalesce(Ticket.first_response_at, now),
+        "updated_at": now,
+    }
+    if seen_status in CLOSED_STATUSES:
+        values["closed_at"] = None
+    same_operator = (
+        Ticket.assigned_to_tg_user_id.is_(None) if seen_operator is None
+        else Ticket.assigned_to_tg_user_id == seen_operator
+    )
+    result = await session.execute(
+        update(Ticket)
+        .where(Ticket.id == ticket_id, Ticket.status == seen_status, same_operator)
+        .values(**values)
+        .returning(Ticket)
+        .execution_options(populate_existing=True)
+    )
+    ticket = result.scalar_one_or_none()
+    if ticket is None:
+        # End the write transaction; commit (unlike rollback) keeps loaded objects usable
+        await session.commit()
+        return None
+    session.add(TicketEvent(
+        ticket_id=ticket_id,
+        ts=now,
+        event=event or transition_event(seen_status, "in_progress"),
+        from_status=seen_status,
+        to_status="in_progress",
+        actor_tg_user_id=actor,
+    ))
+    await session.commit()
+    return ticket
+
+
+async def backfill_closed_at(session: AsyncSession, batch_size: int = 10_000) -> int:
+    """
+    Fill closed_at of resolved tickets closed without it, committing per window of ticket ids.
+    
+    Before closed_at was written for "completed", it was only set for the
+    legacy "closed" status. The value is the ticket's last completion event
+    in ticket_events, or updated_at for tickets closed before events existed.
+    
+    Args:
+        session: Database session
+        batch_size: Ticket ids per transaction
+    
+    Returns:
+        Number of tickets updated
+    """
+    closed_event_ts = (
+        select(func.max(TicketEvent.ts))
+        .where(TicketEvent.ticket_id == Ticket.id, TicketEvent.to_status.in_(RESOLVED_STATUSES))
+        .scalar_subquery()
+    )
+    max_id = (await session.execute(select(func.max(Ticket.id)))).scalar() or 0
+    updated = 0
+    for after_id in range(0, max_id, batch_size):
+        result = await session.execute(
+            update(Ticket)
+            .where(Ticket.id > after_id, Ticket.id <= after_id + batch_size)
+            .where(Ticket.status.in_(RESOLVED_STATUSES), Ticket.closed_at.is_(None))
+            .values(closed_at=func.coalesce(closed_event_ts, Ticket.updated_at))
+            .execution_options(synchronize_session=False)
+        )
+        updated += result.rowcount
+        await session.commit()
+    logging.getLogger(__name__).info("closed_at backfilled for %s tickets, ids up to %s", updated, max_id)
+    return updated
+
+
 async def reopen_ticket(
     session: AsyncSession,
-    ticket_id: int
+    ticket_id: int,
+    actor: Optional[int] = None
 ) -> Optional[Ticket]:
     """Reopen a closed ticket."""
-    return await update_ticket_status(session, ticket_id, "in_progress")
+    return await update_ticket_status(session, ticket_id, "in_progress", actor=actor)
+
+
+async def get_ticket_events(
+    session: AsyncSession,
+    ticket_id: int
+) -> List[TicketEvent]:
+    """Status history of a ticket, oldest first (idx_ticket_events_ticket_id_ts)."""
+    result = await session.execute(
+        select(TicketEvent)
+        .where(TicketEvent.ticket_id == ticket_id)
+        .order_by(TicketEvent.ts, TicketEvent.id)
+    )
+    return list(result.scalars().all())
+
+
+async def get_ticket_events_after(
+    session: AsyncSession,
+    after_id: int,
+    limit: int = 1000
+) -> List[TicketEvent]:
+    """
+    Events with id > after_id in id order (incremental consumers keep the last id seen).
+    
+    Args:
+        session: Database session
+        after_id: Last event id already processed (0 for all)
+        limit: Maximum events
+    """
+    result = await session.execute(
+        select(TicketEvent)
+        .where(TicketEvent.id > after_id)
+        .order_by(TicketEvent.id)
+        .limit(limit)
+    )
+    return list(result.scalars().all())
 
 
 # =============================================================================
@@ -680,7 +1016,7 @@ async def create_message(
     file_id: Optional[str] = None
 ) -> Message:
     """
-    Save a message to ticket history.
+    Save a message to ticket history and update the ticket's conversation counters.
     
     Args:
         session: Database session
@@ -702,9 +1038,12 @@ async def create_message(
         type=msg_type,
         content=content,
         file_id=file_id,
-        author_tg_user_id=author_tg_user_id
+        author_tg_user_id=author_tg_user_id,
+        created_at=datetime.utcnow()
     )
     session.add(message)
+    # Ticket counters are updated in the same transaction
+    await count_message(session, ticket_id, direction, message.created_at)
     await session.commit()
     await session.refresh(message)
     return message
@@ -725,6 +1064,40 @@ async def get_ticket_messages(
     return list(result.scalars().all())
 
 
+async def get_ticket_messages_after(
+    session: AsyncSession,
+    ticket_id: int,
+    after_id: int,
+    limit: int = 500
+) -> List[Row]:
+    """
+    Chunk of a ticket's messages with id > after_id in id (= arrival) order.
+    
+    Returns plain rows, not Message objects: a reader walking a long ticket
+    chunk by chunk does not fill the session's identity map. Seeks
+    idx_messages_ticket_id (ticket_id, then rowid), so every chunk costs the same.
+    
+    Args:
+        session: Database session
+        ticket_id: Ticket ID
+        after_id: Last message id already read (0 for the start)
+        limit: Maximum messages
+    
+    Returns:
+        Rows with id, direction, type, content, file_id, author_tg_user_id, created_at
+    """
+    result = await session.execute(
+        select(
+            Message.id, Message.direction, Message.type, Message.content,
+            Message.file_id, Message.author_tg_user_id, Message.created_at,
+        )
+        .where(Message.ticket_id == ticket_id, Message.id > after_id)
+        .order_by(Message.id)
+        .limit(limit)
+    )
+    return list(result.all())
+
+
 # =============================================================================
 # FEEDBACK OPERATIONS
 # =============================================================================
@@ -761,9 +1134,48 @@ async def create_feedback(
     feedback = Feedback(
         ticket_id=ticket_id,
         csat=csat,
-        comment=comment
+        comment=comment,
+        created_at=datetime.utcnow()  # Explicit: the rollup day is derived from it before commit
     )
     session.add(feedback)
+    await add_to_rollups(session, feedback, counts_of(feedback))
+    await session.commit()
+    await session.refresh(feedback)
+    return feedback
+
+
+async def update_feedback_ratings(
+    session: AsyncSession,
+    ticket_id: int,
+    speed: Optional[int],
+    quality: Optional[int],
+    politeness: Optional[int]
+) -> Optional[Feedback]:
+    """
+    Save detailed ratings (1-5) and update CSAT rollups in the same transaction.
+    
+    Args:
+        session: Database session
+        ticket_id: Ticket ID
+        speed: Speed rating
+        quality: Quality rating
+        politeness: Politeness rating
+        
+    Returns:
+        Updated Feedback or None if the ticket has no feedback
+    """
+    feedback = await get_feedback_by_ticket(session, ticket_id)
+    if feedback is None:
+        return None
+    
+    before = counts_of(feedback)
+    feedback.speed_rating = speed
+    feedback.quality_rating = quality
+    feedback.politeness_rating = politeness
+    after = counts_of(feedback)
+    await add_to_rollups(
+        session, feedback, {name: after.get(name, 0) - before.get(name, 0) for name in after.keys() | before.keys()}
+    )
     await session.commit()
     await session.refresh(feedback)
     return feedback
@@ -0,0 +1,143 @@
+"""
+Keyset (seek) pagination for ticket lists.
+
+With OFFSET, SQLite steps over every skipped row, so page N of a long history
+costs N times page 1. A keyset page starts from the edge of the page shown:
+WHERE (sort_key, id) < (:key, :id) ORDER BY sort_key DESC, id DESC LIMIT n + 1
+is one index seek plus n + 1 rows on any page. The extra row tells whether
+there is a further page.
+
+Cursors are opaque short strings (direction + base36 sort key and id) that
+fit into Telegram callback data (64 bytes) together with a prefix.
+"""
+
+import string
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Callable, Generic, List, Optional, Tuple, TypeVar
+
+from sqlalchemy import String, literal, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
+from sqlalchemy.sql import Select
+
+T = TypeVar("T")
+
+# Cursor directions: page after (further in list order) or before the cursor row
+NEXT = "n"
+PREV = "p"
+
+_DIGITS = string.digits + string.ascii_lowercase
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+@dataclass
+class Page(Generic[T]):
+    """One page of a list with cursors of its neighbours (None = no such page)."""
+
+    items: List[T] = field(default_factory=list)
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+
+
+def _base36(value: int) -> str:
+    digits = []
+    while True:
+        value, digit = divmod(value, 36)
+        digits.append(_DIGITS[digit])
+        if not value:
+            return "".join(reversed(digits))
+
+
+def encode_cursor(direction: str, key: datetime, row_id: int) -> str:
+    """Cursor of a row: direction, microseconds since epoch and id in base36."""
+    return f"{direction}{_base36((key - _EPOCH) // _MICROSECOND)}.{_base36(row_id)}"
+
+
+def decode_cursor(cursor: str) -> Optional[Tuple[str, datetime, int]]:
+    """(direction, sort key, id) of a cursor, or None if it is malformed."""
+    direction = cursor[:1]
+    key, _, row_id = cursor[1:].partition(".")
+    if direction not in (NEXT, PREV):
+        return None
+    try:
+        return direction, _EPOCH + int(key, 36) * _MICROSECOND, int(row_id, 36)
+    except (ValueError, OverflowError):
+        return None
+
+
+def _stored_key(key: datetime) -> Any:
+    """
+    Bind the sort key the way SQLite stores it.
+
+    SQLite compares datetimes as text. Rows written with func.now() (column
+    defaults) have no fractional part, Python datetimes are stored with six
+    digits, and "12:00:00" < "12:00:00.000000". A whole-second key is bound
+    in the func.now() format so the cursor row compares equal to itself.
+    """
+    if key.microsecond:
+        return key
+    return literal(key.strftime("%Y-%m-%d %H:%M:%S"), String)
+
+
+async def fetch_page(
+    session: AsyncSession,
+    query: Select,
+    sort_key: InstrumentedAttribute,
+    row_id: InstrumentedAttribute,
+    descending: bool,
+    cursor: Optional[str],
+    limit: int,
+    row_type: Optional[Callable[..., Any]] = None
+) -> Page:
+    """
+    Run a select of one entity (or of columns) as a keyset page.
+
+    An index on the query's equality filters followed by sort_key makes every
+    page an index seek (SQLite indexes end with the rowid, i.e. row_id).
+
+    Args:
+        session: Database session
+        query: select(Entity) or select(*columns) with filters, without ORDER BY or LIMIT
+        sort_key: Non-null datetime column the list is ordered by
+        row_id: Primary key column (tie-breaker)
+        descending: List order (newest first if True)
+        cursor: Cursor from a previous Page (first page if None or malformed)
+        limit: Items per page
+        row_type: Item factory for a column select, called as row_type(*row);
+            items must have attributes named like sort_key and row_id
+
+    Returns:
+        Page of entities (or row_type items) in list order
+    """
+    decoded = decode_cursor(cursor) if cursor else None
+    backwards = decoded is not None and decoded[0] == PREV
+    # The previous page is read in reverse order from the cursor, then flipped
+    scan_descending = descending != backwards
+    seek = query
+    if decoded is not None:
+        row = tuple_(sort_key, row_id)
+        bound = tuple_(_stored_key(decoded[1]), decoded[2])
+        seek = query.where(row < bound if scan_descending else row > bound)
+    order = (sort_key.desc(), row_id.desc()) if scan_descending else (sort_key.asc(), row_id.asc())
+    result = await session.execute(seek.order_by(*order).limit(limit + 1))
+    rows = [row_type(*row) for row in result] if row_type else list(result.scalars().all())
+    more = len(rows) > limit
+    rows = rows[:limit]
+    if decoded is not None and (not rows or (backwards and len(rows) < limit)):
+        # Rows around the cursor were deleted, or fewer than a page precede it
+        return await fetch_page(session, query, sort_key, row_id, descending, None, limit, row_type)
+    if backwards:
+        rows.reverse()
+
+    def edge(direction: str, item: Any) -> str:
+        return encode_cursor(direction, getattr(item, sort_key.key), getattr(item, row_id.key))
+
+    has_next = True if backwards else more
+    has_prev = more if backwards else decoded is not None
+    return Page(
+        items=rows,
+        next_cursor=edge(NEXT, rows[-1]) if rows and has_next else None,
+        prev_cursor=edge(PREV, rows[0]) if rows and has_prev else None,
+    )
@@ -0,0 +1,55 @@
+"""
+Read-only row DTOs for list screens.
+
+Handlers that only format a few fields do not need ORM entities: every
+Ticket loaded through the ORM gets an InstanceState, an identity-map entry
+and attribute history, all of which live as long as the session. The list
+operations in operations.py select just these columns through Core and
+build slotted, frozen dataclasses instead (one small object per row,
+nothing tracked by the session).
+
+Field names match the ORM attributes, so a DTO can stand in for the entity
+wherever only these fields are read.
+"""
+
+from dataclasses import dataclass, fields
+from datetime import datetime
+from typing import Optional, Tuple
+
+from sqlalchemy.orm import InstrumentedAttribute
+
+from app.database.models import Project, Ticket, UserBinding
+
+
+@dataclass(frozen=True, slots=True)
+class TicketListItem:
+    """Ticket fields shown in client and operator ticket lists."""
+
+    id: int
+    number: int
+    status: str
+    category: str
+    description: Optional[str]
+    support_chat_id: int
+    topic_id: Optional[int]
+    created_at: datetime
+    updated_at: datetime
+    closed_at: Optional[datetime]
+
+
+@dataclass(frozen=True, slots=True)
+class ProjectChoice:
+    """A project the user is bound to (/project)."""
+
+    binding_id: int
+    project_id: int
+    project_name: str
+
+
+def _columns(dto: type, source: type) -> Tuple[InstrumentedAttribute, ...]:
+    """ORM columns named like the DTO fields, in field order."""
+    return tuple(getattr(source, field.name) for field in fields(dto))
+
+
+TICKET_LIST_COLUMNS = _columns(TicketListItem, Ticket)
+PROJECT_CHOICE_COLUMNS = (UserBinding.id, Project.id, Project.name)
@@ -0,0 +1,215 @@
+"""
+CSAT rollups: feedback totals per day x operator x category x client.
+
+Every feedback write adds its contribution to one csat_rollups row in the
+same transaction (SQLite upsert: INSERT ... ON CONFLICT DO UPDATE with
+col = col + delta), so reports aggregate a few rows per day instead of
+scanning feedback joined with tickets. A rating change adds the difference
+between the new and the old contribution.
+
+The row is keyed by the ticket's operator, category and client as of the
+write and by the feedback's local date in the support team's timezone.
+rebuild_csat_rollups() recomputes everything from feedback (after manual
+data fixes or deleted tickets): scripts/rebuild_csat_rollups.py.
+"""
+
+import logging
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Dict, List, Optional, Tuple
+
+import pytz
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config.settings import settings
+from app.database.models import CsatRollup, Feedback, Project, Ticket
+
+logger = logging.getLogger(__name__)
+
+RATINGS = ("speed", "quality", "politeness")
+
+COUNTER_COLUMNS = ("positive", "negative") + tuple(
+    f"{rating}_{part}" for rating in RATINGS for part in ("sum", "count")
+)
+
+# /csat and get_csat_summary() groupings
+GROUP_COLUMNS = {
+    "day": CsatRollup.day,
+    "operator": CsatRollup.operator_tg_user_id,
+    "category": CsatRollup.category,
+    "client": CsatRollup.client_id,
+}
+
+# (day, operator, category, client id)
+_RollupKey = Tuple[date, int, str, int]
+
+
+@dataclass
+class CsatSummary:
+    """CSAT totals of one group (or of the whole period when key is None)."""
+
+    key: object
+    positive: int = 0
+    negative: int = 0
+    speed_sum: int = 0
+    speed_count: int = 0
+    quality_sum: int = 0
+    quality_count: int = 0
+    politeness_sum: int = 0
+    politeness_count: int = 0
+
+    @property
+    def total(self) -> int:
+        return self.positive + self.negative
+
+    @property
+    def positive_share(self) -> Optional[float]:
+        """Share of positive answers (0..1) or None without feedback."""
+        return self.positive / self.total if self.total else None
+
+    def average(self, rating: str) -> Optional[float]:
+        """Average detailed rating (1-5) or None if nobody rated it."""
+        count = getattr(self, f"{rating}_count")
+        return getattr(self, f"{rating}_sum") / count if count else None
+
+
+def rollup_day(moment: datetime, tz: Optional[pytz.BaseTzInfo] = None) -> date:
+    """Local date (support team timezone) of a naive UTC moment."""
+    if tz is None:
+        # Local import: app.services imports the database layer
+        from app.services.business_calendar import get_tz
+        tz = get_tz(settings.timezone)
+    return pytz.utc.localize(moment).astimezone(tz).date()
+
+
+def feedback_counts(
+    csat: str,
+    speed: Optional[int] = None,
+    quality: Optional[int] = None,
+    politeness: Optional[int] = None,
+) -> Dict[str, int]:
+    """Contribution of one feedback to the rollup counters."""
+    counts = {"positive": int(csat == "positive"), "negative": int(csat == "negative")}
+    for rating, value in zip(RATINGS, (speed, quality, politeness)):
+        if value is not None:
+            counts[f"{rating}_sum"] = value
+            counts[f"{rating}_count"] = 1
+    return counts
+
+
+def counts_of(feedback: Feedback) -> Dict[str, int]:
+    """feedback_counts() of a Feedback row."""
+    return feedback_counts(
+        feedback.csat, feedback.speed_rating, feedback.quality_rating, feedback.politeness_rating
+    )
+
+
+async def add_to_rollups(session: AsyncSession, feedback: Feedback, delta: Dict[str, int]) -> None:
+    """
+    Add counter deltas to the feedback's rollup row (created if missing). Does not commit.
+
+    Args:
+        session: Session of the transaction that writes the feedback
+        feedback: Feedback with ticket_id and created_at set
+        delta: Counter name -> increment (may be negative)
+    """
+    delta = {name: value for name, value in delta.items() if value}
+    if not delta:
+        return
+    result = await session.execute(
+        select(Ticket.assigned_to_tg_user_id, Ticket.category, Project.client_id)
+        .join(Project, Ticket.project_id == Project.id)
+        .where(Ticket.id == feedback.ticket_id)
+    )
+    operator, category, client_id = result.one()
+    stmt = sqlite_insert(CsatRollup).values(
+        day=rollup_day(feedback.created_at),
+        operator_tg_user_id=operator or 0,
+        category=category,
+        client_id=client_id,
+        **delta,
+    )
+    columns = CsatRollup.__table__.c
+    await session.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[columns.day, columns.operator_tg_user_id, columns.category, columns.client_id],
+            set_={name: columns[name] + stmt.excluded[name] for name in delta},
+        )
+    )
+
+
+async def rebuild_csat_rollups(session: AsyncSession) -> int:
+    """
+    Recompute all rollup rows from feedback and commit.
+
+    Returns:
+        Number of rollup rows written
+    """
+    result = await session.execute(
+        select(
+            Feedback.created_at,
+            Feedback.csat,
+            Feedback.speed_rating,
+            Feedback.quality_rating,
+            Feedback.politeness_rating,
+            Ticket.assigned_to_tg_user_id,
+            Ticket.category,
+            Project.client_id,
+        )
+        .join(Ticket, Feedback.ticket_id == Ticket.id)
+        .join(Project, Ticket.project_id == Project.id)
+    )
+    from app.services.business_calendar import get_tz
+    tz = get_tz(settings.timezone)
+    totals: Dict[_RollupKey, Dict[str, int]] = {}
+    for created_at, csat, speed, quality, politeness, operator, category, client_id in result:
+        row = totals.setdefault((rollup_day(created_at, tz), operator or 0, category, client_id), {})
+        for name, value in feedback_counts(csat, speed, quality, politeness).items():
+            row[name] = row.get(name, 0) + value
+
+    await session.execute(delete(CsatRollup))
+    if totals:
+        await session.execute(
+            insert(CsatRollup),
+            [
+                {"day": day, "operator_tg_user_id": operator, "category": category, "client_id": client_id, **counts}
+                for (day, operator, category, client_id), counts in totals.items()
+            ],
+        )
+    await session.commit()
+    logger.info("CSAT rollups rebuilt: %s rows", len(totals))
+    return len(totals)
+
+
+async def get_csat_summary(
+    session: AsyncSession,
+    since: date,
+    group_by: Optional[str] = None,
+) -> List[CsatSummary]:
+    """
+    CSAT totals from rollups since a local date (inclusive).
+
+    Reads only csat_rollups, so the cost depends on the period and the
+    number of groups, not on the size of the feedback history.
+
+    Args:
+        session: Database session
+        since: First local day of the period
+        group_by: Key of GROUP_COLUMNS, or None for one total row
+
+    Returns:
+        Summaries, most feedback first (one row with key None without group_by)
+    """
+    sums = [func.coalesce(func.sum(CsatRollup.__table__.c[name]), 0) for name in COUNTER_COLUMNS]
+    key = GROUP_COLUMNS[group_by] if group_by else None
+    stmt = select(*([key] if key is not None else []), *sums).where(CsatRollup.day >= since)
+    if key is not None:
+        stmt = stmt.group_by(key).order_by((sums[0] + sums[1]).desc())
+    result = await session.execute(stmt)
+    summaries = []
+    for row in result:
+        values = list(row) if key is not None else [None, *row]
+        summaries.append(CsatSummary(values[0], *values[1:]))
+    return summaries
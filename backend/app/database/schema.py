@@ -0,0 +1,52 @@
+"""
+In-place schema upgrade for existing databases.
+
+init_db() uses Base.metadata.create_all(), which creates missing tables but
+never alters existing ones. upgrade_schema() closes that gap for the simple
+case this project needs: columns added to a model later (nullable or with a
+server default) are added with ALTER TABLE ... ADD COLUMN, and indexes
+declared in __table_args__ are created if missing. Renames, drops and type
+changes still need a manual SQL script.
+"""
+
+import logging
+from typing import List
+
+from sqlalchemy import inspect
+from sqlalchemy.engine import Connection
+from sqlalchemy.schema import CreateColumn
+
+from app.database.models import Base
+
+logger = logging.getLogger(__name__)
+
+
+def upgrade_schema(conn: Connection) -> List[str]:
+    """
+    Add missing columns and indexes to existing tables.
+
+    Args:
+        conn: Sync connection inside a transaction (use via AsyncConnection.run_sync)
+
+    Returns:
+        "table.column" / index names that were added
+    """
+    inspector = inspect(conn)
+    added = []
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue  # Created with everything by create_all()
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing:
+                ddl = CreateColumn(column).compile(dialect=conn.dialect)
+                conn.exec_driver_sql(f"ALTER TABLE {table.name} ADD COLUMN {ddl}")
+                added.append(f"{table.name}.{column.name}")
+        existing_indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing_indexes:
+                index.create(conn)
+                added.append(index.name)
+    if added:
+        logger.info("Schema upgraded: added %s", ", ".join(added))
+    return added
@@ -0,0 +1,203 @@
+"""
+Full-text search over ticket descriptions and messages (SQLite FTS5).
+
+Two external-content FTS5 tables index messages.content and
+tickets.description without storing the text twice. Triggers keep them in
+sync on every insert/update/delete, so no write path has to remember the
+index. ensure_search_index() creates the tables on startup and backfills
+existing rows the first time ('rebuild').
+
+There is no Russian stemmer in SQLite, so every query term is a prefix
+query ("оплат" finds "оплата", "оплаты"); the prefix='2 3 4' indexes keep
+short prefixes fast.
+"""
+
+import html
+import logging
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from sqlalchemy import column, select, table, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from app.database.models import Ticket
+
+logger = logging.getLogger(__name__)
+
+FTS_OPTIONS = "tokenize='unicode61 remove_diacritics 2', prefix='2 3 4'"
+
+# (FTS table, content table, indexed column)
+INDEXED_COLUMNS = (
+    ("messages_fts", "messages", "content"),
+    ("tickets_fts", "tickets", "description"),
+)
+
+MAX_QUERY_TERMS = 8
+# Message hits fetched per requested ticket (several messages of one ticket may match)
+HITS_PER_TICKET = 20
+# Above this many matching messages results are by recency, not bm25 (bounds query time)
+MAX_RANKED_MATCHES = 5_000
+
+# Snippet markers: control chars that cannot come from Telegram text, replaced after html.escape
+_MARK_OPEN, _MARK_CLOSE = "\x02", "\x03"
+_TERM_RE = re.compile(r"\w+", re.UNICODE)
+_SQLITE_MASTER = table("sqlite_master", column("type"), column("name"))
+
+
+@dataclass
+class SearchHit:
+    """One ticket found by search_tickets()."""
+
+    ticket_id: int
+    number: int
+    status: str
+    support_chat_id: int
+    topic_id: Optional[int]
+    snippet: str  # HTML-safe, matched terms in <b>
+    score: float  # bm25 (lower is better); -rowid for broad queries
+
+
+def _index_ddl(fts: str, table: str, column: str) -> List[str]:
+    """CREATE statements for one FTS table and its sync triggers."""
+    insert = f"INSERT INTO {fts}(rowid, {column}) VALUES (new.id, new.{column});"
+    delete = f"INSERT INTO {fts}({fts}, rowid, {column}) VALUES ('delete', old.id, old.{column});"
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+        f"{column}, content='{table}', content_rowid='id', {FTS_OPTIONS})",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN {insert} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN {delete} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {column} ON {table} BEGIN {delete} {insert} END",
+    ]
+
+
+async def ensure_search_index(conn: AsyncConnection) -> List[str]:
+    """
+    Create FTS tables and triggers; backfill tables created by this call.
+
+    Args:
+        conn: Connection inside a transaction (engine.begin())
+
+    Returns:
+        Names of FTS tables that were created and backfilled
+    """
+    result = await conn.execute(
+        select(_SQLITE_MASTER.c.name)
+        .where(_SQLITE_MASTER.c.type == "table", _SQLITE_MASTER.c.name.in_([fts for fts, _, _ in INDEXED_COLUMNS]))
+    )
+    existing = set(result.scalars().all())
+
+    created = []
+    for fts, content_table, indexed_column in INDEXED_COLUMNS:
+        for statement in _index_ddl(fts, content_table, indexed_column):
+            await conn.exec_driver_sql(statement)
+        if fts not in existing:
+            await conn.exec_driver_sql(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+            created.append(fts)
+            logger.info("Search index %s built from existing %s", fts, content_table)
+    return created
+
+
+def build_match_query(query: str) -> Optional[str]:
+    """
+    Turn free text into a safe FTS5 MATCH expression.
+
+    Every word becomes a quoted prefix term and all terms must match, so FTS
+    operators typed by the user (AND, NEAR, quotes, *) are never interpreted.
+
+    Returns:
+        MATCH expression or None if the query has no words
+    """
+    terms = _TERM_RE.findall(query.lower())[:MAX_QUERY_TERMS]
+    if not terms:
+        return None
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def _render_snippet(raw: Optional[str]) -> str:
+    """Escape snippet text for HTML and turn markers into <b>."""
+    escaped = html.escape(raw or "")
+    return escaped.replace(_MARK_OPEN, "<b>").replace(_MARK_CLOSE, "</b>")
+
+
+async def _is_broad(session: AsyncSession, match: str) -> bool:
+    """True if the query matches more than MAX_RANKED_MATCHES messages (cheap doc-order probe)."""
+    result = await session.execute(
+        text(
+            "SELECT rowid FROM messages_fts WHERE messages_fts MATCH :match "
+            "ORDER BY rowid DESC LIMIT 1 OFFSET :cap"
+        ),
+        {"match": match, "cap": MAX_RANKED_MATCHES},
+    )
+    return result.first() is not None
+
+
+async def _best_matches(session: AsyncSession, match: str, limit: int, broad: bool) -> Dict[int, tuple]:
+    """Best (sort key, snippet) per ticket id from both indexes; lower key is better."""
+    params = {"match": match, "limit": limit, "open": _MARK_OPEN, "close": _MARK_CLOSE}
+    best: Dict[int, tuple] = {}
+    for fts, ticket_id_column, join in (
+        ("messages_fts", "m.ticket_id", "JOIN messages m ON m.id = messages_fts.rowid"),
+        ("tickets_fts", "tickets_fts.rowid", ""),
+    ):
+        # bm25 needs term statistics over every matching row; broad queries take the newest rows instead
+        key, order = (f"-{fts}.rowid", f"{fts}.rowid DESC") if broad else (f"bm25({fts})", "rank")
+        result = await session.execute(
+            text(
+                f"SELECT {ticket_id_column}, {key}, snippet({fts}, 0, :open, :close, '…', 12) "
+                f"FROM {fts} {join} WHERE {fts} MATCH :match ORDER BY {order} LIMIT :limit"
+            ),
+            params,
+        )
+        for ticket_id, sort_key, raw in result:
+            if ticket_id not in best or sort_key < best[ticket_id][0]:
+                best[ticket_id] = (sort_key, raw)
+    return best
+
+
+async def search_tickets(session: AsyncSession, query: str, limit: int = 10) -> List[SearchHit]:
+    """
+    Find tickets whose description or messages match the query.
+
+    Args:
+        session: Database session
+        query: Free text typed by the operator
+        limit: Maximum tickets to return
+
+    Returns:
+        Tickets ordered by best bm25 score of any matching text; for broad
+        queries (more than MAX_RANKED_MATCHES matching messages) the newest
+        matching tickets, since ranking would have to score every match
+    """
+    match = build_match_query(query)
+    if match is None:
+        return []
+
+    broad = await _is_broad(session, match)
+    best = await _best_matches(session, match, limit * HITS_PER_TICKET, broad)
+    if broad:
+        # Keys are -rowid of two different tables; newest tickets first instead
+        top = sorted(best.items(), reverse=True)[:limit]
+    else:
+        top = sorted(best.items(), key=lambda item: item[1][0])[:limit]
+    if not top:
+        return []
+
+    result = await session.execute(
+        select(Ticket.id, Ticket.number, Ticket.status, Ticket.support_chat_id, Ticket.topic_id)
+        .where(Ticket.id.in_([ticket_id for ticket_id, _ in top]))
+    )
+    tickets = {row.id: row for row in result}
+    return [
+        SearchHit(
+            ticket_id=ticket_id,
+            number=tickets[ticket_id].number,
+            status=tickets[ticket_id].status,
+            support_chat_id=tickets[ticket_id].support_chat_id,
+            topic_id=tickets[ticket_id].topic_id,
+            snippet=_render_snippet(raw),
+            score=score,
+        )
+        for ticket_id, (score, raw) in top
+        if ticket_id in tickets
+    ]
@@ -1,12 +1,26 @@
 """
 Minimal HTTP server for platform healthchecks (e.g. Railway).
 
-Responds with 200 OK to GET / so the deployment healthcheck succeeds.
+Routes:
+    GET /live — 200 while the event loop answers
+    GET /ready — JSON report of DB ping, update age and loop lag; 503 if any check fails
+    GET /metrics — Prometheus text metrics (see app.metrics)
+    GET / — 200 OK for the deployment healthcheck (Railway)
+    Anything else — 404
 No extra dependencies; uses asyncio only.
 """
 
 import asyncio
+import json
 import logging
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import text
+
+from app.config.settings import settings
+from app.database.connection import get_engine
+from app.metrics import EVENT_LOOP_LAG, REGISTRY
 
 logger = logging.getLogger(__name__)
 
@@ -19,19 +33,171 @@ HEALTH_RESPONSE = (
     b"OK"
 )
 
+NOT_FOUND_RESPONSE = (
+    b"HTTP/1.1 404 Not Found\r\n"
+    b"Content-Length: 0\r\n"
+    b"Connection: close\r\n\r\n"
+)
+
+METRICS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def build_response(status: str, body: bytes, content_type: str = "text/plain; charset=utf-8") -> bytes:
+    """
+    Build a complete HTTP/1.1 response with Connection: close.
+
+    Args:
+        status: Status line tail, e.g. "200 OK"
+        body: Response body
+        content_type: Content-Type header value
+    """
+    head = (
+        f"HTTP/1.1 {status}\r\n"
+        f"Content-Type: {content_type}\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: close\r\n"
+        f"\r\n"
+    )
+    return head.encode("ascii") + body
+
+
+class ReadinessState:
+    """
+    Process-wide liveness signals used by GET /ready.
+
+    - last_update_at: monotonic time of last processed update or completed
+      long-poll cycle (an empty getUpdates means the bot is caught up)
+    - loop_lag: latest event-loop lag measured by the background probe
+    """
+
+    def __init__(self) -> None:
+        self.last_update_at: float = time.monotonic()
+        self.loop_lag: float = 0.0
+        self._probe_task: Optional[asyncio.Task] = None
+
+    def mark_update(self) -> None:
+        """Record that an update (or an empty polling cycle) was processed."""
+        self.last_update_at = time.monotonic()
+
+    def update_age(self) -> float:
+        """Seconds since last processed update."""
+        return time.monotonic() - self.last_update_at
+
+    def start_loop_probe(self, interval: float) -> None:
+        """Start background task measuring event-loop lag (no-op if running)."""
+        if self._probe_task is None or self._probe_task.done():
+            self._probe_task = asyncio.create_task(self._probe(interval))
+
+    def stop_loop_probe(self) -> None:
+        """Cancel the loop-lag probe task."""
+        if self._probe_task is not None:
+            self._probe_task.cancel()
+            self._probe_task = None
+
+    async def _probe(self, interval: float) -> None:
+        """Sleep for interval and record how late the loop woke us up."""
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + interval
+            await asyncio.sleep(interval)
+            self.loop_lag = max(0.0, loop.time() - expected)
+            EVENT_LOOP_LAG.set(self.loop_lag)
+
+
+# Global readiness state (updated by middlewares, read by /ready)
+readiness = ReadinessState()
+
+
+async def check_database(timeout: float) -> Tuple[bool, float, Optional[str]]:
+    """
+    Ping database through the application engine.
+
+    Args:
+        timeout: Seconds before the ping is considered failed
+
+    Returns:
+        Tuple of (ok, elapsed_ms, error)
+    """
+    async def _ping() -> None:
+        async with get_engine().connect() as conn:
+            # Touch the file (not just "SELECT 1") so a locked database is noticed
+            await conn.execute(text("SELECT 1 FROM sqlite_master LIMIT 1"))
+
+    started = time.perf_counter()
+    try:
+        await asyncio.wait_for(_ping(), timeout=timeout)
+    except asyncio.TimeoutError:
+        return False, (time.perf_counter() - started) * 1000, "timeout"
+    except Exception as e:
+        return False, (time.perf_counter() - started) * 1000, str(e)
+    return True, (time.perf_counter() - started) * 1000, None
+
+
+async def readiness_report() -> Tuple[bool, Dict[str, Any]]:
+    """
+    Run readiness checks against configured thresholds.
+
+    Returns:
+        Tuple of (ready, report dict for JSON body)
+    """
+    db_threshold_ms = settings.ready_db_max_ms
+    db_ok, db_ms, db_error = await check_database(db_threshold_ms / 1000)
+    db_ok = db_ok and db_ms <= db_threshold_ms
+
+    update_age = readiness.update_age()
+    update_ok = update_age <= settings.ready_update_max_age
+
+    lag_ms = readiness.loop_lag * 1000
+    lag_ok = lag_ms <= settings.ready_loop_lag_max_ms
+
+    checks: Dict[str, Any] = {
+        "database": {"ok": db_ok, "ms": round(db_ms, 2), "threshold_ms": db_threshold_ms},
+        "update_age": {
+            "ok": update_ok,
+            "seconds": round(update_age, 1),
+            "threshold_seconds": settings.ready_update_max_age,
+        },
+        "loop_lag": {
+            "ok": lag_ok,
+            "ms": round(lag_ms, 2),
+            "threshold_ms": settings.ready_loop_lag_max_ms,
+        },
+    }
+    if db_error:
+        checks["database"]["error"] = db_error
+
+    ready = db_ok and update_ok and lag_ok
+    return ready, {"status": "ok" if ready else "fail", "checks": checks}
+
+
+def _request_path(request_line: bytes) -> str:
+    """Extract path (without query string) from 'GET /path HTTP/1.1'."""
+    parts = request_line.decode("latin-1").split()
+    if len(parts) < 2:
+        return "/"
+    return parts[1].split("?", 1)[0]
+
 
 async def _handle_client(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
-    """Handle one HTTP connection: read request, send 200 for GET / or GET /health."""
+    """Handle one HTTP connection: read request line and route GET requests."""
     try:
         line = await asyncio.wait_for(reader.readline(), timeout=2.0)
         if line.startswith(b"GET /"):
-            writer.write(HEALTH_RESPONSE)
+            path = _request_path(line)
+            if path == "/ready":
+                ready, report = await readiness_report()
+                body = json.dumps(report).encode("utf-8")
+                status = "200 OK" if ready else "503 Service Unavailable"
+                writer.write(build_response(status, body, "application/json"))
+            elif path == "/metrics":
+                body = REGISTRY.render().encode("utf-8")
+                writer.write(build_response("200 OK", body, METRICS_CONTENT_TYPE))
+            elif path in ("/", "/live"):
+                writer.write(HEALTH_RESPONSE)
+            else:
+                writer.write(NOT_FOUND_RESPONSE)
         else:
-            writer.write(
-                b"HTTP/1.1 404 Not Found\r\n"
-                b"Content-Length: 0\r\n"
-                b"Connection: close\r\n\r\n"
-            )
+            writer.write(NOT_FOUND_RESPONSE)
     except (asyncio.TimeoutError, ConnectionResetError):
         pass
     finally:
@@ -46,6 +212,8 @@ async def run_healthcheck_server(port: int) -> asyncio.Server:
     """
     Start TCP server on given port for healthcheck requests.
 
+    Also starts the event-loop lag probe used by GET /ready.
+
     Args:
         port: Port to bind (e.g. from PORT env on Railway).
 
@@ -53,5 +221,6 @@ async def run_healthcheck_server(port: int) -> asyncio.Server:
         Started asyncio.Server (call server.close() and await server.wait_closed() to stop).
     """
     server = await asyncio.start_server(_handle_client, "0.0.0.0", port)
+    readiness.start_loop_probe(settings.loop_probe_interval)
     logger.info("Healthcheck HTTP server listening on port %s", port)
     return server
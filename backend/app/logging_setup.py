@@ -0,0 +1,149 @@
+"""
+Logging setup: non-blocking output and per-update correlation fields.
+
+Records go through a QueueHandler into an in-memory queue; a QueueListener
+thread writes them to stdout, so slow stdout/journald never blocks the
+event loop. Every record carries update_id, user_id and ticket number
+taken from context variables bound per update.
+"""
+
+import atexit
+import contextvars
+import copy
+import json
+import logging
+import queue
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Optional
+
+# Fields attached to every record; "-" when unknown
+CONTEXT_FIELDS = ("update_id", "user_id", "ticket")
+
+TEXT_FORMAT = (
+    "%(asctime)s - %(name)s - %(levelname)s - "
+    "[upd=%(update_id)s user=%(user_id)s ticket=%(ticket)s] %(message)s"
+)
+
+_log_context: contextvars.ContextVar[Dict[str, Any]] = contextvars.ContextVar(
+    "log_context", default={}
+)
+_listener: Optional[QueueListener] = None
+
+
+def bind_log_context(**fields: Any) -> contextvars.Token:
+    """
+    Add fields to the current log context (e.g. ticket=42).
+
+    The context is per asyncio task, so values bound while handling
+    one update never leak into another.
+
+    Returns:
+        Token for reset_log_context()
+    """
+    return _log_context.set({**_log_context.get(), **fields})
+
+
+def reset_log_context(token: contextvars.Token) -> None:
+    """Restore log context to the state before the matching bind."""
+    _log_context.reset(token)
+
+
+def get_log_context() -> Dict[str, Any]:
+    """Get a copy of the current log context."""
+    return dict(_log_context.get())
+
+
+class ContextFilter(logging.Filter):
+    """Attach context fields to each record (runs in the caller's context)."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        context = _log_context.get()
+        for field in CONTEXT_FIELDS:
+            if not hasattr(record, field):
+                setattr(record, field, context.get(field, "-"))
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as one JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload: Dict[str, Any] = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for field in CONTEXT_FIELDS:
+            value = getattr(record, field, "-")
+            if value != "-":
+                payload[field] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            payload["exc"] = record.exc_text
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class _ContextQueueHandler(QueueHandler):
+    """QueueHandler that keeps message and traceback as separate fields."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Render lazy %-args in the caller thread; keep record picklable-simple."""
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def setup_logging(level: str = "info", json_output: bool = False) -> QueueListener:
+    """
+    Configure root logger with queue-based non-blocking output.
+
+    Safe to call more than once (previous listener is stopped).
+
+    Args:
+        level: Log level name (debug, info, warning, error)
+        json_output: Emit JSON lines instead of text
+
+    Returns:
+        Started QueueListener
+    """
+    global _listener
+
+    shutdown_logging()
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(JsonFormatter() if json_output else logging.Formatter(TEXT_FORMAT))
+
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    queue_handler = _ContextQueueHandler(log_queue)
+    queue_handler.addFilter(ContextFilter())
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level.upper())
+
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the listener thread."""
+    global _listener
+
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
@@ -9,8 +9,12 @@ import logging
 import os
 import sys
 
+from pathlib import Path
+from typing import Optional
+
 from aiogram import Bot, Dispatcher
 from aiogram.client.default import DefaultBotProperties
+from aiogram.client.session.base import BaseSession
 from aiogram.enums import ParseMode
 
 from app.bot.handlers import (
@@ -22,18 +26,25 @@ from app.bot.handlers import (
     start_router,
     ticket_router,
 )
+from app.bot.middlewares.activity import UpdateActivityMiddleware
 from app.bot.middlewares.database import DatabaseMiddleware
+from app.bot.middlewares.log_context import LogContextMiddleware
+from app.bot.middlewares.metrics import MetricsMiddleware
+from app.bot.middlewares.query_budget import QueryBudgetMiddleware
+from app.bot.middlewares.recorder import UpdateRecorder, UpdateRecorderMiddleware
+from app.bot.middlewares.telegram_api import TelegramApiMetricsMiddleware
 from app.config.settings import settings
 from app.database.connection import DatabaseSessionManager, close_db, init_db
 from app.database import operations as ops
-from app.health import run_healthcheck_server
+from app.health import readiness, run_healthcheck_server
+from app.logging_setup import setup_logging, shutdown_logging
+from app.services.awaiting import awaiting_digest, awaiting_queue, warm_up_awaiting_queue
+from app.services.dispatcher import dispatcher as ticket_dispatcher, warm_up_dispatcher
+from app.services.duplicates import duplicate_index, warm_up_duplicate_index
+from app.services.knowledge_base import knowledge_base, load_knowledge_base
+from app.services.sla import sla_scheduler, warm_up_sla_scheduler
+from app.metrics import FSM_STORAGE_RECORDS
 
-# Configure logging
-logging.basicConfig(
-    level=settings.log_level.upper(),
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    stream=sys.stdout
-)
 logger = logging.getLogger(__name__)
 
 
@@ -43,52 +54,81 @@ async def on_startup(bot: Bot) -> None:
     await init_db()
     async with DatabaseSessionManager() as session:
         await ops.ensure_default_project(session)
+        await warm_up_duplicate_index(session, duplicate_index)
+        await warm_up_awaiting_queue(session, awaiting_queue)
+        await warm_up_dispatcher(session, ticket_dispatcher)
+        if settings.sla_timers_enabled:
+            await warm_up_sla_scheduler(session, sla_scheduler)
+    if settings.kb_path:
+        await load_knowledge_base(Path(settings.kb_path), knowledge_base)
+    
+    if settings.sla_timers_enabled:
+        sla_scheduler.start(bot)
+    awaiting_digest.start(bot)
+    if settings.auto_assign_enabled:
+        ticket_dispatcher.start(bot)
     
     # Log bot info
     bot_info = await bot.get_me()
-    logger.info(f"Bot started: @{bot_info.username} (id: {bot_info.id})")
+    logger.info("Bot started: @%s (id: %s)", bot_info.username, bot_info.id)
 
 
-async def on_shutdown(bot: Bot) -> None:
+async def on_shutdown(bot: Bot, update_recorder: Optional[UpdateRecorder] = None) -> None:
     """Actions to perform on bot shutdown."""
     logger.info("Shutting down...")
+    await sla_scheduler.stop()
+    await awaiting_digest.stop()
+    await ticket_dispatcher.stop()
+    if update_recorder is not None:
+        await asyncio.to_thread(update_recorder.stop)
     await close_db()
     logger.info("Shutdown complete")
 
 
-async def main() -> None:
-    """Initialize and start the bot."""
-    logger.info("=" * 50)
-    logger.info("Starting Telegram Support Bot")
-    logger.info("=" * 50)
-    
-    # Log configuration
-    logger.info(f"Bot token: {settings.bot_token[:10]}...{settings.bot_token[-5:]}")
-    logger.info(f"Support chat ID: {settings.support_chat_id}")
-    logger.info(f"Operators: {settings.operators}")
-    if not settings.operators:
-        logger.warning(
-            "OPERATORS is empty! Buttons 'Взять в работу' won't work. "
-            "In Railway Variables set OPERATORS=your_telegram_id (e.g. OPERATORS=373126255)"
-        )
-    logger.info(f"Timezone: {settings.timezone}")
-    logger.info(f"Working hours: {settings.work_hours_start}:00 - {settings.work_hours_end}:00")
-    logger.info(f"Database: {settings.db_path}")
+def create_bot(session: Optional[BaseSession] = None) -> Bot:
+    """
+    Create Bot with default properties and API metrics middleware.
     
-    # Create bot instance
+    Args:
+        session: HTTP session (None for default aiohttp; load tools pass a stub)
+    """
     bot = Bot(
         token=settings.bot_token,
+        session=session,
         default=DefaultBotProperties(parse_mode=ParseMode.HTML)
     )
+    bot.session.middleware(TelegramApiMetricsMiddleware())
+    return bot
+
+
+def create_dispatcher() -> Dispatcher:
+    """
+    Create Dispatcher with middlewares and all routers.
     
-    # Create dispatcher
+    Routers are module-level singletons, so this can be called once per process.
+    """
     dp = Dispatcher()
+    FSM_STORAGE_RECORDS.set_function(lambda: len(getattr(dp.storage, "storage", ())))
     
     # Register startup/shutdown handlers
     dp.startup.register(on_startup)
     dp.shutdown.register(on_shutdown)
     
-    # Setup middlewares
+    # Record anonymized traffic for benchmarks.replay (outermost, so timing covers everything)
+    if settings.record_updates_path:
+        recorder = UpdateRecorder(Path(settings.record_updates_path), settings.support_chat_id, settings.operators)
+        recorder.start()
+        dp["update_recorder"] = recorder
+        dp.update.outer_middleware(UpdateRecorderMiddleware(recorder))
+    
+    # Setup middlewares (log context first, update activity feeds GET /ready)
+    dp.update.outer_middleware(LogContextMiddleware())
+    dp.update.outer_middleware(UpdateActivityMiddleware())
+    # Metrics first so handler latency includes session setup
+    dp.message.middleware(MetricsMiddleware())
+    dp.callback_query.middleware(MetricsMiddleware())
+    dp.message.middleware(QueryBudgetMiddleware())
+    dp.callback_query.middleware(QueryBudgetMiddleware())
     dp.message.middleware(DatabaseMiddleware())
     dp.callback_query.middleware(DatabaseMiddleware())
     
@@ -114,6 +154,31 @@ async def main() -> None:
     # 7. Operator handlers (for support group)
     dp.include_router(operator_router)
     
+    return dp
+
+
+async def main() -> None:
+    """Initialize and start the bot."""
+    logger.info("=" * 50)
+    logger.info("Starting Telegram Support Bot")
+    logger.info("=" * 50)
+    
+    # Log configuration
+    logger.info("Bot token: %s...%s", settings.bot_token[:10], settings.bot_token[-5:])
+    logger.info("Support chat ID: %s", settings.support_chat_id)
+    logger.info("Operators: %s", settings.operators)
+    if not settings.operators:
+        logger.warning(
+            "OPERATORS is empty! Buttons 'Взять в работу' won't work. "
+            "In Railway Variables set OPERATORS=your_telegram_id (e.g. OPERATORS=373126255)"
+        )
+    logger.info("Timezone: %s", settings.timezone)
+    logger.info("Working hours: %s:00 - %s:00", settings.work_hours_start, settings.work_hours_end)
+    logger.info("Database: %s", settings.db_path)
+    
+    bot = create_bot()
+    dp = create_dispatcher()
+    
     # Start HTTP healthcheck server if PORT is set (e.g. Railway)
     # Read PORT from env directly so healthcheck works even if Settings alias differs per platform
     health_server = None
@@ -127,16 +192,21 @@ async def main() -> None:
         await dp.start_polling(bot, allowed_updates=dp.resolve_used_update_types())
     finally:
         if health_server is not None:
+            readiness.stop_loop_probe()
             health_server.close()
             await health_server.wait_closed()
         await bot.session.close()
 
 
 if __name__ == "__main__":
+    # Configure logging (queue-based, never blocks the event loop)
+    setup_logging(settings.log_level, json_output=settings.log_json)
     try:
         asyncio.run(main())
     except KeyboardInterrupt:
         logger.info("Bot stopped by user")
     except Exception as e:
-        logger.exception(f"Fatal error: {e}")
+        logger.exception("Fatal error: %s", e)
         sys.exit(1)
+    finally:
+        shutdown_logging()
@@ -0,0 +1,316 @@
+"""
+In-process metrics registry with Prometheus text exposition.
+
+Collects handler latency, SQL timings, Telegram API calls and FSM storage size.
+No extra dependencies; rendered by the healthcheck server on GET /metrics.
+"""
+
+import math
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Default latency buckets (seconds): 1 ms .. 10 s
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    """Escape label value for Prometheus text format."""
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    """Format sample value (integers without trailing .0)."""
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str]) -> str:
+    """Format label set as {a="1",b="2"} (empty string if no labels)."""
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    """Base class for labelled metrics."""
+
+    metric_type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        """Build label values tuple in declared order."""
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                f"Metric {self.name} expects labels {self.labelnames}, got {tuple(labels)}"
+            )
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> List[str]:
+        """Return exposition lines for this metric (without HELP/TYPE)."""
+        raise NotImplementedError
+
+    def render(self) -> str:
+        """Render metric with HELP and TYPE headers."""
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.metric_type}",
+        ]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """Monotonically increasing counter."""
+
+    metric_type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        """Increment counter for given label set."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def get(self, **labels: str) -> float:
+        """Get current value for given label set (0 if never incremented)."""
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in items
+        ]
+
+
+class Gauge(_Metric):
+    """Value that can go up and down, or be computed on scrape."""
+
+    metric_type = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._function: Optional[Callable[[], float]] = None
+
+    def set(self, value: float, **labels: str) -> None:
+        """Set gauge value for given label set."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def set_function(self, function: Optional[Callable[[], float]]) -> None:
+        """
+        Compute value lazily on every scrape (unlabelled gauges only).
+
+        Args:
+            function: Zero-argument callable, or None to unbind
+        """
+        if self.labelnames:
+            raise ValueError(f"Gauge {self.name} has labels; set_function is not supported")
+        self._function = function
+
+    def get(self, **labels: str) -> float:
+        """Get current value for given label set."""
+        if self._function is not None and not labels:
+            return float(self._function())
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> List[str]:
+        if self._function is not None:
+            try:
+                value = float(self._function())
+            except Exception:
+                return []
+            return [f"{self.name} {_format_value(value)}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in items
+        ]
+
+
+class Histogram(_Metric):
+    """Cumulative histogram with fixed buckets."""
+
+    metric_type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [bucket counts..., +Inf count], sum
+        self._counts: Dict[LabelValues, List[int]] = {}
+        self._sums: Dict[LabelValues, float] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        """Record one observation."""
+        key = self._key(labels)
+        with self._lock:
+            counts = self._counts.get(key)
+            if counts is None:
+                counts = [0] * (len(self.buckets) + 1)
+                self._counts[key] = counts
+                self._sums[key] = 0.0
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            else:
+                counts[-1] += 1
+            self._sums[key] += value
+
+    def count(self, **labels: str) -> int:
+        """Total number of observations for given label set."""
+        counts = self._counts.get(self._key(labels))
+        return sum(counts) if counts else 0
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, list(counts), self._sums[key]) for key, counts in self._counts.items())
+        lines: List[str] = []
+        for key, counts, total in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+                cumulative += bucket_count
+                labels = _format_labels(
+                    self.labelnames + ("le",), key + (_format_value(bound),)
+                )
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            base = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{base} {_format_value(total)}")
+            lines.append(f"{self.name}_count{base} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered together."""
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        """Create and register a counter."""
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Gauge:
+        """Create and register a gauge."""
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        """Create and register a histogram."""
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        """Render all metrics in Prometheus text format (version 0.0.4)."""
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+
+# Global registry used by the bot
+REGISTRY = MetricsRegistry()
+
+# === Handlers (dispatcher middleware) ===
+HANDLER_DURATION = REGISTRY.histogram(
+    "bot_handler_duration_seconds",
+    "Time spent in update handlers.",
+    ("router", "handler", "event"),
+)
+HANDLER_ERRORS = REGISTRY.counter(
+    "bot_handler_errors_total",
+    "Unhandled exceptions raised by update handlers.",
+    ("router", "handler", "event"),
+)
+
+# === Database (SQLAlchemy engine events) ===
+DB_STATEMENTS = REGISTRY.counter(
+    "bot_db_statements_total",
+    "SQL statements executed.",
+    ("operation",),
+)
+DB_STATEMENT_DURATION = REGISTRY.histogram(
+    "bot_db_statement_duration_seconds",
+    "SQL statement execution time.",
+    ("operation",),
+)
+HANDLER_DB_STATEMENTS = REGISTRY.histogram(
+    "bot_handler_db_statements",
+    "SQL statements executed per handled update.",
+    ("router", "handler"),
+    buckets=(1, 2, 5, 10, 20, 50, 100),
+)
+
+# === Telegram Bot API (session middleware) ===
+TELEGRAM_REQUESTS = REGISTRY.counter(
+    "bot_telegram_requests_total",
+    "Outbound Telegram Bot API calls.",
+    ("method", "outcome"),
+)
+TELEGRAM_REQUEST_DURATION = REGISTRY.histogram(
+    "bot_telegram_request_duration_seconds",
+    "Outbound Telegram Bot API call latency.",
+    ("method",),
+)
+TELEGRAM_RETRY_AFTER = REGISTRY.counter(
+    "bot_telegram_retry_after_total",
+    "Telegram flood-control (RetryAfter) responses.",
+    ("method",),
+)
+
+# === FSM ===
+FSM_STORAGE_RECORDS = REGISTRY.gauge(
+    "bot_fsm_storage_records",
+    "Number of records held in FSM storage.",
+)
+
+# === Event loop ===
+EVENT_LOOP_LAG = REGISTRY.gauge(
+    "bot_event_loop_lag_seconds",
+    "Event-loop scheduling lag measured by the readiness probe.",
+)
+
+# === Knowledge base ===
+KB_SUGGESTIONS = REGISTRY.counter(
+    "bot_kb_suggestions_total",
+    "Knowledge-base suggestion outcomes before ticket creation (shown, opened, solved, continued).",
+    ("outcome",),
+)
+
+# === SLA timers ===
+SLA_TIMERS_FIRED = REGISTRY.counter(
+    "bot_sla_timers_fired_total",
+    "SLA reminders and breach alerts posted to ticket topics.",
+    ("kind",),
+)
@@ -0,0 +1,363 @@
+"""
+SLA and response-time analytics over ticket history (/stats).
+
+Ticket history is loaded columnar: one Core select returns timestamps as
+epoch seconds (SQLite julianday(), so no datetime objects are built per
+row) and group keys as plain values; everything else is NumPy.
+
+Durations per ticket:
+- first_response: created_at -> first_response_at
+- resolution: created_at -> closed_at (completed tickets; cancelled ones have no closed_at)
+each both wall-clock and in business time of the support team calendar
+(the cumulative interval table of BusinessCalendar looked up with
+searchsorted, the vectorized form of business_seconds_between()).
+
+Percentiles per group use one argsort of the values per metric and a
+stable sort of group codes per dimension, then read the interpolated
+ranks straight out of each group's slice - no Python loop over tickets
+or groups. Percentiles match numpy.percentile(method="linear").
+"""
+
+import asyncio
+import csv
+import io
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import Float, cast, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config.categories import get_category_label
+from app.database.models import Client, Project, Ticket
+from app.services.business_calendar import BusinessCalendar
+
+logger = logging.getLogger(__name__)
+
+PERCENTILES: Tuple[int, ...] = (50, 90, 99)
+
+DIMENSIONS: Tuple[str, ...] = ("category", "operator", "client")
+
+METRICS: Tuple[str, ...] = (
+    "first_response",
+    "first_response_business",
+    "resolution",
+    "resolution_business",
+)
+
+# julianday() of the Unix epoch
+_UNIX_EPOCH_JULIAN_DAY = 2440587.5
+
+
+def _posix(moment: datetime) -> float:
+    """Naive UTC datetime -> POSIX seconds."""
+    return moment.replace(tzinfo=timezone.utc).timestamp()
+
+
+def _epoch_seconds(column):
+    """SQL expression: naive UTC datetime column -> POSIX seconds (NULL stays NULL)."""
+    return cast((func.julianday(column) - _UNIX_EPOCH_JULIAN_DAY) * 86400.0, Float)
+
+
+@dataclass
+class TicketColumns:
+    """Ticket history as parallel arrays (one element per ticket)."""
+
+    created: np.ndarray  # float64 POSIX seconds
+    first_response: np.ndarray  # float64, NaN if never answered
+    closed: np.ndarray  # float64, NaN if not closed
+    # Dimension -> int codes into keys[dimension]
+    codes: Dict[str, np.ndarray] = field(default_factory=dict)
+    keys: Dict[str, list] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.created)
+
+
+@dataclass
+class Distribution:
+    """Summary of one duration metric, in seconds."""
+
+    count: int
+    mean: float
+    percentiles: Tuple[float, ...]  # Same order as StatsReport.percentiles; NaN if count == 0
+
+
+@dataclass
+class GroupStats:
+    """Metrics of one group (a category, an operator or a client)."""
+
+    key: object
+    label: str
+    tickets: int
+    metrics: Dict[str, Distribution]
+
+
+@dataclass
+class StatsReport:
+    """Result of compute_stats()."""
+
+    since: datetime
+    tickets: int
+    percentiles: Tuple[int, ...]
+    total: GroupStats
+    # Dimension -> groups, most tickets first
+    groups: Dict[str, List[GroupStats]]
+
+
+def _encode(values: list) -> Tuple[np.ndarray, list]:
+    """
+    Dictionary-encode values: codes and the distinct values in first-seen order.
+
+    Codes use the smallest unsigned dtype, so group sorts hit NumPy's radix sort.
+    """
+    keys = list(dict.fromkeys(values))
+    lookup = {key: code for code, key in enumerate(keys)}
+    dtype = np.min_scalar_type(max(len(keys) - 1, 0))
+    return np.fromiter(map(lookup.__getitem__, values), dtype=dtype, count=len(values)), keys
+
+
+def columns_from_rows(rows: Sequence[tuple]) -> TicketColumns:
+    """
+    Build TicketColumns from (created, first_response, closed, category, operator, client) rows.
+
+    Timestamps are POSIX seconds or None; operator is 0 for unassigned tickets.
+    """
+    # One object array instead of zip(*rows): no million-argument call, None -> NaN in astype()
+    table = np.array(rows, dtype=object).reshape(len(rows), 6)
+    columns = TicketColumns(
+        created=table[:, 0].astype(np.float64),
+        first_response=table[:, 1].astype(np.float64),
+        closed=table[:, 2].astype(np.float64),
+    )
+    for position, dimension in enumerate(DIMENSIONS, start=3):
+        columns.codes[dimension], columns.keys[dimension] = _encode(table[:, position].tolist())
+    return columns
+
+
+async def load_ticket_columns(session: AsyncSession, since: datetime) -> TicketColumns:
+    """
+    Load tickets created since the given moment as columns.
+
+    Args:
+        session: Database session
+        since: Naive UTC lower bound on created_at
+    """
+    stmt = (
+        select(
+            _epoch_seconds(Ticket.created_at),
+            _epoch_seconds(Ticket.first_response_at),
+            _epoch_seconds(Ticket.closed_at),
+            Ticket.category,
+            func.coalesce(Ticket.assigned_to_tg_user_id, 0),
+            Project.client_id,
+        )
+        .join(Project, Ticket.project_id == Project.id)
+        .where(Ticket.created_at >= since)
+    )
+    # Core execution on the session's connection: no ORM result machinery per row
+    connection = await session.connection()
+    result = await connection.execute(stmt)
+    # Plain tuples: NumPy probes Row objects key by key when building arrays
+    return columns_from_rows(list(map(tuple, result.all())))
+
+
+async def load_client_names(session: AsyncSession, client_ids: Sequence[int]) -> Dict[int, str]:
+    """Client names by id (for labels of the client dimension)."""
+    if not client_ids:
+        return {}
+    result = await session.execute(select(Client.id, Client.name).where(Client.id.in_(client_ids)))
+    return dict(result.all())
+
+
+def business_seconds_before(calendar: BusinessCalendar, ts: np.ndarray) -> np.ndarray:
+    """
+    Cumulative business seconds of the calendar up to each timestamp (NaN stays NaN).
+
+    Only differences of two results are meaningful (the origin is the start of the table).
+    """
+    valid = ts[~np.isnan(ts)]
+    if not len(valid):
+        return np.full(ts.shape, np.nan)
+    starts, ends, before = (np.asarray(a) for a in calendar.intervals(float(valid.min()), float(valid.max())))
+    i = np.searchsorted(starts, ts, side="right") - 1
+    inside = np.clip(i, 0, None)
+    result = before[inside] + np.minimum(ts, ends[inside]) - starts[inside]
+    return np.where(i < 0, 0.0, result)
+
+
+def durations(columns: TicketColumns, calendar: BusinessCalendar) -> Dict[str, np.ndarray]:
+    """Per-ticket durations in seconds for every metric (NaN where not applicable)."""
+    created_business = business_seconds_before(calendar, columns.created)
+    return {
+        "first_response": columns.first_response - columns.created,
+        "first_response_business": business_seconds_before(calendar, columns.first_response) - created_business,
+        "resolution": columns.closed - columns.created,
+        "resolution_business": business_seconds_before(calendar, columns.closed) - created_business,
+    }
+
+
+def grouped_distributions(
+    sorted_values: np.ndarray,
+    sorted_groups: np.ndarray,
+    n_groups: int,
+    percentiles: Sequence[int],
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Count, mean and percentiles per group.
+
+    Args:
+        sorted_values: Values without NaN, sorted by (group, value)
+        sorted_groups: Group code of each value (same order)
+        n_groups: Number of groups (codes are 0..n_groups-1)
+        percentiles: Percentiles to compute (0-100)
+
+    Returns:
+        (counts[n_groups], means[n_groups], table[n_groups, len(percentiles)]); NaN for empty groups
+    """
+    counts = np.bincount(sorted_groups, minlength=n_groups)
+    sums = np.bincount(sorted_groups, weights=sorted_values, minlength=n_groups)
+    offsets = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = sums / counts
+    if not len(sorted_values):
+        return counts, means, np.full((n_groups, len(percentiles)), np.nan)
+
+    # Linear interpolation between closest ranks inside each group's slice
+    rank = np.clip(counts - 1, 0, None)[:, None] * (np.asarray(percentiles, dtype=np.float64) / 100)[None, :]
+    low = np.floor(rank).astype(np.int64)
+    high = np.ceil(rank).astype(np.int64)
+    last = len(sorted_values) - 1
+    low_values = sorted_values[np.minimum(offsets[:, None] + low, last)]
+    high_values = sorted_values[np.minimum(offsets[:, None] + high, last)]
+    table = low_values + (high_values - low_values) * (rank - low)
+    table[counts == 0] = np.nan
+    return counts, means, table
+
+
+def _distributions(
+    values: Dict[str, np.ndarray],
+    groups: np.ndarray,
+    n_groups: int,
+    percentiles: Sequence[int],
+) -> Dict[str, Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """grouped_distributions() for every metric over one dimension."""
+    result = {}
+    for metric, (order, sorted_values) in values.items():
+        # order sorts by value; a stable sort by group keeps values sorted within each group
+        group_of_value = groups[order]
+        by_group = np.argsort(group_of_value, kind="stable")
+        result[metric] = grouped_distributions(
+            sorted_values[by_group], group_of_value[by_group], n_groups, percentiles
+        )
+    return result
+
+
+def _label(dimension: str, key: object, client_names: Dict[int, str]) -> str:
+    if dimension == "total":
+        return "all"
+    if dimension == "category":
+        return get_category_label(key)
+    if dimension == "operator":
+        return str(key) if key else "—"
+    return client_names.get(key, f"#{key}")
+
+
+def compute_stats(
+    columns: TicketColumns,
+    calendar: BusinessCalendar,
+    since: datetime,
+    percentiles: Sequence[int] = PERCENTILES,
+    client_names: Optional[Dict[int, str]] = None,
+) -> StatsReport:
+    """
+    Distributions of every metric, overall and per category, operator and client.
+
+    Args:
+        columns: Ticket history (load_ticket_columns())
+        calendar: Support team business calendar
+        since: Start of the period (for the report header)
+        percentiles: Percentiles to compute (0-100)
+        client_names: Labels for the client dimension (id used otherwise)
+
+    Returns:
+        StatsReport
+    """
+    client_names = client_names or {}
+    per_ticket = durations(columns, calendar)
+    # Sort every metric once; dimensions only re-sort the (cheap) int group codes
+    values = {}
+    for metric, array in per_ticket.items():
+        order = np.flatnonzero(~np.isnan(array))
+        order = order[np.argsort(array[order])]
+        values[metric] = (order, array[order])
+
+    def build(codes: np.ndarray, keys: list, dimension: str) -> List[GroupStats]:
+        stats = _distributions(values, codes, len(keys), percentiles)
+        tickets = np.bincount(codes, minlength=len(keys))
+        groups = []
+        for code, key in enumerate(keys):
+            metrics = {
+                metric: Distribution(
+                    count=int(counts[code]),
+                    mean=float(means[code]),
+                    percentiles=tuple(float(v) for v in table[code]),
+                )
+                for metric, (counts, means, table) in stats.items()
+            }
+            groups.append(GroupStats(key, _label(dimension, key, client_names), int(tickets[code]), metrics))
+        groups.sort(key=lambda g: g.tickets, reverse=True)
+        return groups
+
+    return StatsReport(
+        since=since,
+        tickets=len(columns),
+        percentiles=tuple(percentiles),
+        total=build(np.zeros(len(columns), dtype=np.uint8), ["all"], "total")[0],
+        groups={d: build(columns.codes[d], columns.keys[d], d) for d in DIMENSIONS},
+    )
+
+
+async def build_stats_report(session: AsyncSession, months: int, calendar: BusinessCalendar) -> StatsReport:
+    """
+    Load the last `months` months of tickets and compute the report.
+
+    The NumPy part runs in a worker thread so a large history does not block the event loop.
+    The thread gets a snapshot of the calendar: extending the shared one there
+    would race with its readers on the loop (SLA timers, is_working_hours).
+    """
+    now = datetime.utcnow()
+    since = now - timedelta(days=30 * months)
+    columns = await load_ticket_columns(session, since)
+    client_names = await load_client_names(session, [int(k) for k in columns.keys.get("client", [])])
+    # Every timestamp of the columns is in [since, now]
+    snapshot = calendar.snapshot(_posix(since), _posix(now))
+    report = await asyncio.to_thread(compute_stats, columns, snapshot, since, PERCENTILES, client_names)
+    logger.info("Stats for %s months computed over %s tickets", months, report.tickets)
+    return report
+
+
+def report_to_csv(report: StatsReport) -> str:
+    """
+    Export the report as CSV: one row per (dimension, group, metric), durations in minutes.
+
+    The "total" dimension holds the whole period.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(
+        ["dimension", "key", "label", "tickets", "metric", "count", "mean_min"]
+        + [f"p{p}_min" for p in report.percentiles]
+    )
+    rows = [("total", report.total)] + [(d, g) for d in DIMENSIONS for g in report.groups[d]]
+    for dimension, group in rows:
+        for metric in METRICS:
+            distribution = group.metrics[metric]
+            minutes = [distribution.mean] + list(distribution.percentiles)
+            writer.writerow(
+                [dimension, group.key, group.label, group.tickets, metric, distribution.count]
+                + ["" if np.isnan(v) else round(v / 60, 1) for v in minutes]
+            )
+    return buffer.getvalue()
@@ -0,0 +1,262 @@
+"""
+"Awaiting reply" queue: open tickets where the client spoke last, longest waiting first.
+
+The queue mirrors tickets.awaiting_reply_since (app/database/counters.py) of
+new and in-progress tickets in memory, so /awaiting and the periodic digest
+never query messages or tickets. It is rebuilt from the database on startup
+(warm_up_awaiting_queue()) and updated after every saved message
+(on_message()) and status change (sync(), like the SLA scheduler).
+
+Entries live in a min-heap by waiting start. heapq cannot delete, so an
+operator reply only drops the ticket from the index; its heap entry becomes
+stale and is skipped (the heap is compacted once stale entries dominate).
+oldest(n) walks the heap as a tree from the root, so listing the n longest
+waiting tickets costs O(n log n) regardless of how many are open.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config.settings import settings
+from app.config.texts import Texts
+from app.database import operations as ops
+from app.database.models import Message, Ticket
+from app.services.business_calendar import get_calendar
+
+logger = logging.getLogger(__name__)
+
+# Statuses in which a waiting client is shown (on_hold is paused on purpose)
+AWAITING_STATUSES = ("new", "in_progress")
+
+# Tickets listed in one /awaiting or digest message
+DIGEST_LIMIT = 20
+
+# Compact when stale heap entries exceed live ones by this factor (plus slack)
+_COMPACT_FACTOR = 2
+_COMPACT_SLACK = 64
+
+# (waiting since, sequence, ticket id); sequence keeps ordering total
+_HeapEntry = Tuple[datetime, int, int]
+
+
+@dataclass(frozen=True)
+class AwaitingTicket:
+    """Open ticket whose client is waiting for an operator reply."""
+
+    ticket_id: int
+    number: int
+    since: datetime  # Naive UTC, first client message after the last operator reply
+    assigned_to: Optional[int]
+    support_chat_id: int
+    topic_id: Optional[int]
+
+    def waited_minutes(self, now: datetime) -> int:
+        return max(int((now - self.since).total_seconds() // 60), 0)
+
+
+class AwaitingReplyQueue:
+    """Min-heap of waiting tickets with an index of the live heap entry per ticket."""
+
+    def __init__(self) -> None:
+        self._heap: List[_HeapEntry] = []
+        self._sequence = itertools.count()
+        # ticket id -> (sequence of its live heap entry, details)
+        self._tickets: Dict[int, Tuple[int, AwaitingTicket]] = {}
+
+    def __len__(self) -> int:
+        """Number of waiting tickets."""
+        return len(self._tickets)
+
+    def sync(self, ticket: Ticket) -> None:
+        """Add, move or drop the ticket after a status change (from its stored awaiting_reply_since)."""
+        if ticket.status not in AWAITING_STATUSES or ticket.awaiting_reply_since is None:
+            self.discard(ticket.id)
+        else:
+            self._put(ticket, ticket.awaiting_reply_since)
+
+    def on_message(self, ticket: Ticket, message: Message) -> None:
+        """
+        Apply a saved message the way ops.create_message updates awaiting_reply_since.
+
+        Needs only the message, so a Ticket loaded before the message was saved is fine.
+        """
+        if message.direction == "operator":
+            self.discard(ticket.id)
+        elif message.direction == "client" and ticket.status in AWAITING_STATUSES:
+            # A follow-up keeps the original waiting start
+            current = self._tickets.get(ticket.id)
+            self._put(ticket, current[1].since if current is not None else message.created_at)
+
+    def _put(self, ticket: Ticket, since: datetime) -> None:
+        entry = AwaitingTicket(
+            ticket_id=ticket.id,
+            number=ticket.number,
+            since=since,
+            assigned_to=ticket.assigned_to_tg_user_id,
+            support_chat_id=ticket.support_chat_id,
+            topic_id=ticket.topic_id,
+        )
+        previous = self._tickets.get(ticket.id)
+        # Same waiting start: the heap entry stays valid, only the details changed
+        if previous is not None and previous[1].since == since:
+            self._tickets[ticket.id] = (previous[0], entry)
+            return
+        sequence = next(self._sequence)
+        self._tickets[ticket.id] = (sequence, entry)
+        heapq.heappush(self._heap, (since, sequence, ticket.id))
+        self._maybe_compact()
+
+    def discard(self, ticket_id: int) -> None:
+        """Drop the ticket (operator replied, paused, closed or cancelled)."""
+        if self._tickets.pop(ticket_id, None) is not None:
+            self._maybe_compact()
+
+    def oldest(self, limit: int, assigned_to: Optional[int] = None) -> List[AwaitingTicket]:
+        """
+        Longest waiting tickets first.
+
+        Args:
+            limit: Maximum tickets
+            assigned_to: Only tickets of this operator (all if None)
+        """
+        found: List[AwaitingTicket] = []
+        # Heap array as a tree: a child never waits longer than its parent
+        frontier: List[Tuple[_HeapEntry, int]] = [(self._heap[0], 0)] if self._heap else []
+        while frontier and len(found) < limit:
+            (_, sequence, ticket_id), index = heapq.heappop(frontier)
+            live = self._tickets.get(ticket_id)
+            if live is not None and live[0] == sequence:
+                if assigned_to is None or live[1].assigned_to == assigned_to:
+                    found.append(live[1])
+            for child in (2 * index + 1, 2 * index + 2):
+                if child < len(self._heap):
+                    heapq.heappush(frontier, (self._heap[child], child))
+        return found
+
+    def waiting_longer_than(self, since: datetime) -> int:
+        """Number of tickets waiting since before a moment."""
+        return sum(1 for _, entry in self._tickets.values() if entry.since <= since)
+
+    def _maybe_compact(self) -> None:
+        """Rebuild the heap without stale entries once they dominate it."""
+        if len(self._heap) > _COMPACT_FACTOR * len(self) + _COMPACT_SLACK:
+            self._heap = [(entry.since, sequence, ticket_id) for ticket_id, (sequence, entry) in self._tickets.items()]
+            heapq.heapify(self._heap)
+
+
+def format_awaiting(entries: List[AwaitingTicket], now: datetime) -> str:
+    """Lines of /awaiting and the digest, longest waiting first."""
+    return "\n".join(
+        Texts.awaiting_item(entry.number, entry.waited_minutes(now), entry.assigned_to is not None)
+        for entry in entries
+    )
+
+
+class AwaitingDigest:
+    """Periodic post of long-waiting tickets into the support group."""
+
+    def __init__(
+        self,
+        queue: AwaitingReplyQueue,
+        interval_minutes: int,
+        min_wait_minutes: int,
+        topic_id: Optional[int] = None,
+        clock: Callable[[], datetime] = datetime.utcnow,
+    ) -> None:
+        """
+        Args:
+            queue: Awaiting reply queue
+            interval_minutes: Minutes between digests (0 = off)
+            min_wait_minutes: Only tickets waiting at least this long
+            topic_id: Support group topic (General if None)
+            clock: Naive UTC time source
+        """
+        self.queue = queue
+        self.interval_minutes = interval_minutes
+        self.min_wait_minutes = min_wait_minutes
+        self.topic_id = topic_id
+        self._clock = clock
+        self._task: Optional[asyncio.Task] = None
+
+    def build(self) -> Optional[str]:
+        """Digest text, or None if nobody has waited long enough or it is outside business hours."""
+        now = self._clock()
+        if not get_calendar().is_business_time(now):
+            return None
+        threshold = now - timedelta(minutes=self.min_wait_minutes)
+        total = self.queue.waiting_longer_than(threshold)
+        if not total:
+            return None
+        entries = [entry for entry in self.queue.oldest(DIGEST_LIMIT) if entry.since <= threshold]
+        text = Texts.AWAITING_DIGEST_HEADER.format(minutes=self.min_wait_minutes, count=total)
+        text += "\n\n" + format_awaiting(entries, now)
+        if total > len(entries):
+            text += "\n" + Texts.AWAITING_MORE.format(count=total - len(entries))
+        return text
+
+    def start(self, bot: Bot) -> None:
+        """Start the digest task (call from a running event loop)."""
+        if not self.interval_minutes:
+            return
+        self._task = asyncio.create_task(self._run(bot), name="awaiting-digest")
+        logger.info("Awaiting reply digest every %s min", self.interval_minutes)
+
+    async def stop(self) -> None:
+        """Cancel the digest task."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self, bot: Bot) -> None:
+        while True:
+            await asyncio.sleep(self.interval_minutes * 60)
+            text = self.build()
+            if text is None:
+                continue
+            try:
+                await bot.send_message(
+                    chat_id=settings.support_chat_id,
+                    message_thread_id=self.topic_id,
+                    text=text,
+                    parse_mode="HTML",
+                )
+            except TelegramAPIError as e:
+                logger.warning("Failed to post awaiting reply digest: %s", e)
+
+
+async def warm_up_awaiting_queue(session: AsyncSession, queue: AwaitingReplyQueue) -> int:
+    """
+    Load waiting tickets from the database (after a restart).
+
+    Returns:
+        Number of waiting tickets
+    """
+    for ticket in await ops.get_tickets_awaiting_reply(session, datetime.utcnow(), limit=None):
+        queue.sync(ticket)
+    logger.info("Awaiting reply queue warmed up: %s tickets", len(queue))
+    return len(queue)
+
+
+# Global queue (warmed up in on_startup, updated after every message and status change)
+awaiting_queue = AwaitingReplyQueue()
+
+awaiting_digest = AwaitingDigest(
+    awaiting_queue,
+    interval_minutes=settings.awaiting_digest_minutes,
+    min_wait_minutes=settings.awaiting_digest_min_wait_minutes,
+    topic_id=settings.awaiting_digest_topic_id,
+)
@@ -0,0 +1,241 @@
+"""
+Business-hours calendar: deadlines and elapsed time in working hours.
+
+A BusinessCalendar precomputes the working intervals of one timezone
+(work days and hours from settings minus holidays) as UTC timestamps
+together with a cumulative table of business seconds before each
+interval. "created_at + N business hours" and "business time between two
+moments" are then a binary search over that table - O(log n), no
+day-by-day loops on the request path. DST is handled when intervals are
+built, by localizing each day's start and end.
+
+Calendars are cached per timezone name (get_calendar); the table covers
+HORIZON_DAYS around today and is extended when a query falls outside.
+"""
+
+import copy
+import logging
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, time, timedelta, timezone
+from functools import lru_cache
+from typing import Iterable, List, Optional, Tuple
+
+import pytz
+
+from app.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Days covered by a freshly built table (half before today, half after)
+HORIZON_DAYS = 730
+
+
+@lru_cache(maxsize=None)
+def get_tz(name: str) -> pytz.BaseTzInfo:
+    """pytz timezone by name, cached (pytz.timezone() re-reads its registry on every call)."""
+    return pytz.timezone(name)
+
+
+def _to_timestamp(moment: datetime) -> float:
+    """Naive UTC datetime (as stored in the database) -> POSIX timestamp."""
+    return moment.replace(tzinfo=timezone.utc).timestamp()
+
+
+def _from_timestamp(ts: float) -> datetime:
+    """POSIX timestamp -> naive UTC datetime."""
+    return datetime.fromtimestamp(ts, timezone.utc).replace(tzinfo=None)
+
+
+class BusinessCalendar:
+    """Working intervals of one timezone with cumulative business time."""
+
+    def __init__(
+        self,
+        tz_name: str,
+        work_days: Iterable[int],
+        start_hour: int,
+        end_hour: int,
+        holidays: Iterable[date] = (),
+        around: Optional[date] = None,
+    ) -> None:
+        """
+        Args:
+            tz_name: Timezone name (e.g. 'Europe/Madrid')
+            work_days: Working weekdays (1=Monday, 7=Sunday)
+            start_hour: Start of the working day (local hour)
+            end_hour: End of the working day (local hour, 24 = midnight)
+            holidays: Non-working dates (local)
+            around: Center of the initial table (today if not given)
+
+        Raises:
+            ValueError: No working time at all (empty days or start >= end)
+        """
+        self.work_days = frozenset(work_days)
+        if not self.work_days or not 0 <= start_hour < end_hour <= 24:
+            raise ValueError("Business calendar needs at least one work day and start_hour < end_hour")
+        self.tz_name = tz_name
+        self.tz = get_tz(tz_name)
+        self.start_hour = start_hour
+        self.end_hour = end_hour
+        self.holidays = frozenset(holidays)
+
+        center = around or date.today()
+        self._first_day = center - timedelta(days=HORIZON_DAYS // 2)
+        self._last_day = center + timedelta(days=HORIZON_DAYS // 2)
+        self._starts: List[float] = []
+        self._ends: List[float] = []
+        # Business seconds before interval i / up to the end of interval i
+        self._before: List[float] = []
+        self._through: List[float] = []
+        self._build()
+
+    def __len__(self) -> int:
+        """Number of working intervals in the table."""
+        return len(self._starts)
+
+    def _local_timestamp(self, day: date, hour: int) -> float:
+        if hour == 24:
+            day, hour = day + timedelta(days=1), 0
+        return self.tz.localize(datetime.combine(day, time(hour))).timestamp()
+
+    def _build(self) -> None:
+        """(Re)compute intervals for [_first_day, _last_day]."""
+        starts, ends, before, through = [], [], [], []
+        total = 0.0
+        day = self._first_day
+        while day <= self._last_day:
+            if day.isoweekday() in self.work_days and day not in self.holidays:
+                start = self._local_timestamp(day, self.start_hour)
+                end = self._local_timestamp(day, self.end_hour)
+                starts.append(start)
+                ends.append(end)
+                before.append(total)
+                total += end - start
+                through.append(total)
+            day += timedelta(days=1)
+        self._starts, self._ends, self._before, self._through = starts, ends, before, through
+        # Queries inside these bounds need no extension (a week of margin on each side)
+        margin = timedelta(days=7)
+        self._safe_from = self._local_timestamp(self._first_day + margin, 0)
+        self._safe_to = self._local_timestamp(self._last_day - margin, 0)
+
+    def _cover(self, ts: float) -> None:
+        """Extend the table so that ts lies inside it with a margin of a few days."""
+        if self._safe_from <= ts <= self._safe_to:
+            return
+        day = datetime.fromtimestamp(ts, self.tz).date()
+        self._first_day = min(self._first_day, day - timedelta(days=HORIZON_DAYS // 2))
+        self._last_day = max(self._last_day, day + timedelta(days=HORIZON_DAYS // 2))
+        logger.info("Business calendar %s extended to %s..%s", self.tz_name, self._first_day, self._last_day)
+        self._build()
+
+    def _business_seconds_before(self, ts: float) -> float:
+        """Business seconds from the start of the table up to ts."""
+        i = bisect_right(self._starts, ts) - 1
+        if i < 0:
+            return 0.0
+        return self._before[i] + min(ts, self._ends[i]) - self._starts[i]
+
+    def is_business_time(self, moment: datetime) -> bool:
+        """True if the naive UTC moment falls into working hours."""
+        return self.is_business_timestamp(_to_timestamp(moment))
+
+    def is_business_timestamp(self, ts: float) -> bool:
+        """True if the POSIX timestamp falls into working hours."""
+        self._cover(ts)
+        i = bisect_right(self._starts, ts) - 1
+        return i >= 0 and ts < self._ends[i]
+
+    def business_seconds_between(self, start: datetime, end: datetime) -> float:
+        """
+        Working time between two naive UTC moments.
+
+        Returns:
+            Seconds of working time (negative if end < start)
+        """
+        start_ts, end_ts = _to_timestamp(start), _to_timestamp(end)
+        self._cover(start_ts)
+        self._cover(end_ts)
+        return self._business_seconds_before(end_ts) - self._business_seconds_before(start_ts)
+
+    def intervals(self, first_ts: float, last_ts: float) -> Tuple[List[float], List[float], List[float]]:
+        """
+        Working intervals covering [first_ts, last_ts], for vectorized callers.
+
+        Business seconds up to a timestamp ts are
+        before[i] + min(ts, ends[i]) - starts[i] with i = bisect_right(starts, ts) - 1
+        (0 when i < 0).
+
+        Returns:
+            (starts, ends, before) - POSIX timestamps and cumulative business seconds
+        """
+        self._cover(first_ts)
+        self._cover(last_ts)
+        return self._starts, self._ends, self._before
+
+    def snapshot(self, first_ts: float, last_ts: float) -> "BusinessCalendar":
+        """
+        Private copy covering [first_ts, last_ts], for use in a worker thread.
+
+        Shared calendars (get_calendar) extend their table in place when a query
+        falls outside it. Call this on the event loop: the copy needs no extension
+        for the range, and a later extension of the shared calendar only replaces
+        its own lists (the copy keeps the old, consistent ones).
+        """
+        self._cover(first_ts)
+        self._cover(last_ts)
+        return copy.copy(self)
+
+    def add_business_time(self, start: datetime, seconds: float) -> datetime:
+        """
+        Moment when `seconds` of working time have passed since start.
+
+        A deadline that ends exactly at closing time stays at closing time
+        (not the next morning).
+
+        Args:
+            start: Naive UTC start
+            seconds: Working time to add (>= 0)
+
+        Returns:
+            Naive UTC deadline
+        """
+        start_ts = _to_timestamp(start)
+        self._cover(start_ts)
+        target = self._business_seconds_before(start_ts) + seconds
+        while not self._through or self._through[-1] < target:
+            # Deadline beyond the table (very long SLA or many holidays): extend forward
+            self._last_day += timedelta(days=HORIZON_DAYS // 2)
+            self._build()
+        i = bisect_left(self._through, target)
+        # max(): a zero duration started after closing time must not end before it started
+        return _from_timestamp(max(start_ts, self._starts[i] + target - self._before[i]))
+
+
+@lru_cache(maxsize=64)
+def _build_calendar(tz_name: str) -> BusinessCalendar:
+    return BusinessCalendar(
+        tz_name,
+        work_days=settings.work_days,
+        start_hour=settings.work_hours_start,
+        end_hour=settings.work_hours_end,
+        holidays=settings.work_holidays,
+    )
+
+
+def get_calendar(tz_name: Optional[str] = None) -> BusinessCalendar:
+    """
+    Cached business calendar for a timezone (working hours from settings).
+
+    Args:
+        tz_name: Timezone name; settings.timezone if empty or unknown
+
+    Returns:
+        BusinessCalendar shared by all callers with this timezone
+    """
+    name = tz_name or settings.timezone
+    try:
+        return _build_calendar(name)
+    except pytz.UnknownTimeZoneError:
+        logger.warning("Unknown timezone %r, using %s", name, settings.timezone)
+        return _build_calendar(settings.timezone)
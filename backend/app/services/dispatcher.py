@@ -0,0 +1,424 @@
+"""
+Automatic operator assignment (optional, AUTO_ASSIGN_ENABLED).
+
+Everything the dispatcher decides on is in memory:
+- unassigned new tickets in one min-heap per category, ordered urgent
+  first, then by SLA deadline (tickets without SLA last), then by arrival;
+- per-operator load (open tickets assigned to them) and category skills
+  (settings.operator_skills; no entry = every category);
+- availability: an operator opts in with /online, and nobody is assigned
+  outside the support team's business hours.
+
+Operators sit in one min-heap by load per skill category plus one for
+generalists, so picking the least loaded available operator for a ticket is
+O(log n). A planning pass only looks at the heads of the ticket heaps whose
+category somebody can take and stops once every operator is full, so each
+decision is O(categories + log n) however long the backlog. Like the SLA
+scheduler, heaps are never searched: a change of load or availability pushes
+a fresh entry and older ones are skipped when popped, and a heap is rebuilt
+once stale entries dominate it.
+
+The state is rebuilt from open tickets on startup (warm_up_dispatcher()) and
+kept current by sync(ticket) / discard(ticket_id), called through
+app.services.lifecycle with the other in-memory indexes. The database is
+only touched to apply a decision: ops.assign_ticket() is a compare-and-set
+UPDATE, so a ticket taken manually in the meantime is simply skipped.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import math
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config.settings import settings
+from app.config.texts import Texts
+from app.database import operations as ops
+from app.database.connection import DatabaseSessionManager
+from app.database.models import Ticket
+from app.services.business_calendar import get_calendar
+
+logger = logging.getLogger(__name__)
+
+# Statuses that count towards an operator's load
+LOAD_STATUSES = ("in_progress", "on_hold")
+
+# Re-check availability at least this often (business hours start and end)
+IDLE_RECHECK_SECONDS = 60
+
+# Heap key of operators without configured skills
+_ANY_CATEGORY = "*"
+
+# Rebuild a heap once it holds more than FACTOR * live + SLACK entries
+_COMPACT_FACTOR = 2
+_COMPACT_SLACK = 64
+
+# (urgent first, SLA deadline, sequence, ticket id)
+_TicketEntry = Tuple[int, float, int, int]
+# (load, version, operator id)
+_OperatorEntry = Tuple[int, int, int]
+
+
+@dataclass
+class QueuedTicket:
+    """Unassigned ticket waiting for auto-assignment."""
+
+    ticket_id: int
+    number: int
+    category: str
+    priority: str
+    sla_due_at: Optional[datetime]
+    support_chat_id: int
+    topic_id: Optional[int]
+    client_tg_user_id: int
+    sequence: int = 0
+
+    @property
+    def key(self) -> _TicketEntry:
+        due = self.sla_due_at.replace(tzinfo=timezone.utc).timestamp() if self.sla_due_at else math.inf
+        return (0 if self.priority == "urgent" else 1, due, self.sequence, self.ticket_id)
+
+
+@dataclass
+class OperatorState:
+    """Load, skills and availability of one operator."""
+
+    operator_id: int
+    skills: Tuple[str, ...]  # Empty = every category
+    online: bool = False
+    username: Optional[str] = None
+    load: int = 0
+    version: int = 0
+
+
+@dataclass(frozen=True)
+class Assignment:
+    """A dispatch decision (not yet applied)."""
+
+    ticket: QueuedTicket
+    operator_id: int
+
+
+def parse_operator_skills(raw: str) -> Dict[int, Tuple[str, ...]]:
+    """
+    Parse settings.operator_skills: '111:report,billing;222:access'.
+
+    Malformed parts are ignored.
+    """
+    skills: Dict[int, Tuple[str, ...]] = {}
+    for part in raw.split(";"):
+        operator_id, _, categories = part.partition(":")
+        if operator_id.strip().isdigit():
+            skills[int(operator_id)] = tuple(c.strip() for c in categories.split(",") if c.strip())
+    return skills
+
+
+class Dispatcher:
+    """Unassigned-ticket queue plus operator load index."""
+
+    def __init__(
+        self,
+        max_load: int,
+        skills: Optional[Dict[int, Sequence[str]]] = None,
+        is_business_time: Optional[Callable[[datetime], bool]] = None,
+    ) -> None:
+        """
+        Args:
+            max_load: Open tickets per operator above which nothing is auto-assigned to them
+            skills: Operator ID -> categories they handle (missing = every category)
+            is_business_time: Naive UTC -> bool (support team calendar if None)
+        """
+        self.max_load = max_load
+        self._skills = {operator_id: tuple(categories) for operator_id, categories in (skills or {}).items()}
+        self._is_business_time = is_business_time
+        self._sequence = itertools.count()
+        self._versions = itertools.count(1)
+        # Unassigned tickets, one heap per category
+        self._queues: Dict[str, List[_TicketEntry]] = {}
+        self._queued: Dict[int, QueuedTicket] = {}
+        # Operators
+        self._operators: Dict[int, OperatorState] = {}
+        self._by_category: Dict[str, List[_OperatorEntry]] = {}
+        # ticket id -> operator id, for open assigned tickets (the load)
+        self._assigned: Dict[int, int] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def __len__(self) -> int:
+        """Number of queued unassigned tickets."""
+        return len(self._queued)
+
+    # ------------------------------------------------------------------
+    # Tickets
+    # ------------------------------------------------------------------
+
+    def sync(self, ticket: Ticket) -> None:
+        """Update queue and load after a ticket was created or changed status/assignee."""
+        self._unassign(ticket.id)
+        if ticket.status == "new" and ticket.assigned_to_tg_user_id is None:
+            self._enqueue(ticket)
+        else:
+            self._queued.pop(ticket.id, None)
+            if ticket.status in LOAD_STATUSES and ticket.assigned_to_tg_user_id is not None:
+                self._assign(ticket.id, ticket.assigned_to_tg_user_id)
+
+    def discard(self, ticket_id: int) -> None:
+        """Forget a closed or cancelled ticket."""
+        self._queued.pop(ticket_id, None)
+        self._unassign(ticket_id)
+
+    def _enqueue(self, ticket: Ticket) -> None:
+        previous = self._queued.get(ticket.id)
+        entry = QueuedTicket(
+            ticket_id=ticket.id,
+            number=ticket.number,
+            category=ticket.category,
+            priority=ticket.priority,
+            sla_due_at=ticket.sla_due_at,
+            support_chat_id=ticket.support_chat_id,
+            topic_id=ticket.topic_id,
+            client_tg_user_id=ticket.tg_user_id,
+            # A re-synced ticket keeps its place among equal priorities
+            sequence=previous.sequence if previous is not None else next(self._sequence),
+        )
+        self._queued[ticket.id] = entry
+        if previous is None or previous.key != entry.key or previous.category != entry.category:
+            heapq.heappush(self._queues.setdefault(entry.category, []), entry.key)
+            self._maybe_compact_tickets(entry.category)
+            self._wake()
+
+    def _maybe_compact_tickets(self, category: str) -> None:
+        """Rebuild a category's ticket heap without stale entries once they dominate it."""
+        if len(self._queues[category]) > _COMPACT_FACTOR * len(self._queued) + _COMPACT_SLACK:
+            heap = [entry.key for entry in self._queued.values() if entry.category == category]
+            heapq.heapify(heap)
+            self._queues[category] = heap
+
+    def _head(self, category: str) -> Optional[QueuedTicket]:
+        """Highest priority queued ticket of a category (stale entries dropped)."""
+        heap = self._queues.get(category)
+        while heap:
+            entry = self._queued.get(heap[0][3])
+            if entry is not None and entry.key == heap[0] and entry.category == category:
+                return entry
+            heapq.heappop(heap)
+        self._queues.pop(category, None)
+        return None
+
+    def _next_ticket(self) -> Optional[QueuedTicket]:
+        """Highest priority queued ticket somebody can take now (left in the queue)."""
+        best: Optional[QueuedTicket] = None
+        for category in list(self._queues):
+            entry = self._head(category)
+            if entry is not None and (best is None or entry.key < best.key) and self.pick(category) is not None:
+                best = entry
+        return best
+
+    # ------------------------------------------------------------------
+    # Operators
+    # ------------------------------------------------------------------
+
+    def operator(self, operator_id: int) -> OperatorState:
+        """State of an operator (created on first use)."""
+        state = self._operators.get(operator_id)
+        if state is None:
+            state = OperatorState(operator_id, self._skills.get(operator_id, ()))
+            self._operators[operator_id] = state
+        return state
+
+    def set_online(self, operator_id: int, online: bool, username: Optional[str] = None) -> OperatorState:
+        """Opt an operator in or out of auto-assignment (/online)."""
+        state = self.operator(operator_id)
+        state.online = online
+        if username:
+            state.username = username
+        self._publish(state)
+        return state
+
+    def _assign(self, ticket_id: int, operator_id: int) -> None:
+        self._assigned[ticket_id] = operator_id
+        state = self.operator(operator_id)
+        state.load += 1
+        self._publish(state)
+
+    def _unassign(self, ticket_id: int) -> None:
+        operator_id = self._assigned.pop(ticket_id, None)
+        if operator_id is not None:
+            state = self._operators[operator_id]
+            state.load -= 1
+            self._publish(state)
+
+    def _publish(self, state: OperatorState) -> None:
+        """Invalidate the operator's heap entries and push current ones if they can take tickets."""
+        state.version = next(self._versions)
+        if not state.online or state.load >= self.max_load:
+            return
+        for category in state.skills or (_ANY_CATEGORY,):
+            heapq.heappush(self._by_category.setdefault(category, []), (state.load, state.version, state.operator_id))
+            self._maybe_compact_operators(category)
+        self._wake()
+
+    def _top(self, category: str) -> Optional[_OperatorEntry]:
+        """Least loaded available operator entry for one heap key (stale entries dropped)."""
+        heap = self._by_category.get(category)
+        while heap:
+            _, version, operator_id = heap[0]
+            if self._operators[operator_id].version == version:
+                return heap[0]
+            heapq.heappop(heap)
+        return None
+
+    def _maybe_compact_operators(self, category: str) -> None:
+        """Rebuild a category's operator heap without stale entries once they dominate it."""
+        if len(self._by_category[category]) > _COMPACT_FACTOR * len(self._operators) + _COMPACT_SLACK:
+            heap = [
+                (state.load, state.version, state.operator_id)
+                for state in self._operators.values()
+                if state.online and state.load < self.max_load and category in (state.skills or (_ANY_CATEGORY,))
+            ]
+            heapq.heapify(heap)
+            self._by_category[category] = heap
+
+    def has_capacity(self) -> bool:
+        """Whether any online operator can take another ticket."""
+        return any(self._top(category) is not None for category in list(self._by_category))
+
+    def pick(self, category: str) -> Optional[int]:
+        """Least loaded online operator who handles the category, or None."""
+        candidates = [entry for entry in (self._top(category), self._top(_ANY_CATEGORY)) if entry is not None]
+        return min(candidates)[2] if candidates else None
+
+    # ------------------------------------------------------------------
+    # Decisions
+    # ------------------------------------------------------------------
+
+    def plan(self, now: Optional[datetime] = None) -> List[Assignment]:
+        """
+        Match queued tickets to operators, highest priority first.
+
+        Chosen operators are charged immediately (so one pass spreads the
+        load); tickets nobody can take now are not touched. The pass ends as
+        soon as every operator is full or no queued category has anybody left.
+        """
+        is_business_time = self._is_business_time or get_calendar().is_business_time
+        if not self._queued or not self.has_capacity() or not is_business_time(now or datetime.utcnow()):
+            return []
+        decisions: List[Assignment] = []
+        while self.has_capacity():
+            entry = self._next_ticket()
+            if entry is None:
+                break
+            heapq.heappop(self._queues[entry.category])
+            del self._queued[entry.ticket_id]
+            operator_id = self.pick(entry.category)
+            self._assign(entry.ticket_id, operator_id)
+            decisions.append(Assignment(entry, operator_id))
+        return decisions
+
+    def cancel(self, decision: Assignment) -> None:
+        """Undo a decision that could not be applied (the ticket changed meanwhile)."""
+        if self._assigned.get(decision.ticket.ticket_id) == decision.operator_id:
+            self._unassign(decision.ticket.ticket_id)
+
+    # ------------------------------------------------------------------
+    # Background task
+    # ------------------------------------------------------------------
+
+    def _wake(self) -> None:
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def start(self, bot: Bot) -> None:
+        """Start the dispatch task (call from a running event loop)."""
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run(bot), name="dispatcher")
+        logger.info("Dispatcher started with %s unassigned tickets", len(self))
+
+    async def stop(self) -> None:
+        """Cancel the dispatch task."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self, bot: Bot) -> None:
+        """Dispatch whenever tickets or operators change (and periodically for business hours)."""
+        while True:
+            self._wakeup.clear()
+            for decision in self.plan():
+                try:
+                    await self._apply(bot, decision)
+                except Exception:
+                    self.cancel(decision)
+                    logger.exception("Auto-assignment of ticket %s failed", decision.ticket.ticket_id)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), IDLE_RECHECK_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _apply(self, bot: Bot, decision: Assignment) -> None:
+        """Assign in the database, then tell the topic and the client."""
+        from app.bot.keyboards.operator import get_ticket_inprogress_keyboard
+        from app.services.lifecycle import on_ticket_changed
+        from app.services.notification import NotificationService
+
+        queued = decision.ticket
+        async with DatabaseSessionManager() as session:
+            ticket = await ops.assign_ticket(session, queued.ticket_id, decision.operator_id, "new", None)
+            if ticket is None:
+                # Taken manually, cancelled or deleted meanwhile; its own sync() fixes the state
+                self.cancel(decision)
+                logger.info("Ticket #%s changed before auto-assignment", queued.number)
+                return
+            on_ticket_changed(ticket)
+            logger.info("Ticket #%s auto-assigned to %s", queued.number, decision.operator_id)
+
+            state = self.operator(decision.operator_id)
+            if queued.topic_id:
+                try:
+                    await bot.send_message(
+                        chat_id=queued.support_chat_id,
+                        message_thread_id=queued.topic_id,
+                        text=Texts.auto_assigned(queued.number, state.username, decision.operator_id),
+                        reply_markup=get_ticket_inprogress_keyboard(queued.ticket_id),
+                    )
+                except TelegramAPIError as e:
+                    logger.warning("Failed to post auto-assignment of ticket #%s: %s", queued.number, e)
+            try:
+                await NotificationService(bot, session).notify_client_ticket_status(
+                    queued.client_tg_user_id, queued.number, "in_progress"
+                )
+            except Exception as e:
+                logger.warning("Failed to notify client of auto-assignment: %s", e)
+
+
+async def warm_up_dispatcher(session: AsyncSession, dispatcher: Dispatcher) -> int:
+    """
+    Load unassigned tickets and operator loads from open tickets (after a restart).
+
+    Returns:
+        Number of queued tickets
+    """
+    tickets = await ops.get_open_tickets_since(session, datetime.min)
+    for ticket in tickets:
+        dispatcher.sync(ticket)
+    logger.info("Dispatcher warmed up: %s unassigned of %s open tickets", len(dispatcher), len(tickets))
+    return len(dispatcher)
+
+
+# Global dispatcher (tracks state always; assigns only when started with AUTO_ASSIGN_ENABLED)
+dispatcher = Dispatcher(
+    max_load=settings.auto_assign_max_load,
+    skills=parse_operator_skills(settings.operator_skills),
+)
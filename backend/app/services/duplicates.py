@@ -0,0 +1,200 @@
+"""
+Near-duplicate detection for new tickets (MinHash over character shingles).
+
+Users of one client often report the same incident minutes apart. Every
+open ticket description is reduced to a bottom-k MinHash sketch (the k
+smallest hashes of its 4-character shingles) and kept in memory for a
+sliding time window. A new description is compared only with tickets of
+the same client that share at least one sketch hash, so a lookup touches
+k dict entries and a handful of candidates.
+
+Hashes come from Python's hash() (randomized per process); the index is
+rebuilt from the database on startup by warm_up_duplicate_index().
+"""
+
+import heapq
+import logging
+import re
+import time
+from collections import Counter, deque
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Deque, Dict, List, Sequence, Set, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config.settings import settings
+from app.database import operations as ops
+
+logger = logging.getLogger(__name__)
+
+SHINGLE_SIZE = 4
+NUM_HASHES = 32
+MAX_ENTRIES = 10_000
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+_MASK = (1 << 64) - 1
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> Set[str]:
+    """Character shingles of the text with case and punctuation normalized."""
+    normalized = " ".join(_WORD_RE.findall(text.lower()))
+    if len(normalized) <= size:
+        return {normalized} if normalized else set()
+    return {normalized[i:i + size] for i in range(len(normalized) - size + 1)}
+
+
+def sketch(text: str, num_hashes: int = NUM_HASHES) -> Tuple[int, ...]:
+    """Bottom-k MinHash sketch: the num_hashes smallest shingle hashes, ascending."""
+    return tuple(heapq.nsmallest(num_hashes, {hash(s) & _MASK for s in shingles(text)}))
+
+
+def estimate_similarity(a: Sequence[int], b: Sequence[int], num_hashes: int = NUM_HASHES) -> float:
+    """
+    Estimate Jaccard similarity of two texts from their sketches.
+
+    Exact when both texts have fewer than num_hashes shingles.
+    """
+    if not a or not b:
+        return 0.0
+    a_set, b_set = set(a), set(b)
+    union = heapq.nsmallest(num_hashes, a_set | b_set)
+    return sum(1 for h in union if h in a_set and h in b_set) / len(union)
+
+
+@dataclass
+class DuplicateMatch:
+    """Open ticket similar to a new description."""
+
+    ticket_id: int
+    number: int
+    similarity: float
+
+
+@dataclass
+class _Entry:
+    ticket_id: int
+    number: int
+    client_id: int
+    sketch: Tuple[int, ...]
+    added_at: float
+
+
+class DuplicateIndex:
+    """Sliding-window MinHash index of open ticket descriptions, per client."""
+
+    def __init__(
+        self,
+        window_seconds: float,
+        threshold: float,
+        num_hashes: int = NUM_HASHES,
+        max_entries: int = MAX_ENTRIES,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Args:
+            window_seconds: Tickets older than this are forgotten
+            threshold: Minimum estimated Jaccard similarity to report
+            num_hashes: Sketch size (accuracy vs memory)
+            max_entries: Hard cap on indexed tickets (oldest evicted first)
+            clock: Monotonic time source (seconds)
+        """
+        self.window_seconds = window_seconds
+        self.threshold = threshold
+        self.num_hashes = num_hashes
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: Dict[int, _Entry] = {}
+        # (client_id, sketch hash) -> ticket ids (lists: a few ids each, cheaper than sets)
+        self._postings: Dict[Tuple[int, int], List[int]] = {}
+        self._order: Deque[_Entry] = deque()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, ticket_id: int, number: int, client_id: int, text: str, age_seconds: float = 0.0) -> None:
+        """Index a ticket description (age_seconds: how long ago the ticket was created)."""
+        self.discard(ticket_id)
+        entry = _Entry(ticket_id, number, client_id, sketch(text, self.num_hashes), self._clock() - age_seconds)
+        if not entry.sketch:
+            return
+        self._entries[ticket_id] = entry
+        self._order.append(entry)
+        for h in entry.sketch:
+            self._postings.setdefault((client_id, h), []).append(ticket_id)
+        self._expire()
+
+    def discard(self, ticket_id: int) -> None:
+        """Forget a ticket (closed or cancelled); no-op if not indexed."""
+        entry = self._entries.pop(ticket_id, None)
+        if entry is None:
+            return
+        for h in entry.sketch:
+            key = (entry.client_id, h)
+            ids = self._postings.get(key)
+            if ids is not None and ticket_id in ids:
+                ids.remove(ticket_id)
+                if not ids:
+                    del self._postings[key]
+        # The deque keeps the stale entry until it expires; _expire skips it
+
+    def find(self, client_id: int, text: str, limit: int = 3) -> List[DuplicateMatch]:
+        """
+        Open tickets of the client whose description is similar to text.
+
+        Returns:
+            Up to limit matches, most similar first
+        """
+        self._expire()
+        query = sketch(text, self.num_hashes)
+        shared: Counter = Counter()
+        for h in query:
+            ids = self._postings.get((client_id, h))
+            if ids:
+                shared.update(ids)
+
+        # The union sketch is at least as large as the query sketch, so similarity >= threshold
+        # needs at least threshold * len(query) shared hashes; skip the estimate below that
+        min_shared = self.threshold * len(query) - 1e-9
+        matches = []
+        for ticket_id, count in shared.items():
+            if count < min_shared:
+                continue
+            entry = self._entries[ticket_id]
+            similarity = estimate_similarity(query, entry.sketch, self.num_hashes)
+            if similarity >= self.threshold:
+                matches.append(DuplicateMatch(ticket_id, entry.number, round(similarity, 2)))
+        matches.sort(key=lambda match: (-match.similarity, -match.ticket_id))
+        return matches[:limit]
+
+    def _expire(self) -> None:
+        """Drop entries older than the window and enforce max_entries."""
+        cutoff = self._clock() - self.window_seconds
+        while self._order and (self._order[0].added_at < cutoff or len(self._entries) > self.max_entries):
+            entry = self._order.popleft()
+            if self._entries.get(entry.ticket_id) is entry:
+                self.discard(entry.ticket_id)
+
+
+async def warm_up_duplicate_index(session: AsyncSession, index: DuplicateIndex) -> int:
+    """
+    Load open tickets created within the window (after a restart).
+
+    Returns:
+        Number of indexed tickets
+    """
+    now = datetime.utcnow()
+    tickets = await ops.get_open_tickets_since(session, now - timedelta(seconds=index.window_seconds))
+    for ticket in tickets:
+        if ticket.description:
+            age = (now - ticket.created_at).total_seconds()
+            index.add(ticket.id, ticket.number, ticket.project.client_id, ticket.description, age)
+    logger.info("Duplicate index warmed up with %s open tickets", len(index))
+    return len(index)
+
+
+# Global index (queried and filled on ticket submission, kept current by app.services.lifecycle)
+duplicate_index = DuplicateIndex(
+    window_seconds=settings.duplicate_window_hours * 3600,
+    threshold=settings.duplicate_threshold,
+)
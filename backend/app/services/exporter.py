@@ -0,0 +1,280 @@
+"""
+Streaming export of tickets (with project, client and feedback) and messages.
+
+Rows are read with server-side iteration (session.stream + yield_per) and
+written chunk by chunk to CSV or Parquet, so memory stays constant however
+large the table is. Reads go in id windows, each in its own short
+transaction: SQLite runs in rollback-journal mode, where a reader holding
+the database for minutes would block the bot's writers.
+
+Incremental exports keep a watermark per dataset in a JSON state file:
+messages are immutable and resume after the last exported id; tickets
+change (status, feedback), so they are re-exported when updated after the
+previous export started (at-least-once, consumers should upsert by id).
+"""
+
+import csv
+import json
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Select, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.database.models import Client, Feedback, Message, Project, Ticket
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 10_000
+# Rows per read transaction; the write lock is free between windows
+DEFAULT_WINDOW = 100_000
+FORMATS = ("csv", "parquet")
+
+# (output column, type) — type drives the Parquet schema
+Column = Tuple[str, str]
+
+TICKET_COLUMNS: List[Column] = [
+    ("id", "int"), ("number", "int"), ("status", "str"), ("priority", "str"), ("category", "str"),
+    ("client_id", "int"), ("client_name", "str"), ("project_id", "int"), ("project_name", "str"),
+    ("tg_user_id", "int"), ("assigned_to_tg_user_id", "int"), ("description", "str"),
+    ("created_at", "datetime"), ("updated_at", "datetime"), ("first_response_at", "datetime"),
+    ("closed_at", "datetime"), ("csat", "str"), ("speed_rating", "int"), ("quality_rating", "int"),
+    ("politeness_rating", "int"), ("feedback_comment", "str"), ("feedback_at", "datetime"),
+]
+
+MESSAGE_COLUMNS: List[Column] = [
+    ("id", "int"), ("ticket_id", "int"), ("direction", "str"), ("type", "str"), ("content", "str"),
+    ("file_id", "str"), ("author_tg_user_id", "int"), ("created_at", "datetime"),
+]
+
+
+class ExportError(RuntimeError):
+    """Export cannot run (e.g. Parquet requested without pyarrow)."""
+
+
+@dataclass
+class ExportFilter:
+    """Date range on created_at and incremental watermarks."""
+
+    since: Optional[datetime] = None
+    until: Optional[datetime] = None
+    after_id: int = 0
+    changed_since: Optional[datetime] = None
+
+
+@dataclass
+class ExportResult:
+    """Outcome of one dataset export."""
+
+    dataset: str
+    path: Path
+    rows: int
+    last_id: int
+
+
+def _tickets_query(filters: ExportFilter) -> Select:
+    stmt = (
+        select(
+            Ticket.id, Ticket.number, Ticket.status, Ticket.priority, Ticket.category,
+            Client.id, Client.name, Project.id, Project.name,
+            Ticket.tg_user_id, Ticket.assigned_to_tg_user_id, Ticket.description,
+            Ticket.created_at, Ticket.updated_at, Ticket.first_response_at, Ticket.closed_at,
+            Feedback.csat, Feedback.speed_rating, Feedback.quality_rating, Feedback.politeness_rating,
+            Feedback.comment, Feedback.created_at,
+        )
+        .join(Project, Project.id == Ticket.project_id)
+        .join(Client, Client.id == Project.client_id)
+        .outerjoin(Feedback, Feedback.ticket_id == Ticket.id)
+    )
+    if filters.since:
+        stmt = stmt.where(Ticket.created_at >= filters.since)
+    if filters.until:
+        stmt = stmt.where(Ticket.created_at < filters.until)
+    if filters.changed_since:
+        stmt = stmt.where(
+            or_(Ticket.updated_at >= filters.changed_since, Feedback.created_at >= filters.changed_since)
+        )
+    return stmt
+
+
+def _messages_query(filters: ExportFilter) -> Select:
+    stmt = select(
+        Message.id, Message.ticket_id, Message.direction, Message.type, Message.content,
+        Message.file_id, Message.author_tg_user_id, Message.created_at,
+    )
+    if filters.since:
+        stmt = stmt.where(Message.created_at >= filters.since)
+    if filters.until:
+        stmt = stmt.where(Message.created_at < filters.until)
+    return stmt
+
+
+# dataset -> (query builder, key column for windows, output columns)
+DATASETS: Dict[str, Tuple[Any, Any, List[Column]]] = {
+    "tickets": (_tickets_query, Ticket.id, TICKET_COLUMNS),
+    "messages": (_messages_query, Message.id, MESSAGE_COLUMNS),
+}
+
+
+class CsvWriter:
+    """Append rows to a CSV file with a header."""
+
+    def __init__(self, path: Path, columns: List[Column]) -> None:
+        self._file = path.open("w", encoding="utf-8", newline="")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow([name for name, _ in columns])
+
+    def write(self, rows: Sequence[Sequence[Any]]) -> None:
+        self._writer.writerows(rows)
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class ParquetWriter:
+    """Write each chunk as one Parquet row group (requires pyarrow)."""
+
+    def __init__(self, path: Path, columns: List[Column]) -> None:
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ExportError("Parquet export requires pyarrow: pip install pyarrow") from e
+
+        types = {"int": pa.int64(), "str": pa.string(), "datetime": pa.timestamp("us")}
+        self._pa = pa
+        self._schema = pa.schema([(name, types[kind]) for name, kind in columns])
+        self._writer = pq.ParquetWriter(str(path), self._schema, compression="zstd")
+
+    def write(self, rows: Sequence[Sequence[Any]]) -> None:
+        arrays = [
+            self._pa.array([row[i] for row in rows], type=column.type)
+            for i, column in enumerate(self._schema)
+        ]
+        self._writer.write_table(self._pa.Table.from_arrays(arrays, schema=self._schema))
+
+    def close(self) -> None:
+        self._writer.close()
+
+
+def open_writer(path: Path, fmt: str, columns: List[Column]) -> Any:
+    """Create CsvWriter or ParquetWriter for format name."""
+    if fmt == "csv":
+        return CsvWriter(path, columns)
+    if fmt == "parquet":
+        return ParquetWriter(path, columns)
+    raise ExportError(f"Unknown format {fmt!r} (expected one of {', '.join(FORMATS)})")
+
+
+async def export_dataset(
+    session_factory: async_sessionmaker[AsyncSession],
+    dataset: str,
+    path: Path,
+    fmt: str = "csv",
+    filters: Optional[ExportFilter] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    window: int = DEFAULT_WINDOW,
+) -> ExportResult:
+    """
+    Stream one dataset into a file.
+
+    Args:
+        session_factory: Session factory of the database to read
+        dataset: "tickets" or "messages"
+        path: Output file
+        fmt: "csv" or "parquet"
+        filters: Date range / watermarks
+        chunk_size: Rows fetched and written per batch (yield_per)
+        window: Rows per read transaction (keyset window by id)
+
+    Returns:
+        ExportResult with row count and the last exported id
+    """
+    build_query, key, columns = DATASETS[dataset]
+    filters = filters or ExportFilter()
+    query = build_query(filters)
+    writer = open_writer(path, fmt, columns)
+    rows = 0
+    last_id = filters.after_id
+    try:
+        while True:
+            window_rows = 0
+            # Short transaction per window so writers are not blocked for the whole export
+            async with session_factory() as session:
+                result = await session.stream(
+                    query.where(key > last_id).order_by(key).limit(window)
+                    .execution_options(yield_per=chunk_size)
+                )
+                async for partition in result.partitions():
+                    writer.write(partition)
+                    window_rows += len(partition)
+                    last_id = partition[-1][0]
+            rows += window_rows
+            if window_rows < window:
+                break
+    finally:
+        writer.close()
+
+    logger.info("Exported %s %s rows to %s", rows, dataset, path)
+    return ExportResult(dataset=dataset, path=path, rows=rows, last_id=last_id)
+
+
+async def database_now(session_factory: async_sessionmaker[AsyncSession]) -> datetime:
+    """Current time on the database clock (same clock as func.now() defaults)."""
+    async with session_factory() as session:
+        value = await session.scalar(select(func.now()))
+    return value if isinstance(value, datetime) else datetime.fromisoformat(str(value))
+
+
+def load_state(path: Path) -> Dict[str, Any]:
+    """Read incremental export state ({} if the file does not exist)."""
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def save_state(path: Path, state: Dict[str, Any]) -> None:
+    """Write incremental export state atomically."""
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(json.dumps(state, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+    tmp.replace(path)
+
+
+async def export_incremental(
+    session_factory: async_sessionmaker[AsyncSession],
+    dataset: str,
+    path: Path,
+    state: Dict[str, Any],
+    fmt: str = "csv",
+    filters: Optional[ExportFilter] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    window: int = DEFAULT_WINDOW,
+) -> ExportResult:
+    """
+    Export rows new or changed since the previous run and advance state.
+
+    Args:
+        state: Mutable state dict (see load_state/save_state), updated in place
+
+    Returns:
+        ExportResult of this run
+    """
+    filters = filters or ExportFilter()
+    previous = state.get(dataset, {})
+    started = await database_now(session_factory)
+    if dataset == "messages":
+        filters.after_id = previous.get("last_id", 0)
+    elif previous.get("started_at"):
+        filters.changed_since = datetime.fromisoformat(previous["started_at"])
+
+    result = await export_dataset(session_factory, dataset, path, fmt, filters, chunk_size, window)
+    state[dataset] = {
+        "last_id": max(result.last_id, previous.get("last_id", 0)),
+        "started_at": started.isoformat(sep=" "),
+        "rows": result.rows,
+        "file": str(path),
+    }
+    return result
@@ -0,0 +1,362 @@
+"""
+Bulk importer for clients, projects, invite codes and predefined users.
+
+Input is a CSV (header row) or JSONL file with one record per row:
+
+    client,project,invite_code,username
+    Acme Inc,Analytics,ACME001,
+    Acme Inc,,,john_doe
+
+Every row names a client; project (+ optional invite_code) and/or
+username attach a project or a predefined user to it. Rows are streamed
+and upserted in chunks, one transaction per chunk: clients are matched by
+name, projects by (client, name), predefined users by username.
+"""
+
+import csv
+import json
+import logging
+import re
+from dataclasses import dataclass, field
+from itertools import islice
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database.models import Client, PredefinedUser, Project
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 5000
+MAX_REPORTED_ERRORS = 50
+
+# Telegram usernames: 5-32 chars, letters/digits/underscore, starting with a letter
+USERNAME_RE = re.compile(r"^[a-z][a-z0-9_]{4,31}$")
+# Deep-link payload alphabet; Project.invite_code is String(50)
+INVITE_CODE_RE = re.compile(r"^[A-Za-z0-9_-]{1,50}$")
+
+
+class ImportFormatError(ValueError):
+    """Input file has an unsupported format or missing columns."""
+
+
+@dataclass
+class ImportRow:
+    """One validated input record."""
+
+    line: int
+    client: str
+    project: Optional[str] = None
+    invite_code: Optional[str] = None
+    username: Optional[str] = None
+
+
+@dataclass
+class EntityCounts:
+    """Upsert outcome for one table."""
+
+    inserted: int = 0
+    updated: int = 0
+    skipped: int = 0
+
+
+@dataclass
+class ImportReport:
+    """Outcome of an import run."""
+
+    clients: EntityCounts = field(default_factory=EntityCounts)
+    projects: EntityCounts = field(default_factory=EntityCounts)
+    predefined_users: EntityCounts = field(default_factory=EntityCounts)
+    rejected: int = 0
+    errors: List[str] = field(default_factory=list)
+
+    def add_error(self, message: str) -> None:
+        """Record an error (only the first MAX_REPORTED_ERRORS are kept)."""
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(message)
+
+
+@dataclass
+class _ImportState:
+    """Lookups carried across chunks."""
+
+    client_ids: Dict[str, int] = field(default_factory=dict)
+    loaded_clients: Set[int] = field(default_factory=set)
+    # (client_id, project name) -> [project id, invite code]
+    projects: Dict[Tuple[int, str], List] = field(default_factory=dict)
+
+
+def _clean(value: Optional[object]) -> Optional[str]:
+    """Strip value; empty -> None."""
+    if value is None:
+        return None
+    text = str(value).strip()
+    return text or None
+
+
+def parse_row(line: int, record: Dict[str, object]) -> ImportRow:
+    """
+    Validate one raw record.
+
+    Args:
+        line: Line number in the input file (for error messages)
+        record: Raw column values
+
+    Returns:
+        Normalized ImportRow
+
+    Raises:
+        ValueError: If the record is invalid
+    """
+    client = _clean(record.get("client"))
+    project = _clean(record.get("project"))
+    invite_code = _clean(record.get("invite_code"))
+    username = _clean(record.get("username"))
+
+    if not client:
+        raise ValueError(f"line {line}: client is required")
+    if len(client) > 255 or (project and len(project) > 255):
+        raise ValueError(f"line {line}: name longer than 255 characters")
+    if invite_code and not project:
+        raise ValueError(f"line {line}: invite_code without project")
+    if invite_code and not INVITE_CODE_RE.match(invite_code):
+        raise ValueError(f"line {line}: invalid invite_code {invite_code!r}")
+    if username:
+        username = username.lstrip("@").lower()
+        if not USERNAME_RE.match(username):
+            raise ValueError(f"line {line}: invalid username {username!r}")
+    return ImportRow(line=line, client=client, project=project, invite_code=invite_code, username=username)
+
+
+def read_records(path: Path) -> Iterator[Tuple[int, Dict[str, object]]]:
+    """
+    Stream raw records from CSV or JSONL.
+
+    Yields:
+        (line number, record dict)
+
+    Raises:
+        ImportFormatError: Unknown extension or CSV without a client column
+    """
+    suffix = path.suffix.lower()
+    if suffix not in (".csv", ".jsonl", ".ndjson"):
+        raise ImportFormatError(f"Unsupported file type {suffix!r} (expected .csv or .jsonl)")
+    with path.open(encoding="utf-8-sig", newline="") as file:
+        if suffix == ".csv":
+            reader = csv.DictReader(file)
+            if not reader.fieldnames or "client" not in reader.fieldnames:
+                raise ImportFormatError("CSV header must contain a 'client' column")
+            for record in reader:
+                yield reader.line_num, record
+        else:
+            for line, text in enumerate(file, start=1):
+                if text.strip():
+                    try:
+                        record = json.loads(text)
+                    except json.JSONDecodeError as e:
+                        record = {"_error": str(e)}
+                    yield line, record if isinstance(record, dict) else {"_error": "not an object"}
+
+
+def iter_rows(records: Iterable[Tuple[int, Dict[str, object]]], report: ImportReport) -> Iterator[ImportRow]:
+    """Validate records; invalid ones are counted as rejected and skipped."""
+    for line, record in records:
+        if "_error" in record:
+            report.rejected += 1
+            report.add_error(f"line {line}: {record['_error']}")
+            continue
+        try:
+            yield parse_row(line, record)
+        except ValueError as e:
+            report.rejected += 1
+            report.add_error(str(e))
+
+
+async def validate_invite_codes(
+    session: AsyncSession,
+    rows: Iterable[ImportRow],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> List[str]:
+    """
+    Check invite codes before anything is written.
+
+    A code must map to one (client, project) within the file and must not
+    belong to a different project in the database. Codes are compared
+    case-insensitively, like get_project_by_invite_code().
+
+    Returns:
+        Conflict descriptions (empty if the import may proceed)
+    """
+    owners: Dict[str, Tuple[str, str, int]] = {}
+    conflicts: List[str] = []
+    for row in rows:
+        if not row.invite_code:
+            continue
+        key = row.invite_code.lower()
+        owner = owners.setdefault(key, (row.client, row.project, row.line))
+        if owner[:2] != (row.client, row.project):
+            conflicts.append(
+                f"line {row.line}: invite code {row.invite_code!r} already used on line {owner[2]} "
+                f"for {owner[0]} / {owner[1]}"
+            )
+
+    codes = list(owners)
+    for start in range(0, len(codes), chunk_size):
+        result = await session.execute(
+            select(func.lower(Project.invite_code), Client.name, Project.name)
+            .join(Client, Client.id == Project.client_id)
+            .where(func.lower(Project.invite_code).in_(codes[start:start + chunk_size]))
+        )
+        for code, client_name, project_name in result:
+            client, project, line = owners[code]
+            if (client_name, project_name) != (client, project):
+                conflicts.append(
+                    f"line {line}: invite code {code!r} belongs to {client_name} / {project_name} in the database"
+                )
+    return conflicts
+
+
+async def _upsert_clients(
+    session: AsyncSession, rows: List[ImportRow], state: _ImportState, report: ImportReport
+) -> None:
+    names = {row.client for row in rows}
+    # Imported or looked up by an earlier chunk
+    known = names & state.client_ids.keys()
+    report.clients.skipped += len(known)
+    names -= known
+    if not names:
+        return
+    result = await session.execute(
+        select(Client.name, func.min(Client.id)).where(Client.name.in_(names)).group_by(Client.name)
+    )
+    existing = dict(result.all())
+    state.client_ids.update(existing)
+    report.clients.skipped += len(existing)
+
+    missing = sorted(names - existing.keys())
+    if missing:
+        result = await session.execute(
+            insert(Client).returning(Client.name, Client.id), [{"name": name} for name in missing]
+        )
+        state.client_ids.update(result.all())
+        report.clients.inserted += len(missing)
+
+
+async def _load_projects(session: AsyncSession, client_ids: Set[int], state: _ImportState) -> None:
+    """Cache existing projects of clients not seen in earlier chunks."""
+    client_ids = client_ids - state.loaded_clients
+    if not client_ids:
+        return
+    result = await session.execute(
+        select(Project.id, Project.client_id, Project.name, Project.invite_code)
+        .where(Project.client_id.in_(client_ids))
+    )
+    for project_id, client_id, name, invite_code in result:
+        state.projects.setdefault((client_id, name), [project_id, invite_code])
+    state.loaded_clients.update(client_ids)
+
+
+async def _upsert_projects(
+    session: AsyncSession, rows: List[ImportRow], state: _ImportState, report: ImportReport
+) -> None:
+    wanted: Dict[Tuple[int, str], Optional[str]] = {}
+    for row in rows:
+        if row.project:
+            wanted[(state.client_ids[row.client], row.project)] = row.invite_code
+    await _load_projects(session, {client_id for client_id, _ in wanted}, state)
+
+    new: List[Dict[str, object]] = []
+    changed: List[Dict[str, object]] = []
+    for (client_id, name), invite_code in wanted.items():
+        current = state.projects.get((client_id, name))
+        if current is None:
+            new.append({"client_id": client_id, "name": name, "invite_code": invite_code})
+        elif invite_code and invite_code != current[1]:
+            changed.append({"id": current[0], "invite_code": invite_code})
+            current[1] = invite_code
+        else:
+            report.projects.skipped += 1
+
+    if new:
+        result = await session.execute(
+            insert(Project).returning(Project.id, Project.client_id, Project.name, Project.invite_code), new
+        )
+        for project_id, client_id, name, invite_code in result:
+            state.projects[(client_id, name)] = [project_id, invite_code]
+        report.projects.inserted += len(new)
+    if changed:
+        await session.execute(update(Project), changed)
+        report.projects.updated += len(changed)
+
+
+async def _upsert_predefined_users(
+    session: AsyncSession, rows: List[ImportRow], state: _ImportState, report: ImportReport
+) -> None:
+    wanted = {row.username: state.client_ids[row.client] for row in rows if row.username}
+    if not wanted:
+        return
+    result = await session.execute(
+        select(PredefinedUser.tg_username, PredefinedUser.id, PredefinedUser.client_id)
+        .where(PredefinedUser.tg_username.in_(wanted))
+    )
+    existing = {username: (user_id, client_id) for username, user_id, client_id in result}
+
+    new: List[Dict[str, object]] = []
+    changed: List[Dict[str, object]] = []
+    for username, client_id in wanted.items():
+        current = existing.get(username)
+        if current is None:
+            new.append({"tg_username": username, "client_id": client_id})
+        elif current[1] != client_id:
+            changed.append({"id": current[0], "client_id": client_id})
+        else:
+            report.predefined_users.skipped += 1
+
+    if new:
+        await session.execute(insert(PredefinedUser), new)
+        report.predefined_users.inserted += len(new)
+    if changed:
+        await session.execute(update(PredefinedUser), changed)
+        report.predefined_users.updated += len(changed)
+
+
+async def import_rows(
+    session: AsyncSession,
+    rows: Iterable[ImportRow],
+    report: Optional[ImportReport] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> ImportReport:
+    """
+    Upsert rows in chunks, committing once per chunk.
+
+    Duplicates inside a chunk collapse to the last row; a row repeating an
+    already imported entity counts as skipped.
+
+    Args:
+        session: Database session
+        rows: Validated rows (see iter_rows)
+        report: Report to update (new one if None)
+        chunk_size: Rows per transaction
+
+    Returns:
+        ImportReport with inserted/updated/skipped counts per table
+    """
+    report = report or ImportReport()
+    state = _ImportState()
+    iterator = iter(rows)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            break
+        try:
+            await _upsert_clients(session, chunk, state, report)
+            await _upsert_projects(session, chunk, state, report)
+            await _upsert_predefined_users(session, chunk, state, report)
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            logger.exception("Import failed in chunk starting at line %s", chunk[0].line)
+            raise
+    return report
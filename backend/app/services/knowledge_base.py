@@ -0,0 +1,229 @@
+"""
+Local knowledge base for self-service answers before ticket creation.
+
+Markdown articles from KB_PATH are loaded at startup into an in-memory
+inverted index ranked with BM25. An article is one .md file:
+
+    ---
+    categories: access, howto
+    ---
+    # How to add a user to the report
+
+    Text...
+
+Front matter is optional; without categories the article is suggested for
+any category. The title is the first "# " heading (file name otherwise)
+and counts TITLE_WEIGHT times. There is no Russian stemmer, so terms are
+cut to STEM_LENGTH characters ("доступ", "доступы", "доступа" -> "доступ").
+"""
+
+import asyncio
+import logging
+import math
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+STEM_LENGTH = 6
+TITLE_WEIGHT = 3
+EXCERPT_LENGTH = 200
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+_FRONT_MATTER_RE = re.compile(r"\A---\s*\n(.*?)\n---\s*\n", re.DOTALL)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word stems (ё folded to е, one-letter words dropped)."""
+    return [
+        token[:STEM_LENGTH]
+        for token in _TOKEN_RE.findall(text.lower().replace("ё", "е"))
+        if len(token) > 1
+    ]
+
+
+@dataclass
+class Article:
+    """One knowledge-base article."""
+
+    slug: str
+    title: str
+    body: str
+    categories: Tuple[str, ...] = ()
+
+    @property
+    def excerpt(self) -> str:
+        """First paragraph of the body, shortened for the suggestion list."""
+        paragraph = next((p.strip() for p in self.body.split("\n\n") if p.strip()), "")
+        paragraph = " ".join(paragraph.split())
+        if len(paragraph) > EXCERPT_LENGTH:
+            paragraph = paragraph[:EXCERPT_LENGTH - 1].rsplit(" ", 1)[0] + "…"
+        return paragraph
+
+
+@dataclass
+class Suggestion:
+    """Article matched by KnowledgeBase.search()."""
+
+    article: Article
+    score: float
+
+
+def parse_article(slug: str, text: str) -> Article:
+    """
+    Parse Markdown text into an Article.
+
+    Args:
+        slug: Stable article id (path relative to KB root, without .md)
+        text: File contents
+    """
+    categories: Tuple[str, ...] = ()
+    front_matter = _FRONT_MATTER_RE.match(text)
+    if front_matter:
+        text = text[front_matter.end():]
+        for line in front_matter.group(1).splitlines():
+            key, _, value = line.partition(":")
+            if key.strip().lower() == "categories":
+                categories = tuple(c.strip() for c in value.split(",") if c.strip())
+
+    title = Path(slug).name.replace("-", " ").replace("_", " ")
+    lines = text.strip().splitlines()
+    if lines and lines[0].startswith("# "):
+        title = lines[0][2:].strip()
+        lines = lines[1:]
+    return Article(slug=slug, title=title, body="\n".join(lines).strip(), categories=categories)
+
+
+def load_articles(directory: Path) -> List[Article]:
+    """
+    Read every *.md file under directory (recursively), sorted by path.
+
+    Unreadable files are logged and skipped.
+    """
+    articles = []
+    for path in sorted(directory.rglob("*.md")):
+        slug = path.relative_to(directory).with_suffix("").as_posix()
+        try:
+            articles.append(parse_article(slug, path.read_text(encoding="utf-8")))
+        except (OSError, UnicodeDecodeError) as e:
+            logger.warning("Skipping knowledge-base article %s: %s", path, e)
+    return articles
+
+
+@dataclass
+class _Index:
+    articles: List[Article] = field(default_factory=list)
+    # stem -> [(article position, weighted term frequency)]
+    postings: Dict[str, List[Tuple[int, int]]] = field(default_factory=dict)
+    idf: Dict[str, float] = field(default_factory=dict)
+    # k1 * (1 - b + b * length / avg_length) per article
+    length_norm: List[float] = field(default_factory=list)
+    by_slug: Dict[str, Article] = field(default_factory=dict)
+
+
+class KnowledgeBase:
+    """In-memory BM25 index over articles; rebuilt as a whole by load()."""
+
+    def __init__(self, articles: Iterable[Article] = (), k1: float = 1.2, b: float = 0.75) -> None:
+        self.k1 = k1
+        self.b = b
+        self._index = self._build(list(articles))
+
+    def __len__(self) -> int:
+        return len(self._index.articles)
+
+    def load(self, articles: Iterable[Article]) -> None:
+        """Replace the indexed articles (searches see either the old or the new index)."""
+        self._index = self._build(list(articles))
+
+    def get(self, slug: str) -> Optional[Article]:
+        """Article by slug."""
+        return self._index.by_slug.get(slug)
+
+    def _build(self, articles: List[Article]) -> _Index:
+        index = _Index(articles=articles, by_slug={article.slug: article for article in articles})
+        lengths = []
+        for position, article in enumerate(articles):
+            counts: Dict[str, int] = {}
+            for stem in tokenize(article.title):
+                counts[stem] = counts.get(stem, 0) + TITLE_WEIGHT
+            for stem in tokenize(article.body):
+                counts[stem] = counts.get(stem, 0) + 1
+            for stem, tf in counts.items():
+                index.postings.setdefault(stem, []).append((position, tf))
+            lengths.append(sum(counts.values()))
+
+        n = len(articles)
+        avg_length = (sum(lengths) / n) if n else 1.0
+        index.length_norm = [self.k1 * (1 - self.b + self.b * length / avg_length) for length in lengths]
+        # Lucene-style idf: never negative, so terms present in most articles add almost nothing
+        index.idf = {
+            stem: math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            for stem, postings in index.postings.items()
+        }
+        return index
+
+    def search(
+        self,
+        query: str,
+        category: Optional[str] = None,
+        limit: int = 3,
+        min_score: float = 0.0,
+    ) -> List[Suggestion]:
+        """
+        Rank articles for a free-text query.
+
+        Args:
+            query: Problem description typed by the user
+            category: Ticket category; articles restricted to other categories are skipped
+            limit: Maximum suggestions
+            min_score: BM25 score below which an article is not suggested
+
+        Returns:
+            Suggestions, best first
+        """
+        index = self._index
+        scores: Dict[int, float] = {}
+        k1_plus_1 = self.k1 + 1
+        for stem in set(tokenize(query)):
+            postings = index.postings.get(stem)
+            if not postings:
+                continue
+            idf = index.idf[stem]
+            for position, tf in postings:
+                scores[position] = scores.get(position, 0.0) + idf * tf * k1_plus_1 / (
+                    tf + index.length_norm[position]
+                )
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        suggestions = []
+        for position, score in ranked:
+            if score < min_score or len(suggestions) == limit:
+                break
+            article = index.articles[position]
+            if category and article.categories and category not in article.categories:
+                continue
+            suggestions.append(Suggestion(article=article, score=score))
+        return suggestions
+
+
+async def load_knowledge_base(directory: Path, kb: KnowledgeBase) -> int:
+    """
+    Read articles and rebuild the index off the event loop.
+
+    Returns:
+        Number of indexed articles (0 if the directory does not exist)
+    """
+    if not directory.is_dir():
+        logger.warning("Knowledge base directory %s not found, suggestions disabled", directory)
+        return 0
+    articles = await asyncio.to_thread(load_articles, directory)
+    await asyncio.to_thread(kb.load, articles)
+    logger.info("Knowledge base loaded: %s articles from %s", len(kb), directory)
+    return len(kb)
+
+
+# Global knowledge base (loaded on startup from settings.kb_path)
+knowledge_base = KnowledgeBase()
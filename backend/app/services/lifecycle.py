@@ -0,0 +1,49 @@
+"""
+Keep the in-memory ticket indexes in step with ticket status changes.
+
+The SLA scheduler, the /awaiting queue, the dispatcher and the duplicate
+index each track open tickets without querying the database. Handlers and
+TicketService call these helpers after every status change instead of
+updating each index themselves, so no path can forget one of them.
+"""
+
+from datetime import datetime
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import operations as ops
+from app.database.models import Ticket
+from app.services.awaiting import awaiting_queue
+from app.services.dispatcher import dispatcher
+from app.services.duplicates import duplicate_index
+from app.services.sla import restart_resolution_sla, sla_scheduler
+
+
+def on_ticket_changed(ticket: Ticket) -> None:
+    """Re-sync a ticket that was taken, paused, resumed or reopened."""
+    sla_scheduler.sync(ticket)
+    awaiting_queue.sync(ticket)
+    dispatcher.sync(ticket)
+
+
+def on_ticket_closed(ticket_id: int) -> None:
+    """Forget a completed or cancelled ticket."""
+    duplicate_index.discard(ticket_id)
+    sla_scheduler.discard(ticket_id)
+    awaiting_queue.discard(ticket_id)
+    dispatcher.discard(ticket_id)
+
+
+async def on_ticket_reopened(session: AsyncSession, ticket: Ticket) -> None:
+    """
+    Start a new resolution period and track a reopened ticket again.
+
+    The ticket goes back into the duplicate index (while it is younger than
+    the index window) like any other open ticket.
+    """
+    project = await ops.get_project_with_client(session, ticket.project_id)
+    await restart_resolution_sla(session, ticket, project)
+    if project is not None and ticket.description:
+        age = (datetime.utcnow() - ticket.created_at).total_seconds()
+        duplicate_index.add(ticket.id, ticket.number, project.client_id, ticket.description, age)
+    on_ticket_changed(ticket)
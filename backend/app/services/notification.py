@@ -9,7 +9,7 @@ Handles:
 
 import logging
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, Sequence
 
 from aiogram import Bot
 from aiogram.types import Message
@@ -22,8 +22,10 @@ from app.bot.keyboards.operator import (
 )
 from app.config.categories import get_category_label
 from app.config.settings import settings
+from app.config.texts import Texts
 from app.database import operations as ops
 from app.database.models import Ticket
+from app.services.duplicates import DuplicateMatch
 from app.services.timezone import get_current_time
 
 logger = logging.getLogger(__name__)
@@ -66,7 +68,7 @@ class NotificationService:
         client = await ops.get_client_with_topic(self.session, client_id)
         
         if client and client.topic_id:
-            logger.debug(f"Using existing topic {client.topic_id} for client {client_name}")
+            logger.debug("Using existing topic %s for client %s", client.topic_id, client_name)
             return client.topic_id
         
         # Create new topic for client
@@ -92,11 +94,11 @@ class NotificationService:
                 support_chat_id=self.support_chat_id
             )
             
-            logger.info(f"Created topic {topic_id} for client {client_name}")
+            logger.info("Created topic %s for client %s", topic_id, client_name)
             return topic_id
             
         except TelegramAPIError as e:
-            logger.error(f"Failed to create topic for client {client_name}: {e}")
+            logger.error("Failed to create topic for client %s: %s", client_name, e)
             return None
     
     async def create_topic_for_ticket(
@@ -141,11 +143,11 @@ class NotificationService:
                 name=topic_name
             )
             
-            logger.info(f"Created topic {result.message_thread_id} for ticket #{ticket.number}")
+            logger.info("Created topic %s for ticket #%s", result.message_thread_id, ticket.number)
             return result.message_thread_id
             
         except TelegramAPIError as e:
-            logger.error(f"Failed to create topic for ticket #{ticket.number}: {e}")
+            logger.error("Failed to create topic for ticket #%s: %s", ticket.number, e)
             return None
     
     async def send_ticket_card(
@@ -156,7 +158,8 @@ class NotificationService:
         client_name: Optional[str] = None,
         client_company: Optional[str] = None,
         project_name: Optional[str] = None,
-        attachments_count: int = 0
+        attachments_count: int = 0,
+        duplicates: Sequence[DuplicateMatch] = ()
     ) -> Optional[int]:
         """
         Send ticket card to topic.
@@ -169,12 +172,13 @@ class NotificationService:
             client_company: Client's company name
             project_name: Project name
             attachments_count: Number of attachments
+            duplicates: Likely duplicates of this ticket (flagged on the card)
         
         Returns:
             Message ID if sent, None on error
         """
         if not ticket.topic_id:
-            logger.error(f"Ticket #{ticket.number} has no topic_id")
+            logger.error("Ticket #%s has no topic_id", ticket.number)
             return None
         
         # Format user info
@@ -208,6 +212,8 @@ class NotificationService:
 
 📊 <b>Статус:</b> {ticket.status}
 """.strip()
+        if duplicates:
+            card += "\n\n" + Texts.duplicate_warning(list(duplicates))
         
         try:
             message = await self.bot.send_message(
@@ -217,11 +223,11 @@ class NotificationService:
                 reply_markup=get_ticket_actions_keyboard(ticket.id)
             )
             
-            logger.info(f"Sent ticket card for #{ticket.number} to topic {ticket.topic_id}")
+            logger.info("Sent ticket card for #%s to topic %s", ticket.number, ticket.topic_id)
             return message.message_id
             
         except TelegramAPIError as e:
-            logger.error(f"Failed to send ticket card for #{ticket.number}: {e}")
+            logger.error("Failed to send ticket card for #%s: %s", ticket.number, e)
             return None
     
     async def forward_client_message(
@@ -240,7 +246,7 @@ class NotificationService:
             True if forwarded successfully
         """
         if not ticket.topic_id:
-            logger.error(f"Ticket #{ticket.number} has no topic_id")
+            logger.error("Ticket #%s has no topic_id", ticket.number)
             return False
         
         try:
@@ -272,11 +278,11 @@ class NotificationService:
                 message_id=message.message_id
             )
             
-            logger.debug(f"Forwarded message to topic {ticket.topic_id}")
+            logger.debug("Forwarded message to topic %s", ticket.topic_id)
             return True
             
         except TelegramAPIError as e:
-            logger.error(f"Failed to forward message to topic {ticket.topic_id}: {e}")
+            logger.error("Failed to forward message to topic %s: %s", ticket.topic_id, e)
             return False
     
     async def forward_attachments(
@@ -341,7 +347,7 @@ class NotificationService:
                 sent += 1
                 
             except TelegramAPIError as e:
-                logger.error(f"Failed to send attachment to topic {ticket.topic_id}: {e}")
+                logger.error("Failed to send attachment to topic %s: %s", ticket.topic_id, e)
         
         return sent
     
@@ -392,13 +398,13 @@ class NotificationService:
                     voice=message.voice.file_id
                 )
             else:
-                logger.warning(f"Unsupported message type from operator")
+                logger.warning("Unsupported message type from operator")
                 return False
             
             return True
             
         except TelegramAPIError as e:
-            logger.error(f"Failed to send reply to client {client_chat_id}: {e}")
+            logger.error("Failed to send reply to client %s: %s", client_chat_id, e)
             return False
     
     async def update_ticket_card(
@@ -453,7 +459,7 @@ class NotificationService:
             return True
             
         except TelegramAPIError as e:
-            logger.error(f"Failed to update ticket card: {e}")
+            logger.error("Failed to update ticket card: %s", e)
             return False
     
     async def send_feedback_to_topic(
@@ -491,7 +497,7 @@ class NotificationService:
             return True
             
         except TelegramAPIError as e:
-            logger.error(f"Failed to send feedback to topic: {e}")
+            logger.error("Failed to send feedback to topic: %s", e)
             return False
     
     async def notify_client_ticket_status(
@@ -555,7 +561,7 @@ class NotificationService:
             return True
             
         except TelegramAPIError as e:
-            logger.error(f"Failed to notify client {client_chat_id}: {e}")
+            logger.error("Failed to notify client %s: %s", client_chat_id, e)
             return False
     
     async def notify_client_ticket_paused(
@@ -588,7 +594,7 @@ class NotificationService:
             return True
             
         except TelegramAPIError as e:
-            logger.error(f"Failed to notify client {client_chat_id} about pause: {e}")
+            logger.error("Failed to notify client %s about pause: %s", client_chat_id, e)
             return False
     
     async def notify_client_ticket_cancelled(
@@ -621,7 +627,7 @@ class NotificationService:
             return True
             
         except TelegramAPIError as e:
-            logger.error(f"Failed to notify client {client_chat_id} about cancellation: {e}")
+            logger.error("Failed to notify client %s about cancellation: %s", client_chat_id, e)
             return False
     
     async def send_request_details(
@@ -647,5 +653,5 @@ class NotificationService:
             return True
             
         except TelegramAPIError as e:
-            logger.error(f"Failed to send request details to {client_chat_id}: {e}")
+            logger.error("Failed to send request details to %s: %s", client_chat_id, e)
             return False
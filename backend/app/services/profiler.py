@@ -0,0 +1,178 @@
+"""
+On-demand sampling profiler for the running event loop.
+
+A helper thread samples the event-loop thread's stack every few milliseconds
+and aggregates collapsed stacks (flamegraph.pl / speedscope format). Nothing
+runs while no profile is in progress, so there is no idle overhead.
+"""
+
+import asyncio
+import collections
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from dataclasses import dataclass
+from types import FrameType
+from typing import Counter, List, Optional
+
+# Only one profile at a time (sampling twice would double the overhead)
+_lock = asyncio.Lock()
+
+
+@dataclass
+class ProfileReport:
+    """Result of one profiling run."""
+
+    seconds: float
+    samples: int
+    collapsed: str
+    summary: str
+    memory: Optional[str] = None
+
+
+def _frame_label(frame: FrameType) -> str:
+    """Label frame as module:function."""
+    code = frame.f_code
+    module = os.path.splitext(os.path.basename(code.co_filename))[0]
+    return f"{module}:{code.co_name}"
+
+
+def _collapse(frame: Optional[FrameType]) -> str:
+    """Build 'outer;...;inner' stack string from innermost frame."""
+    labels: List[str] = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    labels.reverse()
+    return ";".join(labels)
+
+
+class SamplingProfiler:
+    """
+    Samples one thread's stack from a background thread.
+
+    Usage:
+        profiler = SamplingProfiler(threading.get_ident(), interval=0.005)
+        profiler.start()
+        ...
+        stacks = profiler.stop()
+    """
+
+    def __init__(self, thread_id: int, interval: float) -> None:
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter[str] = collections.Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start sampling thread."""
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> Counter[str]:
+        """Stop sampling and return collapsed stack counts."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        return self.stacks
+
+    def _run(self) -> None:
+        """Sampling loop (runs in the helper thread)."""
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.stacks[_collapse(frame)] += 1
+
+
+def format_collapsed(stacks: Counter[str]) -> str:
+    """Render stacks as 'stack count' lines for flame graph tools."""
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+def format_summary(stacks: Counter[str], seconds: float, limit: int = 40) -> str:
+    """
+    Render pstats-like table of functions by self and total samples.
+
+    Args:
+        stacks: Collapsed stack counts
+        seconds: Profiling duration
+        limit: Rows per table
+    """
+    total = sum(stacks.values())
+    own: Counter[str] = collections.Counter()
+    inclusive: Counter[str] = collections.Counter()
+    for stack, count in stacks.items():
+        frames = stack.split(";")
+        own[frames[-1]] += count
+        for label in set(frames):
+            inclusive[label] += count
+
+    lines = [f"{total} samples in {seconds:.1f}s", ""]
+    for title, counter in (("self", own), ("total", inclusive)):
+        lines.append(f"{title:>8}  {'%':>6}  function")
+        for label, count in counter.most_common(limit):
+            share = 100.0 * count / total if total else 0.0
+            lines.append(f"{count:>8}  {share:>6.1f}  {label}")
+        lines.append("")
+    return "\n".join(lines)
+
+
+def format_memory(snapshot: tracemalloc.Snapshot, limit: int = 30) -> str:
+    """Render top allocation sites of a tracemalloc snapshot."""
+    stats = snapshot.statistics("lineno")
+    total_kib = sum(stat.size for stat in stats) / 1024
+    lines = [f"Traced memory: {total_kib:.1f} KiB in {len(stats)} sites", ""]
+    lines.extend(str(stat) for stat in stats[:limit])
+    return "\n".join(lines) + "\n"
+
+
+def is_running() -> bool:
+    """Check if a profile is in progress."""
+    return _lock.locked()
+
+
+async def profile_event_loop(seconds: float, interval: float, with_memory: bool = False) -> ProfileReport:
+    """
+    Sample the event loop for given duration.
+
+    Must be awaited from the event-loop thread; other updates keep being
+    processed meanwhile (the caller only sleeps).
+
+    Args:
+        seconds: Profiling duration
+        interval: Sampling interval in seconds
+        with_memory: Also collect tracemalloc top allocations
+
+    Returns:
+        ProfileReport with collapsed stacks, summary and optional memory table
+    """
+    async with _lock:
+        started_tracing = with_memory and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+
+        profiler = SamplingProfiler(threading.get_ident(), interval)
+        started = time.perf_counter()
+        profiler.start()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            stacks = profiler.stop()
+            elapsed = time.perf_counter() - started
+            memory = None
+            if with_memory:
+                memory = format_memory(tracemalloc.take_snapshot())
+            if started_tracing:
+                tracemalloc.stop()
+
+    return ProfileReport(
+        seconds=elapsed,
+        samples=sum(stacks.values()),
+        collapsed=format_collapsed(stacks),
+        summary=format_summary(stacks, elapsed),
+        memory=memory,
+    )
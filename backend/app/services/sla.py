@@ -0,0 +1,361 @@
+"""
+SLA timers: first-response and resolution deadlines, reminders for unassigned tickets.
+
+All durations are business time (app.services.business_calendar): the
+resolution deadline is computed once in the client's timezone and stored in
+tickets.sla_due_at; first-response and reminder deadlines follow the support
+team's calendar (settings.timezone), so nothing fires at night or on holidays.
+
+Deadlines of open tickets are kept in a min-heap in memory. A single asyncio
+task sleeps until the earliest deadline (or until an earlier one is
+scheduled), so nothing polls the database: work is proportional to the
+deadlines that actually fire, not to the number of open tickets.
+
+The heap is rebuilt from the database on startup (warm_up_sla_scheduler())
+and updated by sync(ticket) after every status change. heapq cannot delete,
+so superseded entries stay in the heap tagged with an old generation and are
+skipped when popped; the heap is compacted when they outnumber live ones.
+
+A breach (first response, resolution) is reported once per ticket: the
+scheduler remembers which breaches fired, so a later sync() of the same
+overdue ticket (take, pause/resume) does not post the alert again. The
+record is dropped when the ticket is closed.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config.categories import get_resolution_hours
+from app.config.settings import settings
+from app.config.texts import Texts
+from app.database import operations as ops
+from app.database.connection import DatabaseSessionManager
+from app.database.models import Project, Ticket
+from app.metrics import SLA_TIMERS_FIRED
+from app.services.business_calendar import BusinessCalendar, get_calendar
+
+logger = logging.getLogger(__name__)
+
+KIND_UNASSIGNED = "unassigned"          # Repeating reminder while status is "new"
+KIND_FIRST_RESPONSE = "first_response"  # No operator took the ticket in time
+KIND_RESOLUTION = "resolution"          # Ticket not closed within category SLA
+
+# Compact when stale heap entries exceed live ones by this factor (plus slack)
+_COMPACT_FACTOR = 2
+_COMPACT_SLACK = 64
+
+# (due timestamp, sequence, ticket id, kind, generation); sequence keeps ordering total
+_HeapEntry = Tuple[float, int, int, str, int]
+
+
+@dataclass(frozen=True)
+class Deadline:
+    """One SLA deadline of a ticket."""
+
+    kind: str
+    due: datetime  # Naive UTC, like database columns
+    since: datetime  # Start of the waited period (for the alert text)
+
+
+def _timestamp(moment: datetime) -> float:
+    """Naive UTC datetime -> POSIX timestamp."""
+    return moment.replace(tzinfo=timezone.utc).timestamp()
+
+
+def resolution_deadline(category: str, created_at: datetime, tz_name: Optional[str] = None) -> Optional[datetime]:
+    """
+    Resolution deadline: created_at + category SLA in business hours.
+
+    Args:
+        category: Ticket category
+        created_at: Naive UTC creation time
+        tz_name: Client timezone (settings.timezone if None)
+
+    Returns:
+        Naive UTC deadline or None if the category has no SLA
+    """
+    hours = get_resolution_hours(category)
+    if not hours:
+        return None
+    return get_calendar(tz_name).add_business_time(created_at, hours * 3600)
+
+
+class SlaScheduler:
+    """Min-heap of ticket deadlines served by one sleeping task."""
+
+    def __init__(
+        self,
+        first_response_minutes: int,
+        reminder_minutes: int,
+        clock: Callable[[], float] = time.time,
+        calendar: Optional[BusinessCalendar] = None,
+    ) -> None:
+        """
+        Args:
+            first_response_minutes: First-response deadline after creation, business minutes (0 = off)
+            reminder_minutes: Reminder interval for new unassigned tickets, business minutes (0 = off)
+            clock: Wall-clock time source (POSIX seconds)
+            calendar: Support team calendar (get_calendar() if None)
+        """
+        self.first_response_minutes = first_response_minutes
+        self.reminder_minutes = reminder_minutes
+        self._clock = clock
+        self._calendar = calendar
+        self._heap: List[_HeapEntry] = []
+        self._sequence = itertools.count()
+        self._generations = itertools.count(1)
+        # ticket id -> [generation, live heap entries]
+        self._tickets: Dict[int, List[int]] = {}
+        self._live = 0
+        # ticket id -> breach kinds already fired
+        self._breached: Dict[int, Set[str]] = {}
+        self._bot: Optional[Bot] = None
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def __len__(self) -> int:
+        """Number of pending (live) deadlines."""
+        return self._live
+
+    @property
+    def calendar(self) -> BusinessCalendar:
+        """Support team business calendar."""
+        return self._calendar or get_calendar()
+
+    # ------------------------------------------------------------------
+    # Deadlines
+    # ------------------------------------------------------------------
+
+    def ticket_deadlines(self, ticket: Ticket) -> List[Deadline]:
+        """SLA deadlines that apply to the ticket in its current status."""
+        created = ticket.created_at
+        deadlines = []
+        if ticket.status == "new":
+            if self.reminder_minutes:
+                # updated_at is when the ticket last became "new" (created or reopened)
+                since = ticket.updated_at or created
+                deadlines.append(Deadline(KIND_UNASSIGNED, self._after(since, self.reminder_minutes), since))
+            if self.first_response_minutes and ticket.first_response_at is None:
+                due = self._after(created, self.first_response_minutes)
+                deadlines.append(Deadline(KIND_FIRST_RESPONSE, due, created))
+        if ticket.status in ("new", "in_progress"):
+            # Tickets created before sla_due_at existed: compute in the default timezone
+            due = ticket.sla_due_at or resolution_deadline(ticket.category, created)
+            if due is not None:
+                deadlines.append(Deadline(KIND_RESOLUTION, due, created))
+        return deadlines
+
+    def _after(self, start: datetime, minutes: int) -> datetime:
+        """start + business minutes of the support team."""
+        return self.calendar.add_business_time(start, minutes * 60)
+
+    def sync(self, ticket: Ticket, skip_past: bool = False) -> None:
+        """
+        Replace the ticket's deadlines after a status change.
+
+        Overdue breaches that already fired for this ticket are not scheduled again.
+
+        Args:
+            ticket: Ticket with current status
+            skip_past: Drop breaches already overdue (startup: they fired before the restart);
+                overdue reminders are moved to one interval from now instead
+        """
+        self._drop(ticket.id)
+        if ticket.status in ops.CLOSED_STATUSES:
+            self._breached.pop(ticket.id, None)
+            return
+        now = self._clock()
+        breached = self._breached.get(ticket.id, ())
+        for deadline in self.ticket_deadlines(ticket):
+            due = _timestamp(deadline.due)
+            if due <= now and deadline.kind != KIND_UNASSIGNED and (skip_past or deadline.kind in breached):
+                continue
+            if skip_past and due <= now:
+                due = self._next_reminder(now)
+            self.schedule(ticket.id, deadline.kind, due)
+
+    def _next_reminder(self, now: float) -> float:
+        """Timestamp one reminder interval (business time) after now."""
+        moment = datetime.fromtimestamp(now, timezone.utc).replace(tzinfo=None)
+        return _timestamp(self._after(moment, self.reminder_minutes))
+
+    def schedule(self, ticket_id: int, kind: str, due: float) -> None:
+        """Add one deadline (POSIX timestamp) to the ticket's current generation."""
+        state = self._tickets.setdefault(ticket_id, [next(self._generations), 0])
+        state[1] += 1
+        self._live += 1
+        if self._wakeup is not None and (not self._heap or due < self._heap[0][0]):
+            self._wakeup.set()
+        heapq.heappush(self._heap, (due, next(self._sequence), ticket_id, kind, state[0]))
+
+    def discard(self, ticket_id: int) -> None:
+        """Forget a closed or cancelled ticket: its deadlines and fired breaches."""
+        self._drop(ticket_id)
+        self._breached.pop(ticket_id, None)
+
+    def _drop(self, ticket_id: int) -> None:
+        """Drop all deadlines of a ticket (about to be re-synced or forgotten)."""
+        state = self._tickets.pop(ticket_id, None)
+        if state is not None:
+            self._live -= state[1]
+            self._maybe_compact()
+
+    def next_due(self) -> Optional[float]:
+        """Earliest live deadline (POSIX timestamp) or None."""
+        while self._heap and not self._is_live(self._heap[0]):
+            heapq.heappop(self._heap)
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: float) -> List[Tuple[int, str]]:
+        """Remove and return (ticket id, kind) of live deadlines due at or before now."""
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            entry = heapq.heappop(self._heap)
+            if not self._is_live(entry):
+                continue
+            _, _, ticket_id, kind, _ = entry
+            state = self._tickets[ticket_id]
+            state[1] -= 1
+            self._live -= 1
+            if state[1] == 0:
+                del self._tickets[ticket_id]
+            if kind != KIND_UNASSIGNED:
+                self._breached.setdefault(ticket_id, set()).add(kind)
+            due.append((ticket_id, kind))
+        return due
+
+    def _is_live(self, entry: _HeapEntry) -> bool:
+        state = self._tickets.get(entry[2])
+        return state is not None and state[0] == entry[4]
+
+    def _maybe_compact(self) -> None:
+        """Rebuild the heap without stale entries once they dominate it."""
+        if len(self._heap) > _COMPACT_FACTOR * len(self) + _COMPACT_SLACK:
+            self._heap = [entry for entry in self._heap if self._is_live(entry)]
+            heapq.heapify(self._heap)
+
+    # ------------------------------------------------------------------
+    # Background task
+    # ------------------------------------------------------------------
+
+    def start(self, bot: Bot) -> None:
+        """Start the timer task (call from a running event loop)."""
+        self._bot = bot
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run(), name="sla-scheduler")
+        logger.info("SLA scheduler started with %s pending deadlines", len(self))
+
+    async def stop(self) -> None:
+        """Cancel the timer task."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        """Sleep until the earliest deadline (or an earlier schedule()), fire what is due."""
+        while True:
+            self._wakeup.clear()
+            due = self.next_due()
+            timeout = None if due is None else due - self._clock()
+            if timeout is None or timeout > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout)
+                    continue  # Earlier deadline scheduled: recompute the sleep
+                except asyncio.TimeoutError:
+                    pass
+            for ticket_id, kind in self.pop_due(self._clock()):
+                try:
+                    await self._fire(ticket_id, kind)
+                except Exception:
+                    logger.exception("SLA timer %s for ticket %s failed", kind, ticket_id)
+
+    async def _fire(self, ticket_id: int, kind: str) -> None:
+        """Post the reminder/alert into the ticket topic if the deadline still applies."""
+        async with DatabaseSessionManager() as session:
+            ticket = await ops.get_ticket_by_id(session, ticket_id)
+        if ticket is None:
+            return
+        deadline = next((d for d in self.ticket_deadlines(ticket) if d.kind == kind), None)
+        if deadline is None:
+            # Status changed without sync(); nothing to report
+            return
+        if kind == KIND_UNASSIGNED:
+            self.schedule(ticket_id, kind, self._next_reminder(self._clock()))
+
+        SLA_TIMERS_FIRED.inc(kind=kind)
+        if ticket.topic_id is None:
+            logger.warning("SLA %s for ticket #%s: no topic to post to", kind, ticket.number)
+            return
+        waited = int((datetime.utcnow() - deadline.since).total_seconds() // 60)
+        try:
+            await self._bot.send_message(
+                chat_id=ticket.support_chat_id,
+                message_thread_id=ticket.topic_id,
+                text=Texts.sla_alert(kind, ticket.number, waited),
+            )
+            logger.info("SLA %s posted for ticket #%s", kind, ticket.number)
+        except TelegramAPIError as e:
+            logger.warning("Failed to post SLA %s for ticket #%s: %s", kind, ticket.number, e)
+
+
+async def restart_resolution_sla(
+    session: AsyncSession, ticket: Ticket, project: Optional[Project] = None
+) -> Optional[datetime]:
+    """
+    Start a new resolution period for a reopened ticket (call before sync()).
+
+    The deadline counts from the reopen, in the client's business hours like
+    at creation; otherwise a reopened ticket would be overdue from day one.
+
+    Args:
+        session: Database session
+        ticket: Reopened ticket
+        project: The ticket's project with client loaded (fetched if None)
+
+    Returns:
+        New sla_due_at (None if the category has no SLA)
+    """
+    project = project or await ops.get_project_with_client(session, ticket.project_id)
+    tz_name = project.client.timezone if project and project.client else None
+    due = resolution_deadline(ticket.category, datetime.utcnow(), tz_name)
+    # The ORM UPDATE also refreshes ticket.sla_due_at in the session
+    await ops.update_ticket_sla_due_at(session, ticket.id, due)
+    return due
+
+
+async def warm_up_sla_scheduler(session: AsyncSession, scheduler: SlaScheduler) -> int:
+    """
+    Schedule deadlines of all open tickets (after a restart).
+
+    Breaches that fell due while the bot was down are not reported.
+
+    Returns:
+        Number of pending deadlines
+    """
+    tickets = await ops.get_open_tickets_since(session, datetime.min)
+    for ticket in tickets:
+        scheduler.sync(ticket, skip_past=True)
+    logger.info("SLA scheduler warmed up: %s deadlines for %s open tickets", len(scheduler), len(tickets))
+    return len(scheduler)
+
+
+# Global scheduler (started in on_startup, updated by TicketService on status changes)
+sla_scheduler = SlaScheduler(
+    first_response_minutes=settings.sla_first_response_minutes,
+    reminder_minutes=settings.sla_unassigned_reminder_minutes,
+)
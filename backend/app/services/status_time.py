@@ -0,0 +1,124 @@
+"""
+Time-in-status metrics over the ticket event log (ticket_events).
+
+Every event ends the interval the ticket has spent in its previous status
+since the previous event. StatusTimeAggregator consumes the log
+incrementally in id order: update() reads only events newer than the last
+one it has seen, so repeated reports cost O(new events), not O(history).
+Only tickets in an open status are kept in memory (for their running
+interval); a closed ticket is forgotten until it is reopened.
+
+Tickets created before the log existed have no "created" event; their
+first logged transition has nothing to close, so time before it is not
+counted.
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import operations as ops
+from app.database.models import TicketEvent
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+@dataclass
+class StatusTime:
+    """Total time spent in one status."""
+
+    seconds: float = 0.0
+    intervals: int = 0
+
+    @property
+    def mean_seconds(self) -> float:
+        return self.seconds / self.intervals if self.intervals else 0.0
+
+
+def time_in_status(events: Sequence[TicketEvent], now: Optional[datetime] = None) -> Dict[str, float]:
+    """
+    Seconds one ticket spent in each status.
+
+    Args:
+        events: The ticket's events, oldest first (ops.get_ticket_events)
+        now: Count the current open status up to this moment (not counted if None)
+
+    Returns:
+        Status -> seconds
+    """
+    totals: Dict[str, float] = {}
+    for current, following in zip(events, events[1:]):
+        totals[current.to_status] = totals.get(current.to_status, 0.0) + (following.ts - current.ts).total_seconds()
+    if events and now is not None and events[-1].to_status not in ops.CLOSED_STATUSES:
+        last = events[-1]
+        totals[last.to_status] = totals.get(last.to_status, 0.0) + (now - last.ts).total_seconds()
+    return totals
+
+
+class StatusTimeAggregator:
+    """Running time-in-status totals over all tickets."""
+
+    def __init__(self) -> None:
+        self.last_event_id = 0
+        self._totals: Dict[str, StatusTime] = {}
+        # ticket id -> (open status, since)
+        self._open: Dict[int, Tuple[str, datetime]] = {}
+        self._lock = asyncio.Lock()
+
+    def feed(self, events: Iterable[TicketEvent]) -> None:
+        """Apply events in id order (each event exactly once)."""
+        for event in events:
+            previous = self._open.pop(event.ticket_id, None)
+            if previous is not None:
+                status, since = previous
+                total = self._totals.setdefault(status, StatusTime())
+                total.seconds += (event.ts - since).total_seconds()
+                total.intervals += 1
+            if event.to_status not in ops.CLOSED_STATUSES:
+                self._open[event.ticket_id] = (event.to_status, event.ts)
+            self.last_event_id = max(self.last_event_id, event.id)
+
+    async def update(self, session: AsyncSession, batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+        """
+        Read and apply events logged since the previous update.
+
+        Returns:
+            Number of new events
+        """
+        processed = 0
+        # Concurrent callers would read the same batch twice
+        async with self._lock:
+            while True:
+                events = await ops.get_ticket_events_after(session, self.last_event_id, batch_size)
+                self.feed(events)
+                processed += len(events)
+                if len(events) < batch_size:
+                    break
+        if processed:
+            logger.debug("Status time: %s new events, %s open tickets", processed, len(self._open))
+        return processed
+
+    def snapshot(self, now: Optional[datetime] = None) -> Dict[str, StatusTime]:
+        """
+        Totals per status, including running intervals of open tickets up to now.
+
+        Args:
+            now: Naive UTC moment (datetime.utcnow() if None)
+        """
+        now = now or datetime.utcnow()
+        result = {status: StatusTime(total.seconds, total.intervals) for status, total in self._totals.items()}
+        for status, since in self._open.values():
+            total = result.setdefault(status, StatusTime())
+            total.seconds += (now - since).total_seconds()
+            total.intervals += 1
+        return result
+
+
+# Global aggregator (caught up lazily by /stats)
+status_time = StatusTimeAggregator()
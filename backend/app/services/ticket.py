@@ -3,6 +3,7 @@ Ticket business logic service.
 """
 
 import logging
+from datetime import datetime
 from typing import Optional, List, Tuple
 
 from aiogram import Bot
@@ -11,7 +12,14 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.config.settings import settings
 from app.database import operations as ops
 from app.database.models import Ticket
+from app.config.texts import Texts
+from app.logging_setup import bind_log_context
+from app.services.awaiting import awaiting_queue
+from app.services.dispatcher import dispatcher
+from app.services.duplicates import DuplicateMatch
+from app.services.lifecycle import on_ticket_changed, on_ticket_closed
 from app.services.notification import NotificationService
+from app.services.sla import resolution_deadline, sla_scheduler
 from app.services.timezone import is_working_hours
 
 logger = logging.getLogger(__name__)
@@ -41,14 +49,15 @@ class TicketService:
         tg_username: Optional[str] = None,
         tg_name: Optional[str] = None,
         attachments: Optional[List[dict]] = None,
-        priority: str = "normal"
+        priority: str = "normal",
+        duplicates: Optional[List[DuplicateMatch]] = None
     ) -> Tuple[Ticket, bool]:
         """
         Create a new ticket with full flow.
         
         1. Create ticket in database
         2. Create topic in support group
-        3. Send ticket card to topic
+        3. Send ticket card to topic (likely duplicates flagged)
         4. Send attachments to topic
         
         Args:
@@ -60,23 +69,26 @@ class TicketService:
             tg_name: Client's display name
             attachments: List of attachment dicts
             priority: normal or urgent
+            duplicates: Likely duplicates found by duplicate_index.find()
         
         Returns:
             Tuple of (Ticket, success_flag)
         """
         attachments = attachments or []
+        duplicates = duplicates or []
         
         # Get project info for topic name
         project = await ops.get_project_with_client(self.session, project_id)
         
         if not project:
-            logger.error(f"Project {project_id} not found")
+            logger.error("Project %s not found", project_id)
             return None, False
         
         client_name = project.client.name if project.client else "Unknown"
         project_name = project.name
         
-        # Create ticket in database
+        # Create ticket in database (resolution deadline in the client's business hours)
+        client_timezone = project.client.timezone if project.client else None
         ticket = await ops.create_ticket(
             self.session,
             project_id=project_id,
@@ -84,13 +96,16 @@ class TicketService:
             category=category,
             support_chat_id=settings.support_chat_id,
             description=description,
-            priority=priority
+            priority=priority,
+            sla_due_at=resolution_deadline(category, datetime.utcnow(), client_timezone)
         )
         
-        logger.info(f"Created ticket #{ticket.number} for user {tg_user_id}")
+        bind_log_context(ticket=ticket.number)
+        logger.info("Created ticket #%s for user %s", ticket.number, tg_user_id)
+        sla_scheduler.sync(ticket)
         
         # Save description as first message
-        await ops.create_message(
+        first_message = await ops.create_message(
             self.session,
             ticket_id=ticket.id,
             direction="client",
@@ -99,6 +114,8 @@ class TicketService:
             author_tg_user_id=tg_user_id,
             content=description
         )
+        # Attachments and the system link do not move the waiting start
+        awaiting_queue.on_message(ticket, first_message)
         
         # Save attachments to database
         for att in attachments:
@@ -112,6 +129,22 @@ class TicketService:
                 file_id=att.get("file_id")
             )
         
+        if duplicates:
+            logger.info(
+                "Ticket #%s is a likely duplicate of %s",
+                ticket.number, ", ".join(f"#{m.number}" for m in duplicates)
+            )
+            if settings.duplicate_link:
+                await ops.create_message(
+                    self.session,
+                    ticket_id=ticket.id,
+                    direction="system",
+                    tg_message_id=0,
+                    msg_type="text",
+                    author_tg_user_id=0,
+                    content=Texts.duplicate_link_message(duplicates[0].number, duplicates[0].similarity)
+                )
+        
         # Create topic in support group
         topic_id = await self.notification.create_topic_for_ticket(
             ticket, client_name, project_name
@@ -121,6 +154,7 @@ class TicketService:
             # Update ticket with topic ID
             await ops.update_ticket_topic(self.session, ticket.id, topic_id)
             ticket.topic_id = topic_id
+            awaiting_queue.sync(ticket)  # Link to the topic in /awaiting
             
             # Send ticket card
             await self.notification.send_ticket_card(
@@ -130,16 +164,20 @@ class TicketService:
                 client_name=tg_name,
                 client_company=client_name,
                 project_name=project_name,
-                attachments_count=len(attachments)
+                attachments_count=len(attachments),
+                duplicates=duplicates
             )
             
             # Forward attachments
             if attachments:
                 await self.notification.forward_attachments(ticket, attachments)
             
+            # Queued only now, so an auto-assignment note lands after the card
+            dispatcher.sync(ticket)
             return ticket, True
         else:
-            logger.warning(f"Failed to create topic for ticket #{ticket.number}")
+            logger.warning("Failed to create topic for ticket #%s", ticket.number)
+            dispatcher.sync(ticket)
             return ticket, False
     
     async def take_ticket(
@@ -163,18 +201,20 @@ class TicketService:
         
         if not ticket:
             return None
+        bind_log_context(ticket=ticket.number)
         
         # Check if already in progress by another operator
         if ticket.status == "in_progress" and ticket.assigned_to_tg_user_id != operator_id:
-            logger.info(f"Ticket #{ticket.number} already taken by {ticket.assigned_to_tg_user_id}")
+            logger.info("Ticket #%s already taken by %s", ticket.number, ticket.assigned_to_tg_user_id)
             return None
         
-        # Update status
-        ticket = await ops.update_ticket_status(
-            self.session, ticket_id, "in_progress", assigned_to=operator_id
+        # Update status unless the auto-assigner (or another operator) got there first
+        ticket = await ops.assign_ticket(
+            self.session, ticket_id, operator_id, ticket.status, ticket.assigned_to_tg_user_id, actor=operator_id
         )
         
         if ticket:
+            on_ticket_changed(ticket)
             try:
                 await self.notification.notify_client_ticket_status(
                     ticket.tg_user_id, ticket.number, "in_progress"
@@ -202,10 +242,12 @@ class TicketService:
             Updated ticket or None
         """
         ticket = await ops.update_ticket_status(
-            self.session, ticket_id, "on_hold"
+            self.session, ticket_id, "on_hold", actor=operator_id, reason=reason or None
         )
         
         if ticket:
+            bind_log_context(ticket=ticket.number)
+            on_ticket_changed(ticket)
             await self.notification.notify_client_ticket_paused(
                 ticket.tg_user_id, ticket.number, reason
             )
@@ -228,10 +270,12 @@ class TicketService:
             Updated ticket or None
         """
         ticket = await ops.update_ticket_status(
-            self.session, ticket_id, "in_progress"
+            self.session, ticket_id, "in_progress", actor=operator_id
         )
         
         if ticket:
+            bind_log_context(ticket=ticket.number)
+            on_ticket_changed(ticket)
             await self.notification.notify_client_ticket_status(
                 ticket.tg_user_id, ticket.number, "resumed"
             )
@@ -254,10 +298,12 @@ class TicketService:
             Updated ticket or None
         """
         ticket = await ops.update_ticket_status(
-            self.session, ticket_id, "completed"
+            self.session, ticket_id, "completed", actor=operator_id
         )
+        on_ticket_closed(ticket_id)
         
         if ticket:
+            bind_log_context(ticket=ticket.number)
             # Notify client with CSAT prompt
             await self.notification.notify_client_ticket_status(
                 ticket.tg_user_id, ticket.number, "closed"
@@ -283,10 +329,12 @@ class TicketService:
             Updated ticket or None
         """
         ticket = await ops.update_ticket_status(
-            self.session, ticket_id, "cancelled"
+            self.session, ticket_id, "cancelled", actor=operator_id, reason=reason or None
         )
+        on_ticket_closed(ticket_id)
         
         if ticket:
+            bind_log_context(ticket=ticket.number)
             await self.notification.notify_client_ticket_cancelled(
                 ticket.tg_user_id, ticket.number, reason
             )
@@ -330,6 +378,8 @@ class TicketService:
         Returns:
             True if forwarded successfully
         """
+        bind_log_context(ticket=ticket.number)
+        
         # Save message to database
         msg_type = "text"
         content = message.text
@@ -351,7 +401,7 @@ class TicketService:
             msg_type = "voice"
             file_id = message.voice.file_id
         
-        await ops.create_message(
+        reply = await ops.create_message(
             self.session,
             ticket_id=ticket.id,
             direction="operator",
@@ -361,6 +411,7 @@ class TicketService:
             content=content,
             file_id=file_id
         )
+        awaiting_queue.on_message(ticket, reply)
         
         # Forward to client
         return await self.notification.send_operator_reply_to_client(
@@ -388,6 +439,7 @@ class TicketService:
         
         if not ticket:
             return False
+        bind_log_context(ticket=ticket.number)
         
         # Save to database
         await ops.create_feedback(self.session, ticket_id, csat, comment)
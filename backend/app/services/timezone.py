@@ -5,9 +5,8 @@ Timezone and working hours utilities.
 from datetime import datetime
 from typing import Optional
 
-import pytz
-
 from app.config.settings import settings
+from app.services.business_calendar import get_calendar, get_tz
 
 
 def get_current_time(timezone: Optional[str] = None) -> datetime:
@@ -21,9 +20,7 @@ def get_current_time(timezone: Optional[str] = None) -> datetime:
     Returns:
         Current datetime in the specified timezone
     """
-    tz_name = timezone or settings.timezone
-    tz = pytz.timezone(tz_name)
-    return datetime.now(tz)
+    return datetime.now(get_tz(timezone or settings.timezone))
 
 
 def is_working_hours(
@@ -44,26 +41,16 @@ def is_working_hours(
         - work_hours_start: Start hour (default 10)
         - work_hours_end: End hour (default 19)
         - work_days: List of weekdays (1=Monday, 7=Sunday)
+        - work_holidays: Non-working dates
     """
+    tz_name = timezone or settings.timezone
     if dt is None:
-        dt = get_current_time(timezone)
+        dt = get_current_time(tz_name)
     elif dt.tzinfo is None:
         # Localize naive datetime
-        tz_name = timezone or settings.timezone
-        tz = pytz.timezone(tz_name)
-        dt = tz.localize(dt)
-    
-    # Check day of week (1=Monday, 7=Sunday in our config)
-    # Python's weekday() returns 0=Monday, 6=Sunday
-    weekday = dt.weekday() + 1  # Convert to 1-based
-    
-    if weekday not in settings.work_days:
-        return False
-    
-    # Check hour
-    hour = dt.hour
+        dt = get_tz(tz_name).localize(dt)
     
-    return settings.work_hours_start <= hour < settings.work_hours_end
+    return get_calendar(tz_name).is_business_timestamp(dt.timestamp())
 
 
 def get_sla_message(is_urgent: bool = False) -> str:
@@ -0,0 +1,188 @@
+"""
+Ticket transcript for operators (/history).
+
+A long ticket can have thousands of messages. They are read in id chunks
+(ops.get_ticket_messages_after returns plain rows, so the session's identity
+map does not grow), each chunk is rendered and appended to a temporary file,
+and aiogram uploads the file from disk. Memory is bounded by one chunk
+whatever the ticket's length.
+
+Media are listed with their Telegram file_id: the bot can send the file
+again by that id. The header has no description: TicketService stores it as
+the ticket's first client message.
+"""
+
+import asyncio
+import html
+import logging
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Optional, Sequence, TextIO, Tuple
+
+from sqlalchemy import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config.categories import get_category_label
+from app.config.texts import Texts
+from app.database import operations as ops
+from app.database.models import Ticket
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 500
+FORMATS = ("html", "txt")
+
+_HTML_STYLE = (
+    "body{font-family:sans-serif;max-width:50em;margin:2em auto;color:#222}"
+    "dl{display:grid;grid-template-columns:max-content auto;gap:.2em 1em}dt{color:#666}dd{margin:0}"
+    ".msg{margin:.6em 0;padding:.5em .8em;border-radius:.5em;background:#f3f3f3}"
+    ".client{background:#e8f1fb}.operator{background:#eaf7ea}.system{background:#fff;color:#666}"
+    ".meta{font-size:.8em;color:#666}.text{white-space:pre-wrap;margin-top:.3em}.file{font-family:monospace}"
+)
+
+
+def _format_time(value: Optional[datetime]) -> str:
+    return value.strftime("%Y-%m-%d %H:%M UTC") if value else "—"
+
+
+def _ticket_fields(ticket: Ticket) -> Dict[str, str]:
+    status = Texts.OPERATOR_STATUS_LABELS.get(ticket.status, ("", ticket.status))[1]
+    return {
+        "category": get_category_label(ticket.category),
+        "status": status,
+        "client": str(ticket.tg_user_id),
+        "operator": str(ticket.assigned_to_tg_user_id or "—"),
+        "created": _format_time(ticket.created_at),
+    }
+
+
+def _author(row: Row) -> str:
+    label = Texts.TRANSCRIPT_AUTHORS.get(row.direction, row.direction)
+    return label if row.direction == "system" else f"{label} {row.author_tg_user_id}"
+
+
+# --- HTML ---------------------------------------------------------------------
+
+def _html_header(ticket: Ticket) -> str:
+    title = html.escape(Texts.TRANSCRIPT_TITLE.format(number=ticket.number))
+    fields = _ticket_fields(ticket)
+    rows = "".join(
+        f"<dt>{html.escape(label)}</dt><dd>{html.escape(fields[key])}</dd>"
+        for label, key in Texts.TRANSCRIPT_FIELDS
+    )
+    return (
+        f'<!DOCTYPE html>\n<html lang="ru"><head><meta charset="utf-8"><title>{title}</title>'
+        f"<style>{_HTML_STYLE}</style></head><body>\n<h1>{title}</h1><dl>{rows}</dl><hr>\n"
+    )
+
+
+def _html_message(row: Row) -> str:
+    parts = [
+        f'<div class="msg {html.escape(row.direction)}">'
+        f'<div class="meta">{_format_time(row.created_at)} · {html.escape(_author(row))}</div>'
+    ]
+    if row.content:
+        parts.append(f'<div class="text">{html.escape(row.content)}</div>')
+    if row.file_id:
+        file_line = Texts.TRANSCRIPT_FILE.format(type=row.type, file_id=row.file_id)
+        parts.append(f'<div class="file">{html.escape(file_line)}</div>')
+    parts.append("</div>\n")
+    return "".join(parts)
+
+
+def _html_footer(count: int) -> str:
+    return f"<hr><p>{html.escape(Texts.TRANSCRIPT_FOOTER.format(count=count))}</p></body></html>\n"
+
+
+# --- Plain text -----------------------------------------------------------------
+
+def _text_header(ticket: Ticket) -> str:
+    fields = _ticket_fields(ticket)
+    lines = [Texts.TRANSCRIPT_TITLE.format(number=ticket.number)]
+    lines += [f"{label}: {fields[key]}" for label, key in Texts.TRANSCRIPT_FIELDS]
+    lines += ["=" * 40, ""]
+    return "\n".join(lines) + "\n"
+
+
+def _text_message(row: Row) -> str:
+    lines = [f"[{_format_time(row.created_at)}] {_author(row)}"]
+    if row.content:
+        lines.append(row.content)
+    if row.file_id:
+        lines.append(Texts.TRANSCRIPT_FILE.format(type=row.type, file_id=row.file_id))
+    return "\n".join(lines) + "\n\n"
+
+
+def _text_footer(count: int) -> str:
+    return "=" * 40 + "\n" + Texts.TRANSCRIPT_FOOTER.format(count=count) + "\n"
+
+
+# fmt -> (header, message, footer)
+_RENDERERS: Dict[str, Tuple[Callable[[Ticket], str], Callable[[Row], str], Callable[[int], str]]] = {
+    "html": (_html_header, _html_message, _html_footer),
+    "txt": (_text_header, _text_message, _text_footer),
+}
+
+
+async def write_transcript(
+    session: AsyncSession,
+    ticket: Ticket,
+    out: TextIO,
+    fmt: str = "html",
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> int:
+    """
+    Render a ticket's conversation into a text stream, one chunk of messages at a time.
+
+    Args:
+        session: Database session
+        ticket: Ticket to render
+        out: Writable text stream (file writes run in a thread)
+        fmt: "html" or "txt"
+        chunk_size: Messages read and written per step
+
+    Returns:
+        Number of messages written
+    """
+    header, render_message, footer = _RENDERERS[fmt]
+    await asyncio.to_thread(out.write, header(ticket))
+    count, after_id = 0, 0
+    while True:
+        rows: Sequence[Row] = await ops.get_ticket_messages_after(session, ticket.id, after_id, chunk_size)
+        if not rows:
+            break
+        await asyncio.to_thread(out.write, "".join(render_message(row) for row in rows))
+        count += len(rows)
+        after_id = rows[-1].id
+        if len(rows) < chunk_size:
+            break
+    await asyncio.to_thread(out.write, footer(count))
+    return count
+
+
+async def build_transcript_file(
+    session: AsyncSession,
+    ticket: Ticket,
+    fmt: str = "html",
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Tuple[Path, int]:
+    """
+    Render a transcript into a temporary file; the caller sends and deletes it.
+
+    Returns:
+        Tuple of (file path, number of messages)
+    """
+    out = await asyncio.to_thread(
+        tempfile.NamedTemporaryFile, "w", encoding="utf-8", suffix=f".{fmt}", delete=False
+    )
+    path = Path(out.name)
+    try:
+        count = await write_transcript(session, ticket, out, fmt, chunk_size)
+    except BaseException:
+        await asyncio.to_thread(out.close)
+        path.unlink(missing_ok=True)
+        raise
+    await asyncio.to_thread(out.close)
+    logger.info("Transcript of ticket #%s: %s messages", ticket.number, count)
+    return path, count
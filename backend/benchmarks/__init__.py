@@ -0,0 +1,6 @@
+"""
+Benchmarks run against file-backed SQLite seeded at production sizes.
+
+Run from backend/:
+    python -m benchmarks.db_bench --scale 0.01
+"""
@@ -0,0 +1,411 @@
+"""
+Database-layer benchmark for app.database.operations.
+
+Seeds (or reuses) a file-backed SQLite database at production sizes,
+times every operation with a fresh session per call (as handlers do) and
+writes a JSON report with p50/p95/p99 latency and statements per call.
+
+Each run works on a throwaway copy of the seeded file, and read cases run
+before write cases. Every run therefore starts from the same data, reads
+see the seeded data as is, and reports of different runs compare like with
+like.
+
+Usage (from backend/):
+    python -m benchmarks.db_bench --scale 0.01 --output bench.json
+    python -m benchmarks.db_bench --scale 0.01 --compare bench.json
+"""
+
+import argparse
+import asyncio
+import inspect
+import json
+import math
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+# Settings require Telegram credentials; the benchmark never talks to Telegram
+os.environ.setdefault("BOT_TOKEN", "0:bench")
+os.environ.setdefault("SUPPORT_CHAT_ID", "-1001234567890")
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine  # noqa: E402
+
+from app.config.categories import CATEGORIES  # noqa: E402
+from app.database import operations as ops  # noqa: E402
+from app.database.instrumentation import (  # noqa: E402
+    instrument_engine,
+    start_query_tracking,
+    stop_query_tracking,
+)
+from benchmarks.seed import (  # noqa: E402
+    FIRST_TG_USER_ID,
+    OPERATOR_IDS,
+    SUPPORT_CHAT_ID,
+    DatasetSizes,
+    seed_database,
+)
+
+Case = Callable[[AsyncSession, random.Random], Awaitable[Any]]
+
+# Operations that write (by operations.py naming); their cases run after the reads
+WRITE_PREFIXES = ("create_", "update_", "assign_", "reopen_", "backfill_", "ensure_")
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile of an ascending list (q in 0..100)."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(q / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+class BenchContext:
+    """Pools of existing keys used to build realistic arguments."""
+
+    def __init__(self, path: Path, sizes: DatasetSizes, iterations: int) -> None:
+        self.sizes = sizes
+        self.run_id = int(time.time())
+        self._counter = 0
+        conn = sqlite3.connect(path)
+        try:
+            self.max_ticket_id = conn.execute("SELECT MAX(id) FROM tickets").fetchone()[0]
+            self.max_feedback_id = conn.execute("SELECT MAX(id) FROM feedback").fetchone()[0] or 1
+            # Tickets that can still receive feedback (unique ticket_id)
+            self.feedbackless_tickets = [
+                row[0] for row in conn.execute(
+                    "SELECT id FROM tickets WHERE id NOT IN (SELECT ticket_id FROM feedback) "
+                    "ORDER BY id DESC LIMIT ?",
+                    (iterations * 4,),
+                )
+            ]
+        finally:
+            conn.close()
+
+    def unique(self, prefix: str) -> str:
+        """Value not present in the seeded data (for unique columns)."""
+        self._counter += 1
+        return f"{prefix}{self.run_id}_{self._counter}"
+
+    def client_id(self, rng: random.Random) -> int:
+        return rng.randint(1, self.sizes.clients)
+
+    def project_id(self, rng: random.Random) -> int:
+        return rng.randint(1, self.sizes.projects)
+
+    def tg_user_id(self, rng: random.Random) -> int:
+        return FIRST_TG_USER_ID + rng.randrange(self.sizes.users)
+
+    def ticket_id(self, rng: random.Random) -> int:
+        return rng.randint(1, self.max_ticket_id)
+
+    def topic_id(self, rng: random.Random) -> int:
+        return 10_000 + rng.randint(1, self.sizes.clients)
+
+
+def build_cases(ctx: BenchContext) -> Dict[str, Case]:
+    """Map operation name to a call with realistic arguments."""
+    categories = [category.id for category in CATEGORIES]
+
+    async def create_feedback(session: AsyncSession, rng: random.Random) -> Any:
+        if not ctx.feedbackless_tickets:
+            return None
+        return await ops.create_feedback(session, ctx.feedbackless_tickets.pop(), "positive", "bench")
+
+    return {
+        # Clients
+        "get_client_by_id": lambda s, r: ops.get_client_by_id(s, ctx.client_id(r)),
+        "create_client": lambda s, r: ops.create_client(s, ctx.unique("Bench client ")),
+        "get_client_by_username": lambda s, r: ops.get_client_by_username(
+            s, f"user{r.randint(1, ctx.sizes.predefined_users)}"
+        ),
+        "update_client_topic": lambda s, r: ops.update_client_topic(
+            s, ctx.client_id(r), ctx.topic_id(r), SUPPORT_CHAT_ID
+        ),
+        "get_client_with_topic": lambda s, r: ops.get_client_with_topic(s, ctx.client_id(r)),
+        # Predefined users
+        "create_predefined_user": lambda s, r: ops.create_predefined_user(s, ctx.unique("bench"), ctx.client_id(r)),
+        "get_predefined_user": lambda s, r: ops.get_predefined_user(
+            s, f"user{r.randint(1, ctx.sizes.predefined_users)}"
+        ),
+        "get_predefined_users_by_client": lambda s, r: ops.get_predefined_users_by_client(s, ctx.client_id(r)),
+        # Projects
+        "get_project_by_id": lambda s, r: ops.get_project_by_id(s, ctx.project_id(r)),
+        "get_project_by_invite_code": lambda s, r: ops.get_project_by_invite_code(
+            s, f"INV{ctx.project_id(r):07d}"
+        ),
+        "get_project_with_client": lambda s, r: ops.get_project_with_client(s, ctx.project_id(r)),
+        "create_project": lambda s, r: ops.create_project(
+            s, ctx.client_id(r), "Bench project", ctx.unique("B")
+        ),
+        "ensure_default_project": lambda s, r: ops.ensure_default_project(s),
+        # Bindings
+        "get_user_binding": lambda s, r: ops.get_user_binding(s, ctx.tg_user_id(r)),
+        "get_user_bindings": lambda s, r: ops.get_user_bindings(s, ctx.tg_user_id(r)),
+        "get_user_projects": lambda s, r: ops.get_user_projects(s, ctx.tg_user_id(r)),
+        "create_or_update_user_binding": lambda s, r: ops.create_or_update_user_binding(
+            s, ctx.tg_user_id(r), ctx.project_id(r), "bench", "Bench User"
+        ),
+        "update_active_binding": lambda s, r: ops.update_active_binding(s, ctx.tg_user_id(r), ctx.project_id(r)),
+        # Tickets
+        "get_next_ticket_number": lambda s, r: ops.get_next_ticket_number(s),
+        "get_ticket_by_id": lambda s, r: ops.get_ticket_by_id(s, ctx.ticket_id(r)),
+        "get_ticket_by_number": lambda s, r: ops.get_ticket_by_number(s, ctx.ticket_id(r)),
+        "get_ticket_by_topic_id": lambda s, r: ops.get_ticket_by_topic_id(s, ctx.topic_id(r), SUPPORT_CHAT_ID),
+        "get_active_ticket": lambda s, r: ops.get_active_ticket(s, ctx.tg_user_id(r)),
+        "get_user_tickets": lambda s, r: ops.get_user_tickets(s, ctx.tg_user_id(r)),
+        "get_recent_closed_ticket": lambda s, r: ops.get_recent_closed_ticket(s, ctx.tg_user_id(r)),
+        "get_ticket_with_project": lambda s, r: ops.get_ticket_with_project(s, ctx.ticket_id(r)),
+        "get_operator_tickets": lambda s, r: ops.get_operator_tickets(s, r.choice(OPERATOR_IDS), "active"),
+        "get_unassigned_tickets": lambda s, r: ops.get_unassigned_tickets(s),
+        "get_open_tickets_since": lambda s, r: ops.get_open_tickets_since(s, datetime.utcnow() - timedelta(days=1)),
+        "get_tickets_breaching_before": lambda s, r: ops.get_tickets_breaching_before(
+            s, datetime.utcnow() + timedelta(hours=4)
+        ),
+        "get_tickets_awaiting_reply": lambda s, r: ops.get_tickets_awaiting_reply(
+            s, datetime.utcnow() - timedelta(hours=1)
+        ),
+        "create_ticket": lambda s, r: ops.create_ticket(
+            s, ctx.project_id(r), ctx.tg_user_id(r), r.choice(categories), SUPPORT_CHAT_ID, "Bench ticket"
+        ),
+        "update_ticket_topic": lambda s, r: ops.update_ticket_topic(s, ctx.ticket_id(r), ctx.topic_id(r)),
+        "update_ticket_sla_due_at": lambda s, r: ops.update_ticket_sla_due_at(
+            s, ctx.ticket_id(r), datetime.utcnow() + timedelta(hours=8)
+        ),
+        "update_ticket_status": lambda s, r: ops.update_ticket_status(
+            s, ctx.ticket_id(r), "in_progress", r.choice(OPERATOR_IDS)
+        ),
+        # Mostly a compare-and-set miss on the seeded data, like a manual take racing the dispatcher
+        "assign_ticket": lambda s, r: ops.assign_ticket(s, ctx.ticket_id(r), r.choice(OPERATOR_IDS), "new", None),
+        "reopen_ticket": lambda s, r: ops.reopen_ticket(s, ctx.ticket_id(r)),
+        # Idempotent: after the first call only the scan of resolved tickets remains
+        "backfill_closed_at": lambda s, r: ops.backfill_closed_at(s),
+        "get_ticket_events": lambda s, r: ops.get_ticket_events(s, ctx.ticket_id(r)),
+        "get_ticket_events_after": lambda s, r: ops.get_ticket_events_after(s, r.randint(0, ctx.max_ticket_id)),
+        # Messages
+        "create_message": lambda s, r: ops.create_message(
+            s, ctx.ticket_id(r), "client", r.randint(1, 10**9), "text", ctx.tg_user_id(r), "Bench message"
+        ),
+        "get_ticket_messages": lambda s, r: ops.get_ticket_messages(s, ctx.ticket_id(r)),
+        "get_ticket_messages_after": lambda s, r: ops.get_ticket_messages_after(s, ctx.ticket_id(r), 0),
+        # Feedback
+        "get_feedback_by_ticket": lambda s, r: ops.get_feedback_by_ticket(s, ctx.ticket_id(r)),
+        "create_feedback": create_feedback,
+        "update_feedback_comment": lambda s, r: ops.update_feedback_comment(
+            s, r.randint(1, ctx.max_feedback_id), "bench"
+        ),
+        "update_feedback_ratings": lambda s, r: ops.update_feedback_ratings(
+            s, ctx.ticket_id(r), r.randint(1, 5), r.randint(1, 5), r.randint(1, 5)
+        ),
+    }
+
+
+def uncovered_operations(cases: Dict[str, Case]) -> List[str]:
+    """Public async functions in operations.py that have no benchmark case."""
+    return sorted(
+        name
+        for name, function in inspect.getmembers(ops, inspect.iscoroutinefunction)
+        if function.__module__ == ops.__name__ and not name.startswith("_") and name not in cases
+    )
+
+
+async def run_benchmark(
+    path: Path,
+    sizes: DatasetSizes,
+    iterations: int,
+    warmup: int,
+    seed: int,
+    only: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    """
+    Time each operation and collect statement counts.
+
+    The seeded file at path is left untouched: cases run on a copy that is
+    deleted afterwards, reads first, then writes.
+
+    Returns:
+        Mapping of operation name to its latency/statement stats
+    """
+    with tempfile.TemporaryDirectory(prefix="db_bench_", dir=path.parent) as scratch:
+        copy = Path(scratch) / path.name
+        shutil.copyfile(path, copy)
+        return await _run_cases(copy, sizes, iterations, warmup, seed, only)
+
+
+async def _run_cases(
+    path: Path,
+    sizes: DatasetSizes,
+    iterations: int,
+    warmup: int,
+    seed: int,
+    only: Optional[List[str]],
+) -> Dict[str, Any]:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    instrument_engine(engine)
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    ctx = BenchContext(path, sizes, iterations + warmup)
+    cases = build_cases(ctx)
+    rng = random.Random(seed)
+    results: Dict[str, Any] = {}
+
+    try:
+        # Stable sort: reads, then writes, each in build_cases() order
+        for name, case in sorted(cases.items(), key=lambda item: item[0].startswith(WRITE_PREFIXES)):
+            if only and name not in only:
+                continue
+            timings: List[float] = []
+            statements: List[int] = []
+            errors: Dict[str, int] = {}
+            for i in range(warmup + iterations):
+                async with factory() as session:
+                    stats, token = start_query_tracking()
+                    started = time.perf_counter()
+                    try:
+                        await case(session, rng)
+                    except Exception as e:
+                        # Keep going: a failing query shape is a finding, not a crash
+                        key = f"{type(e).__name__}: {str(e).splitlines()[0][:120]}"
+                        errors[key] = errors.get(key, 0) + 1
+                        await session.rollback()
+                    finally:
+                        elapsed = time.perf_counter() - started
+                        stop_query_tracking(token)
+                if i >= warmup:
+                    timings.append(elapsed * 1000)
+                    statements.append(stats.count)
+            timings.sort()
+            results[name] = {
+                "iterations": iterations,
+                "p50_ms": round(percentile(timings, 50), 3),
+                "p95_ms": round(percentile(timings, 95), 3),
+                "p99_ms": round(percentile(timings, 99), 3),
+                "max_ms": round(timings[-1], 3),
+                "statements": round(sum(statements) / len(statements), 2),
+            }
+            if errors:
+                results[name]["errors"] = errors
+            print(
+                f"  {name:<32} p50 {results[name]['p50_ms']:>9.3f} ms  "
+                f"p95 {results[name]['p95_ms']:>9.3f} ms  "
+                f"p99 {results[name]['p99_ms']:>9.3f} ms  "
+                f"stmts {results[name]['statements']:>5}"
+                + (f"  errors {sum(errors.values())}" if errors else "")
+            )
+    finally:
+        await engine.dispose()
+
+    return results
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare_reports(base: Dict[str, Any], current: Dict[str, Any], threshold: float) -> List[str]:
+    """
+    Compare two reports and list regressions.
+
+    Args:
+        base: Previous report
+        current: New report
+        threshold: Allowed p95 slowdown ratio (e.g. 1.5)
+
+    Returns:
+        Human-readable regression descriptions (empty if none)
+    """
+    regressions: List[str] = []
+    print(f"\n  {'operation':<32} {'p95 base':>10} {'p95 now':>10} {'ratio':>7} {'stmts':>11}")
+    for name, now in current["operations"].items():
+        before = base.get("operations", {}).get(name)
+        if before is None:
+            continue
+        ratio = now["p95_ms"] / before["p95_ms"] if before["p95_ms"] else 1.0
+        print(
+            f"  {name:<32} {before['p95_ms']:>10.3f} {now['p95_ms']:>10.3f} {ratio:>6.2f}x "
+            f"{before['statements']:>5}->{now['statements']:<5}"
+        )
+        if now["statements"] > before["statements"]:
+            regressions.append(f"{name}: statements {before['statements']} -> {now['statements']}")
+        if ratio > threshold:
+            regressions.append(f"{name}: p95 {before['p95_ms']} -> {now['p95_ms']} ms ({ratio:.2f}x)")
+    return regressions
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark app.database.operations on seeded SQLite")
+    parser.add_argument("--db", type=Path, default=Path("data/bench.sqlite"), help="Benchmark database file")
+    parser.add_argument("--scale", type=float, default=1.0, help="Fraction of production sizes (default 1.0)")
+    parser.add_argument("--reseed", action="store_true", help="Delete and reseed the database")
+    parser.add_argument("--iterations", type=int, default=200, help="Timed calls per operation")
+    parser.add_argument("--warmup", type=int, default=5, help="Untimed calls per operation")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for data and arguments")
+    parser.add_argument("--only", nargs="*", help="Run only these operations")
+    parser.add_argument("--output", type=Path, help="Write JSON report to this file")
+    parser.add_argument("--compare", type=Path, help="Compare with a previous JSON report")
+    parser.add_argument("--threshold", type=float, default=1.5, help="Allowed p95 slowdown for --compare")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    sizes = DatasetSizes.for_scale(args.scale)
+
+    if args.reseed and args.db.exists():
+        args.db.unlink()
+    if not args.db.exists():
+        print(f"Seeding {args.db} (scale {args.scale})")
+        seed_database(args.db, args.scale, args.seed)
+    else:
+        print(f"Reusing {args.db} (pass --reseed after changing --scale; runs never modify it)")
+
+    print(f"Benchmarking {args.iterations} iterations per operation")
+    results = asyncio.run(
+        run_benchmark(args.db, sizes, args.iterations, args.warmup, args.seed, args.only)
+    )
+
+    report: Dict[str, Any] = {
+        "meta": {
+            "created_at": datetime.utcnow().isoformat(timespec="seconds"),
+            "git": _git_revision(),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "scale": args.scale,
+            "sizes": sizes.to_dict(),
+            "iterations": args.iterations,
+            "seed": args.seed,
+        },
+        "operations": results,
+        "uncovered": uncovered_operations(build_cases(BenchContext(args.db, sizes, 0))),
+    }
+    if report["uncovered"]:
+        print(f"\n⚠️  Not benchmarked: {', '.join(report['uncovered'])}")
+
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        print(f"\nReport written to {args.output}")
+
+    if args.compare:
+        base = json.loads(args.compare.read_text(encoding="utf-8"))
+        regressions = compare_reports(base, report, args.threshold)
+        if regressions:
+            print("\n❌ Regressions:\n  " + "\n  ".join(regressions))
+            return 1
+        print("\n✅ No regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
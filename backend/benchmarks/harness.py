@@ -0,0 +1,361 @@
+"""
+Shared pieces for driving the real Dispatcher without Telegram.
+
+- StubSession: Bot API session that records calls, fakes results and
+  simulates latency and flood limits
+- UpdateFactory: builds private/group messages and callback queries
+- Probe: per-update handler name, SQL statements and outbound calls
+- get_dispatcher(): the Dispatcher from app.main, built once per process
+"""
+
+import asyncio
+import collections
+import contextvars
+import itertools
+import math
+import random
+import time
+import typing
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from aiogram import BaseMiddleware, Bot, Dispatcher
+from aiogram.client.session.base import BaseSession
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import TelegramMethod
+from aiogram.types import ForumTopic, Message, MessageId, TelegramObject, Update, User
+
+from app.config.settings import settings
+
+# Telegram's documented limits: ~30 msg/s per bot, ~1 msg/s per chat, 20 msg/min per group
+GLOBAL_RATE = 30.0
+PRIVATE_CHAT_RATE = 1.0
+GROUP_CHAT_RATE = 20 / 60
+BURST = 3.0
+
+_FLOOD_LIMITED_PREFIXES = ("send", "copy", "forward")
+
+
+@dataclass
+class UpdateSample:
+    """What happened while one update was processed."""
+
+    handler: Optional[str] = None
+    statements: int = 0
+    calls: int = 0
+
+
+_current_sample: contextvars.ContextVar[Optional[UpdateSample]] = contextvars.ContextVar(
+    "update_sample", default=None
+)
+
+
+class _TokenBucket:
+    """Classic token bucket; take() returns seconds to wait (0 if allowed)."""
+
+    def __init__(self, rate: float, burst: float) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def take(self) -> float:
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class StubSession(BaseSession):
+    """
+    Bot API session that never leaves the process.
+
+    Args:
+        latency: Mean simulated round-trip in seconds
+        flood: Raise TelegramRetryAfter when Telegram's rate limits would trigger
+        seed: Random seed for latency jitter
+    """
+
+    def __init__(self, latency: float = 0.0, flood: bool = False, seed: int = 0) -> None:
+        super().__init__()
+        self.latency = latency
+        self.flood = flood
+        self.rng = random.Random(seed)
+        self.calls: typing.Counter[str] = collections.Counter()
+        self.retry_after = 0
+        self._ids = itertools.count(1_000_000)
+        self._global_bucket = _TokenBucket(GLOBAL_RATE, GLOBAL_RATE)
+        self._chat_buckets: Dict[Any, _TokenBucket] = {}
+
+    async def close(self) -> None:
+        pass
+
+    async def stream_content(self, *args: Any, **kwargs: Any) -> typing.AsyncGenerator[bytes, None]:
+        yield b""
+
+    async def make_request(self, bot: Bot, method: TelegramMethod, timeout: Optional[int] = None) -> Any:
+        name = method.__api_method__
+        self.calls[name] += 1
+        sample = _current_sample.get()
+        if sample is not None:
+            sample.calls += 1
+
+        if self.latency:
+            await asyncio.sleep(max(0.0, self.rng.gauss(self.latency, self.latency * 0.3)))
+
+        if self.flood and name.startswith(_FLOOD_LIMITED_PREFIXES):
+            wait = self._flood_wait(getattr(method, "chat_id", None))
+            if wait:
+                self.retry_after += 1
+                raise TelegramRetryAfter(method, "Flood control exceeded", math.ceil(wait))
+
+        return self._fake_result(bot, method)
+
+    def _flood_wait(self, chat_id: Any) -> float:
+        """Seconds until the call would be allowed (0 if allowed now)."""
+        bucket = self._chat_buckets.get(chat_id)
+        if bucket is None:
+            is_group = isinstance(chat_id, int) and chat_id < 0
+            bucket = _TokenBucket(GROUP_CHAT_RATE if is_group else PRIVATE_CHAT_RATE, BURST)
+            self._chat_buckets[chat_id] = bucket
+        return max(self._global_bucket.take(), bucket.take())
+
+    def _fake_result(self, bot: Bot, method: TelegramMethod) -> Any:
+        """Build a plausible result object for the method's return type."""
+        returning = method.__returning__
+        if typing.get_origin(returning) is list:
+            return []
+        returns_message = returning is Message or (
+            typing.get_origin(returning) is typing.Union and Message in typing.get_args(returning)
+        )
+        if returns_message:
+            chat_id = getattr(method, "chat_id", None)
+            chat_id = chat_id if isinstance(chat_id, int) else 0
+            return Message.model_validate(
+                {
+                    "message_id": next(self._ids),
+                    "date": datetime.now(timezone.utc),
+                    "chat": {"id": chat_id, "type": "supergroup" if chat_id < 0 else "private"},
+                    "message_thread_id": getattr(method, "message_thread_id", None),
+                    "text": getattr(method, "text", None),
+                },
+                context={"bot": bot},
+            )
+        if returning is MessageId:
+            return MessageId(message_id=next(self._ids))
+        if returning is ForumTopic:
+            return ForumTopic(message_thread_id=next(self._ids), name=getattr(method, "name", "topic"), icon_color=0)
+        if returning is User:
+            return User(id=bot.id, is_bot=True, first_name="Load", username="load_test_bot")
+        return True
+
+
+class UpdateFactory:
+    """Builds Update objects with increasing update/message ids."""
+
+    def __init__(self, bot: Bot, support_chat_id: int) -> None:
+        self.bot = bot
+        self.support_chat_id = support_chat_id
+        self._update_ids = itertools.count(1)
+        self._message_ids = itertools.count(1)
+
+    def _user(self, user_id: int) -> Dict[str, Any]:
+        return {"id": user_id, "is_bot": False, "first_name": f"User{user_id}", "username": f"user{user_id}"}
+
+    def _message(self, user_id: int, chat: Dict[str, Any], **fields: Any) -> Dict[str, Any]:
+        return {
+            "message_id": next(self._message_ids),
+            "date": datetime.now(timezone.utc),
+            "chat": chat,
+            "from": self._user(user_id),
+            **fields,
+        }
+
+    def _update(self, **payload: Any) -> Update:
+        return Update.model_validate({"update_id": next(self._update_ids), **payload}, context={"bot": self.bot})
+
+    def private_text(self, user_id: int, text: str) -> Update:
+        """Text message from user in their private chat with the bot."""
+        chat = {"id": user_id, "type": "private"}
+        return self._update(message=self._message(user_id, chat, text=text))
+
+    def private_photo(self, user_id: int, caption: Optional[str] = None) -> Update:
+        """Photo message from user in private chat."""
+        chat = {"id": user_id, "type": "private"}
+        file_id = f"photo-{user_id}-{next(self._message_ids)}"
+        photo = [{"file_id": file_id, "file_unique_id": file_id, "width": 1280, "height": 720}]
+        return self._update(message=self._message(user_id, chat, photo=photo, caption=caption))
+
+    def topic_text(self, user_id: int, thread_id: int, text: str) -> Update:
+        """Message from user (operator) in a support-group topic."""
+        chat = {"id": self.support_chat_id, "type": "supergroup", "title": "Support", "is_forum": True}
+        return self._update(
+            message=self._message(user_id, chat, text=text, message_thread_id=thread_id, is_topic_message=True)
+        )
+
+    def callback(self, user_id: int, data: str, thread_id: Optional[int] = None) -> Update:
+        """Button press on a bot message (support topic if thread_id, else private chat)."""
+        if thread_id is None:
+            chat = {"id": user_id, "type": "private"}
+        else:
+            chat = {"id": self.support_chat_id, "type": "supergroup", "title": "Support", "is_forum": True}
+        bot_user = {"id": self.bot.id, "is_bot": True, "first_name": "Load"}
+        message = {
+            "message_id": next(self._message_ids),
+            "date": datetime.now(timezone.utc),
+            "chat": chat,
+            "from": bot_user,
+            "text": "…",
+            "message_thread_id": thread_id,
+        }
+        return self._update(
+            callback_query={
+                "id": str(next(self._update_ids)),
+                "from": self._user(user_id),
+                "chat_instance": str(chat["id"]),
+                "message": message,
+                "data": data,
+            }
+        )
+
+
+class ProbeMiddleware(BaseMiddleware):
+    """Innermost middleware: records handler name and SQL statements per update."""
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        try:
+            return await handler(event, data)
+        finally:
+            sample = _current_sample.get()
+            if sample is not None:
+                callback = getattr(data.get("handler"), "callback", None)
+                sample.handler = getattr(callback, "__name__", None) or "unknown"
+                stats = data.get("query_stats")
+                sample.statements = stats.count if stats is not None else 0
+
+
+@dataclass
+class FeedResult:
+    """One processed update."""
+
+    seconds: float
+    sample: UpdateSample
+    error: Optional[str] = None
+
+
+@dataclass
+class FeedLog:
+    """All processed updates of a run."""
+
+    results: List[FeedResult] = field(default_factory=list)
+
+    def by_handler(self) -> Dict[str, List[FeedResult]]:
+        grouped: Dict[str, List[FeedResult]] = collections.defaultdict(list)
+        for result in self.results:
+            grouped[result.sample.handler or "unhandled"].append(result)
+        return dict(grouped)
+
+
+async def feed(dp: Dispatcher, bot: Bot, update: Update, log: FeedLog) -> FeedResult:
+    """Feed one update through the dispatcher and record its sample."""
+    sample = UpdateSample()
+    token = _current_sample.set(sample)
+    error = None
+    started = time.perf_counter()
+    try:
+        await dp.feed_update(bot, update)
+    except Exception as e:
+        error = type(e).__name__
+    finally:
+        elapsed = time.perf_counter() - started
+        _current_sample.reset(token)
+    result = FeedResult(seconds=elapsed, sample=sample, error=error)
+    log.results.append(result)
+    return result
+
+
+_dispatcher: Optional[Dispatcher] = None
+
+
+def get_dispatcher() -> Dispatcher:
+    """
+    Dispatcher from app.main with ProbeMiddleware attached.
+
+    Routers are module singletons and can be attached only once, so the
+    dispatcher is built once per process and reused.
+    """
+    global _dispatcher
+
+    if _dispatcher is None:
+        from app.main import create_dispatcher
+
+        _dispatcher = create_dispatcher()
+        _dispatcher.message.middleware(ProbeMiddleware())
+        _dispatcher.callback_query.middleware(ProbeMiddleware())
+    return _dispatcher
+
+
+async def use_scratch_database(path: Path) -> None:
+    """Point the app at a fresh SQLite file and create tables."""
+    from app.database import connection
+
+    await connection.close_db()
+    if path.exists():
+        path.unlink()
+    settings.db_path = str(path)
+    await connection.init_db()
+
+
+def percentiles(values: List[float]) -> Dict[str, float]:
+    """p50/p95/p99/max in milliseconds (nearest rank)."""
+    if not values:
+        return {"p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+    ordered = sorted(values)
+
+    def rank(q: float) -> float:
+        return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)] * 1000
+
+    return {
+        "p50_ms": round(rank(50), 3),
+        "p95_ms": round(rank(95), 3),
+        "p99_ms": round(rank(99), 3),
+        "max_ms": round(ordered[-1] * 1000, 3),
+    }
+
+
+def summarize(log: FeedLog, elapsed: float, session: StubSession) -> Dict[str, Any]:
+    """Build report: throughput, latency, per-handler stats, outbound calls."""
+    results = log.results
+    count = len(results) or 1
+    handlers: Dict[str, Any] = {}
+    for name, items in sorted(log.by_handler().items()):
+        handlers[name] = {
+            "updates": len(items),
+            **percentiles([item.seconds for item in items]),
+            "statements_per_update": round(sum(i.sample.statements for i in items) / len(items), 2),
+            "calls_per_update": round(sum(i.sample.calls for i in items) / len(items), 2),
+            "errors": sum(1 for i in items if i.error),
+        }
+    errors: typing.Counter[str] = collections.Counter(r.error for r in results if r.error)
+    return {
+        "updates": len(results),
+        "seconds": round(elapsed, 3),
+        "updates_per_second": round(len(results) / elapsed, 1) if elapsed else 0.0,
+        "latency": percentiles([r.seconds for r in results]),
+        "statements_per_update": round(sum(r.sample.statements for r in results) / count, 2),
+        "calls_per_update": round(sum(r.sample.calls for r in results) / count, 2),
+        "outbound_calls": dict(sorted(session.calls.items())),
+        "retry_after": session.retry_after,
+        "errors": dict(errors),
+        "handlers": handlers,
+    }
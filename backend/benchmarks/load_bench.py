@@ -0,0 +1,240 @@
+"""
+End-to-end load generator for the real Dispatcher with a stub Bot session.
+
+N clients concurrently open tickets (with photo attachments), chat with
+support and leave CSAT; M operators take, answer and close the tickets.
+Every update goes through dp.feed_update with all production middlewares
+and routers; Bot API calls hit StubSession (latency and flood simulation).
+
+Usage (from backend/):
+    python -m benchmarks.load_bench --clients 200 --operators 10 --latency-ms 80
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Settings require Telegram credentials; the load test never talks to Telegram
+os.environ.setdefault("BOT_TOKEN", "123456:load-test")
+os.environ.setdefault("SUPPORT_CHAT_ID", "-1001234567890")
+
+from aiogram import Bot  # noqa: E402
+from aiogram.fsm.storage.memory import MemoryStorage  # noqa: E402
+
+from app.config.settings import settings  # noqa: E402
+from app.database import operations as ops  # noqa: E402
+from app.database.connection import DatabaseSessionManager, close_db  # noqa: E402
+from app.logging_setup import setup_logging, shutdown_logging  # noqa: E402
+from benchmarks.harness import (  # noqa: E402
+    FeedLog,
+    StubSession,
+    UpdateFactory,
+    feed,
+    get_dispatcher,
+    summarize,
+    use_scratch_database,
+)
+
+FIRST_CLIENT_ID = 500_000_000
+FIRST_OPERATOR_ID = 900_000_000
+
+
+@dataclass
+class LoadConfig:
+    """Scenario parameters."""
+
+    clients: int = 50
+    operators: int = 5
+    attachments: int = 1
+    messages: int = 3
+    csat_rate: float = 0.8
+    latency_ms: float = 0.0
+    flood: bool = False
+    think_ms: float = 0.0
+    seed: int = 42
+
+
+@dataclass
+class TicketJob:
+    """Ticket handed from a client to the operator pool."""
+
+    client_id: int
+    ticket_id: int
+    topic_id: Optional[int]
+    taken: asyncio.Event
+    closed: asyncio.Event
+
+
+class LoadRun:
+    """One load-test run against a scratch database."""
+
+    def __init__(self, config: LoadConfig, bot: Bot, session: StubSession) -> None:
+        self.config = config
+        self.bot = bot
+        self.session = session
+        self.dp = get_dispatcher()
+        self.updates = UpdateFactory(bot, settings.support_chat_id)
+        self.log = FeedLog()
+        self.rng = random.Random(config.seed)
+        self.jobs: "asyncio.Queue[Optional[TicketJob]]" = asyncio.Queue()
+
+    async def _send(self, update: Any) -> None:
+        if self.config.think_ms:
+            await asyncio.sleep(self.rng.uniform(0, self.config.think_ms / 1000))
+        await feed(self.dp, self.bot, update, self.log)
+
+    async def seed_projects(self) -> None:
+        """One client company (own topic) and invite code per simulated user."""
+        async with DatabaseSessionManager() as session:
+            for i in range(self.config.clients):
+                client = await ops.create_client(session, f"Load client {i}")
+                await ops.create_project(session, client.id, "Main", invite_code=f"load{i}")
+
+    async def client(self, index: int) -> None:
+        """Open a ticket, chat while it is in progress, leave CSAT after close."""
+        user_id = FIRST_CLIENT_ID + index
+        updates = self.updates
+
+        await self._send(updates.private_text(user_id, f"/start load{index}"))
+        await self._send(updates.callback(user_id, "category:report"))
+        await self._send(updates.private_text(user_id, f"Report #{index} shows wrong numbers since Monday"))
+        for _ in range(self.config.attachments):
+            await self._send(updates.private_photo(user_id))
+        if self.config.attachments:
+            await self._send(updates.callback(user_id, "ticket:show_summary"))
+        else:
+            await self._send(updates.callback(user_id, "ticket:skip_attachments"))
+        await self._send(updates.callback(user_id, "ticket:submit"))
+
+        async with DatabaseSessionManager() as session:
+            ticket = await ops.get_active_ticket(session, user_id)
+        if ticket is None:
+            return
+
+        job = TicketJob(user_id, ticket.id, ticket.topic_id, asyncio.Event(), asyncio.Event())
+        await self.jobs.put(job)
+
+        await job.taken.wait()
+        for i in range(self.config.messages):
+            await self._send(updates.private_text(user_id, f"Any news? ({i + 1})"))
+
+        await job.closed.wait()
+        if self.rng.random() < self.config.csat_rate:
+            await self._send(updates.callback(user_id, f"csat:positive:{ticket.id}"))
+            for dimension in ("speed", "quality", "politeness"):
+                await self._send(updates.callback(user_id, f"csat_detail:{dimension}:5:{ticket.id}"))
+        else:
+            await self._send(updates.callback(user_id, f"csat:negative:{ticket.id}"))
+            await self._send(updates.private_text(user_id, "Took too long"))
+
+    async def operator(self, index: int) -> None:
+        """Take tickets from the queue, answer in the topic and close them."""
+        operator_id = FIRST_OPERATOR_ID + index
+        while True:
+            job = await self.jobs.get()
+            if job is None:
+                return
+            thread_id = job.topic_id or 1
+            await self._send(self.updates.callback(operator_id, f"op:take:{job.ticket_id}", thread_id))
+            job.taken.set()
+            for i in range(self.config.messages):
+                await self._send(self.updates.topic_text(operator_id, thread_id, f"Looking into it ({i + 1})"))
+            await self._send(self.updates.callback(operator_id, f"op:close:{job.ticket_id}", thread_id))
+            job.closed.set()
+
+    async def run(self) -> Dict[str, Any]:
+        await self.seed_projects()
+        operators = [asyncio.create_task(self.operator(i)) for i in range(self.config.operators)]
+
+        started = time.perf_counter()
+        await asyncio.gather(*(self.client(i) for i in range(self.config.clients)))
+        elapsed = time.perf_counter() - started
+
+        for _ in operators:
+            await self.jobs.put(None)
+        await asyncio.gather(*operators)
+        return summarize(self.log, elapsed, self.session)
+
+
+async def run_load(config: LoadConfig, db_path: Path) -> Dict[str, Any]:
+    """
+    Run the scenario against a scratch database.
+
+    Args:
+        config: Scenario parameters
+        db_path: SQLite file to (re)create
+
+    Returns:
+        Report dict (see benchmarks.harness.summarize)
+    """
+    settings.operators = [FIRST_OPERATOR_ID + i for i in range(config.operators)]
+    await use_scratch_database(db_path)
+
+    from app.main import create_bot
+
+    session = StubSession(latency=config.latency_ms / 1000, flood=config.flood, seed=config.seed)
+    bot = create_bot(session)
+    dp = get_dispatcher()
+    dp.fsm.storage = MemoryStorage()
+    try:
+        return await LoadRun(config, bot, session).run()
+    finally:
+        await close_db()
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Drive the real Dispatcher with synthetic clients and operators")
+    parser.add_argument("--clients", type=int, default=50, help="Concurrent clients (one ticket each)")
+    parser.add_argument("--operators", type=int, default=5, help="Concurrent operators")
+    parser.add_argument("--attachments", type=int, default=1, help="Photos per ticket")
+    parser.add_argument("--messages", type=int, default=3, help="Chat messages per side per ticket")
+    parser.add_argument("--csat-rate", type=float, default=0.8, help="Share of positive CSAT")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Mean simulated Bot API latency")
+    parser.add_argument("--flood", action="store_true", help="Simulate Telegram flood limits (RetryAfter)")
+    parser.add_argument("--think-ms", type=float, default=0.0, help="Max random pause before each update")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--db", type=Path, help="Scratch database file (default: temporary)")
+    parser.add_argument("--output", type=Path, help="Write JSON report to this file")
+    parser.add_argument("--log-level", default="warning", help="App log level (slow queries, handler errors)")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    setup_logging(args.log_level)
+    config = LoadConfig(
+        clients=args.clients,
+        operators=args.operators,
+        attachments=args.attachments,
+        messages=args.messages,
+        csat_rate=args.csat_rate,
+        latency_ms=args.latency_ms,
+        flood=args.flood,
+        think_ms=args.think_ms,
+        seed=args.seed,
+    )
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = args.db or Path(tmp) / "load.sqlite"
+            report = asyncio.run(run_load(config, db_path))
+    finally:
+        shutdown_logging()
+
+    report["config"] = config.__dict__
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        args.output.write_text(text + "\n", encoding="utf-8")
+    print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
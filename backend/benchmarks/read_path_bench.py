@@ -0,0 +1,304 @@
+"""
+Microbenchmark for read-only list screens: ORM entities vs row DTOs.
+
+Renders the lists behind /mytickets, /unassigned, "Мои заявки" and /project
+two ways on a seeded database:
+  orm - select(Ticket) / get_user_bindings, i.e. session-tracked entities
+        (how the list operations loaded rows before read_models)
+  dto - the column selects in operations.py returning slotted dataclasses
+
+Each render (query + text) gets a fresh session, as in a handler. Latency
+is timed without tracing, alternating the variants call by call; a separate
+pass under tracemalloc records the peak memory allocated per render and how
+many objects the session tracked.
+
+Usage (from backend/):
+    python -m benchmarks.read_path_bench --scale 0.01
+    python -m benchmarks.read_path_bench --scale 0.01 --output read_path.json
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import random
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+# Settings require Telegram credentials; the benchmark never talks to Telegram
+os.environ.setdefault("BOT_TOKEN", "0:bench")
+os.environ.setdefault("SUPPORT_CHAT_ID", "-1001234567890")
+
+from sqlalchemy import select  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine  # noqa: E402
+
+from app.config.categories import get_category_label  # noqa: E402
+from app.config.texts import Texts  # noqa: E402
+from app.database import operations as ops  # noqa: E402
+from app.database.models import Ticket  # noqa: E402
+from app.database.pagination import fetch_page  # noqa: E402
+from benchmarks.db_bench import BenchContext, percentile  # noqa: E402
+from benchmarks.seed import OPERATOR_IDS, DatasetSizes, seed_database  # noqa: E402
+
+# Page sizes of the handlers
+OPERATOR_PAGE = 20
+USER_PAGE = 10
+
+Fetch = Callable[[AsyncSession, random.Random], Awaitable[Sequence[Any]]]
+Render = Callable[[Sequence[Any]], str]
+
+
+def render_operator_list(items: Sequence[Any]) -> str:
+    """Lines and topic links of /mytickets and /unassigned."""
+    return "\n".join(
+        Texts.operator_ticket_item(
+            number=t.number,
+            status=t.status,
+            category=get_category_label(t.category),
+            description=t.description or "",
+        ) + f" https://t.me/c/{str(t.support_chat_id)[4:]}/{t.topic_id}"
+        for t in items
+    )
+
+
+def render_user_list(items: Sequence[Any]) -> str:
+    """Lines of the client's "Мои заявки" list."""
+    return "\n".join(
+        Texts.MY_TICKETS_ITEM.format(
+            number=t.number,
+            category=get_category_label(t.category),
+            description=(t.description or "")[:50],
+            date=t.created_at.strftime("%d.%m.%Y"),
+            time=t.created_at.strftime("%H:%M"),
+            progress_bar="",
+            status_emoji="",
+            status=t.status,
+        ) + (t.closed_at.strftime(" %d.%m.%Y") if t.closed_at else "")
+        for t in items
+    )
+
+
+def render_bindings(bindings: Sequence[Any]) -> str:
+    """Buttons of /project from UserBinding entities."""
+    return "\n".join(f"{b.project.name} project:switch:{b.project.id}" for b in bindings if b.project)
+
+
+def render_project_choices(choices: Sequence[Any]) -> str:
+    """Buttons of /project from ProjectChoice rows."""
+    return "\n".join(f"{c.project_name} project:switch:{c.project_id}" for c in choices)
+
+
+def _orm_page(query: Any, sort_key: Any, descending: bool, limit: int) -> Fetch:
+    async def fetch(session: AsyncSession, rng: random.Random) -> Sequence[Any]:
+        page = await fetch_page(session, query(rng), sort_key, Ticket.id, descending, None, limit)
+        return page.items
+    return fetch
+
+
+def build_cases(ctx: BenchContext) -> Dict[str, Dict[str, Tuple[Fetch, Render]]]:
+    """Map list name to its orm and dto variants (same arguments for a given seed)."""
+
+    async def orm_projects(session: AsyncSession, rng: random.Random) -> Sequence[Any]:
+        return await ops.get_user_bindings(session, ctx.tg_user_id(rng))
+
+    async def dto_projects(session: AsyncSession, rng: random.Random) -> Sequence[Any]:
+        return await ops.get_user_projects(session, ctx.tg_user_id(rng))
+
+    async def dto_operator(session: AsyncSession, rng: random.Random) -> Sequence[Any]:
+        page = await ops.get_operator_tickets(session, rng.choice(OPERATOR_IDS), "active", limit=OPERATOR_PAGE)
+        return page.items
+
+    async def dto_unassigned(session: AsyncSession, rng: random.Random) -> Sequence[Any]:
+        return (await ops.get_unassigned_tickets(session, limit=OPERATOR_PAGE)).items
+
+    async def dto_user(session: AsyncSession, rng: random.Random) -> Sequence[Any]:
+        return (await ops.get_user_tickets(session, ctx.tg_user_id(rng), limit=USER_PAGE)).items
+
+    operator_query = _orm_page(
+        lambda rng: select(Ticket)
+        .where(Ticket.assigned_to_tg_user_id == rng.choice(OPERATOR_IDS))
+        .where(Ticket.status.in_(("in_progress", "on_hold"))),
+        Ticket.updated_at, True, OPERATOR_PAGE,
+    )
+    unassigned_query = _orm_page(
+        lambda rng: select(Ticket).where(Ticket.assigned_to_tg_user_id.is_(None)).where(Ticket.status == "new"),
+        Ticket.created_at, False, OPERATOR_PAGE,
+    )
+    user_query = _orm_page(
+        lambda rng: select(Ticket).where(Ticket.tg_user_id == ctx.tg_user_id(rng)),
+        Ticket.created_at, True, USER_PAGE,
+    )
+    return {
+        "operator_tickets": {
+            "orm": (operator_query, render_operator_list), "dto": (dto_operator, render_operator_list),
+        },
+        "unassigned_tickets": {
+            "orm": (unassigned_query, render_operator_list), "dto": (dto_unassigned, render_operator_list),
+        },
+        "user_tickets": {"orm": (user_query, render_user_list), "dto": (dto_user, render_user_list)},
+        "user_projects": {
+            "orm": (orm_projects, render_bindings), "dto": (dto_projects, render_project_choices),
+        },
+    }
+
+
+async def _time_variants(
+    factory: async_sessionmaker,
+    variants: Dict[str, Tuple[Fetch, Render]],
+    iterations: int,
+    warmup: int,
+    seed: int,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Time renders of all variants interleaved, so drift hits them alike.
+
+    Every variant draws arguments from its own Random(seed): the i-th render
+    of each variant shows the same list, and the output digests must match.
+    """
+    rngs = {variant: random.Random(seed) for variant in variants}
+    digests = {variant: hashlib.sha1() for variant in variants}
+    timings: Dict[str, List[float]] = {variant: [] for variant in variants}
+    rows = dict.fromkeys(variants, 0)
+    order = list(variants)
+    for i in range(warmup + iterations):
+        for variant in order if i % 2 else reversed(order):
+            fetch, render = variants[variant]
+            async with factory() as session:
+                started = time.perf_counter()
+                items = await fetch(session, rngs[variant])
+                text = render(items)
+                elapsed = time.perf_counter() - started
+            if i >= warmup:
+                timings[variant].append(elapsed * 1000)
+                rows[variant] += len(items)
+                digests[variant].update(text.encode())
+
+    stats: Dict[str, Dict[str, Any]] = {}
+    for variant, values in timings.items():
+        values.sort()
+        stats[variant] = {
+            "p50_ms": round(percentile(values, 50), 3),
+            "p95_ms": round(percentile(values, 95), 3),
+            "rows": round(rows[variant] / max(iterations, 1), 1),
+            "output": digests[variant].hexdigest(),
+        }
+    return stats
+
+
+async def _trace(
+    factory: async_sessionmaker,
+    fetch: Fetch,
+    render: Render,
+    iterations: int,
+    seed: int,
+) -> Dict[str, Any]:
+    """Median peak memory allocated by one render and objects its session tracked."""
+    rng = random.Random(seed)
+    peaks: List[float] = []
+    tracked: List[int] = []
+    tracemalloc.start()
+    try:
+        for _ in range(iterations):
+            async with factory() as session:
+                tracemalloc.reset_peak()
+                before = tracemalloc.get_traced_memory()[0]
+                items = await fetch(session, rng)
+                render(items)
+                peaks.append((tracemalloc.get_traced_memory()[1] - before) / 1024)
+                # The identity map is weak: count while the handler still holds the items
+                tracked.append(len(session.identity_map))
+                del items
+    finally:
+        tracemalloc.stop()
+    peaks.sort()
+    return {
+        "peak_kib": round(percentile(peaks, 50), 1),
+        "tracked_objects": round(sum(tracked) / max(len(tracked), 1), 1),
+    }
+
+
+async def run_benchmark(
+    path: Path,
+    sizes: DatasetSizes,
+    iterations: int,
+    warmup: int,
+    seed: int,
+    memory_iterations: int = 50,
+) -> Dict[str, Any]:
+    """
+    Measure every list in both variants.
+
+    Returns:
+        Mapping of list name to {"orm": stats, "dto": stats, "same_output": bool, ratios}
+    """
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    cases = build_cases(BenchContext(path, sizes, 0))
+    results: Dict[str, Any] = {}
+    print(f"  {'list':<20} {'variant':<4} {'p50 ms':>9} {'p95 ms':>9} {'peak KiB':>9} {'tracked':>8} {'rows':>6}")
+    try:
+        for name, variants in cases.items():
+            result: Dict[str, Any] = await _time_variants(factory, variants, iterations, warmup, seed)
+            for variant, (fetch, render) in variants.items():
+                stats = result[variant]
+                stats.update(await _trace(factory, fetch, render, min(memory_iterations, iterations), seed))
+                print(
+                    f"  {name:<20} {variant:<4} {stats['p50_ms']:>9.3f} {stats['p95_ms']:>9.3f} "
+                    f"{stats['peak_kib']:>9.1f} {stats['tracked_objects']:>8} {stats['rows']:>6}"
+                )
+            orm, dto = result["orm"], result["dto"]
+            result["same_output"] = orm.pop("output") == dto.pop("output")
+            result["p50_speedup"] = round(orm["p50_ms"] / dto["p50_ms"], 2) if dto["p50_ms"] else None
+            result["peak_ratio"] = round(orm["peak_kib"] / dto["peak_kib"], 2) if dto["peak_kib"] else None
+            results[name] = result
+    finally:
+        await engine.dispose()
+    return results
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Compare ORM entities and row DTOs on list screens")
+    parser.add_argument("--db", type=Path, default=Path("data/bench.sqlite"), help="Benchmark database file")
+    parser.add_argument("--scale", type=float, default=0.01, help="Fraction of production sizes (default 0.01)")
+    parser.add_argument("--reseed", action="store_true", help="Delete and reseed the database")
+    parser.add_argument("--iterations", type=int, default=500, help="Timed renders per list and variant")
+    parser.add_argument("--warmup", type=int, default=20, help="Untimed renders per list and variant")
+    parser.add_argument("--memory-iterations", type=int, default=50, help="Traced renders per list and variant")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for data and arguments")
+    parser.add_argument("--output", type=Path, help="Write JSON report to this file")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    sizes = DatasetSizes.for_scale(args.scale)
+
+    if args.reseed and args.db.exists():
+        args.db.unlink()
+    if not args.db.exists():
+        print(f"Seeding {args.db} (scale {args.scale})")
+        seed_database(args.db, args.scale, args.seed)
+    else:
+        print(f"Reusing {args.db} (pass --reseed after changing --scale)")
+
+    results = asyncio.run(
+        run_benchmark(args.db, sizes, args.iterations, args.warmup, args.seed, args.memory_iterations)
+    )
+    print()
+    for name, result in results.items():
+        print(
+            f"  {name:<20} p50 {result['p50_speedup']}x faster, "
+            f"peak {result['peak_ratio']}x smaller, same output: {result['same_output']}"
+        )
+    if args.output:
+        report = {"scale": args.scale, "sizes": sizes.to_dict(), "iterations": args.iterations, "lists": results}
+        args.output.write_text(json.dumps(report, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        print(f"\nReport written to {args.output}")
+    return 0 if all(result["same_output"] for result in results.values()) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,266 @@
+"""
+Replay recorded traffic against a scratch database and a stub Bot.
+
+Recordings come from UpdateRecorderMiddleware (RECORD_UPDATES_PATH).
+Updates are fed through the real Dispatcher either at the recorded pace
+(scaled by --speed, concurrent like polling) or back to back as fast as
+possible (--speed 0, deterministic order). Invite codes seen in /start
+deep links are created in the scratch database before replay.
+
+Usage (from backend/):
+    python -m benchmarks.replay data/updates.jsonl --speed 0 --output replay.json
+    python -m benchmarks.replay data/updates.jsonl --speed 0 --compare replay.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+
+# Settings require Telegram credentials; the replay never talks to Telegram
+os.environ.setdefault("BOT_TOKEN", "123456:replay")
+os.environ.setdefault("SUPPORT_CHAT_ID", "-1001234567890")
+
+from aiogram import Bot  # noqa: E402
+from aiogram.fsm.storage.memory import MemoryStorage  # noqa: E402
+from aiogram.types import Update  # noqa: E402
+
+from app.config.settings import settings  # noqa: E402
+from app.database import operations as ops  # noqa: E402
+from app.database.connection import DatabaseSessionManager, close_db  # noqa: E402
+from app.logging_setup import setup_logging, shutdown_logging  # noqa: E402
+from benchmarks.harness import (  # noqa: E402
+    FeedLog,
+    StubSession,
+    feed,
+    get_dispatcher,
+    percentiles,
+    summarize,
+    use_scratch_database,
+)
+
+
+@dataclass
+class RecordedUpdate:
+    """One line of a recording."""
+
+    t: float
+    handle_ms: float
+    payload: Dict[str, Any]
+
+
+@dataclass
+class Recording:
+    """Parsed recording file."""
+
+    support_chat_id: Optional[int] = None
+    operators: List[int] = field(default_factory=list)
+    updates: List[RecordedUpdate] = field(default_factory=list)
+    # Segments disagree on the support chat: recorded with different keys
+    mixed_keys: bool = False
+
+
+def load_recording(path: Path) -> Recording:
+    """
+    Read a JSONL recording.
+
+    A file appended across several bot restarts has several headers; each
+    segment's offsets continue after the previous segment's last update.
+    Segments share the recording's key file, so a user, chat or invite code
+    has the same pseudonym in all of them. Files recorded before the key
+    file existed (or after it was deleted) are flagged as mixed_keys.
+
+    Args:
+        path: Recording file
+
+    Returns:
+        Recording with updates ordered by arrival time
+    """
+    recording = Recording()
+    operators: Set[int] = set()
+    offset = 0.0
+    segment_end = 0.0
+    with path.open(encoding="utf-8") as file:
+        for line in file:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            header = entry.get("header")
+            if header is not None:
+                offset = segment_end
+                chat_id = header.get("support_chat_id")
+                if recording.support_chat_id is not None and chat_id != recording.support_chat_id:
+                    recording.mixed_keys = True
+                recording.support_chat_id = chat_id
+                operators.update(header.get("operators", []))
+                continue
+            t = offset + entry["t"]
+            segment_end = max(segment_end, t)
+            recording.updates.append(
+                RecordedUpdate(t=t, handle_ms=entry.get("handle_ms", 0.0), payload=entry["update"])
+            )
+
+    recording.operators = sorted(operators)
+    recording.updates.sort(key=lambda item: item.t)
+    return recording
+
+
+def invite_codes(recording: Recording) -> Set[str]:
+    """Arguments of /start deep links (hashed invite codes)."""
+    codes: Set[str] = set()
+    for item in recording.updates:
+        text = item.payload.get("message", {}).get("text", "")
+        command, _, args = text.partition(" ")
+        if command == "/start" and args.strip():
+            codes.add(args.strip())
+    return codes
+
+
+async def seed_invite_codes(codes: Set[str]) -> None:
+    """One client company (own topic) and project per recorded invite code."""
+    async with DatabaseSessionManager() as session:
+        for code in sorted(codes):
+            client = await ops.create_client(session, f"Replay {code}")
+            await ops.create_project(session, client.id, "Main", invite_code=code)
+
+
+async def _replay_updates(recording: Recording, bot: Bot, speed: float, log: FeedLog) -> float:
+    """Feed updates; return wall time of the replay in seconds."""
+    dp = get_dispatcher()
+    started = time.perf_counter()
+    if speed <= 0:
+        for item in recording.updates:
+            await feed(dp, bot, Update.model_validate(item.payload, context={"bot": bot}), log)
+        return time.perf_counter() - started
+
+    tasks = []
+    first = recording.updates[0].t if recording.updates else 0.0
+    for item in recording.updates:
+        delay = (item.t - first) / speed - (time.perf_counter() - started)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        update = Update.model_validate(item.payload, context={"bot": bot})
+        tasks.append(asyncio.create_task(feed(dp, bot, update, log)))
+    await asyncio.gather(*tasks)
+    return time.perf_counter() - started
+
+
+async def replay(recording: Recording, db_path: Path, speed: float = 0.0, latency_ms: float = 0.0) -> Dict[str, Any]:
+    """
+    Replay a recording against a fresh scratch database.
+
+    Args:
+        recording: Loaded recording
+        db_path: SQLite file to (re)create
+        speed: Pace multiplier (1.0 = recorded pace, 0 = as fast as possible)
+        latency_ms: Mean simulated Bot API latency
+
+    Returns:
+        Report dict (see benchmarks.harness.summarize) with recorded latencies added
+    """
+    if recording.support_chat_id is not None:
+        settings.support_chat_id = recording.support_chat_id
+    settings.operators = list(recording.operators)
+    await use_scratch_database(db_path)
+    await seed_invite_codes(invite_codes(recording))
+
+    from app.main import create_bot
+
+    session = StubSession(latency=latency_ms / 1000)
+    bot = create_bot(session)
+    get_dispatcher().fsm.storage = MemoryStorage()
+    log = FeedLog()
+    try:
+        elapsed = await _replay_updates(recording, bot, speed, log)
+    finally:
+        await close_db()
+
+    report = summarize(log, elapsed, session)
+    report["recorded_latency"] = percentiles([item.handle_ms / 1000 for item in recording.updates])
+    report["speed"] = speed
+    return report
+
+
+def compare_replays(base: Dict[str, Any], current: Dict[str, Any], threshold: float) -> List[str]:
+    """
+    Compare per-handler results of two replays of the same recording.
+
+    Args:
+        base: Previous report
+        current: New report
+        threshold: Allowed p95 slowdown ratio (e.g. 1.5)
+
+    Returns:
+        Human-readable regression descriptions (empty if none)
+    """
+    regressions: List[str] = []
+    print(f"\n  {'handler':<36} {'p95 base':>10} {'p95 now':>10} {'ratio':>7} {'stmts/upd':>13}")
+    for name, now in current["handlers"].items():
+        before = base.get("handlers", {}).get(name)
+        if before is None:
+            continue
+        ratio = now["p95_ms"] / before["p95_ms"] if before["p95_ms"] else 1.0
+        print(
+            f"  {name:<36} {before['p95_ms']:>10.3f} {now['p95_ms']:>10.3f} {ratio:>6.2f}x "
+            f"{before['statements_per_update']:>6}->{now['statements_per_update']:<6}"
+        )
+        if now["statements_per_update"] > before["statements_per_update"]:
+            regressions.append(
+                f"{name}: statements/update {before['statements_per_update']} -> {now['statements_per_update']}"
+            )
+        if ratio > threshold:
+            regressions.append(f"{name}: p95 {before['p95_ms']} -> {now['p95_ms']} ms ({ratio:.2f}x)")
+    return regressions
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Replay recorded updates through the real Dispatcher")
+    parser.add_argument("recording", type=Path, help="JSONL file written by RECORD_UPDATES_PATH")
+    parser.add_argument("--speed", type=float, default=0.0, help="Pace multiplier (1 = recorded pace, 0 = max)")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Mean simulated Bot API latency")
+    parser.add_argument("--db", type=Path, help="Scratch database file (default: temporary)")
+    parser.add_argument("--output", type=Path, help="Write JSON report to this file")
+    parser.add_argument("--compare", type=Path, help="Previous report to compare against")
+    parser.add_argument("--threshold", type=float, default=1.5, help="Allowed p95 slowdown ratio")
+    parser.add_argument("--log-level", default="warning", help="App log level (slow queries, handler errors)")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    setup_logging(args.log_level)
+    recording = load_recording(args.recording)
+    print(f"Replaying {len(recording.updates)} updates from {args.recording}")
+    if recording.mixed_keys:
+        print("⚠️  Segments were recorded with different keys: ids do not match across restarts")
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = args.db or Path(tmp) / "replay.sqlite"
+            report = asyncio.run(replay(recording, db_path, args.speed, args.latency_ms))
+    finally:
+        shutdown_logging()
+
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        args.output.write_text(text + "\n", encoding="utf-8")
+    print(text)
+
+    if args.compare:
+        base = json.loads(args.compare.read_text(encoding="utf-8"))
+        regressions = compare_replays(base, report, args.threshold)
+        if regressions:
+            print("\nRegressions:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
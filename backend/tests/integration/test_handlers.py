@@ -7,9 +7,11 @@ Tests handler logic with mocked Telegram API.
 import pytest
 from unittest.mock import AsyncMock, MagicMock
 
+from aiogram.filters import CommandObject
 from aiogram.types import User, Chat, Message, CallbackQuery
 
 from app.bot.handlers.common import handle_help, handle_project
+from app.bot.handlers.operator_commands import BREACHING_MAX_HOURS, cmd_breaching
 from app.database import operations as ops
 from app.config.texts import Texts
 
@@ -119,6 +121,22 @@ class TestProjectHandler:
         assert "My Project" in call_args[0][0]
 
 
+class TestBreachingHandler:
+    """Tests for /breaching command."""
+    
+    @pytest.mark.asyncio
+    async def test_breaching_clamps_hours(self, session):
+        """A huge window is clamped instead of overflowing datetime."""
+        message = create_mock_message("/breaching 99999999")
+        command = CommandObject(prefix="/", command="breaching", args="99999999")
+        
+        await cmd_breaching(message, command, session)
+        
+        message.answer.assert_called_once()
+        expected = Texts.OPERATOR_BREACHING_HEADER.format(hours=BREACHING_MAX_HOURS)
+        assert message.answer.call_args[0][0].startswith(expected)
+
+
 class TestDatabaseOperationsIntegration:
     """Integration tests for database operations."""
     
@@ -0,0 +1,143 @@
+"""
+Tests for columnar SLA analytics (/stats).
+"""
+
+from datetime import date, datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import operations as ops
+from app.database.models import Ticket
+from app.services.analytics import (
+    business_seconds_before,
+    columns_from_rows,
+    compute_stats,
+    grouped_distributions,
+    load_ticket_columns,
+    report_to_csv,
+)
+from app.services.business_calendar import BusinessCalendar
+
+# Mon-Fri 10:00-19:00 UTC
+OFFICE = BusinessCalendar("UTC", work_days=range(1, 6), start_hour=10, end_hour=19, around=date(2026, 10, 15))
+
+
+def ts(text: str) -> float:
+    return datetime.fromisoformat(text).replace(tzinfo=timezone.utc).timestamp()
+
+
+def test_grouped_distributions_match_numpy_percentile():
+    rng = np.random.default_rng(7)
+    values = rng.exponential(100, 1000)
+    groups = rng.integers(0, 4, 1000).astype(np.uint8)
+    order = np.lexsort((values, groups))
+
+    counts, means, table = grouped_distributions(values[order], groups[order], 5, (50, 90, 99))
+
+    for group in range(4):
+        own = values[groups == group]
+        assert counts[group] == len(own)
+        assert means[group] == pytest.approx(own.mean())
+        assert table[group] == pytest.approx(np.percentile(own, [50, 90, 99]))
+    assert counts[4] == 0 and np.isnan(table[4]).all()
+
+
+def test_business_seconds_follow_calendar():
+    """Friday 18:00 -> Monday 11:00 is two working hours; NaN stays NaN."""
+    moments = np.array([ts("2026-10-16 18:00"), ts("2026-10-19 11:00"), np.nan])
+    cumulative = business_seconds_before(OFFICE, moments)
+    assert cumulative[1] - cumulative[0] == 2 * 3600
+    assert np.isnan(cumulative[2])
+
+
+def test_compute_stats_per_dimension():
+    created = ts("2026-10-16 18:00")
+    rows = [
+        # Answered Monday 11:00, closed Monday 12:00
+        (created, ts("2026-10-19 11:00"), ts("2026-10-19 12:00"), "report", 42, 1),
+        # Answered after 30 minutes, still open
+        (created, created + 1800, None, "report", 42, 1),
+        # Never answered
+        (created, None, None, "billing", 0, 2),
+    ]
+    report = compute_stats(columns_from_rows(rows), OFFICE, datetime(2026, 10, 1), (50, 90), {1: "Acme"})
+
+    assert report.tickets == 3
+    assert report.total.metrics["first_response"].count == 2
+    report_group = report.groups["category"][0]
+    assert report_group.key == "report" and report_group.tickets == 2
+    assert report_group.metrics["resolution_business"].percentiles == (3 * 3600, 3 * 3600)
+    assert report_group.metrics["resolution"].percentiles[0] == 66 * 3600
+    # 30 min and 2 h of business time: linear interpolation
+    assert report_group.metrics["first_response_business"].percentiles[0] == pytest.approx(4500)
+    assert [g.label for g in report.groups["client"]] == ["Acme", "#2"]
+    assert report.groups["operator"][1].label == "—"
+
+    csv_text = report_to_csv(report)
+    assert csv_text.splitlines()[0] == "dimension,key,label,tickets,metric,count,mean_min,p50_min,p90_min"
+    assert "category,billing" in csv_text
+
+
+def test_compute_stats_without_tickets():
+    report = compute_stats(columns_from_rows([]), OFFICE, datetime(2026, 10, 1))
+    assert report.tickets == 0
+    assert report.groups == {"category": [], "operator": [], "client": []}
+    assert np.isnan(report.total.metrics["resolution"].mean)
+
+
+@pytest.mark.asyncio
+async def test_load_ticket_columns(session: AsyncSession, sample_data):
+    ticket = await ops.create_ticket(
+        session, project_id=sample_data["project1"].id, tg_user_id=1, category="report",
+        support_chat_id=-1001234567890, description="Отчёт",
+    )
+    created = datetime(2026, 10, 16, 18, 0, 0, 500000)
+    await session.execute(
+        update(Ticket).where(Ticket.id == ticket.id).values(
+            created_at=created, first_response_at=created + timedelta(minutes=5)
+        )
+    )
+    await session.commit()
+
+    columns = await load_ticket_columns(session, datetime(2026, 10, 1))
+    assert len(columns) == 1
+    assert columns.created[0] == pytest.approx(ts("2026-10-16 18:00:00.5"), abs=1e-3)
+    assert columns.first_response[0] - columns.created[0] == pytest.approx(300, abs=1e-3)
+    assert np.isnan(columns.closed[0])
+    assert columns.keys == {"category": ["report"], "operator": [0], "client": [sample_data["client"].id]}
+
+    assert len(await load_ticket_columns(session, datetime(2026, 10, 17))) == 0
+
+
+@pytest.mark.asyncio
+async def test_backfill_closed_at_gives_completed_tickets_a_resolution(session: AsyncSession, sample_data):
+    tickets = [
+        await ops.create_ticket(
+            session, project_id=sample_data["project1"].id, tg_user_id=1, category="report",
+            support_chat_id=-1001234567890,
+        )
+        for _ in range(3)
+    ]
+    ids = [t.id for t in tickets]
+    completed, legacy, cancelled = ids
+    await ops.update_ticket_status(session, completed, "completed")
+    await ops.update_ticket_status(session, cancelled, "cancelled")
+    [closed_at] = [e.ts for e in await ops.get_ticket_events(session, completed) if e.to_status == "completed"]
+    # Rows closed before closed_at was written for "completed" (and before ticket_events)
+    await session.execute(update(Ticket).where(Ticket.id == completed).values(closed_at=None))
+    await session.execute(update(Ticket).where(Ticket.id == legacy).values(status="completed", closed_at=None))
+    await session.commit()
+
+    assert await ops.backfill_closed_at(session, batch_size=2) == 2
+    assert await ops.backfill_closed_at(session) == 0
+
+    session.expire_all()
+    by_id = {ticket_id: await ops.get_ticket_by_id(session, ticket_id) for ticket_id in ids}
+    assert by_id[completed].closed_at == closed_at
+    assert by_id[legacy].closed_at == by_id[legacy].updated_at
+    assert by_id[cancelled].closed_at is None
+    columns = await load_ticket_columns(session, datetime(2026, 1, 1))
+    assert int(np.count_nonzero(~np.isnan(columns.closed))) == 2
@@ -0,0 +1,117 @@
+"""
+Tests for the in-memory "awaiting reply" queue and its digest.
+"""
+
+import random
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from typing import Optional
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import operations as ops
+from app.services.awaiting import AwaitingDigest, AwaitingReplyQueue, warm_up_awaiting_queue
+
+# Monday, 12:00 in Madrid (business hours)
+T0 = datetime(2026, 10, 19, 10, 0)
+
+
+def ticket(ticket_id: int, since: Optional[datetime], status: str = "in_progress", operator: int = 7):
+    return SimpleNamespace(
+        id=ticket_id, number=1000 + ticket_id, status=status, awaiting_reply_since=since,
+        assigned_to_tg_user_id=operator, support_chat_id=-1001234567890, topic_id=ticket_id,
+    )
+
+
+def message(direction: str, minutes: int) -> SimpleNamespace:
+    return SimpleNamespace(direction=direction, created_at=T0 + timedelta(minutes=minutes))
+
+
+def numbers(entries) -> list:
+    return [entry.number for entry in entries]
+
+
+def test_messages_move_tickets_in_and_out():
+    queue = AwaitingReplyQueue()
+    first, second = ticket(1, None), ticket(2, None)
+    queue.on_message(first, message("client", 0))
+    queue.on_message(second, message("client", 5))
+    # A follow-up keeps the original waiting start
+    queue.on_message(first, message("client", 10))
+    assert numbers(queue.oldest(10)) == [1001, 1002]
+    assert queue.oldest(1)[0].since == T0
+
+    queue.on_message(first, message("operator", 12))
+    queue.on_message(second, message("system", 12))
+    assert numbers(queue.oldest(10)) == [1002]
+    queue.on_message(first, message("client", 20))
+    assert numbers(queue.oldest(10)) == [1002, 1001]
+
+
+def test_status_changes_use_stored_waiting_start():
+    queue = AwaitingReplyQueue()
+    queue.sync(ticket(1, T0))
+    queue.sync(ticket(2, T0 - timedelta(hours=1), status="new", operator=None))
+    queue.sync(ticket(1, T0, status="on_hold"))
+    assert numbers(queue.oldest(10)) == [1002]
+
+    # Resumed ticket is back at its original place; unrelated changes keep the order
+    queue.sync(ticket(1, T0))
+    queue.sync(ticket(2, T0 - timedelta(hours=1), operator=9))
+    assert numbers(queue.oldest(10)) == [1002, 1001]
+    assert numbers(queue.oldest(10, assigned_to=9)) == [1002]
+    queue.sync(ticket(2, T0 - timedelta(hours=1), status="completed"))
+    assert len(queue) == 1
+
+
+def test_oldest_matches_sorting_with_stale_entries():
+    rng = random.Random(1)
+    queue = AwaitingReplyQueue()
+    expected = {}
+    for _ in range(5000):
+        ticket_id = rng.randint(1, 500)
+        if rng.random() < 0.4:
+            queue.discard(ticket_id)
+            expected.pop(ticket_id, None)
+        else:
+            since = T0 + timedelta(seconds=rng.randint(0, 10**6))
+            queue.sync(ticket(ticket_id, since))
+            expected[ticket_id] = since
+    assert len(queue) == len(expected)
+    assert len(queue._heap) <= 2 * len(queue) + 64
+    oldest = sorted(expected, key=lambda ticket_id: (expected[ticket_id], ticket_id))
+    assert [entry.since for entry in queue.oldest(25)] == [expected[t] for t in oldest[:25]]
+
+
+def test_digest_lists_long_waits_in_business_hours():
+    queue = AwaitingReplyQueue()
+    for ticket_id, minutes in ((1, 90), (2, 45), (3, 10)):
+        queue.sync(ticket(ticket_id, T0 - timedelta(minutes=minutes), operator=None if ticket_id == 2 else 7))
+
+    text = AwaitingDigest(queue, 60, 30, clock=lambda: T0).build()
+    assert "дольше 30 мин: 2" in text
+    assert text.index("#1001 — ждёт 1 ч 30 мин") < text.index("#1002 — ждёт 45 мин · 🆕 не назначен")
+    assert "#1003" not in text
+
+    assert AwaitingDigest(queue, 60, 120, clock=lambda: T0).build() is None
+    # Saturday
+    assert AwaitingDigest(queue, 60, 30, clock=lambda: T0 + timedelta(days=5)).build() is None
+
+
+@pytest.mark.asyncio
+async def test_warm_up_from_ticket_counters(session: AsyncSession, sample_data):
+    ids = []
+    for directions in (("client",), ("client", "operator"), ("client", "client")):
+        created = await ops.create_ticket(
+            session, project_id=sample_data["project1"].id, tg_user_id=1, category="report",
+            support_chat_id=-1001234567890,
+        )
+        for direction in directions:
+            await ops.create_message(session, created.id, direction, 1, "text", 1, direction)
+        ids.append(created.id)
+    await ops.update_ticket_status(session, ids[2], "on_hold")
+
+    queue = AwaitingReplyQueue()
+    assert await warm_up_awaiting_queue(session, queue) == 1
+    assert [entry.ticket_id for entry in queue.oldest(10)] == [ids[0]]
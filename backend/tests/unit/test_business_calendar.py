@@ -0,0 +1,83 @@
+"""
+Tests for the business-hours calendar.
+"""
+
+from datetime import date, datetime
+
+import pytz
+
+from app.services.business_calendar import BusinessCalendar, get_calendar
+
+MADRID = pytz.timezone("Europe/Madrid")
+
+
+def utc(year: int, month: int, day: int, hour: int, minute: int = 0) -> datetime:
+    """Madrid local time -> naive UTC."""
+    local = MADRID.localize(datetime(year, month, day, hour, minute))
+    return local.astimezone(pytz.utc).replace(tzinfo=None)
+
+
+def office(**kwargs) -> BusinessCalendar:
+    return BusinessCalendar("Europe/Madrid", work_days=[1, 2, 3, 4, 5], start_hour=10, end_hour=19,
+                            around=date(2026, 10, 18), **kwargs)
+
+
+def test_add_business_time_skips_nights_weekends_and_holidays():
+    calendar = office(holidays=[date(2026, 10, 26)])
+    # Friday 17:00 + 4 h -> 2 h on Friday, Monday is a holiday, 2 h on Tuesday
+    assert calendar.add_business_time(utc(2026, 10, 23, 17), 4 * 3600) == utc(2026, 10, 27, 12)
+    # Started at night: counting begins at opening time
+    assert calendar.add_business_time(utc(2026, 10, 20, 3), 3600) == utc(2026, 10, 20, 11)
+    # Ending exactly at closing time stays on that day; zero duration never goes back in time
+    assert calendar.add_business_time(utc(2026, 10, 20, 10), 9 * 3600) == utc(2026, 10, 20, 19)
+    assert calendar.add_business_time(utc(2026, 10, 20, 22), 0) == utc(2026, 10, 20, 22)
+
+
+def test_elapsed_is_inverse_of_add():
+    calendar = office()
+    start = utc(2026, 10, 21, 15, 30)
+    for hours in (0.5, 3, 9, 27, 100):
+        deadline = calendar.add_business_time(start, hours * 3600)
+        assert calendar.business_seconds_between(start, deadline) == hours * 3600
+    assert calendar.business_seconds_between(utc(2026, 10, 24, 0), utc(2026, 10, 25, 23)) == 0
+
+
+def test_dst_change_and_working_time_check():
+    always = BusinessCalendar("Europe/Madrid", work_days=range(1, 8), start_hour=0, end_hour=24,
+                              around=date(2026, 3, 29))
+    # Clocks go forward on 2026-03-29: the local day has 23 hours
+    assert always.business_seconds_between(utc(2026, 3, 29, 0), utc(2026, 3, 30, 0)) == 23 * 3600
+
+    calendar = office()
+    assert calendar.is_business_time(utc(2026, 10, 19, 10))
+    assert not calendar.is_business_time(utc(2026, 10, 19, 19))
+    assert not calendar.is_business_time(utc(2026, 10, 18, 12))  # Sunday
+
+
+def test_table_extends_beyond_horizon():
+    calendar = office()
+    size = len(calendar)
+    far = utc(2031, 6, 2, 10)  # Monday
+    assert calendar.add_business_time(far, 3600) == utc(2031, 6, 2, 11)
+    assert calendar.add_business_time(utc(2026, 10, 19, 10), 5000 * 3600) > utc(2028, 1, 1, 0)
+    assert len(calendar) > size
+
+
+def test_snapshot_is_not_touched_by_later_extension():
+    calendar = office()
+    start, end = utc(2026, 9, 1, 0).timestamp(), utc(2026, 10, 18, 0).timestamp()
+    snapshot = calendar.snapshot(start, end)
+    intervals = snapshot.intervals(start, end)
+
+    calendar.add_business_time(utc(2031, 6, 2, 10), 3600)  # extends the shared table
+
+    assert snapshot is not calendar and len(snapshot) < len(calendar)
+    assert all(a is b for a, b in zip(snapshot.intervals(start, end), intervals))
+
+
+def test_get_calendar_is_cached_per_timezone():
+    assert get_calendar("Asia/Tokyo") is get_calendar("Asia/Tokyo")
+    assert get_calendar() is get_calendar("Europe/Madrid")
+    assert get_calendar("Not/AZone") is get_calendar()
+    # Monday 09:00 JST (00:00 UTC) + 1 business hour -> 11:00 JST
+    assert get_calendar("Asia/Tokyo").add_business_time(datetime(2026, 10, 19, 0, 0), 3600) == datetime(2026, 10, 19, 2)
@@ -0,0 +1,97 @@
+"""
+Tests for denormalized ticket conversation counters.
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import operations as ops
+from app.database.counters import backfill_message_counters
+from app.database.models import Message, Ticket
+
+
+async def new_ticket(session: AsyncSession, project_id: int) -> Ticket:
+    return await ops.create_ticket(
+        session, project_id=project_id, tg_user_id=1, category="report", support_chat_id=-1001234567890,
+    )
+
+
+async def say(session: AsyncSession, ticket_id: int, direction: str) -> Message:
+    return await ops.create_message(session, ticket_id, direction, 1, "text", 1, direction)
+
+
+def counters(ticket: Ticket) -> tuple:
+    return (
+        ticket.message_count, ticket.last_message_at, ticket.last_client_message_at,
+        ticket.last_operator_message_at, ticket.awaiting_reply_since,
+    )
+
+
+@pytest.mark.asyncio
+async def test_create_message_updates_counters(session: AsyncSession, sample_data):
+    ticket = await new_ticket(session, sample_data["project1"].id)
+    updated_at = ticket.updated_at
+
+    first = await say(session, ticket.id, "client")
+    second = await say(session, ticket.id, "client")
+    ticket = await ops.get_ticket_by_id(session, ticket.id)
+    # A follow-up does not reset the waiting time
+    assert counters(ticket) == (2, second.created_at, second.created_at, None, first.created_at)
+    assert ticket.updated_at == updated_at
+
+    reply = await say(session, ticket.id, "operator")
+    await say(session, ticket.id, "system")
+    ticket = await ops.get_ticket_by_id(session, ticket.id)
+    assert ticket.message_count == 4
+    assert (ticket.last_operator_message_at, ticket.awaiting_reply_since) == (reply.created_at, None)
+
+
+@pytest.mark.asyncio
+async def test_loaded_ticket_gets_counters_in_place(session: AsyncSession, sample_data):
+    """A Ticket held by the caller is updated without a lazy load (which fails under asyncio)."""
+    ticket = await new_ticket(session, sample_data["project1"].id)
+
+    message = await say(session, ticket.id, "client")
+
+    assert counters(ticket) == (1, message.created_at, message.created_at, None, message.created_at)
+
+
+@pytest.mark.asyncio
+async def test_tickets_awaiting_reply(session: AsyncSession, sample_data):
+    project_id = sample_data["project1"].id
+    waiting = await new_ticket(session, project_id)
+    answered = await new_ticket(session, project_id)
+    recent = await new_ticket(session, project_id)
+    for ticket in (waiting, answered):
+        await say(session, ticket.id, "client")
+    await say(session, answered.id, "operator")
+    hour_ago = datetime.utcnow() - timedelta(hours=1)
+    await session.execute(
+        update(Ticket).where(Ticket.id == waiting.id).values(awaiting_reply_since=hour_ago - timedelta(minutes=5))
+    )
+    await session.commit()
+    await say(session, recent.id, "client")
+
+    assert [t.id for t in await ops.get_tickets_awaiting_reply(session, hour_ago)] == [waiting.id]
+    assert [t.id for t in await ops.get_tickets_awaiting_reply(session, datetime.utcnow())] == [waiting.id, recent.id]
+
+
+@pytest.mark.asyncio
+async def test_backfill_matches_incremental_counters(session: AsyncSession, sample_data):
+    project_id = sample_data["project1"].id
+    ids = [(await new_ticket(session, project_id)).id for _ in range(3)]
+    for direction in ("client", "operator", "client", "client"):
+        await say(session, ids[0], direction)
+    await say(session, ids[1], "operator")
+    expected = [counters(await ops.get_ticket_by_id(session, ticket_id)) for ticket_id in ids]
+
+    await session.execute(update(Ticket).values(message_count=99, last_message_at=None, awaiting_reply_since=None))
+    await session.commit()
+    session.expire_all()
+
+    assert await backfill_message_counters(session, batch_size=2) == 2
+    assert [counters(await ops.get_ticket_by_id(session, ticket_id)) for ticket_id in ids] == expected
+    assert expected[2] == (0, None, None, None, None)
@@ -0,0 +1,72 @@
+"""
+Tests for the database benchmark harness (tiny scale).
+"""
+
+import hashlib
+from pathlib import Path
+
+import pytest
+
+from benchmarks.db_bench import (
+    WRITE_PREFIXES,
+    BenchContext,
+    build_cases,
+    compare_reports,
+    percentile,
+    run_benchmark,
+    uncovered_operations,
+)
+from benchmarks.seed import DatasetSizes, seed_database
+
+
+def test_percentile_nearest_rank():
+    """Nearest-rank percentiles on a sorted list."""
+    values = [float(i) for i in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([], 95) == 0.0
+
+
+def test_compare_reports_flags_regressions():
+    """Slower p95 beyond threshold and extra statements are regressions."""
+    base = {"operations": {"op": {"p95_ms": 1.0, "statements": 1.0}}}
+    current = {"operations": {"op": {"p95_ms": 2.0, "statements": 2.0}}}
+    regressions = compare_reports(base, current, threshold=1.5)
+    assert len(regressions) == 2
+    assert compare_reports(base, base, threshold=1.5) == []
+
+
+@pytest.mark.asyncio
+async def test_benchmark_covers_all_operations(tmp_path: Path):
+    """Every operation in operations.py has a case and runs on seeded data."""
+    path = tmp_path / "bench.sqlite"
+    sizes = seed_database(path, scale=0.0005)
+    assert sizes == DatasetSizes.for_scale(0.0005)
+
+    assert uncovered_operations(build_cases(BenchContext(path, sizes, 0))) == []
+
+    results = await run_benchmark(
+        path, sizes, iterations=2, warmup=0, seed=1, only=["get_user_tickets", "create_ticket"]
+    )
+    assert set(results) == {"get_user_tickets", "create_ticket"}
+    assert results["get_user_tickets"]["statements"] == 1
+    assert results["create_ticket"]["p50_ms"] > 0
+
+
+@pytest.mark.asyncio
+async def test_runs_leave_the_seeded_file_alone(tmp_path: Path):
+    """Write cases run on a throwaway copy, after every read case."""
+    path = tmp_path / "bench.sqlite"
+    sizes = seed_database(path, scale=0.0005)
+    before = hashlib.sha256(path.read_bytes()).hexdigest()
+    cases = build_cases(BenchContext(path, sizes, 0))
+    assert all(name.startswith(("get_",) + WRITE_PREFIXES) for name in cases)
+
+    writes = ["create_ticket", "update_ticket_status", "reopen_ticket", "backfill_closed_at"]
+    results = await run_benchmark(
+        path, sizes, iterations=3, warmup=0, seed=1, only=writes + ["get_unassigned_tickets"]
+    )
+
+    assert list(results) == ["get_unassigned_tickets"] + writes
+    assert hashlib.sha256(path.read_bytes()).hexdigest() == before
+    assert [p.name for p in tmp_path.iterdir()] == ["bench.sqlite"]
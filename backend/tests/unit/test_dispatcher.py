@@ -0,0 +1,176 @@
+"""
+Tests for the load-aware auto-assignment dispatcher.
+"""
+
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from typing import Optional
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import operations as ops
+from app.services.dispatcher import Dispatcher, parse_operator_skills
+
+T0 = datetime(2026, 10, 19, 10, 0)
+
+
+def always(_: datetime) -> bool:
+    return True
+
+
+def ticket(
+    ticket_id: int,
+    category: str = "report",
+    priority: str = "normal",
+    sla_due_at: Optional[datetime] = None,
+    status: str = "new",
+    operator: Optional[int] = None,
+):
+    return SimpleNamespace(
+        id=ticket_id, number=1000 + ticket_id, category=category, priority=priority, sla_due_at=sla_due_at,
+        status=status, assigned_to_tg_user_id=operator, support_chat_id=-1001234567890, topic_id=ticket_id,
+        tg_user_id=1,
+    )
+
+
+def plan(dispatcher: Dispatcher) -> list:
+    return [(decision.ticket.number, decision.operator_id) for decision in dispatcher.plan(T0)]
+
+
+def test_priority_order_urgent_then_sla_then_arrival():
+    dispatcher = Dispatcher(max_load=10, is_business_time=always)
+    dispatcher.sync(ticket(1))
+    dispatcher.sync(ticket(2, sla_due_at=T0 + timedelta(hours=8)))
+    dispatcher.sync(ticket(3, sla_due_at=T0 + timedelta(hours=2)))
+    dispatcher.sync(ticket(4, priority="urgent"))
+    dispatcher.sync(ticket(5))
+    # Re-syncing a queued ticket keeps its place
+    dispatcher.sync(ticket(1))
+    dispatcher.set_online(7, True)
+    assert [number for number, _ in plan(dispatcher)] == [1004, 1003, 1002, 1001, 1005]
+    assert len(dispatcher) == 0
+
+
+def test_load_is_spread_and_capped():
+    dispatcher = Dispatcher(max_load=2, is_business_time=always)
+    dispatcher.sync(ticket(10, status="in_progress", operator=7))
+    for ticket_id in range(1, 5):
+        dispatcher.sync(ticket(ticket_id))
+    dispatcher.set_online(7, True)
+    dispatcher.set_online(8, True)
+
+    # 8 starts empty, then they alternate until both are full
+    assert plan(dispatcher) == [(1001, 8), (1002, 7), (1003, 8)]
+    assert (dispatcher.operator(7).load, dispatcher.operator(8).load) == (2, 2)
+    assert len(dispatcher) == 1
+
+    # Closing a ticket frees a slot
+    dispatcher.discard(10)
+    assert plan(dispatcher) == [(1004, 7)]
+
+
+def test_skills_and_generalists():
+    dispatcher = Dispatcher(max_load=5, skills={7: ["billing"], 8: ["access"]}, is_business_time=always)
+    dispatcher.sync(ticket(1, category="access"))
+    dispatcher.sync(ticket(2, category="report"))
+    dispatcher.sync(ticket(3, category="billing"))
+    dispatcher.set_online(7, True)
+    dispatcher.set_online(8, True)
+    # Nobody handles "report" yet: it stays queued without blocking the others
+    assert plan(dispatcher) == [(1001, 8), (1003, 7)]
+    assert len(dispatcher) == 1
+
+    dispatcher.set_online(9, True)
+    assert plan(dispatcher) == [(1002, 9)]
+
+
+def test_plan_leaves_the_backlog_alone():
+    dispatcher = Dispatcher(max_load=1, skills={7: ["billing"]}, is_business_time=always)
+    for ticket_id in range(1, 1001):
+        dispatcher.sync(ticket(ticket_id))
+    dispatcher.sync(ticket(2000, category="billing"))
+    dispatcher.set_online(7, True)
+    # Nobody takes "report": its tickets are never popped and pushed back
+    assert plan(dispatcher) == [(3000, 7)]
+    assert len(dispatcher._queues["report"]) == 1000
+
+    # One free slot takes one ticket, the rest of the backlog is not scanned
+    dispatcher.set_online(8, True)
+    assert plan(dispatcher) == [(1001, 8)]
+    assert not dispatcher.has_capacity()
+    assert len(dispatcher._queues["report"]) == 999
+    assert plan(dispatcher) == []
+    assert len(dispatcher) == 999
+
+
+def test_heaps_are_compacted():
+    dispatcher = Dispatcher(max_load=5, is_business_time=always)
+    dispatcher.set_online(7, True)
+    dispatcher.sync(ticket(1))
+    for ticket_id in range(2, 1002):
+        # Taken manually and closed: load goes up and down, 7 stays at the heap head
+        dispatcher.sync(ticket(ticket_id))
+        dispatcher.sync(ticket(ticket_id, status="in_progress", operator=7))
+        dispatcher.discard(ticket_id)
+    assert len(dispatcher._by_category["*"]) <= 2 + 64 + 1
+    assert len(dispatcher._queues["report"]) <= 2 + 64 + 1
+    assert plan(dispatcher) == [(1001, 7)]
+
+
+def test_offline_and_outside_business_hours():
+    closed = Dispatcher(max_load=5, is_business_time=lambda _: False)
+    closed.sync(ticket(1))
+    closed.set_online(7, True)
+    assert plan(closed) == []
+
+    dispatcher = Dispatcher(max_load=5, is_business_time=always)
+    dispatcher.sync(ticket(1))
+    dispatcher.set_online(7, True)
+    dispatcher.set_online(7, False)
+    assert plan(dispatcher) == []
+    assert len(dispatcher) == 1
+
+
+def test_sync_tracks_manual_changes():
+    dispatcher = Dispatcher(max_load=5, is_business_time=always)
+    dispatcher.sync(ticket(1))
+    dispatcher.sync(ticket(2))
+    # Taken manually, then paused: still counts, no longer queued
+    dispatcher.sync(ticket(1, status="in_progress", operator=7))
+    dispatcher.sync(ticket(1, status="on_hold", operator=7))
+    assert (len(dispatcher), dispatcher.operator(7).load) == (1, 1)
+
+    dispatcher.set_online(8, True)
+    decisions = dispatcher.plan(T0)
+    assert [(d.ticket.ticket_id, d.operator_id) for d in decisions] == [(2, 8)]
+    # The assignment could not be applied: the charge is undone
+    dispatcher.cancel(decisions[0])
+    assert dispatcher.operator(8).load == 0
+    dispatcher.discard(1)
+    assert dispatcher.operator(7).load == 0
+
+
+def test_parse_operator_skills():
+    assert parse_operator_skills("111:report, billing;222:access;bad;") == {
+        111: ("report", "billing"), 222: ("access",),
+    }
+    assert parse_operator_skills("") == {}
+
+
+@pytest.mark.asyncio
+async def test_assign_ticket_is_compare_and_set(session: AsyncSession, sample_data):
+    created = await ops.create_ticket(
+        session, project_id=sample_data["project1"].id, tg_user_id=1, category="report",
+        support_chat_id=-1001234567890,
+    )
+    # A manual take wins; the dispatcher's stale decision then misses
+    taken = await ops.assign_ticket(session, created.id, 7, "new", None, actor=7)
+    assert (taken.status, taken.assigned_to_tg_user_id) == ("in_progress", 7)
+    assert taken.first_response_at is not None
+    assert await ops.assign_ticket(session, created.id, 8, "new", None) is None
+
+    ticket = await ops.get_ticket_by_id(session, created.id)
+    assert ticket.assigned_to_tg_user_id == 7
+    events = await ops.get_ticket_events(session, created.id)
+    assert [(event.to_status, event.actor_tg_user_id) for event in events][1:] == [("in_progress", 7)]
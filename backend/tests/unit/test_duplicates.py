@@ -0,0 +1,77 @@
+"""
+Tests for near-duplicate ticket detection.
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import operations as ops
+from app.database.models import Ticket
+from app.services.duplicates import DuplicateIndex, estimate_similarity, sketch, warm_up_duplicate_index
+
+PAYMENT = "Не проходит оплата картой на сайте, выдаёт ошибку 500"
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_similarity_estimate():
+    """Reworded reports of one incident score high, unrelated ones low."""
+    assert estimate_similarity(sketch(PAYMENT), sketch(PAYMENT.upper() + "!!")) == 1.0
+    assert estimate_similarity(sketch(PAYMENT), sketch("Оплата картой на сайте не проходит, ошибка 500")) > 0.5
+    assert estimate_similarity(sketch(PAYMENT), sketch("Не могу войти в личный кабинет")) < 0.2
+    assert estimate_similarity(sketch(""), sketch(PAYMENT)) == 0.0
+
+
+def test_find_is_per_client_and_forgets_closed_tickets():
+    index = DuplicateIndex(window_seconds=3600, threshold=0.5)
+    index.add(1, 101, client_id=1, text=PAYMENT)
+    index.add(2, 102, client_id=1, text="Не могу войти в личный кабинет")
+    index.add(3, 103, client_id=2, text=PAYMENT)
+
+    matches = index.find(1, "Не проходит оплата картой на сайте — ошибка 500!")
+    assert [(m.ticket_id, m.number) for m in matches] == [(1, 101)]
+    assert matches[0].similarity >= 0.5
+
+    index.discard(1)
+    assert index.find(1, PAYMENT) == []
+    assert len(index) == 2
+
+
+def test_sliding_window_and_cap():
+    clock = FakeClock()
+    index = DuplicateIndex(window_seconds=600, threshold=0.5, max_entries=2, clock=clock)
+    index.add(1, 101, 1, PAYMENT, age_seconds=500)
+    index.add(2, 102, 1, PAYMENT)
+    clock.now += 200
+    assert [m.ticket_id for m in index.find(1, PAYMENT)] == [2]
+
+    index.add(3, 103, 1, PAYMENT)
+    index.add(4, 104, 1, PAYMENT)
+    assert len(index) == 2
+    assert [m.ticket_id for m in index.find(1, PAYMENT)] == [4, 3]
+
+
+@pytest.mark.asyncio
+async def test_warm_up_loads_recent_open_tickets(session: AsyncSession, sample_data):
+    project = sample_data["project1"]
+    fresh = await ops.create_ticket(session, project.id, 1, "bug", -100123, description=PAYMENT)
+    closed = await ops.create_ticket(session, project.id, 1, "bug", -100123, description=PAYMENT)
+    old = await ops.create_ticket(session, project.id, 1, "bug", -100123, description=PAYMENT)
+    await ops.update_ticket_status(session, closed.id, "completed")
+    await session.execute(
+        update(Ticket).where(Ticket.id == old.id).values(created_at=datetime.utcnow() - timedelta(days=3))
+    )
+    await session.commit()
+
+    index = DuplicateIndex(window_seconds=24 * 3600, threshold=0.5)
+    assert await warm_up_duplicate_index(session, index) == 1
+    assert [m.number for m in index.find(project.client_id, PAYMENT)] == [fresh.number]
@@ -0,0 +1,92 @@
+"""
+Tests for readiness checks (GET /ready).
+"""
+
+import asyncio
+import time
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app import health
+from app.config.settings import settings
+
+
+@pytest.fixture
+def ready_engine(engine: AsyncEngine, monkeypatch):
+    """Point readiness DB ping at the in-memory test engine."""
+    monkeypatch.setattr(health, "get_engine", lambda: engine)
+    monkeypatch.setattr(health, "readiness", health.ReadinessState())
+    return engine
+
+
+@pytest.mark.asyncio
+async def test_ready_when_all_checks_pass(ready_engine):
+    """Fresh state with reachable DB is ready."""
+    ready, report = await health.readiness_report()
+
+    assert ready is True
+    assert report["status"] == "ok"
+    assert report["checks"]["database"]["ok"] is True
+
+
+@pytest.mark.asyncio
+async def test_not_ready_when_updates_stale(ready_engine, monkeypatch):
+    """Update age above threshold makes /ready fail."""
+    monkeypatch.setattr(settings, "ready_update_max_age", 10)
+    health.readiness.last_update_at -= 60
+
+    ready, report = await health.readiness_report()
+
+    assert ready is False
+    assert report["checks"]["update_age"]["ok"] is False
+
+
+@pytest.mark.asyncio
+async def test_not_ready_when_loop_lags(ready_engine, monkeypatch):
+    """Loop lag above threshold makes /ready fail."""
+    monkeypatch.setattr(settings, "ready_loop_lag_max_ms", 100)
+    health.readiness.loop_lag = 0.5
+
+    ready, report = await health.readiness_report()
+
+    assert ready is False
+    assert report["checks"]["loop_lag"]["ok"] is False
+
+
+@pytest.mark.asyncio
+async def test_loop_probe_measures_blocking():
+    """Blocking the loop is reported as lag by the probe."""
+    state = health.ReadinessState()
+    state.start_loop_probe(0.01)
+    await asyncio.sleep(0.02)
+    time.sleep(0.1)  # block the loop
+    await asyncio.sleep(0.005)
+    state.stop_loop_probe()
+
+    assert state.loop_lag >= 0.05
+    assert state._probe_task is None
+
+
+@pytest.mark.asyncio
+async def test_routes():
+    """/ and /live answer OK, unknown paths and methods get 404."""
+    server = await asyncio.start_server(health._handle_client, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+
+    async def status(request: bytes) -> bytes:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(request)
+        await writer.drain()
+        response = await reader.read()
+        writer.close()
+        return response.split(b"\r\n", 1)[0]
+
+    try:
+        assert await status(b"GET / HTTP/1.1\r\n\r\n") == b"HTTP/1.1 200 OK"
+        assert await status(b"GET /live?probe=1 HTTP/1.1\r\n\r\n") == b"HTTP/1.1 200 OK"
+        assert await status(b"GET /favicon.ico HTTP/1.1\r\n\r\n") == b"HTTP/1.1 404 Not Found"
+        assert await status(b"POST /live HTTP/1.1\r\n\r\n") == b"HTTP/1.1 404 Not Found"
+    finally:
+        server.close()
+        await server.wait_closed()
@@ -0,0 +1,135 @@
+"""
+Tests for the bulk importer.
+"""
+
+from pathlib import Path
+
+import pytest
+from sqlalchemy import func, select
+
+from app.database.models import Client, PredefinedUser, Project
+from app.services.importer import (
+    ImportFormatError,
+    ImportReport,
+    import_rows,
+    iter_rows,
+    parse_row,
+    read_records,
+    validate_invite_codes,
+)
+
+
+def write_csv(path: Path, *lines: str) -> Path:
+    path.write_text("client,project,invite_code,username\n" + "\n".join(lines) + "\n", encoding="utf-8")
+    return path
+
+
+def rows_of(path: Path, report: ImportReport):
+    return iter_rows(read_records(path), report)
+
+
+def test_parse_row_validation():
+    """Usernames are normalized; broken rows raise ValueError."""
+    row = parse_row(2, {"client": " Acme ", "username": "@John_Doe"})
+    assert (row.client, row.username) == ("Acme", "john_doe")
+
+    for record in (
+        {"client": ""},
+        {"client": "Acme", "invite_code": "X1"},
+        {"client": "Acme", "project": "Main", "invite_code": "bad code"},
+        {"client": "Acme", "username": "ab"},
+    ):
+        with pytest.raises(ValueError):
+            parse_row(3, record)
+
+
+def test_read_records_rejects_unknown_format(tmp_path: Path):
+    with pytest.raises(ImportFormatError):
+        list(read_records(tmp_path / "data.xlsx"))
+    path = tmp_path / "data.csv"
+    path.write_text("name\nAcme\n", encoding="utf-8")
+    with pytest.raises(ImportFormatError):
+        list(read_records(path))
+
+
+@pytest.mark.asyncio
+async def test_import_upserts_and_counts(session, tmp_path: Path):
+    """First run inserts, second run updates changed rows and skips the rest."""
+    first = write_csv(
+        tmp_path / "first.csv",
+        "Acme,Main,ACME001,",
+        "Acme,,,alice_a",
+        "Acme,,,bob_b",
+        "Globex,Prod,GLOBEX1,carol_c",
+        ",Orphan,,",
+    )
+    report = ImportReport()
+    await import_rows(session, rows_of(first, report), report, chunk_size=2)
+
+    assert (report.clients.inserted, report.projects.inserted, report.predefined_users.inserted) == (2, 2, 3)
+    assert report.rejected == 1 and "client is required" in report.errors[0]
+
+    second = tmp_path / "second.jsonl"
+    second.write_text(
+        '{"client": "Acme", "project": "Main", "invite_code": "ACME002"}\n'
+        '{"client": "Globex", "username": "bob_b"}\n'
+        '{"client": "Acme", "username": "alice_a"}\n'
+        "not json\n",
+        encoding="utf-8",
+    )
+    report = ImportReport()
+    await import_rows(session, rows_of(second, report), report)
+
+    assert report.clients.skipped == 2 and report.clients.inserted == 0
+    assert report.projects.updated == 1
+    assert (report.predefined_users.updated, report.predefined_users.skipped) == (1, 1)
+    assert report.rejected == 1
+
+    code = await session.scalar(select(Project.invite_code).where(Project.name == "Main"))
+    bob_client = await session.scalar(
+        select(Client.name).join(PredefinedUser, PredefinedUser.client_id == Client.id)
+        .where(PredefinedUser.tg_username == "bob_b")
+    )
+    assert code == "ACME002"
+    assert bob_client == "Globex"
+    assert await session.scalar(select(func.count()).select_from(Client)) == 2
+
+
+@pytest.mark.asyncio
+async def test_repeats_in_later_chunks_are_skipped(session, tmp_path: Path):
+    """A client seen by an earlier chunk counts as skipped, like projects and usernames."""
+    path = write_csv(
+        tmp_path / "clients.csv",
+        "Acme,,,",
+        "Globex,,,",
+        "Acme,,,",
+        "Globex,,,",
+    )
+    report = ImportReport()
+    await import_rows(session, rows_of(path, report), report, chunk_size=1)
+    assert (report.clients.inserted, report.clients.skipped) == (2, 2)
+
+    report = ImportReport()
+    await import_rows(session, rows_of(path, report), report, chunk_size=1)
+    assert (report.clients.inserted, report.clients.skipped) == (0, 4)
+
+
+@pytest.mark.asyncio
+async def test_validate_invite_codes(session, sample_data, tmp_path: Path):
+    """Codes reused inside the file or owned by another project are conflicts."""
+    path = write_csv(
+        tmp_path / "codes.csv",
+        "Acme,Main,NEW001,",
+        "Acme,Beta,new001,",
+        "Acme,Other,TEST001,",
+        "Test Company,Main Project,TEST001,",
+    )
+    conflicts = await validate_invite_codes(session, rows_of(path, ImportReport()))
+
+    assert len(conflicts) == 3
+    assert "line 3" in conflicts[0] and "line 2" in conflicts[0]
+    assert "line 5" in conflicts[1]
+    assert "Test Company / Main Project in the database" in conflicts[2]
+
+    same_owner = write_csv(path, "Test Company,Main Project,TEST001,")
+    assert await validate_invite_codes(session, rows_of(same_owner, ImportReport())) == []
@@ -0,0 +1,74 @@
+"""
+Tests for knowledge-base suggestions (BM25 over Markdown articles).
+"""
+
+import time
+from pathlib import Path
+
+import pytest
+
+from app.services.knowledge_base import Article, KnowledgeBase, load_knowledge_base, parse_article, tokenize
+
+ARTICLES = [
+    Article("access/add-user", "Как добавить пользователя", "Откройте Настройки → Доступы и нажмите «Пригласить».",
+            ("access", "howto")),
+    Article("report/export", "Выгрузка отчёта в Excel", "Отчёт можно выгрузить кнопкой «Экспорт» над таблицей.",
+            ("report",)),
+    Article("billing/invoice", "Где взять счёт на оплату", "Счета лежат в разделе Биллинг. Оплата картой тоже там."),
+]
+
+
+def test_tokenize_folds_case_yo_and_endings():
+    assert tokenize("Отчёт ОТЧЕТЫ, отчёта a") == ["отчет", "отчеты", "отчета"]
+    assert tokenize("Пользователя пользователей") == ["пользо", "пользо"]
+
+
+def test_search_ranks_and_filters_by_category():
+    kb = KnowledgeBase(ARTICLES)
+
+    hits = kb.search("не могу выгрузить отчеты в excel")
+    assert [hit.article.slug for hit in hits][0] == "report/export"
+    assert hits[0].score > 0
+
+    # Restricted to other categories -> skipped; unrestricted articles stay eligible
+    assert [hit.article.slug for hit in kb.search("выгрузка отчета", category="access")] == []
+    assert [hit.article.slug for hit in kb.search("счёт оплата", category="access")] == ["billing/invoice"]
+
+    assert kb.search("совсем другое", min_score=0.1) == []
+    assert kb.search("выгрузка отчета", min_score=100) == []
+
+
+def test_parse_article_front_matter_and_title():
+    article = parse_article("faq/reset-password", "---\ncategories: access, other\n---\n# Сброс пароля\n\nШаг 1.\n")
+    assert (article.title, article.body, article.categories) == ("Сброс пароля", "Шаг 1.", ("access", "other"))
+
+    article = parse_article("faq/reset-password", "Без заголовка\n\n" + "слово " * 100)
+    assert article.title == "reset password"
+    assert article.excerpt == "Без заголовка"
+    assert parse_article("x", "# T\n\n" + "слово " * 100).excerpt.endswith("…")
+
+
+@pytest.mark.asyncio
+async def test_load_from_directory(tmp_path: Path):
+    (tmp_path / "access").mkdir()
+    (tmp_path / "access" / "add-user.md").write_text("# Как добавить пользователя\n\nТекст", encoding="utf-8")
+    (tmp_path / "notes.txt").write_text("не статья", encoding="utf-8")
+
+    kb = KnowledgeBase()
+    assert await load_knowledge_base(tmp_path, kb) == 1
+    assert kb.get("access/add-user").title == "Как добавить пользователя"
+    assert await load_knowledge_base(tmp_path / "missing", kb) == 0
+
+
+def test_search_is_fast_on_thousands_of_articles():
+    words = [f"w{i}x" for i in range(5000)]  # distinct after stemming
+    articles = [
+        Article(f"a{i}", f"Статья {words[i]}", " ".join(words[(i * 7 + j) % 5000] for j in range(150)))
+        for i in range(3000)
+    ]
+    kb = KnowledgeBase(articles)
+
+    started = time.perf_counter()
+    for i in range(100):
+        kb.search(f"не работает {words[i]} {words[i + 1]} после обновления {words[i * 3]}")
+    assert (time.perf_counter() - started) / 100 < 0.005
@@ -0,0 +1,42 @@
+"""
+Tests for the in-memory index fan-out on ticket status changes.
+"""
+
+from datetime import datetime
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import operations as ops
+from app.services.awaiting import awaiting_queue
+from app.services.dispatcher import dispatcher
+from app.services.duplicates import duplicate_index
+from app.services.lifecycle import on_ticket_closed, on_ticket_reopened
+from app.services.sla import sla_scheduler
+
+DESCRIPTION = "Не выгружается отчёт по продажам за прошлый месяц"
+
+
+@pytest.mark.asyncio
+async def test_reopen_tracks_the_ticket_everywhere(session: AsyncSession, sample_data):
+    client_id = sample_data["client"].id
+    ticket = await ops.create_ticket(
+        session, sample_data["project1"].id, 1, "report", -100123, description=DESCRIPTION,
+    )
+    duplicate_index.add(ticket.id, ticket.number, client_id, DESCRIPTION)
+    try:
+        await ops.update_ticket_status(session, ticket.id, "completed")
+        on_ticket_closed(ticket.id)
+        assert duplicate_index.find(client_id, DESCRIPTION) == []
+        assert ticket.id not in sla_scheduler._tickets
+
+        await ops.reopen_ticket(session, ticket.id)
+        await on_ticket_reopened(session, ticket)
+
+        assert [match.ticket_id for match in duplicate_index.find(client_id, DESCRIPTION)] == [ticket.id]
+        assert ticket.sla_due_at > datetime.utcnow()
+        assert ticket.id in sla_scheduler._tickets
+    finally:
+        on_ticket_closed(ticket.id)
+    assert ticket.id not in sla_scheduler._tickets
+    assert len(dispatcher) == 0 and len(awaiting_queue) == 0
@@ -0,0 +1,47 @@
+"""
+Tests for the load generator harness (stub Bot session, real Dispatcher).
+"""
+
+from pathlib import Path
+
+import pytest
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import SendMessage
+
+from app.config.settings import settings
+from app.main import create_bot
+from benchmarks.harness import StubSession
+from benchmarks.load_bench import LoadConfig, run_load
+
+
+@pytest.mark.asyncio
+async def test_stub_session_flood_limit(monkeypatch):
+    """Bursting messages into one private chat triggers RetryAfter."""
+    monkeypatch.setattr(settings, "bot_token", "123456:test")
+    session = StubSession(flood=True)
+    bot = create_bot(session)
+
+    with pytest.raises(TelegramRetryAfter):
+        for _ in range(10):
+            await bot(SendMessage(chat_id=42, text="hi"))
+
+    assert session.retry_after == 1
+    assert session.calls["sendMessage"] >= 4
+
+
+@pytest.mark.asyncio
+async def test_load_run_reports_throughput(tmp_path: Path, monkeypatch):
+    """Small scenario runs the full ticket lifecycle through the dispatcher."""
+    monkeypatch.setattr(settings, "bot_token", "123456:test")
+    monkeypatch.setattr(settings, "db_path", settings.db_path)
+    monkeypatch.setattr(settings, "operators", settings.operators)
+
+    report = await run_load(LoadConfig(clients=1, operators=1, messages=1), tmp_path / "load.sqlite")
+
+    assert report["updates"] > 10
+    assert report["errors"] == {}
+    assert report["updates_per_second"] > 0
+    assert report["handlers"]["callback_take_ticket"]["updates"] == 1
+    assert report["handlers"]["callback_submit_ticket"]["statements_per_update"] > 0
+    assert report["outbound_calls"]["createForumTopic"] == 1
+    assert report["calls_per_update"] > 0
@@ -0,0 +1,76 @@
+"""
+Tests for queue-based logging and per-update log context.
+"""
+
+import json
+import logging
+import queue
+from types import SimpleNamespace
+
+import pytest
+from aiogram.types import Update
+
+from app.bot.middlewares.log_context import LogContextMiddleware
+from app.logging_setup import (
+    ContextFilter,
+    JsonFormatter,
+    _ContextQueueHandler,
+    bind_log_context,
+    get_log_context,
+    reset_log_context,
+)
+
+
+def _emit(message: str, *args) -> logging.LogRecord:
+    """Pass one record through the queue handler and return the queued copy."""
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    handler = _ContextQueueHandler(log_queue)
+    handler.addFilter(ContextFilter())
+    record = logging.LogRecord("test", logging.INFO, __file__, 1, message, args, None)
+    handler.handle(record)
+    return log_queue.get_nowait()
+
+
+def test_record_gets_context_fields():
+    """Bound fields appear on records; unknown fields default to '-'."""
+    token = bind_log_context(update_id=10, user_id=20)
+    try:
+        record = _emit("ticket %s", 5)
+    finally:
+        reset_log_context(token)
+
+    assert record.getMessage() == "ticket 5"
+    assert record.update_id == 10
+    assert record.user_id == 20
+    assert record.ticket == "-"
+    assert get_log_context() == {}
+
+
+def test_json_formatter():
+    """JSON formatter emits one object with message and bound context."""
+    token = bind_log_context(ticket=42)
+    try:
+        record = _emit("hello %s", "world")
+    finally:
+        reset_log_context(token)
+
+    payload = json.loads(JsonFormatter().format(record))
+    assert payload["msg"] == "hello world"
+    assert payload["ticket"] == 42
+    assert "update_id" not in payload
+
+
+@pytest.mark.asyncio
+async def test_middleware_binds_and_resets():
+    """Middleware binds update/user ids for the handler and resets afterwards."""
+    seen = {}
+
+    async def handler(event, data):
+        bind_log_context(ticket=7)
+        seen.update(get_log_context())
+
+    update = Update(update_id=99)
+    await LogContextMiddleware()(handler, update, {"event_from_user": SimpleNamespace(id=123)})
+
+    assert seen == {"update_id": 99, "user_id": 123, "ticket": 7}
+    assert get_log_context() == {}
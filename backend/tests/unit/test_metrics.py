@@ -0,0 +1,157 @@
+"""
+Tests for metrics registry, instrumentation and /metrics endpoint.
+"""
+
+import asyncio
+import logging
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.bot.middlewares.query_budget import QueryBudgetMiddleware
+from app.config.settings import settings
+from app.database.instrumentation import (
+    instrument_engine,
+    parameters_shape,
+    start_query_tracking,
+    statement_operation,
+    stop_query_tracking,
+)
+from app.health import run_healthcheck_server
+from app.metrics import DB_STATEMENTS, MetricsRegistry
+
+
+class TestRegistry:
+    """Tests for metric types and text exposition."""
+
+    def test_counter_render(self):
+        """Counter renders HELP/TYPE and labelled samples."""
+        registry = MetricsRegistry()
+        counter = registry.counter("test_total", "Test counter.", ("method",))
+        counter.inc(method="sendMessage")
+        counter.inc(2, method="sendMessage")
+
+        output = registry.render()
+        assert "# TYPE test_total counter" in output
+        assert 'test_total{method="sendMessage"} 3' in output
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Histogram buckets are cumulative and include +Inf, sum and count."""
+        registry = MetricsRegistry()
+        histogram = registry.histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0))
+        histogram.observe(0.05)
+        histogram.observe(0.5)
+        histogram.observe(5)
+
+        output = registry.render()
+        assert 'latency_seconds_bucket{le="0.1"} 1' in output
+        assert 'latency_seconds_bucket{le="1"} 2' in output
+        assert 'latency_seconds_bucket{le="+Inf"} 3' in output
+        assert "latency_seconds_count 3" in output
+        assert histogram.count() == 3
+
+    def test_gauge_function(self):
+        """Gauge bound to a function is evaluated on scrape."""
+        registry = MetricsRegistry()
+        gauge = registry.gauge("records", "Records.")
+        gauge.set_function(lambda: 7)
+        assert "records 7" in registry.render()
+
+    def test_wrong_labels_rejected(self):
+        """Using undeclared labels raises ValueError."""
+        registry = MetricsRegistry()
+        counter = registry.counter("c_total", "C.", ("a",))
+        with pytest.raises(ValueError):
+            counter.inc(b="1")
+
+
+class TestDatabaseInstrumentation:
+    """Tests for SQLAlchemy engine events."""
+
+    def test_statement_operation(self):
+        """Statements are labelled by leading keyword."""
+        assert statement_operation("SELECT 1") == "select"
+        assert statement_operation("  insert into x values (1)") == "insert"
+        assert statement_operation("CREATE TABLE t (id int)") == "other"
+
+    @pytest.mark.asyncio
+    async def test_statements_counted(self, engine: AsyncEngine):
+        """Executed statements increment the statement counter."""
+        instrument_engine(engine)
+        instrument_engine(engine)  # idempotent
+        before = DB_STATEMENTS.get(operation="select")
+
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+        assert DB_STATEMENTS.get(operation="select") == before + 1
+
+    def test_parameters_shape(self):
+        """Parameter shape lists types, never values."""
+        assert parameters_shape((1, "secret", None)) == "(int, str, NoneType)"
+        assert parameters_shape([(1, "a"), (2, "b")], executemany=True) == "2 x (int, str)"
+        assert parameters_shape({"id": 5}) == "{id: int}"
+
+    @pytest.mark.asyncio
+    async def test_slow_query_logged_and_tracked(self, engine: AsyncEngine, monkeypatch, caplog):
+        """Statements over threshold are logged; tracking counts per context."""
+        instrument_engine(engine)
+        monkeypatch.setattr(settings, "slow_query_ms", 0)
+
+        stats, token = start_query_tracking()
+        try:
+            with caplog.at_level(logging.WARNING, logger="app.database.instrumentation"):
+                async with engine.connect() as conn:
+                    await conn.execute(text("SELECT :x"), {"x": "secret"})
+                    await conn.execute(text("SELECT 2"))
+        finally:
+            stop_query_tracking(token)
+
+        assert stats.count == 2
+        assert stats.slow_count == 2
+        assert "Slow query" in caplog.text
+        assert "secret" not in caplog.text
+
+    @pytest.mark.asyncio
+    async def test_query_budget_warning(self, engine: AsyncEngine, monkeypatch, caplog):
+        """Handler exceeding the query budget produces a warning."""
+        instrument_engine(engine)
+        monkeypatch.setattr(settings, "query_budget", 1)
+
+        async def handler(event, data):
+            async with engine.connect() as conn:
+                for _ in range(3):
+                    await conn.execute(text("SELECT 1"))
+            return data["query_stats"].count
+
+        with caplog.at_level(logging.WARNING, logger="app.bot.middlewares.query_budget"):
+            count = await QueryBudgetMiddleware()(handler, object(), {})
+
+        assert count == 3
+        assert "executed 3 SQL statements (budget 1" in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint():
+    """GET /metrics returns Prometheus text, GET / stays 200 OK."""
+    server = await run_healthcheck_server(0)
+    port = server.sockets[0].getsockname()[1]
+    try:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"GET /metrics HTTP/1.1\r\nHost: x\r\n\r\n")
+        await writer.drain()
+        response = await reader.read()
+        writer.close()
+        assert response.startswith(b"HTTP/1.1 200 OK")
+        assert b"bot_handler_duration_seconds" in response
+
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"GET / HTTP/1.1\r\n\r\n")
+        await writer.drain()
+        response = await reader.read()
+        writer.close()
+        assert response.endswith(b"OK")
+    finally:
+        server.close()
+        await server.wait_closed()
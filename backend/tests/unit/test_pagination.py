@@ -0,0 +1,119 @@
+"""
+Tests for keyset pagination of ticket lists.
+"""
+
+from datetime import datetime, timedelta
+from typing import List
+
+import pytest
+from sqlalchemy import event, text, update
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from app.database import operations as ops
+from app.database.models import Ticket
+from app.database.pagination import NEXT, PREV, decode_cursor, encode_cursor
+
+USER_ID = 42
+
+
+async def create_tickets(session: AsyncSession, project_id: int, count: int) -> List[int]:
+    ids = []
+    for _ in range(count):
+        ticket = await ops.create_ticket(
+            session, project_id=project_id, tg_user_id=USER_ID, category="report", support_chat_id=-1001234567890,
+        )
+        ids.append(ticket.id)
+    return ids
+
+
+def test_cursor_round_trip():
+    at = datetime(2026, 10, 19, 12, 30, 5, 123456)
+    cursor = encode_cursor(NEXT, at, 123456)
+    assert len(cursor) < 24
+    assert decode_cursor(cursor) == (NEXT, at, 123456)
+    assert decode_cursor(encode_cursor(PREV, datetime(2026, 1, 1), 1)) == (PREV, datetime(2026, 1, 1), 1)
+    for malformed in ("", "x1.1", "n", "nzz", "n1.", "n!.1"):
+        assert decode_cursor(malformed) is None
+
+
+@pytest.mark.asyncio
+async def test_user_tickets_pages_forward_and_back(session: AsyncSession, sample_data):
+    ids = await create_tickets(session, sample_data["project1"].id, 23)
+    # Ties on created_at (column default: whole seconds) plus a few Python timestamps
+    base = datetime(2026, 10, 19, 10, 0)
+    for index, ticket_id in enumerate(ids):
+        created_at = base + timedelta(seconds=index // 5)
+        if index % 7 == 0:
+            created_at += timedelta(microseconds=500)
+        await session.execute(update(Ticket).where(Ticket.id == ticket_id).values(created_at=created_at))
+    await session.execute(
+        text("UPDATE tickets SET created_at = substr(created_at, 1, 19) WHERE created_at LIKE '%.000000'")
+    )
+    await session.commit()
+    session.expire_all()
+    expected = [
+        t.id for t in sorted(
+            [await ops.get_ticket_by_id(session, ticket_id) for ticket_id in ids],
+            key=lambda t: (t.created_at, t.id), reverse=True,
+        )
+    ]
+
+    pages = [await ops.get_user_tickets(session, USER_ID, limit=5)]
+    while pages[-1].next_cursor and len(pages) < 10:
+        pages.append(await ops.get_user_tickets(session, USER_ID, limit=5, cursor=pages[-1].next_cursor))
+    assert [[t.id for t in page.items] for page in pages] == [expected[i:i + 5] for i in range(0, 23, 5)]
+    assert pages[0].prev_cursor is None and pages[-1].next_cursor is None
+
+    back = await ops.get_user_tickets(session, USER_ID, limit=5, cursor=pages[-1].prev_cursor)
+    assert [t.id for t in back.items] == expected[15:20]
+    # Going back from the second page lands on a full first page without a Prev button
+    first = await ops.get_user_tickets(session, USER_ID, limit=5, cursor=pages[1].prev_cursor)
+    assert [t.id for t in first.items] == expected[:5]
+    assert first.prev_cursor is None and first.next_cursor is not None
+    # Garbage cursors fall back to the first page
+    assert [t.id for t in (await ops.get_user_tickets(session, USER_ID, limit=5, cursor="zz")).items] == expected[:5]
+
+
+@pytest.mark.asyncio
+async def test_unassigned_oldest_first(session: AsyncSession, sample_data):
+    ids = await create_tickets(session, sample_data["project1"].id, 7)
+    await ops.assign_ticket(session, ids[2], 7, "new", None)
+    first = await ops.get_unassigned_tickets(session, limit=4)
+    second = await ops.get_unassigned_tickets(session, limit=4, cursor=first.next_cursor)
+    assert [t.id for t in first.items + second.items] == [ids[i] for i in (0, 1, 3, 4, 5, 6)]
+    assert second.next_cursor is None and second.prev_cursor is not None
+
+
+@pytest.mark.asyncio
+async def test_later_pages_seek_the_index(engine: AsyncEngine, session: AsyncSession, sample_data):
+    ids = await create_tickets(session, sample_data["project1"].id, 6)
+    for ticket_id in ids[:4]:
+        await ops.assign_ticket(session, ticket_id, 7, "new", None)
+    first_user = await ops.get_user_tickets(session, USER_ID, limit=2)
+    first_operator = await ops.get_operator_tickets(session, 7, "active", limit=2)
+    first_unassigned = await ops.get_unassigned_tickets(session, limit=1)
+
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        await ops.get_user_tickets(session, USER_ID, limit=2, cursor=first_user.next_cursor)
+        await ops.get_operator_tickets(session, 7, "active", limit=2, cursor=first_operator.next_cursor)
+        await ops.get_unassigned_tickets(session, limit=1, cursor=first_unassigned.next_cursor)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", capture)
+
+    # One statement per page, each an index range seek
+    assert len(statements) == 3
+    plans = []
+    for statement, parameters in statements:
+        raw = await session.connection()
+        rows = await raw.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters)
+        plans.append(" ".join(row[-1] for row in rows))
+    assert "idx_tickets_tg_user_id_created_at (tg_user_id=? AND created_at<?)" in plans[0]
+    assert "idx_tickets_assigned_status_updated_at" in plans[1]
+    assert "idx_tickets_status_created_at (status=? AND created_at>?)" in plans[2]
+    assert "TEMP B-TREE" not in plans[0] + plans[2]
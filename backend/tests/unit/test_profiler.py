@@ -0,0 +1,51 @@
+"""
+Tests for the on-demand event-loop profiler.
+"""
+
+import asyncio
+import collections
+import threading
+import time
+
+import pytest
+
+from app.services import profiler
+
+
+def _busy_work(seconds: float) -> None:
+    """Burn CPU in the event-loop thread."""
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+async def _busy_task() -> None:
+    for _ in range(10):
+        _busy_work(0.02)
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_profile_captures_loop_stacks():
+    """Samples taken while a coroutine is busy include its frames."""
+    task = asyncio.create_task(_busy_task())
+    report = await profiler.profile_event_loop(0.3, interval=0.002, with_memory=True)
+    await task
+
+    assert report.samples > 0
+    assert "test_profiler:_busy_work" in report.collapsed
+    assert "self" in report.summary and "total" in report.summary
+    assert report.memory is not None and "Traced memory" in report.memory
+    assert not profiler.is_running()
+    assert not any(thread.name == "profiler" for thread in threading.enumerate())
+
+
+def test_format_summary_counts_self_and_total():
+    """Leaf frames count as self time, every frame counts as total."""
+    stacks = collections.Counter({"main:a;mod:b": 3, "main:a": 1})
+    summary = profiler.format_summary(stacks, 1.0)
+
+    assert "4 samples" in summary
+    assert "       3    75.0  mod:b" in summary
+    assert "       4   100.0  main:a" in summary
+    assert profiler.format_collapsed(stacks).splitlines()[0] == "main:a;mod:b 3"
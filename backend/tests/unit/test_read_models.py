@@ -0,0 +1,75 @@
+"""
+Tests for read-only list rows (TicketListItem, ProjectChoice) and their benchmark.
+"""
+
+import dataclasses
+from pathlib import Path
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import operations as ops
+from app.database.read_models import ProjectChoice, TicketListItem
+from benchmarks.read_path_bench import run_benchmark
+from benchmarks.seed import DatasetSizes, seed_database
+
+
+@pytest.mark.asyncio
+async def test_ticket_lists_return_untracked_rows(session: AsyncSession, sample_data):
+    """List operations build slotted rows with the ticket's values, not session entities."""
+    ticket = await ops.create_ticket(
+        session, project_id=sample_data["project1"].id, tg_user_id=42, category="report",
+        support_chat_id=-1001234567890, description="Не грузится отчёт",
+    )
+    await ops.update_ticket_topic(session, ticket.id, 555)
+    expected = (ticket.id, ticket.number, "new", "report", "Не грузится отчёт", -1001234567890, 555)
+    session.expunge_all()
+
+    pages = [
+        await ops.get_user_tickets(session, 42),
+        await ops.get_unassigned_tickets(session),
+    ]
+    assert len(session.identity_map) == 0
+    for page in pages:
+        [item] = page.items
+        assert isinstance(item, TicketListItem)
+        assert dataclasses.astuple(item)[:7] == expected
+        assert item.closed_at is None
+        assert not hasattr(item, "__dict__")
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            item.status = "closed"
+
+
+@pytest.mark.asyncio
+async def test_get_user_projects(session: AsyncSession, sample_data):
+    """One row per binding with the project's id and name."""
+    await ops.create_or_update_user_binding(session, 123456789, sample_data["project2"].id, "testuser")
+    session.expunge_all()
+
+    projects = await ops.get_user_projects(session, 123456789)
+
+    assert len(session.identity_map) == 0
+    assert all(isinstance(choice, ProjectChoice) for choice in projects)
+    assert {(c.project_id, c.project_name) for c in projects} == {
+        (sample_data["project1"].id, sample_data["project1"].name),
+        (sample_data["project2"].id, sample_data["project2"].name),
+    }
+    assert await ops.get_user_projects(session, 999999999) == []
+
+
+@pytest.mark.asyncio
+async def test_read_path_bench_renders_same_lists(tmp_path: Path):
+    """Both variants render identical text; only the ORM one fills the identity map."""
+    path = tmp_path / "bench.sqlite"
+    seed_database(path, scale=0.0005)
+
+    results = await run_benchmark(path, DatasetSizes.for_scale(0.0005), iterations=4, warmup=0, seed=1,
+                                  memory_iterations=2)
+
+    assert set(results) == {"operator_tickets", "unassigned_tickets", "user_tickets", "user_projects"}
+    for result in results.values():
+        assert result["same_output"]
+        assert result["dto"]["tracked_objects"] == 0
+        assert result["orm"]["peak_kib"] > 0
+    unassigned = results["unassigned_tickets"]
+    assert unassigned["orm"]["tracked_objects"] == unassigned["orm"]["rows"] > 0
@@ -0,0 +1,114 @@
+"""
+Tests for the update recorder and the replay harness.
+"""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from app.bot.middlewares.recorder import Anonymizer, UpdateRecorder
+from app.config.settings import settings
+from app.main import create_bot
+from benchmarks.harness import StubSession, UpdateFactory
+from benchmarks.replay import invite_codes, load_recording, replay
+
+SUPPORT_CHAT_ID = -1001234567890
+USER_ID = 555
+
+
+def test_anonymizer_keeps_shape():
+    """Ids are stable pseudonyms, text keeps length, commands and callback data survive."""
+    anonymizer = Anonymizer(b"k" * 32)
+    payload = {
+        "message": {
+            "from": {"id": USER_ID, "first_name": "Ivan", "username": "ivan"},
+            "chat": {"id": SUPPORT_CHAT_ID, "title": "Support"},
+            "text": "My phone is 123 45",
+            "photo": [{"file_id": "AgAD", "file_unique_id": "U1"}],
+        },
+        "callback_query": {"from": {"id": USER_ID}, "data": "ticket:submit"},
+    }
+
+    result = anonymizer.anonymize(payload)
+    message = result["message"]
+
+    assert message["from"]["id"] != USER_ID
+    assert message["from"]["id"] == result["callback_query"]["from"]["id"]
+    assert message["chat"]["id"] < 0
+    assert message["text"] == "xx xxxxx xx xxx xx"
+    assert "Ivan" not in json.dumps(result) and "AgAD" not in json.dumps(result)
+    assert result["callback_query"]["data"] == "ticket:submit"
+    assert anonymizer.text("/start INV42").startswith("/start a")
+    assert "INV42" not in anonymizer.text("/start INV42")
+
+
+@pytest.mark.asyncio
+async def test_record_and_replay_ticket_flow(tmp_path: Path, monkeypatch):
+    """Recorded client flow replays into a submitted ticket on a scratch database."""
+    monkeypatch.setattr(settings, "bot_token", "123456:test")
+    monkeypatch.setattr(settings, "db_path", settings.db_path)
+    monkeypatch.setattr(settings, "operators", settings.operators)
+    monkeypatch.setattr(settings, "support_chat_id", settings.support_chat_id)
+
+    bot = create_bot(StubSession())
+    factory = UpdateFactory(bot, SUPPORT_CHAT_ID)
+    path = tmp_path / "updates.jsonl"
+    recorder = UpdateRecorder(path, SUPPORT_CHAT_ID, [900])
+    recorder.start()
+    for update in (
+        factory.private_text(USER_ID, "/start INV42"),
+        factory.callback(USER_ID, "category:report"),
+        factory.private_text(USER_ID, "Numbers in the monthly report are wrong"),
+        factory.callback(USER_ID, "ticket:skip_attachments"),
+        factory.callback(USER_ID, "ticket:submit"),
+    ):
+        recorder.record(update, recorder.started, 0.01)
+    recorder.stop()
+
+    assert "Numbers" not in path.read_text(encoding="utf-8")
+    recording = load_recording(path)
+    assert len(recording.updates) == 5
+    assert len(recording.operators) == 1
+    assert len(invite_codes(recording)) == 1
+
+    report = await replay(recording, tmp_path / "replay.sqlite", speed=0)
+
+    assert report["updates"] == 5
+    assert report["errors"] == {}
+    assert report["handlers"]["callback_submit_ticket"]["updates"] == 1
+    assert report["outbound_calls"]["createForumTopic"] == 1
+    assert report["recorded_latency"]["p50_ms"] == 10.0
+
+
+def test_segments_after_restart_keep_ids(tmp_path: Path, monkeypatch):
+    """A restarted recorder reuses the key file: ids stay continuous across segments."""
+    monkeypatch.setattr(settings, "bot_token", "123456:test")
+    bot = create_bot(StubSession())
+    factory = UpdateFactory(bot, SUPPORT_CHAT_ID)
+    path = tmp_path / "updates.jsonl"
+    for _ in range(2):
+        recorder = UpdateRecorder(path, SUPPORT_CHAT_ID, [900])
+        recorder.start()
+        recorder.record(factory.private_text(USER_ID, "/start INV42"), recorder.started, 0.01)
+        recorder.record(factory.topic_text(900, 7, "Checking"), recorder.started, 0.01)
+        recorder.stop()
+
+    recording = load_recording(path)
+    assert not recording.mixed_keys
+    assert len(recording.updates) == 4
+    assert len(recording.operators) == 1
+    assert len(invite_codes(recording)) == 1
+    senders = {item.payload["message"]["from"]["id"] for item in recording.updates}
+    chats = {item.payload["message"]["chat"]["id"] for item in recording.updates}
+    assert len(senders) == 2 and recording.operators[0] in senders
+    assert len(chats) == 2 and recording.support_chat_id in chats
+    key_path = path.with_name("updates.jsonl.key")
+    assert key_path.stat().st_mode & 0o777 == 0o600
+
+    # Without the key file a new segment gets new pseudonyms; the loader notices
+    key_path.unlink()
+    recorder = UpdateRecorder(path, SUPPORT_CHAT_ID, [900])
+    recorder.start()
+    recorder.stop()
+    assert load_recording(path).mixed_keys
@@ -0,0 +1,82 @@
+"""
+Tests for incrementally maintained CSAT rollups.
+"""
+
+from datetime import date, datetime
+from typing import Optional
+
+import pytest
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import operations as ops
+from app.database.models import CsatRollup, Ticket
+from app.database.rollups import get_csat_summary, rebuild_csat_rollups, rollup_day
+
+
+async def make_ticket(session: AsyncSession, project_id: int, category: str, operator: Optional[int] = None) -> Ticket:
+    ticket = await ops.create_ticket(
+        session, project_id=project_id, tg_user_id=1, category=category, support_chat_id=-1001234567890,
+    )
+    if operator:
+        await ops.update_ticket_status(session, ticket.id, "in_progress", assigned_to=operator)
+    return ticket
+
+
+async def rollup_rows(session: AsyncSession) -> list:
+    result = await session.execute(select(CsatRollup).order_by(CsatRollup.category))
+    return [
+        (row.operator_tg_user_id, row.category, row.positive, row.negative, row.speed_sum, row.speed_count)
+        for row in result.scalars()
+    ]
+
+
+def test_rollup_day_uses_support_timezone():
+    # settings.timezone defaults to Europe/Madrid (UTC+2 in October)
+    assert rollup_day(datetime(2026, 10, 17, 22, 30)) == date(2026, 10, 18)
+
+
+@pytest.mark.asyncio
+async def test_feedback_writes_update_rollups(session: AsyncSession, sample_data):
+    project_id = sample_data["project1"].id
+    first = await make_ticket(session, project_id, "report", operator=42)
+    second = await make_ticket(session, project_id, "report", operator=42)
+    third = await make_ticket(session, project_id, "billing")
+
+    await ops.create_feedback(session, first.id, "positive")
+    await ops.create_feedback(session, second.id, "negative", "долго")
+    await ops.create_feedback(session, third.id, "positive")
+    assert await rollup_rows(session) == [(0, "billing", 1, 0, 0, 0), (42, "report", 1, 1, 0, 0)]
+
+    await ops.update_feedback_ratings(session, first.id, 5, 4, 5)
+    # Changing ratings replaces the old contribution instead of adding another one
+    await ops.update_feedback_ratings(session, first.id, 3, 4, 5)
+    assert await rollup_rows(session) == [(0, "billing", 1, 0, 0, 0), (42, "report", 1, 1, 3, 1)]
+    assert await ops.update_feedback_ratings(session, 999_999, 1, 1, 1) is None
+
+    incremental = await rollup_rows(session)
+    assert await rebuild_csat_rollups(session) == 2
+    assert await rollup_rows(session) == incremental
+
+
+@pytest.mark.asyncio
+async def test_csat_summary_reads_rollups(session: AsyncSession, sample_data):
+    project_id = sample_data["project1"].id
+    for category, csat in (("report", "positive"), ("report", "positive"), ("access", "negative")):
+        ticket = await make_ticket(session, project_id, category, operator=7)
+        await ops.create_feedback(session, ticket.id, csat)
+        await ops.update_feedback_ratings(session, ticket.id, 4, 5, None)
+    today = rollup_day(datetime.utcnow())
+
+    total, = await get_csat_summary(session, today)
+    assert (total.key, total.total, total.positive_share) == (None, 3, pytest.approx(2 / 3))
+    assert total.average("speed") == 4 and total.average("politeness") is None
+
+    by_category = await get_csat_summary(session, today, "category")
+    assert [(s.key, s.positive, s.negative) for s in by_category] == [("report", 2, 0), ("access", 0, 1)]
+
+    # Rows outside the period are not read
+    await session.execute(update(CsatRollup).values(day=date(2020, 1, 1)))
+    await session.commit()
+    empty, = await get_csat_summary(session, today)
+    assert empty.total == 0 and empty.positive_share is None
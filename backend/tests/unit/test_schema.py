@@ -0,0 +1,25 @@
+"""
+Tests for in-place schema upgrade of existing databases.
+"""
+
+import pytest
+from sqlalchemy import inspect
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.database.schema import upgrade_schema
+
+
+@pytest.mark.asyncio
+async def test_upgrade_adds_missing_columns_and_indexes(engine: AsyncEngine):
+    async with engine.begin() as conn:
+        # Simulate a database created before clients.timezone / tickets.sla_due_at existed
+        await conn.exec_driver_sql("DROP INDEX idx_tickets_status_sla_due_at")
+        await conn.exec_driver_sql("ALTER TABLE tickets DROP COLUMN sla_due_at")
+        await conn.exec_driver_sql("ALTER TABLE clients DROP COLUMN timezone")
+
+        added = await conn.run_sync(upgrade_schema)
+        assert added == ["clients.timezone", "tickets.sla_due_at", "idx_tickets_status_sla_due_at"]
+        assert await conn.run_sync(upgrade_schema) == []
+
+        columns = await conn.run_sync(lambda sync: {c["name"] for c in inspect(sync).get_columns("tickets")})
+        assert "sla_due_at" in columns
@@ -0,0 +1,65 @@
+"""
+Tests for full-text search (FTS5).
+"""
+
+import pytest
+from sqlalchemy import delete, update
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from app.database import operations as ops
+from app.database.models import Message
+from app.database.search import build_match_query, ensure_search_index, search_tickets
+
+
+async def make_ticket(session: AsyncSession, project_id: int, description: str, *messages: str):
+    ticket = await ops.create_ticket(
+        session, project_id=project_id, tg_user_id=1, category="bug",
+        support_chat_id=-1001234567890, description=description, topic_id=77,
+    )
+    for i, content in enumerate(messages, start=1):
+        await ops.create_message(session, ticket.id, "client", i, "text", 1, content=content)
+    return ticket
+
+
+def test_build_match_query_quotes_terms():
+    """User input never reaches FTS syntax unquoted."""
+    assert build_match_query('Оплата NEAR "card" OR*') == '"оплата"* "near"* "card"* "or"*'
+    assert build_match_query("  ?! ") is None
+
+
+@pytest.mark.asyncio
+async def test_search_ranks_tickets_and_backfills(engine: AsyncEngine, session: AsyncSession, sample_data):
+    """Rows written before the index exists are backfilled; later writes go through triggers."""
+    project_id = sample_data["project1"].id
+    old = await make_ticket(session, project_id, "Не проходит оплата картой", "Ошибка 500 при оплате")
+
+    async with engine.begin() as conn:
+        assert await ensure_search_index(conn) == ["messages_fts", "tickets_fts"]
+        assert await ensure_search_index(conn) == []
+
+    new = await make_ticket(session, project_id, "Вопрос по отчёту", "Оплата прошла, но <счёт> не пришёл")
+    await make_ticket(session, project_id, "Другое", "Совсем другая тема")
+
+    hits = await search_tickets(session, "оплат")
+    assert {hit.ticket_id for hit in hits} == {old.id, new.id}
+
+    hits = await search_tickets(session, "счёт оплата")
+    assert [hit.number for hit in hits] == [new.number]
+    assert "&lt;<b>счёт</b>&gt;" in hits[0].snippet
+    assert hits[0].topic_id == 77
+
+
+@pytest.mark.asyncio
+async def test_search_follows_updates_and_deletes(engine: AsyncEngine, session: AsyncSession, sample_data):
+    async with engine.begin() as conn:
+        await ensure_search_index(conn)
+    ticket = await make_ticket(session, sample_data["project1"].id, None, "первый текст")
+
+    await session.execute(update(Message).where(Message.ticket_id == ticket.id).values(content="второй текст"))
+    await session.commit()
+    assert await search_tickets(session, "первый") == []
+    assert len(await search_tickets(session, "второй")) == 1
+
+    await session.execute(delete(Message).where(Message.ticket_id == ticket.id))
+    await session.commit()
+    assert await search_tickets(session, "второй") == []
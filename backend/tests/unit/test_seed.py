@@ -0,0 +1,50 @@
+"""
+Tests for the synthetic dataset generator.
+"""
+
+import random
+import sqlite3
+from pathlib import Path
+
+from benchmarks.seed import DatasetSizes, Distributions, allocate, seed_database
+
+
+def test_allocate_keeps_total():
+    """Counts follow the weights and add up exactly."""
+    counts = allocate(1000, [1.0, 3.0, 0.0, 6.0], random.Random(1))
+    assert sum(counts) == 1000
+    assert counts[2] == 0
+    assert counts[3] > counts[1] > counts[0]
+
+
+def test_seed_database_distributions(tmp_path: Path):
+    """Zipf skew, exact message total, CSAT rates and indexes survive the bulk load."""
+    path = tmp_path / "gen.sqlite"
+    sizes = DatasetSizes.for_scale(0.002)
+    dist = Distributions(client_skew=1.5, csat_response_rate=1.0, csat_positive_rate=0.5)
+
+    assert seed_database(path, seed=7, distributions=dist, sizes=sizes) == sizes
+
+    conn = sqlite3.connect(path)
+    try:
+        per_client = [
+            row[0] for row in conn.execute(
+                "SELECT COUNT(*) FROM tickets JOIN projects ON projects.id = tickets.project_id "
+                "GROUP BY projects.client_id ORDER BY COUNT(*) DESC"
+            )
+        ]
+        completed = conn.execute("SELECT COUNT(*) FROM tickets WHERE status = 'completed'").fetchone()[0]
+        feedback = dict(conn.execute("SELECT csat, COUNT(*) FROM feedback GROUP BY csat").fetchall())
+        messages = conn.execute("SELECT COUNT(*) FROM messages").fetchone()[0]
+        indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        created = conn.execute("SELECT created_at FROM tickets WHERE id = 1").fetchone()[0]
+    finally:
+        conn.close()
+
+    # Busiest client gets far more than a uniform share
+    assert per_client[0] > 5 * sizes.tickets / sizes.clients
+    assert messages == sizes.messages
+    assert sum(feedback.values()) == completed
+    assert 0.4 < feedback["positive"] / completed < 0.6
+    assert "idx_messages_ticket_id" in indexes
+    assert len(created) == len("2024-01-01 00:00:00.000000")
@@ -0,0 +1,186 @@
+"""
+Tests for SLA timers (heap scheduler).
+"""
+
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from typing import List, Tuple
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import operations as ops
+from app.database.models import Ticket
+from app.services.business_calendar import BusinessCalendar
+from app.services.sla import SlaScheduler, resolution_deadline, restart_resolution_sla, warm_up_sla_scheduler
+
+NOW = datetime(2026, 10, 18, 12, 0)
+# Calendar time (24/7 in UTC) keeps deadline arithmetic obvious in these tests
+ALWAYS = BusinessCalendar("UTC", work_days=range(1, 8), start_hour=0, end_hour=24, around=NOW.date())
+
+
+def ticket(ticket_id: int, status: str = "new", category: str = "access", age_minutes: int = 0) -> Ticket:
+    created = NOW - timedelta(minutes=age_minutes)
+    return Ticket(
+        id=ticket_id, number=100 + ticket_id, status=status, category=category,
+        created_at=created, updated_at=created, first_response_at=None,
+        sla_due_at=created + timedelta(hours=3) if category == "access" else None,
+    )
+
+
+def at(moment: datetime) -> float:
+    return moment.replace(tzinfo=timezone.utc).timestamp()
+
+
+class RecordingScheduler(SlaScheduler):
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.fired: List[Tuple[int, str]] = []
+
+    async def _fire(self, ticket_id: int, kind: str) -> None:
+        self.fired.append((ticket_id, kind))
+
+
+def test_deadlines_follow_status():
+    scheduler = SlaScheduler(first_response_minutes=60, reminder_minutes=30, calendar=ALWAYS)
+    kinds = lambda t: [(d.kind, d.due) for d in scheduler.ticket_deadlines(t)]  # noqa: E731
+
+    assert kinds(ticket(1)) == [
+        ("unassigned", NOW + timedelta(minutes=30)),
+        ("first_response", NOW + timedelta(minutes=60)),
+        ("resolution", NOW + timedelta(hours=3)),
+    ]
+    assert kinds(ticket(1, status="in_progress")) == [("resolution", NOW + timedelta(hours=3))]
+    assert kinds(ticket(1, status="on_hold")) == []
+    assert kinds(ticket(1, category="feature")) == [
+        ("unassigned", NOW + timedelta(minutes=30)),
+        ("first_response", NOW + timedelta(minutes=60)),
+    ]
+
+
+def test_heap_pops_in_order_and_skips_superseded():
+    clock = lambda: 0.0  # noqa: E731
+    scheduler = SlaScheduler(first_response_minutes=60, reminder_minutes=0, clock=clock, calendar=ALWAYS)
+    for ticket_id in range(1, 6):
+        scheduler.schedule(ticket_id, "resolution", 100.0 - ticket_id)
+    scheduler.sync(ticket(3, status="completed"))  # closed: its deadline is dropped
+    scheduler.discard(4)
+    scheduler.schedule(2, "first_response", 50.0)
+
+    assert len(scheduler) == 4
+    assert scheduler.next_due() == 50.0
+    assert scheduler.pop_due(97.5) == [(2, "first_response"), (5, "resolution")]
+    assert scheduler.pop_due(1000) == [(2, "resolution"), (1, "resolution")]
+    assert len(scheduler) == 0 and scheduler.next_due() is None
+
+
+def test_stale_entries_are_compacted():
+    scheduler = SlaScheduler(first_response_minutes=60, reminder_minutes=30, calendar=ALWAYS)
+    open_ticket = ticket(1)
+    for _ in range(1000):
+        scheduler.sync(open_ticket)
+    assert len(scheduler) == 3
+    assert len(scheduler._heap) < 100
+
+
+def test_warm_sync_skips_past_breaches_and_realigns_reminders():
+    scheduler = SlaScheduler(first_response_minutes=60, reminder_minutes=30, clock=lambda: at(NOW), calendar=ALWAYS)
+    scheduler.sync(ticket(1, age_minutes=100), skip_past=True)
+    # Overdue reminder moves to one interval from now; overdue first response is dropped
+    assert [(round(due - at(NOW)), kind) for due, _, _, kind, _ in sorted(scheduler._heap)] == [
+        (30 * 60, "unassigned"),
+        (80 * 60, "resolution"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_overdue_breach_is_reported_once():
+    scheduler = RecordingScheduler(first_response_minutes=60, reminder_minutes=0, clock=lambda: at(NOW), calendar=ALWAYS)
+    overdue = ticket(1, age_minutes=100)
+    scheduler.start(bot=None)
+    try:
+        scheduler.sync(overdue)
+        await asyncio.sleep(0.01)
+        # Taken and paused/resumed later: the same breach is still overdue
+        scheduler.sync(overdue)
+        scheduler.sync(overdue)
+        await asyncio.sleep(0.01)
+        assert scheduler.fired == [(1, "first_response")]
+        assert len(scheduler) == 1  # resolution, due in 80 minutes
+
+        # Closed and reopened: a new breach period
+        scheduler.discard(1)
+        scheduler.sync(overdue)
+        await asyncio.sleep(0.01)
+        assert scheduler.fired == [(1, "first_response")] * 2
+    finally:
+        await scheduler.stop()
+
+
+@pytest.mark.asyncio
+async def test_task_sleeps_until_next_deadline_and_wakes_for_earlier_one():
+    scheduler = RecordingScheduler(first_response_minutes=60, reminder_minutes=30, calendar=ALWAYS)
+    scheduler.schedule(1, "resolution", time.time() + 3600)
+    scheduler.start(bot=None)
+    try:
+        await asyncio.sleep(0.01)
+        assert scheduler.fired == []
+
+        scheduler.schedule(2, "first_response", time.time() + 0.05)
+        await asyncio.sleep(0.2)
+        assert scheduler.fired == [(2, "first_response")]
+        assert len(scheduler) == 1
+    finally:
+        await scheduler.stop()
+
+
+@pytest.mark.asyncio
+async def test_warm_up_loads_open_tickets(session: AsyncSession, sample_data):
+    project_id = sample_data["project1"].id
+    await ops.create_ticket(session, project_id, 1, "access", -100123, description="a")
+    closed = await ops.create_ticket(session, project_id, 1, "access", -100123, description="b")
+    await ops.update_ticket_status(session, closed.id, "completed")
+
+    scheduler = SlaScheduler(first_response_minutes=60, reminder_minutes=30, calendar=ALWAYS)
+    assert await warm_up_sla_scheduler(session, scheduler) == 3
+
+
+def test_resolution_deadline_uses_business_hours():
+    # Friday 2026-10-23 17:00 Madrid (15:00 UTC) + 3 business hours -> Monday 11:00 Madrid
+    assert resolution_deadline("access", datetime(2026, 10, 23, 15, 0)) == datetime(2026, 10, 26, 10, 0)
+    assert resolution_deadline("feature", NOW) is None
+
+
+@pytest.mark.asyncio
+async def test_breaching_tickets_by_deadline(session: AsyncSession, sample_data):
+    project_id = sample_data["project1"].id
+    overdue = await ops.create_ticket(session, project_id, 1, "access", -100123, sla_due_at=NOW - timedelta(hours=1))
+    soon = await ops.create_ticket(session, project_id, 1, "access", -100123, sla_due_at=NOW + timedelta(hours=1))
+    await ops.create_ticket(session, project_id, 1, "access", -100123, sla_due_at=NOW + timedelta(days=2))
+    await ops.create_ticket(session, project_id, 1, "feature", -100123)
+    closed = await ops.create_ticket(session, project_id, 1, "access", -100123, sla_due_at=NOW - timedelta(hours=2))
+    await ops.update_ticket_status(session, closed.id, "completed")
+
+    tickets = await ops.get_tickets_breaching_before(session, NOW + timedelta(hours=4))
+    assert [t.id for t in tickets] == [overdue.id, soon.id]
+
+    plan = await session.execute(text(
+        "EXPLAIN QUERY PLAN SELECT id FROM tickets WHERE status IN ('new', 'in_progress') "
+        "AND sla_due_at <= '2026-10-18' ORDER BY sla_due_at"
+    ))
+    assert any("idx_tickets_status_sla_due_at" in row[-1] for row in plan)
+
+
+@pytest.mark.asyncio
+async def test_reopen_starts_new_resolution_period(session: AsyncSession, sample_data):
+    old_due = datetime.utcnow() - timedelta(days=30)
+    ticket = await ops.create_ticket(session, sample_data["project1"].id, 1, "access", -100123, sla_due_at=old_due)
+    await ops.update_ticket_status(session, ticket.id, "completed")
+    await ops.reopen_ticket(session, ticket.id)
+
+    due = await restart_resolution_sla(session, ticket)
+
+    assert due > datetime.utcnow() and ticket.sla_due_at == due
+    assert await ops.get_tickets_breaching_before(session, datetime.utcnow()) == []
@@ -0,0 +1,101 @@
+"""
+Tests for the ticket event log and time-in-status aggregation.
+"""
+
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import operations as ops
+from app.database.models import TicketEvent
+from app.services.status_time import StatusTimeAggregator, time_in_status
+
+T0 = datetime(2026, 10, 19, 10, 0)
+
+
+def event(event_id: int, ticket_id: int, minutes: int, to_status: str) -> SimpleNamespace:
+    return SimpleNamespace(id=event_id, ticket_id=ticket_id, ts=T0 + timedelta(minutes=minutes), to_status=to_status)
+
+
+def test_transition_event_names():
+    assert ops.transition_event("new", "in_progress") == "taken"
+    assert ops.transition_event("on_hold", "in_progress") == "resumed"
+    assert ops.transition_event("in_progress", "on_hold") == "paused"
+    assert ops.transition_event("in_progress", "completed") == "closed"
+    assert ops.transition_event("completed", "new") == "reopened"
+    assert ops.transition_event("completed", "in_progress") == "reopened"
+
+
+def test_time_in_status_for_one_ticket():
+    events = [event(1, 1, 0, "new"), event(2, 1, 10, "in_progress"), event(3, 1, 40, "on_hold")]
+    assert time_in_status(events) == {"new": 600, "in_progress": 1800}
+    assert time_in_status(events, now=T0 + timedelta(minutes=100)) == {
+        "new": 600, "in_progress": 1800, "on_hold": 3600,
+    }
+
+
+def test_aggregator_is_incremental():
+    aggregator = StatusTimeAggregator()
+    aggregator.feed([event(1, 1, 0, "new"), event(2, 2, 0, "new"), event(3, 1, 30, "in_progress")])
+    assert aggregator.last_event_id == 3
+
+    aggregator.feed([event(4, 1, 90, "completed"), event(5, 2, 60, "cancelled")])
+    totals = aggregator.snapshot(now=T0 + timedelta(hours=5))
+    assert (totals["new"].seconds, totals["new"].intervals) == (30 * 60 + 60 * 60, 2)
+    assert totals["in_progress"].mean_seconds == 3600
+    assert "completed" not in totals
+
+    # Reopened ticket runs again until now
+    aggregator.feed([event(6, 1, 120, "new")])
+    assert aggregator.snapshot(now=T0 + timedelta(minutes=150))["new"].intervals == 3
+
+
+@pytest.mark.asyncio
+async def test_transitions_are_logged(session: AsyncSession, sample_data):
+    ticket = await ops.create_ticket(
+        session, project_id=sample_data["project1"].id, tg_user_id=555, category="report",
+        support_chat_id=-1001234567890,
+    )
+    await ops.update_ticket_status(session, ticket.id, "in_progress", assigned_to=42, actor=42)
+    await ops.update_ticket_status(session, ticket.id, "on_hold", actor=42, reason="Ждём логи")
+    await ops.update_ticket_status(session, ticket.id, "in_progress", actor=42)
+    closed = await ops.update_ticket_status(session, ticket.id, "completed", actor=42)
+    assert closed.closed_at is not None
+    reopened = await ops.update_ticket_status(session, ticket.id, "new", actor=555)
+    assert reopened.closed_at is None
+
+    events = await ops.get_ticket_events(session, ticket.id)
+    assert [(e.event, e.from_status, e.to_status, e.actor_tg_user_id) for e in events] == [
+        ("created", None, "new", 555),
+        ("taken", "new", "in_progress", 42),
+        ("paused", "in_progress", "on_hold", 42),
+        ("resumed", "on_hold", "in_progress", 42),
+        ("closed", "in_progress", "completed", 42),
+        ("reopened", "completed", "new", 555),
+    ]
+    assert events[2].reason == "Ждём логи"
+
+
+@pytest.mark.asyncio
+async def test_aggregator_update_reads_new_events_only(session: AsyncSession, sample_data):
+    ticket = await ops.create_ticket(
+        session, project_id=sample_data["project1"].id, tg_user_id=1, category="report",
+        support_chat_id=-1001234567890,
+    )
+    await session.execute(update(TicketEvent).values(ts=T0))
+    await session.commit()
+
+    aggregator = StatusTimeAggregator()
+    assert await aggregator.update(session, batch_size=1) == 1
+    assert await aggregator.update(session) == 0
+
+    await ops.update_ticket_status(session, ticket.id, "cancelled", actor=1, event="client_cancelled")
+    await session.execute(update(TicketEvent).where(TicketEvent.event == "client_cancelled").values(
+        ts=T0 + timedelta(minutes=5)
+    ))
+    await session.commit()
+    assert await aggregator.update(session) == 1
+    assert aggregator.snapshot()["new"].seconds == 300
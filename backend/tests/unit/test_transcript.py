@@ -0,0 +1,77 @@
+"""
+Tests for chunked ticket transcripts (/history).
+"""
+
+import io
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from app.database import operations as ops
+from app.services.transcript import build_transcript_file, write_transcript
+
+
+async def ticket_with_messages(session: AsyncSession, project_id: int, count: int):
+    ticket = await ops.create_ticket(
+        session, project_id=project_id, tg_user_id=1, category="report",
+        support_chat_id=-1001234567890, description="Не работает <отчёт>",
+    )
+    # Like TicketService.create_ticket: the description is the first message
+    await ops.create_message(session, ticket.id, "client", 0, "text", 1, ticket.description)
+    for index in range(count):
+        direction = "operator" if index % 2 else "client"
+        await ops.create_message(session, ticket.id, direction, index, "text", 7 if index % 2 else 1, f"msg {index}")
+    await ops.create_message(session, ticket.id, "client", 99, "photo", 1, "скрин & подпись", "AgACPhotoId")
+    return ticket
+
+
+@pytest.mark.asyncio
+async def test_html_transcript_in_order_and_escaped(session: AsyncSession, sample_data):
+    ticket = await ticket_with_messages(session, sample_data["project1"].id, 5)
+    out = io.StringIO()
+
+    assert await write_transcript(session, ticket, out, "html", chunk_size=2) == 7
+    text = out.getvalue()
+    assert text.startswith("<!DOCTYPE html>") and text.rstrip().endswith("</html>")
+    # Shown once, as the first message
+    assert text.count("Не работает &lt;отчёт&gt;") == 1
+    assert text.index("Не работает &lt;отчёт&gt;") < text.index("msg 0<")
+    assert [text.index(f"msg {i}<") for i in range(5)] == sorted(text.index(f"msg {i}<") for i in range(5))
+    assert "скрин &amp; подпись" in text and "file_id: AgACPhotoId" in text
+    assert "Оператор 7" in text and "Сообщений: 7" in text
+
+
+@pytest.mark.asyncio
+async def test_chunks_do_not_load_orm_objects(engine: AsyncEngine, session: AsyncSession, sample_data):
+    ticket = await ticket_with_messages(session, sample_data["project1"].id, 9)
+    session.expunge_all()
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        out = io.StringIO()
+        assert await write_transcript(session, ticket, out, "txt", chunk_size=4) == 11
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", capture)
+    # 4 + 4 + 3 messages: the short last chunk ends the walk
+    assert len(statements) == 3
+    assert len(session.identity_map) == 0
+    assert "[" in out.getvalue() and "📎 photo, file_id: AgACPhotoId" in out.getvalue()
+
+
+@pytest.mark.asyncio
+async def test_transcript_file(session: AsyncSession, sample_data):
+    ticket = await ticket_with_messages(session, sample_data["project1"].id, 0)
+    path, count = await build_transcript_file(session, ticket, "txt")
+    try:
+        assert count == 2
+        assert path.suffix == ".txt"
+        text = path.read_text(encoding="utf-8")
+        assert f"Тикет #{ticket.number}" in text
+        assert text.count("Не работает <отчёт>") == 1
+    finally:
+        path.unlink()
@@ -0,0 +1,45 @@
+"""
+Fill tickets.closed_at of completed tickets that were closed without it.
+
+Run with: python scripts/backfill_closed_at.py [--batch-size 10000]
+
+Needed once after upgrading an existing database: completed tickets got no
+closed_at before, so their resolution time was missing from /stats and the
+CSV. Takes the completion time from ticket_events, or updated_at for older
+tickets. Commits per window of ticket ids, so the bot can keep running.
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+from app.database import operations as ops  # noqa: E402
+from app.database.connection import DatabaseSessionManager, close_db, init_db  # noqa: E402
+
+
+async def run_backfill(batch_size: int) -> int:
+    await init_db()
+    started = time.perf_counter()
+    try:
+        async with DatabaseSessionManager() as session:
+            tickets = await ops.backfill_closed_at(session, batch_size)
+    finally:
+        await close_db()
+    print(f"✅ closed_at backfilled: {tickets:,} tickets ({time.perf_counter() - started:.1f}s)")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Fill closed_at of completed tickets")
+    parser.add_argument("--batch-size", type=int, default=10_000, help="Ticket ids per transaction")
+    args = parser.parse_args()
+    return asyncio.run(run_backfill(args.batch_size))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
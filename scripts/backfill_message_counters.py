@@ -0,0 +1,45 @@
+"""
+Recompute ticket conversation counters (message_count, last_*_message_at,
+awaiting_reply_since) from the messages table.
+
+Run with: python scripts/backfill_message_counters.py [--batch-size 10000]
+
+Needed once after upgrading an existing database (init_db() adds the columns
+empty; the bot only counts new messages) and after bulk imports or manual
+fixes. Commits per window of ticket ids, so the bot can keep running.
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+from app.database.connection import DatabaseSessionManager, close_db, init_db  # noqa: E402
+from app.database.counters import DEFAULT_BATCH_SIZE, backfill_message_counters  # noqa: E402
+
+
+async def run_backfill(batch_size: int) -> int:
+    await init_db()
+    started = time.perf_counter()
+    try:
+        async with DatabaseSessionManager() as session:
+            tickets = await backfill_message_counters(session, batch_size)
+    finally:
+        await close_db()
+    print(f"✅ Message counters backfilled: {tickets:,} tickets with messages ({time.perf_counter() - started:.1f}s)")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Recompute ticket message counters from messages")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Ticket ids per transaction")
+    args = parser.parse_args()
+    return asyncio.run(run_backfill(args.batch_size))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+"""
+Export tickets (with project, client, feedback) and messages to CSV or Parquet.
+
+Run with:
+  python scripts/export_data.py --output-dir exports
+  python scripts/export_data.py --dataset messages --format parquet --since 2026-01-01 --until 2026-02-01
+  python scripts/export_data.py --output-dir exports --incremental
+
+Safe to run next to the live bot: rows are streamed in short read
+transactions, memory stays constant. Parquet needs pyarrow installed.
+"""
+
+import argparse
+import asyncio
+import resource
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+from app.database.connection import close_db, get_session_factory  # noqa: E402
+from app.services.exporter import (  # noqa: E402
+    DATASETS,
+    DEFAULT_CHUNK_SIZE,
+    DEFAULT_WINDOW,
+    FORMATS,
+    ExportError,
+    ExportFilter,
+    export_dataset,
+    export_incremental,
+    load_state,
+    save_state,
+)
+
+STATE_FILE = ".export_state.json"
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Stream tickets and messages to CSV/Parquet")
+    parser.add_argument("--dataset", choices=[*DATASETS, "all"], default="all")
+    parser.add_argument("--format", choices=FORMATS, default="csv")
+    parser.add_argument("--output-dir", type=Path, default=Path("exports"))
+    parser.add_argument("--since", type=datetime.fromisoformat, help="created_at >= (YYYY-MM-DD[ HH:MM])")
+    parser.add_argument("--until", type=datetime.fromisoformat, help="created_at < (YYYY-MM-DD[ HH:MM])")
+    parser.add_argument(
+        "--incremental", action="store_true",
+        help=f"Only rows new/changed since the previous --incremental run (state in <output-dir>/{STATE_FILE})",
+    )
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Rows per fetch/write")
+    parser.add_argument("--window", type=int, default=DEFAULT_WINDOW, help="Rows per read transaction")
+    return parser.parse_args(argv)
+
+
+async def run_export(args: argparse.Namespace) -> int:
+    datasets = list(DATASETS) if args.dataset == "all" else [args.dataset]
+    stamp = datetime.now().strftime("%Y%m%dT%H%M%S")
+    args.output_dir.mkdir(parents=True, exist_ok=True)
+    state_path = args.output_dir / STATE_FILE
+    state = load_state(state_path) if args.incremental else {}
+    factory = get_session_factory()
+
+    try:
+        for dataset in datasets:
+            path = args.output_dir / f"{dataset}-{stamp}.{args.format}"
+            filters = ExportFilter(since=args.since, until=args.until)
+            started = time.perf_counter()
+            if args.incremental:
+                result = await export_incremental(
+                    factory, dataset, path, state, args.format, filters, args.chunk_size, args.window
+                )
+                save_state(state_path, state)
+            else:
+                result = await export_dataset(
+                    factory, dataset, path, args.format, filters, args.chunk_size, args.window
+                )
+            print(f"✅ {dataset}: {result.rows:,} rows → {path} ({time.perf_counter() - started:.1f}s)")
+    except ExportError as e:
+        print(f"❌ {e}")
+        return 1
+    finally:
+        await close_db()
+
+    # ru_maxrss is KiB on Linux
+    print(f"Peak RSS: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MiB")
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    return asyncio.run(run_export(parse_args(argv)))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+"""
+Generate a synthetic production-sized database for performance testing.
+
+Run with:
+  python scripts/generate_data.py --db data/perf.sqlite --scale 1.0
+  python scripts/generate_data.py --db data/small.sqlite --tickets 100000 --messages 1000000 --zipf 1.3
+
+Distributions are configurable: Zipf skew of clients, ticket status mix,
+messages-per-ticket tail, CSAT rates. The same seed gives the same data.
+"""
+
+import argparse
+import dataclasses
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+from benchmarks.seed import DatasetSizes, Distributions, seed_database  # noqa: E402
+
+
+def parse_status_mix(value: str) -> Tuple[Tuple[str, int], ...]:
+    """
+    Parse 'completed=70,cancelled=10,...' into status weights.
+
+    Args:
+        value: Comma-separated status=weight pairs
+    """
+    weights: List[Tuple[str, int]] = []
+    for part in value.split(","):
+        status, _, weight = part.partition("=")
+        if not status.strip() or not weight.strip().isdigit():
+            raise argparse.ArgumentTypeError(f"Invalid status weight: {part!r}")
+        weights.append((status.strip(), int(weight)))
+    return tuple(weights)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Bulk-load synthetic clients, tickets and messages into SQLite")
+    parser.add_argument("--db", type=Path, required=True, help="SQLite file to create")
+    parser.add_argument("--force", action="store_true", help="Overwrite existing file")
+    parser.add_argument("--scale", type=float, default=1.0, help="Fraction of production sizes (1.0 = 1M tickets)")
+    parser.add_argument("--seed", type=int, default=42)
+
+    counts = parser.add_argument_group("row counts (override --scale)")
+    for name in ("clients", "bindings", "tickets", "messages"):
+        counts.add_argument(f"--{name}", type=int)
+
+    shape = parser.add_argument_group("distributions")
+    defaults = Distributions()
+    shape.add_argument("--zipf", type=float, default=defaults.client_skew, help="Client skew exponent (0 = uniform)")
+    shape.add_argument(
+        "--status-mix",
+        type=parse_status_mix,
+        default=defaults.status_weights,
+        help="Ticket status weights, e.g. completed=70,cancelled=10,in_progress=10,on_hold=5,new=5",
+    )
+    shape.add_argument(
+        "--message-tail", type=float, default=defaults.message_sigma,
+        help="Lognormal sigma of messages per ticket (0 = equal)",
+    )
+    shape.add_argument("--csat-response", type=float, default=defaults.csat_response_rate)
+    shape.add_argument("--csat-positive", type=float, default=defaults.csat_positive_rate)
+    shape.add_argument("--attachments", type=float, default=defaults.attachment_rate, help="Share of file messages")
+    return parser.parse_args(argv)
+
+
+def build_sizes(args: argparse.Namespace) -> DatasetSizes:
+    """Sizes for --scale with explicit counts applied (derived counts follow clients/bindings)."""
+    sizes = DatasetSizes.for_scale(args.scale)
+    overrides: Dict[str, int] = {
+        name: getattr(args, name) for name in ("clients", "bindings", "tickets", "messages")
+        if getattr(args, name) is not None
+    }
+    if "clients" in overrides:
+        overrides.update(projects=overrides["clients"] * 3 // 2 or 1, predefined_users=overrides["clients"] * 2)
+    if "bindings" in overrides:
+        overrides["users"] = max(1, overrides["bindings"] * 4 // 5)
+    return dataclasses.replace(sizes, **overrides)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    if args.db.exists():
+        if not args.force:
+            print(f"❌ {args.db} exists (pass --force to overwrite)")
+            return 1
+        args.db.unlink()
+
+    sizes = build_sizes(args)
+    distributions = Distributions(
+        client_skew=args.zipf,
+        status_weights=args.status_mix,
+        message_sigma=args.message_tail,
+        csat_response_rate=args.csat_response,
+        csat_positive_rate=args.csat_positive,
+        attachment_rate=args.attachments,
+    )
+
+    print(f"Generating {args.db} (seed {args.seed})")
+    started = time.perf_counter()
+    seed_database(args.db, seed=args.seed, distributions=distributions, sizes=sizes)
+    elapsed = time.perf_counter() - started
+
+    print(json.dumps({"sizes": sizes.to_dict(), "distributions": distributions.to_dict()}, indent=2))
+    print(f"\n✅ Done in {elapsed:.1f}s ({args.db.stat().st_size / 2**20:.0f} MiB)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+"""
+Bulk import clients, projects, invite codes and predefined users.
+
+Run with:
+  python scripts/import_data.py customers.csv
+  python scripts/import_data.py customers.jsonl --chunk-size 10000
+
+CSV header (JSONL uses the same keys):
+  client,project,invite_code,username
+
+Invite codes are validated against the file and the database before
+anything is written; then rows are upserted, one transaction per chunk.
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+from typing import List, Optional
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+from app.database.connection import DatabaseSessionManager, close_db, init_db  # noqa: E402
+from app.services.importer import (  # noqa: E402
+    DEFAULT_CHUNK_SIZE,
+    ImportFormatError,
+    ImportReport,
+    import_rows,
+    iter_rows,
+    read_records,
+    validate_invite_codes,
+)
+
+
+def print_report(report: ImportReport, elapsed: float) -> None:
+    """Print per-table counts and the first errors."""
+    print(f"\n{'table':<18} {'inserted':>9} {'updated':>9} {'skipped':>9}")
+    for name in ("clients", "projects", "predefined_users"):
+        counts = getattr(report, name)
+        print(f"{name:<18} {counts.inserted:>9} {counts.updated:>9} {counts.skipped:>9}")
+    print(f"\nRejected rows: {report.rejected}")
+    for error in report.errors:
+        print(f"  ⚠️  {error}")
+    print(f"\n✅ Done in {elapsed:.1f}s")
+
+
+async def run_import(path: Path, chunk_size: int) -> int:
+    """Validate invite codes, then import. Returns process exit code."""
+    await init_db()
+    started = time.perf_counter()
+    try:
+        async with DatabaseSessionManager() as session:
+            # First pass: invite codes only (nothing is written)
+            conflicts = await validate_invite_codes(
+                session, iter_rows(read_records(path), ImportReport()), chunk_size
+            )
+            if conflicts:
+                print(f"❌ {len(conflicts)} invite code conflicts, nothing imported:")
+                for conflict in conflicts[:50]:
+                    print(f"  {conflict}")
+                return 1
+
+            report = ImportReport()
+            await import_rows(session, iter_rows(read_records(path), report), report, chunk_size)
+    except ImportFormatError as e:
+        print(f"❌ {e}")
+        return 1
+    finally:
+        await close_db()
+
+    print_report(report, time.perf_counter() - started)
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Bulk upsert clients, projects and predefined users")
+    parser.add_argument("file", type=Path, help="CSV or JSONL file")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Rows per transaction")
+    args = parser.parse_args(argv)
+
+    if not args.file.exists():
+        print(f"❌ File not found: {args.file}")
+        return 1
+    return asyncio.run(run_import(args.file, args.chunk_size))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,6 +5,8 @@ Run with: python scripts/init_data.py
 
 To add predefined users:
   python scripts/init_data.py --add-user username client_name
+
+For bulk onboarding (thousands of users, CSV/JSONL) use scripts/import_data.py.
 """
 
 import argparse
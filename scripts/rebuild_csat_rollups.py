@@ -0,0 +1,40 @@
+"""
+Recompute CSAT rollups (csat_rollups) from the feedback table.
+
+Run with: python scripts/rebuild_csat_rollups.py
+
+Needed once after upgrading an existing database (the bot only maintains
+rollups for new feedback) and after manual data fixes or deleted tickets.
+Runs in one transaction: /csat sees either the old or the new rollups.
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+from app.database.connection import DatabaseSessionManager, close_db, init_db  # noqa: E402
+from app.database.rollups import rebuild_csat_rollups  # noqa: E402
+
+
+async def run_rebuild() -> int:
+    await init_db()
+    started = time.perf_counter()
+    try:
+        async with DatabaseSessionManager() as session:
+            rows = await rebuild_csat_rollups(session)
+    finally:
+        await close_db()
+    print(f"✅ CSAT rollups rebuilt: {rows:,} rows ({time.perf_counter() - started:.1f}s)")
+    return 0
+
+
+def main() -> int:
+    return asyncio.run(run_rebuild())
+
+
+if __name__ == "__main__":
+    sys.exit(main())